@@ -0,0 +1,76 @@
+"""Time DAG dispatch overhead on large synthetic plans.
+
+Runs ``run_dag`` with a no-op executor over wide, chain and layered plans of
+1k and 10k nodes, so the time measured is scheduling alone. RUNNING writes
+counts ``persist_started`` calls, the number of durable writes a real run
+spends on starting steps.
+
+    python -m benchmarks.dag_dispatch
+"""
+
+import asyncio
+import time
+
+from cognitrix.tasks.dag import DagNode, run_dag
+
+NODE_COUNTS = (1_000, 10_000)
+MAX_PARALLEL = 8
+LAYER_WIDTH = 50
+
+
+def _wide(count: int) -> list[DagNode]:
+    return [DagNode(node_id=index) for index in range(count)]
+
+
+def _chain(count: int) -> list[DagNode]:
+    return [
+        DagNode(node_id=index, dependencies=(index - 1,) if index else ())
+        for index in range(count)
+    ]
+
+
+def _layered(count: int) -> list[DagNode]:
+    """Layers of LAYER_WIDTH nodes, each depending on two nodes of the layer above."""
+    nodes = []
+    for index in range(count):
+        layer, position = divmod(index, LAYER_WIDTH)
+        if layer == 0:
+            nodes.append(DagNode(node_id=index))
+            continue
+        above = (layer - 1) * LAYER_WIDTH
+        dependencies = {above + position, above + (position + 1) % LAYER_WIDTH}
+        nodes.append(DagNode(node_id=index, dependencies=tuple(sorted(dependencies))))
+    return nodes
+
+
+SHAPES = {"wide": _wide, "chain": _chain, "layered": _layered}
+
+
+async def _measure(nodes: list[DagNode]) -> tuple[float, int]:
+    writes = 0
+
+    async def execute(node: DagNode) -> int:
+        return node.node_id
+
+    async def persist_started(wave: list[DagNode]) -> None:
+        nonlocal writes
+        writes += 1
+
+    started = time.perf_counter()
+    await run_dag(nodes, execute, max_parallel=MAX_PARALLEL, persist_started=persist_started)
+    return time.perf_counter() - started, writes
+
+
+async def main() -> None:
+    print(f"{'shape':>8} {'nodes':>7} {'ms':>9} {'us/node':>8} {'RUNNING writes':>15}")
+    for name, build in SHAPES.items():
+        for count in NODE_COUNTS:
+            seconds, writes = await _measure(build(count))
+            print(
+                f"{name:>8} {count:>7} {seconds * 1000:>9.1f} "
+                f"{seconds * 1e6 / count:>8.1f} {writes:>15}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
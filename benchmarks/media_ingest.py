@@ -0,0 +1,90 @@
+"""Measure image ingestion throughput in images per second per core.
+
+Normalizes a burst of camera-sized JPEGs and screenshot PNGs the way
+uploads are processed (original re-encode, vision variant, thumbnail) under
+each execution mode:
+
+* ``thread, full decode``: the thread pool, resampling variants from the
+  full-size decode (the behaviour before reduced JPEG decoding).
+* ``thread``: the thread pool with reduced-scale JPEG decoding.
+* ``process``: the shared process pool (``COGNITRIX_MEDIA_PROCESSING_MODE``).
+
+Per-core throughput divides by the cores actually available to the workers.
+
+    python -m benchmarks.media_ingest
+"""
+
+import asyncio
+import io
+import os
+import time
+
+from PIL import Image, ImageDraw
+
+from cognitrix.media import processing
+
+BURST = 20
+CONCURRENCY = min(processing._MAX_MEDIA_PROCESSING_CONCURRENCY, os.cpu_count() or 1)
+
+
+def _photo(width: int, height: int) -> bytes:
+    noise = Image.effect_noise((width // 8, height // 8), 40).resize((width, height))
+    gradient = Image.linear_gradient('L').resize((width, height))
+    image = Image.merge('RGB', (noise, gradient, gradient.transpose(Image.Transpose.ROTATE_180)))
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+def _screenshot(width: int, height: int) -> bytes:
+    image = Image.new('RGB', (width, height), (246, 246, 246))
+    draw = ImageDraw.Draw(image)
+    for top in range(0, height, 48):
+        draw.rectangle((0, top, width // 5, top + 40), fill=(40, 44, 52))
+        draw.text((width // 4, top + 12), 'def handler(request): return response ' * 3, fill=(20, 20, 20))
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+
+async def _burst(images: list[bytes]) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(processing.run_media_cpu(processing._process_image, data) for data in images)
+    )
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    jpeg = _photo(4032, 3024)
+    png = _screenshot(1920, 1080)
+    images = [jpeg if index % 4 else png for index in range(BURST)]
+    cores = min(CONCURRENCY, os.cpu_count() or 1)
+    processing.MEDIA_PROCESSING_CONCURRENCY = CONCURRENCY
+    reduced_jpeg = processing._reduced_jpeg
+
+    print(f'{BURST} images ({len(jpeg) // 1024} KiB JPEG, {len(png) // 1024} KiB PNG), '
+          f'concurrency {CONCURRENCY}, {cores} core(s)')
+    print(f"{'mode':>20} {'seconds':>8} {'images/s':>9} {'per core':>9}")
+    for label, mode, reduced in (
+        ('thread, full decode', 'thread', False),
+        ('thread', 'thread', True),
+        ('process', 'process', True),
+    ):
+        processing.MEDIA_PROCESSING_MODE = mode
+        processing._reduced_jpeg = reduced_jpeg if reduced else (lambda _data: None)
+        if mode == 'process':
+            # Start the workers outside the measurement.
+            await asyncio.gather(
+                *(processing.run_media_cpu(processing._process_image, png) for _ in range(CONCURRENCY))
+            )
+        seconds = await _burst(images)
+        rate = BURST / seconds
+        print(f'{label:>20} {seconds:>8.2f} {rate:>9.2f} {rate / cores:>9.2f}')
+    processing._reduced_jpeg = reduced_jpeg
+    if processing._process_pool is not None:
+        processing._process_pool.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
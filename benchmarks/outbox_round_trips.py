@@ -0,0 +1,95 @@
+"""Count database round-trips needed to drain a task-run event outbox.
+
+Compares the per-envelope drain with the batched ``RunRepository.flush_outbox``
+on a throwaway SQLite database. Every ODBMS SQLite operation opens its own
+connection, so connections opened during a drain equal statements issued.
+
+    python -m benchmarks.outbox_round_trips
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from odbms import DBMS
+
+from cognitrix.config import _patch_odbms_sqlite
+from cognitrix.tasks.events import TaskRunEvent
+from cognitrix.tasks.repository import RunRepository
+from cognitrix.tasks.run import TaskRun, TaskRunHead, TaskRunStatus
+
+# The per-envelope drain gives up after MAX_CAS_ATTEMPTS * 4 envelopes.
+EVENT_COUNTS = (1, 10, 100, 250)
+
+
+async def _stranded_run(repo: RunRepository, task_id: str, count: int) -> str:
+    async def leave_for_recovery(*args, **kwargs):
+        return []
+
+    created = await repo.create_queued(task_id=task_id)
+    original = repo.flush_outbox
+    repo.flush_outbox = leave_for_recovery
+    try:
+        for index in range(count):
+            await repo.mutate(
+                created.id,
+                claim=None,
+                updates={},
+                expected_statuses={TaskRunStatus.QUEUED},
+                event={"kind": "text_delta", "data": {"index": index}},
+            )
+    finally:
+        repo.flush_outbox = original
+    return created.id
+
+
+async def _measure(repo: RunRepository, drain, run_id: str) -> tuple[int, float]:
+    database = DBMS.Database
+    original = database._get_connection
+    opened = 0
+
+    def counted():
+        nonlocal opened
+        opened += 1
+        return original()
+
+    database._get_connection = counted
+    started = time.perf_counter()
+    try:
+        await drain(run_id)
+    finally:
+        database._get_connection = original
+    return opened, time.perf_counter() - started
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        await DBMS.initialize_async(
+            "sqlite",
+            database=str(Path(directory) / "outbox.db"),
+        )
+        _patch_odbms_sqlite()
+        for model in (TaskRun, TaskRunHead, TaskRunEvent):
+            await model.create_table()
+
+        repo = RunRepository()
+        print(f"{'events':>8} {'serial trips':>13} {'batched trips':>14} "
+              f"{'serial ms':>10} {'batched ms':>11}")
+        for count in EVENT_COUNTS:
+            serial_run = await _stranded_run(repo, f"serial-{count}", count)
+            batched_run = await _stranded_run(repo, f"batched-{count}", count)
+            serial_trips, serial_seconds = await _measure(
+                repo, repo._flush_outbox_serial, serial_run
+            )
+            batched_trips, batched_seconds = await _measure(
+                repo, repo.flush_outbox, batched_run
+            )
+            print(
+                f"{count:>8} {serial_trips:>13} {batched_trips:>14} "
+                f"{serial_seconds * 1000:>10.1f} {batched_seconds * 1000:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,5 @@
 import asyncio
+import sys
 from contextlib import asynccontextmanager
 
 import aiofiles
@@ -12,8 +13,10 @@ from ..media.staging import (
     start_attachment_maintenance,
     stop_attachment_maintenance,
 )
+from ..tasks.event_bus import close_run_event_bus
 from ..tasks.recovery import recovery_loop, run_recovery_pass
 from ..tasks.scheduler import scheduler_loop
+from ..utils.stream_state import close_stream_state
 from .health import task_runtime_health
 from .routes import api_router
 from .routes.openai_compat import openai_api
@@ -27,8 +30,16 @@ async def lifespan(app: FastAPI):
     await run_recovery_pass()
     scheduler = None
     recovery = None
+    warmup = None
     maintenance_started = False
     try:
+        if settings.embedding_warmup_models:
+            from ..utils.embedding_model import warm_up_embedding_models
+
+            # Off the startup path: the first memory turn finds the model loaded.
+            warmup = asyncio.create_task(
+                asyncio.to_thread(warm_up_embedding_models, settings.embedding_warmup_models)
+            )
         scheduler = asyncio.create_task(scheduler_loop())
         recovery = asyncio.create_task(
             recovery_loop(
@@ -40,7 +51,7 @@ async def lifespan(app: FastAPI):
         yield
     finally:
         cleanup_errors = []
-        tasks = tuple(task for task in (scheduler, recovery) if task is not None)
+        tasks = tuple(task for task in (scheduler, recovery, warmup) if task is not None)
         for task in tasks:
             task.cancel()
         for task in tasks:
@@ -55,6 +66,27 @@ async def lifespan(app: FastAPI):
                 await stop_attachment_maintenance()
         except BaseException as exc:
             cleanup_errors.append(exc)
+        try:
+            await close_run_event_bus()
+        except BaseException as exc:
+            cleanup_errors.append(exc)
+        try:
+            await close_stream_state()
+        except BaseException as exc:
+            cleanup_errors.append(exc)
+        provider = sys.modules.get('cognitrix.providers.base')
+        if provider is not None:
+            try:
+                await provider.close_llm_clients()
+            except BaseException as exc:
+                cleanup_errors.append(exc)
+        memory = sys.modules.get('cognitrix.memory.hybrid_context')
+        if memory is not None:
+            # Only loaded once an agent used long-term memory.
+            try:
+                await memory.flush_pending_memories()
+            except BaseException as exc:
+                cleanup_errors.append(exc)
         if cleanup_errors:
             raise cleanup_errors[0]
 
@@ -66,7 +98,9 @@ app.add_middleware(
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    # Keyset cursor of the paged task and run list endpoints.
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(api_router)
@@ -84,6 +118,13 @@ async def healthcheck():
     return await task_runtime_health()
 
 
+@app.get('/health/llm-clients')
+async def llm_client_health():
+    from ..providers.base import llm_client_pool_stats
+
+    return llm_client_pool_stats()
+
+
 # SPA fallback — MUST be registered last so real routes (api, /health, the
 # static mounts) aren't shadowed by this catch-all.
 @app.get("/{path:path}")
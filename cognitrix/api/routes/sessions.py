@@ -156,7 +156,8 @@ async def _visible_remote_sessions(sessions: list[Session], ctx: AuthContext) ->
         run_candidates.append(session)
     if run_candidates:
         visible.extend(await visible_sessions(run_candidates, ctx))
-    return visible
+    # Only the sessions actually returned pay for their history.
+    return await Session.load_chats(visible)
 
 
 def _not_found() -> HTTPException:
@@ -1,4 +1,6 @@
 import asyncio
+import base64
+import binascii
 import inspect
 import json
 import logging
@@ -6,7 +8,7 @@ from collections.abc import Mapping
 from datetime import datetime, timezone
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
@@ -16,7 +18,8 @@ from cognitrix.common.security import AuthContext, crud_scope, get_auth_context,
 from cognitrix.tasks import Task
 from cognitrix.tasks.base import TaskStatus
 from cognitrix.tasks.budget import TaskBudget, stable_actor_key
-from cognitrix.tasks.events import event_payload, events_after, step_tool_calls
+from cognitrix.tasks.event_bus import run_event_bus
+from cognitrix.tasks.events import EVENT_PAGE_SIZE, event_payload, events_after, step_tool_calls
 from cognitrix.tasks.repository import (
     ActiveRunExists,
     RunRepository,
@@ -49,10 +52,16 @@ _TERMINAL_RUN_STATUSES = (
 _TASK_RUN_SCAN_BATCH = 100
 # Offset is a compatibility surface for the current UI, but it must not turn
 # one authenticated request into an unbounded history scan.  Keep both the
-# visible window and the underlying ACL scan finite; cursor pagination can
-# replace this compatibility window in a future API version.
+# visible window and the underlying ACL scan finite; new clients page with
+# the opaque keyset cursor returned in X-Next-Cursor instead.
 _TASK_RUN_MAX_OFFSET = 1_000
 _TASK_RUN_MAX_SCAN_ROWS = 5_000
+_TASK_PAGE_SIZE = 100
+_NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+# List views read metadata only: plans, results and outboxes stay behind the
+# detail and result endpoints.  A pre-row legacy run still carries its plan.
+_TASK_RUN_LIST_BLOBS = frozenset({'plan', 'result', 'result_data', 'event_outbox'})
+_TASK_RUN_STEP_LIST_BLOBS = frozenset({'result', 'runtime_snapshot'})
 
 
 def _check_task_allowlists(ctx: AuthContext, task: Task) -> None:
@@ -176,8 +185,11 @@ def _run_authority(ctx: AuthContext) -> tuple[str, str | None]:
 
 async def _task_projection(task: Task) -> dict:
     """Project TaskRun lifecycle state over the legacy Task status cache."""
+    return _task_projection_with_latest(task, await RunRepository().latest_run(task.id))
+
+
+def _task_projection_with_latest(task: Task, latest: TaskRun | None) -> dict:
     data = _task_json(task)
-    latest = await RunRepository().latest_run(task.id)
     if latest is None:
         data['run_id'] = None
         data['run_status'] = None
@@ -297,13 +309,171 @@ def _sql_parameter(dbms: str, name: str) -> str:
     return f':{name}' if dbms == 'sqlite' else f'%({name})s'
 
 
+PageKey = tuple[str, str]
+
+
+def _page_key(record: Mapping) -> PageKey:
+    """The stored (created_at, id) of a row, as the database compares it."""
+    created_at = record.get('created_at')
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat(sep=' ')
+    return str(created_at or ''), str(record.get('id') or record.get('_id') or '')
+
+
+def _encode_cursor(key: PageKey) -> str:
+    token = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str | None) -> PageKey | None:
+    if not cursor:
+        return None
+    try:
+        created_at, item_id = json.loads(
+            base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        )
+    except (binascii.Error, ValueError, TypeError):
+        created_at = item_id = None
+    if not isinstance(created_at, str) or not isinstance(item_id, str):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+    return created_at, item_id
+
+
+def _keyset_predicate(dbms: str, alias: str) -> str:
+    """Rows strictly after a (created_at, id) key in newest-first order."""
+    created_at = _sql_parameter(dbms, 'after_created_at')
+    return (
+        f'({alias}.created_at < {created_at} OR '
+        f'({alias}.created_at = {created_at} AND '
+        f'{alias}.id < {_sql_parameter(dbms, "after_id")}))'
+    )
+
+
+def _keyset_params(after: PageKey | None) -> dict:
+    return {'after_created_at': after[0], 'after_id': after[1]} if after else {}
+
+
+def _keyset_conditions(after: PageKey | None) -> dict:
+    if after is None:
+        return {}
+    from bson import ObjectId
+
+    try:
+        created_at = datetime.fromisoformat(after[0])
+    except ValueError:
+        created_at = after[0]
+    # Stored _id values are ObjectIds; a str never compares equal or less.
+    after_id = ObjectId(after[1]) if ObjectId.is_valid(after[1]) else after[1]
+    return {'$or': [
+        {'created_at': {'$lt': created_at}},
+        {'created_at': created_at, '_id': {'$lt': after_id}},
+    ]}
+
+
+def _list_columns(model, alias: str, excluded: frozenset[str]) -> str:
+    return ', '.join(
+        f'{alias}.{name}' for name in model.model_fields if name not in excluded
+    )
+
+
+async def _task_rows(*, limit: int, after: PageKey | None) -> list[tuple[PageKey, Task]]:
+    """One newest-first page of live tasks, filtered by the database."""
+    from odbms import DBMS
+
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    if dbms == 'mongodb':
+        rows = await database.find(
+            Task.table_name(),
+            {'deleted_at': {'$in': [None, '']}, **_keyset_conditions(after)},
+            limit=limit,
+            sort=[('created_at', -1), ('_id', -1)],
+        )
+    elif dbms in ('sqlite', 'postgresql', 'mysql'):
+        predicate = f' AND {_keyset_predicate(dbms, "t")}' if after else ''
+        rows = await _relational_records(
+            database,
+            f'SELECT * FROM {Task.table_name()} t '
+            "WHERE (t.deleted_at IS NULL OR t.deleted_at = '')"
+            f'{predicate} '
+            'ORDER BY t.created_at DESC, t.id DESC '
+            f'LIMIT {_sql_parameter(dbms, "limit")}',
+            {'limit': limit, **_keyset_params(after)},
+        )
+    else:
+        raise RuntimeError(
+            f'Indexed task paging is unsupported for database {dbms!r}'
+        )
+    return [(_page_key(row), Task(**Task.normalise(row))) for row in rows]
+
+
+async def _latest_task_runs(task_ids: list[str]) -> dict[str, TaskRun]:
+    """Latest run id/status per task for a list page, in two indexed reads.
+
+    Heads answer for every task that has one; tasks without a usable head
+    (never run, or pre-head history) take the newest run by (created_at, id).
+    """
+    if not task_ids:
+        return {}
+    from odbms import DBMS
+
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    if dbms not in ('sqlite', 'postgresql', 'mysql'):
+        repository = RunRepository()
+        runs = await asyncio.gather(*(repository.latest_run(task_id) for task_id in task_ids))
+        return {task_id: run for task_id, run in zip(task_ids, runs, strict=True) if run is not None}
+
+    def task_filter(column: str, ids: list[str]) -> tuple[str, dict]:
+        params = {f'task_id_{index}': task_id for index, task_id in enumerate(ids)}
+        placeholders = ', '.join(_sql_parameter(dbms, name) for name in params)
+        return f'{column} IN ({placeholders})', params
+
+    latest: dict[str, TaskRun] = {}
+    predicate, params = task_filter('h.id', task_ids)
+    try:
+        rows = await _relational_records(
+            database,
+            'SELECT r.id, r.task_id, r.status '
+            f'FROM {TaskRunHead.table_name()} h '
+            f'JOIN {TaskRun.table_name()} r ON r.id = h.latest_run_id '
+            f'WHERE {predicate}',
+            params,
+        )
+    except Exception:
+        # Additive rollout: a reader may briefly precede the head schema.
+        logger.debug('Could not read task-run heads for a task page', exc_info=True)
+        rows = []
+    for row in rows:
+        run = TaskRun(**TaskRun.normalise(row))
+        latest[run.task_id] = run
+
+    missing = [task_id for task_id in task_ids if task_id not in latest]
+    if missing:
+        predicate, params = task_filter('r.task_id', missing)
+        rows = await _relational_records(
+            database,
+            'SELECT r.id, r.task_id, r.status '
+            f'FROM {TaskRun.table_name()} r '
+            f'WHERE {predicate} AND NOT EXISTS ('
+            f'SELECT 1 FROM {TaskRun.table_name()} n '
+            'WHERE n.task_id = r.task_id AND (n.created_at > r.created_at OR '
+            '(n.created_at = r.created_at AND n.id > r.id)))',
+            params,
+        )
+        for row in rows:
+            run = TaskRun(**TaskRun.normalise(row))
+            latest[run.task_id] = run
+    return latest
+
+
 async def _task_run_rows(
     task_id: str,
     *,
     limit: int,
-    offset: int,
-) -> list[TaskRun]:
-    """Read one deterministic database page without materializing history."""
+    after: PageKey | None = None,
+) -> list[tuple[PageKey, TaskRun]]:
+    """Read one keyset page of run metadata without materializing history."""
     from odbms import DBMS
 
     database = DBMS.Database
@@ -311,26 +481,32 @@ async def _task_run_rows(
     if dbms == 'mongodb':
         rows = await database.find(
             TaskRun.table_name(),
-            {'task_id': task_id},
-            skip=offset,
+            {'task_id': task_id, **_keyset_conditions(after)},
             limit=limit,
             sort=[('created_at', -1), ('_id', -1)],
         )
     elif dbms in ('sqlite', 'postgresql', 'mysql'):
+        predicate = f' AND {_keyset_predicate(dbms, "r")}' if after else ''
         rows = await _relational_records(
             database,
-            f'SELECT * FROM {TaskRun.table_name()} '
-            f'WHERE task_id = {_sql_parameter(dbms, "task_id")} '
-            'ORDER BY created_at DESC, id DESC '
-            f'LIMIT {_sql_parameter(dbms, "limit")} '
-            f'OFFSET {_sql_parameter(dbms, "offset")}',
-            {'task_id': task_id, 'limit': limit, 'offset': offset},
+            f'SELECT {_list_columns(TaskRun, "r", _TASK_RUN_LIST_BLOBS)}, '
+            'CASE WHEN EXISTS ('
+            f'SELECT 1 FROM {TaskRunStep.table_name()} s WHERE s.run_id = r.id'
+            ') THEN NULL ELSE r.plan END AS plan '
+            f'FROM {TaskRun.table_name()} r '
+            f'WHERE r.task_id = {_sql_parameter(dbms, "task_id")}{predicate} '
+            'ORDER BY r.created_at DESC, r.id DESC '
+            f'LIMIT {_sql_parameter(dbms, "limit")}',
+            {'task_id': task_id, 'limit': limit, **_keyset_params(after)},
         )
+        for row in rows:
+            if row.get('plan') is None:
+                row.pop('plan', None)
     else:
         raise RuntimeError(
             f'Indexed task-run paging is unsupported for database {dbms!r}'
         )
-    return [TaskRun(**TaskRun.normalise(row)) for row in rows]
+    return [(_page_key(row), TaskRun(**TaskRun.normalise(row))) for row in rows]
 
 
 async def _authorized_task_run_page(
@@ -339,34 +515,36 @@ async def _authorized_task_run_page(
     *,
     limit: int,
     offset: int,
-) -> list[TaskRun]:
+    after: PageKey | None = None,
+) -> tuple[list[TaskRun], str | None]:
     """Page the ACL-visible sequence without ever loading all task runs.
 
     ACL snapshots contain portable JSON agent lists, so applying their exact
     semantics in SQL would require divergent queries for every supported
-    database. Scan fixed-size ordered pages instead: memory and every database
+    database. Scan fixed-size keyset pages instead: memory and every database
     read stay bounded while offset still counts visible runs, not hidden rows.
+    Returns the page and a cursor to continue after it, if more may follow.
     """
     selected: list[TaskRun] = []
     visible_seen = 0
-    database_offset = 0
-    while (
-        len(selected) < limit
-        and database_offset < _TASK_RUN_MAX_SCAN_ROWS
-    ):
+    scanned = 0
+    position = after
+    next_key: PageKey | None = None
+    exhausted = False
+    while len(selected) < limit and scanned < _TASK_RUN_MAX_SCAN_ROWS:
         batch_limit = min(
             _TASK_RUN_SCAN_BATCH,
-            _TASK_RUN_MAX_SCAN_ROWS - database_offset,
+            _TASK_RUN_MAX_SCAN_ROWS - scanned,
         )
         batch = await _task_run_rows(
             task_id,
             limit=batch_limit,
-            offset=database_offset,
+            after=position,
         )
-        if not batch:
-            break
-        database_offset += len(batch)
-        for run in batch:
+        scanned += len(batch)
+        if batch:
+            position = batch[-1][0]
+        for key, run in batch:
             if not run_acl_allowed(run, ctx):
                 continue
             if visible_seen < offset:
@@ -375,10 +553,15 @@ async def _authorized_task_run_page(
             selected.append(run)
             visible_seen += 1
             if len(selected) == limit:
+                next_key = key
                 break
         if len(batch) < batch_limit:
+            exhausted = True
             break
-    return selected
+    if next_key is None and not exhausted:
+        # The scan budget ran out on hidden rows; resume the scan from there.
+        next_key = position
+    return selected, _encode_cursor(next_key) if next_key else None
 
 
 async def _task_run_step_rows(run_ids: list[str]) -> list[TaskRunStep]:
@@ -405,9 +588,10 @@ async def _task_run_step_rows(run_ids: list[str]) -> list[TaskRunStep]:
         )
         rows = await _relational_records(
             database,
-            f'SELECT * FROM {TaskRunStep.table_name()} '
-            f'WHERE run_id IN ({placeholders}) '
-            'ORDER BY run_id ASC, step_index ASC',
+            f'SELECT {_list_columns(TaskRunStep, "s", _TASK_RUN_STEP_LIST_BLOBS)} '
+            f'FROM {TaskRunStep.table_name()} s '
+            f'WHERE s.run_id IN ({placeholders}) '
+            'ORDER BY s.run_id ASC, s.step_index ASC',
             params,
         )
     else:
@@ -546,34 +730,74 @@ def _event_cursor(request: Request, after: int | None) -> int:
     return max(0, *values)
 
 
+def _sse_event(payload: dict) -> dict:
+    return {
+        'event': 'task_run',
+        'id': str(payload['sequence']),
+        'data': json.dumps(payload),
+    }
+
+
 async def _task_run_event_stream(
     request: Request,
     run_id: str,
     after: int,
     *,
-    poll_interval: float = 0.5,
+    resync_interval: float | None = None,
 ):
+    """Replay events after the cursor, then follow pushes from the run event bus.
+
+    The event table is read only to catch up: on connect, after a gap or an
+    overflow in pushed sequences, for a message too large to carry its
+    events, and on the bus's slow resync timer. Finding the run terminal
+    with an empty outbox ends the stream.
+    """
+    bus = run_event_bus()
+    interval = bus.resync_seconds if resync_interval is None else resync_interval
     last_sequence = after
-    terminal_quiet_pass = False
-    while not await request.is_disconnected():
-        rows = await events_after(run_id, last_sequence)
-        if rows:
-            terminal_quiet_pass = False
-            for row in rows:
-                last_sequence = row.sequence
-                yield {
-                    'event': 'task_run',
-                    'id': str(row.sequence),
-                    'data': json.dumps(event_payload(row)),
-                }
-
-        fresh = await TaskRun.get(run_id)
-        terminal = bool(fresh and fresh.status in _TERMINAL_RUN_STATUSES)
-        if terminal and not rows:
-            if terminal_quiet_pass:
+    with bus.subscribe(run_id) as subscription:
+        catch_up = check_terminal = True
+        while not await request.is_disconnected():
+            terminal = False
+            if check_terminal:
+                # Status before catch-up: a terminal run appends no further
+                # events, so catching up afterwards cannot miss any.
+                fresh = await TaskRun.get(run_id)
+                terminal = fresh is None or (
+                    fresh.status in _TERMINAL_RUN_STATUSES
+                    and not getattr(fresh, 'event_outbox', None)
+                )
+            if catch_up:
+                while True:
+                    rows = await events_after(run_id, last_sequence)
+                    for row in rows:
+                        last_sequence = row.sequence
+                        yield _sse_event(event_payload(row))
+                    if len(rows) < EVENT_PAGE_SIZE:
+                        break
+            if terminal:
                 return
-            terminal_quiet_pass = True
-        await asyncio.sleep(poll_interval)
+
+            message = await subscription.next(interval)
+            catch_up = check_terminal = message is None or subscription.overflowed
+            subscription.overflowed = False
+            if message is None:
+                continue
+            check_terminal = check_terminal or bool(message.get('terminal'))
+            payloads = message.get('events')
+            if payloads is None:
+                catch_up = True
+                continue
+            for payload in payloads:
+                sequence = int(payload['sequence'])
+                if sequence <= last_sequence:
+                    continue
+                if sequence != last_sequence + 1:
+                    catch_up = True
+                    break
+                last_sequence = sequence
+                yield _sse_event(payload)
+            catch_up = catch_up or check_terminal
 
 logger = logging.getLogger('cognitrix.log')
 
@@ -605,10 +829,30 @@ tasks_run_api = APIRouter(
 )
 
 @tasks_api.get('')
-async def list_tasks():
-    tasks = await Task.all()
-    tasks = [task for task in tasks if not task.deleted_at]
-    return await asyncio.gather(*[_task_projection(task) for task in tasks])
+async def list_tasks(
+    limit: Annotated[int | None, Query(ge=1, le=_TASK_PAGE_SIZE)] = None,
+    cursor: Annotated[str | None, Query(max_length=512)] = None,
+    response: Response = None,
+):
+    """Live tasks, newest first. With ``limit`` or ``cursor`` one page is
+    returned and the next page's cursor is sent in ``X-Next-Cursor``."""
+    paged = limit is not None or cursor is not None
+    page_size = limit or _TASK_PAGE_SIZE
+    after = _decode_cursor(cursor)
+    tasks: list[Task] = []
+    while True:
+        rows = await _task_rows(limit=page_size, after=after)
+        tasks.extend(task for _key, task in rows)
+        if len(rows) < page_size:
+            after = None
+            break
+        after = rows[-1][0]
+        if paged:
+            break
+    if after is not None and response is not None:
+        response.headers[_NEXT_CURSOR_HEADER] = _encode_cursor(after)
+    latest = await _latest_task_runs([task.id for task in tasks])
+    return [_task_projection_with_latest(task, latest.get(task.id)) for task in tasks]
 
 @tasks_api.post('')
 async def save_task(request: Request, task: Task, background_tasks: BackgroundTasks,
@@ -1030,18 +1274,24 @@ async def list_task_runs(
     ctx: AuthContext = Depends(get_auth_context),
     limit: Annotated[int, Query(ge=1, le=100)] = 50,
     offset: Annotated[int, Query(ge=0, le=_TASK_RUN_MAX_OFFSET)] = 0,
+    cursor: Annotated[str | None, Query(max_length=512)] = None,
+    response: Response = None,
 ):
+    after = _decode_cursor(cursor)
     # The Task row is retained specifically so authorized historical runs
     # remain addressable after the authoring task is hidden.
     task = await Task.get(task_id)
     if task is None:
         raise HTTPException(status_code=404, detail='Task not found')
-    page = await _authorized_task_run_page(
+    page, next_cursor = await _authorized_task_run_page(
         task_id,
         ctx,
         limit=limit,
         offset=offset,
+        after=after,
     )
+    if next_cursor and response is not None:
+        response.headers[_NEXT_CURSOR_HEADER] = next_cursor
     if not page:
         return []
     page_ids = [run.id for run in page]
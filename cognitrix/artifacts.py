@@ -50,6 +50,9 @@ class Artifact(Model):
     origin: str | None = 'generated'
     vision_storage_key: str | None = None
     thumbnail_storage_key: str | None = None
+    # SHA-256 of the source bytes; artifacts of one owner that share it share
+    # their variant files.
+    content_sha256: str | None = None
     created_at: str | None = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     mime_type: str = 'image/png'
     filename: str | None = None
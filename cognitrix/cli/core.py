@@ -46,17 +46,19 @@ async def run_configuration():
     from cognitrix.models.user import User
     from cognitrix.session_ownership import SessionOwnership
     from cognitrix.sessions.base import Session
+    from cognitrix.sessions.messages import SessionMessage
     from cognitrix.tasks.events import TaskRunEvent
     from cognitrix.tasks.metrics import TaskRunPhaseMetric
     from cognitrix.tasks.run import TaskRun, TaskRunHead
+    from cognitrix.tasks.scheduler_lease import SchedulerLease
     from cognitrix.tasks.step import TaskRunStep
 
     if DBMS.Database is not None and DBMS.Database.dbms != 'mongodb':
         from cognitrix.artifacts import Artifact, DocumentArtifact
         for model in (
-            Agent, Task, Team, Session, Tool, User, TaskRun, TaskRunHead,
+            Agent, Task, Team, Session, SessionMessage, Tool, User, TaskRun, TaskRunHead,
             TaskRunStep, TaskRunEvent, TaskRunPhaseMetric, APIKey, Artifact,
-            SessionOwnership, DocumentArtifact,
+            SessionOwnership, DocumentArtifact, SchedulerLease,
         ):
             # Older odbms releases only ship async create_table(); newer ones
             # rename it to _create_table_async.
@@ -9,6 +9,16 @@ import sys
 from .args import get_arguments
 
 
+async def _run(func, args):
+    """Run a CLI command, then write any queued long-term memories."""
+    try:
+        await func(args)
+    finally:
+        memory = sys.modules.get('cognitrix.memory.hybrid_context')
+        if memory is not None:
+            await memory.flush_pending_memories()
+
+
 def main():
     """Main entry point for the Cognitrix CLI."""
     # Windows consoles often default to cp1252; model output and status
@@ -34,7 +44,7 @@ def main():
 
         # Check if the function is async and run appropriately
         if asyncio.iscoroutinefunction(args.func):
-            asyncio.run(args.func(args))
+            asyncio.run(_run(args.func, args))
         else:
             args.func(args)
 
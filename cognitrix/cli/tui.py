@@ -514,7 +514,9 @@ class CognitrixApp(App):
         try:
             sessions = await Session.all()
             # Filter to sessions for this agent and sort by datetime
-            agent_sessions = [s for s in sessions if s.agent_id == str(self.agent.id)]
+            agent_sessions = await Session.load_chats(
+                [s for s in sessions if s.agent_id == str(self.agent.id)]
+            )
 
             for s in agent_sessions:
                 # Build a label from the session datetime or first message
@@ -1,4 +1,5 @@
 import inspect
+import json
 import logging
 import math
 import os
@@ -70,6 +71,19 @@ class CognitrixSettings:
                 'TASK_RECOVERY_INTERVAL_SECONDS must be a positive number'
             )
 
+        # Run-event fan-out to SSE watchers: 'redis://...', 'postgres', 'unix',
+        # 'local', or blank to infer from the broker/database. The resync
+        # interval is the watchers' safety-net database read (0 = default).
+        self.task_event_transport = os.getenv('COGNITRIX_EVENT_TRANSPORT', '')
+        self.task_event_resync_seconds = float(os.getenv('COGNITRIX_EVENT_RESYNC_SECONDS', '0')) or None
+        # Scheduler leader election: blank/'auto', a redis:// URL, 'database',
+        # or 'none' (every API process ticks).
+        self.scheduler_leader = os.getenv('COGNITRIX_SCHEDULER_LEADER', '')
+        # Shared chat-stream output log so any API node can resume a browser
+        # stream: blank/'auto', a redis:// URL, or 'local' (one process).
+        self.sse_stream_state = os.getenv('COGNITRIX_SSE_STREAM_STATE', '')
+        self.sse_stream_ttl_seconds = float(os.getenv('COGNITRIX_SSE_STREAM_TTL_SECONDS', '600'))
+
         # Deployment environment marker (read early: gates JWT-secret behaviour).
         self.env = os.getenv('COGNITRIX_ENV', 'development')
 
@@ -107,10 +121,53 @@ class CognitrixSettings:
         # Defaults to the current working directory.
         self.tools_root = Path(os.getenv('COGNITRIX_TOOLS_ROOT', Path.cwd())).expanduser().resolve()
 
+        # Optional persistent trigram index for Grep/Glob under tools_root,
+        # stored in the workdir and refreshed by a background stat sweep at
+        # most every COGNITRIX_SEARCH_INDEX_SWEEP_SECONDS. Roots with more
+        # entries than the cap are searched without the index.
+        self.search_index = os.getenv('COGNITRIX_SEARCH_INDEX', 'false').lower() == 'true'
+        self.search_index_sweep_seconds = float(os.getenv('COGNITRIX_SEARCH_INDEX_SWEEP_SECONDS', '2'))
+        self.search_index_max_entries = int(os.getenv('COGNITRIX_SEARCH_INDEX_MAX_ENTRIES', '200000'))
+
+        # Size bound of the in-process cache of PDF page text and line
+        # offsets that lets Read page through a document without reparsing.
+        self.read_cache_mb = float(os.getenv('COGNITRIX_READ_CACHE_MB', '64'))
+
         # CORS: comma-separated list of allowed origins for the web API.
         _cors = os.getenv('COGNITRIX_CORS_ORIGINS', 'http://localhost:8000,http://localhost:5173')
         self.cors_origins = [o.strip() for o in _cors.split(',') if o.strip()]
 
+        # Embedding models: registry bounds, CPU inference mode, and the
+        # comma-separated list the API loads at startup.
+        self.embedding_backend = os.getenv('COGNITRIX_EMBEDDING_BACKEND', 'torch').lower()
+        self.embedding_quantize = os.getenv('COGNITRIX_EMBEDDING_QUANTIZE', '').lower() == 'true'
+        self.embedding_max_models = int(os.getenv('COGNITRIX_EMBEDDING_MAX_MODELS', '2'))
+        self.embedding_memory_budget_mb = int(os.getenv('COGNITRIX_EMBEDDING_MEMORY_MB', '2048'))
+        self.embedding_idle_seconds = float(os.getenv('COGNITRIX_EMBEDDING_IDLE_SECONDS', '1800'))
+        _warmup = os.getenv('COGNITRIX_EMBEDDING_WARMUP', '')
+        self.embedding_warmup_models = [m.strip() for m in _warmup.split(',') if m.strip()]
+
+        # Provider response cache for deterministic calls: '' (off), 'sqlite',
+        # or a redis:// URL shared across workers.
+        self.response_cache = os.getenv('COGNITRIX_RESPONSE_CACHE', '').strip()
+        self.response_cache_ttl_seconds = float(os.getenv('COGNITRIX_RESPONSE_CACHE_TTL_SECONDS', '86400'))
+        self.response_cache_max_entries = int(os.getenv('COGNITRIX_RESPONSE_CACHE_MAX_ENTRIES', '10000'))
+
+        # Browser chat output: streamed text deltas are merged for up to this
+        # many milliseconds or bytes per frame (0 ms sends every delta).
+        self.stream_coalesce_ms = float(os.getenv('COGNITRIX_STREAM_COALESCE_MS', '16'))
+        self.stream_coalesce_bytes = int(os.getenv('COGNITRIX_STREAM_COALESCE_BYTES', '1024'))
+
+        # Provider HTTP clients: LRU pool size, and per-provider httpx tuning
+        # as JSON keyed by provider name (or "default").
+        self.llm_client_pool_size = int(os.getenv('COGNITRIX_LLM_CLIENT_POOL_SIZE', '32'))
+        try:
+            self.llm_http_options = json.loads(os.getenv('COGNITRIX_LLM_HTTP_JSON', '') or '{}')
+        except json.JSONDecodeError as exc:
+            raise ValueError('COGNITRIX_LLM_HTTP_JSON must be valid JSON') from exc
+        if not isinstance(self.llm_http_options, dict):
+            raise ValueError('COGNITRIX_LLM_HTTP_JSON must be an object keyed by provider')
+
         # MCP Configuration
         self.mcp_config_file = self.workdir / 'mcp.json'
 
@@ -313,6 +370,8 @@ async def initialize_database():
     if getattr(DBMS.Database, 'dbms', '') in ('sqlite', 'postgresql', 'mysql'):
         await repository.reconcile_heads()
     await repository.recover_outboxes()
+    from cognitrix.sessions.messages import migrate_legacy_chats
+    await migrate_legacy_chats()
 
 
 _TASKRUN_MIGRATION_COLUMNS = (
@@ -354,6 +413,7 @@ _ARTIFACT_MIGRATION_COLUMNS = (
     ('user_id', 'TEXT'), ('run_id', 'TEXT'),
     ('origin', 'TEXT'), ('vision_storage_key', 'TEXT'),
     ('thumbnail_storage_key', 'TEXT'), ('created_at', 'TEXT'),
+    ('content_sha256', 'TEXT'),
 )
 
 _SESSION_MIGRATION_COLUMNS = (
@@ -365,6 +425,7 @@ _TASKRUN_INDEXES = (
     ('ux_task_run_steps_run_step', 'taskrunsteps', 'run_id, step_index', True),
     ('ux_task_run_events_run_sequence', 'taskrunevents', 'run_id, sequence', True),
     ('ix_task_runs_task_created', 'taskruns', 'task_id, created_at', False),
+    ('ix_task_runs_task_created_id', 'taskruns', 'task_id, created_at, id', False),
     ('ix_task_runs_status_lease', 'taskruns', 'status, lease_expires_at', False),
     ('ix_task_runs_notification_due', 'taskruns',
      'completion_notification_state, completion_notification_next_at', False),
@@ -663,6 +724,7 @@ async def _ensure_schema():
     from cognitrix.tasks.events import TaskRunEvent
     from cognitrix.tasks.metrics import TaskRunPhaseMetric
     from cognitrix.tasks.run import TaskRun, TaskRunHead
+    from cognitrix.tasks.scheduler_lease import SchedulerLease
     from cognitrix.tasks.step import TaskRunStep
 
     for model in (
@@ -671,6 +733,7 @@ async def _ensure_schema():
         TaskRunStep,
         TaskRunEvent,
         TaskRunPhaseMetric,
+        SchedulerLease,
         APIKey,
         Artifact,
     ):
@@ -701,6 +764,9 @@ async def _ensure_schema():
         if hasattr(result, '__await__'):
             await result
 
+    from cognitrix.sessions.messages import ensure_message_log
+    await ensure_message_log()
+
     if dbms in ('postgresql', 'mysql'):
         await _migrate_relational_task_schema(DBMS.Database)
         return
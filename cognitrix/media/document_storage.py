@@ -3,6 +3,10 @@
 This module owns document namespace creation, exact deletion, recovery
 inspection, and bounded reads. Promotion orchestration and database state live
 elsewhere and depend only on this small API.
+
+Every document row owns exactly one file, even when its bytes match another
+row's: deletion and reconciliation remove a file by its pinned identity, so
+content-addressed sharing (as image variants do) is deliberately not offered.
 """
 
 from __future__ import annotations
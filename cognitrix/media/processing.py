@@ -1,14 +1,28 @@
-"""Bounded worker execution and private Pillow transforms for media assets."""
+"""Bounded worker execution and private Pillow transforms for media assets.
+
+Image decoding and encoding run in worker threads by default. With
+``COGNITRIX_MEDIA_PROCESSING_MODE=process`` those threads hand each image to
+a shared process pool instead, so a burst of uploads uses every core rather
+than contending for one interpreter. Input bytes reach the workers through
+shared memory rather than the pool's pickle pipe.
+"""
 
 from __future__ import annotations
 
 import asyncio
 import io
 import logging
+import math
+import multiprocessing
 import os
+import sys
+import threading
 import weakref
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
+from multiprocessing import shared_memory
 from typing import TypeVar
 
 from PIL import Image, ImageOps, UnidentifiedImageError
@@ -46,9 +60,22 @@ def _parse_media_processing_concurrency(raw: str | None) -> int:
     )
 
 
+def _parse_media_processing_mode(raw: str | None) -> str:
+    value = (raw or 'thread').strip().lower()
+    if value not in {'thread', 'process'}:
+        logger.warning(
+            "Invalid COGNITRIX_MEDIA_PROCESSING_MODE=%r; using 'thread'", raw
+        )
+        return 'thread'
+    return value
+
+
 MEDIA_PROCESSING_CONCURRENCY = _parse_media_processing_concurrency(
     os.getenv('COGNITRIX_MEDIA_PROCESSING_CONCURRENCY')
 )
+MEDIA_PROCESSING_MODE = _parse_media_processing_mode(
+    os.getenv('COGNITRIX_MEDIA_PROCESSING_MODE')
+)
 _MEDIA_PROCESSING_LIMITERS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
 
@@ -89,6 +116,69 @@ async def _run_thread_joined(func: Callable[..., T], *args, **kwargs) -> T:
         raise
 
 
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+
+
+def _media_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                # Workers fork from a server that imported this module once.
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context('spawn')
+            _process_pool = ProcessPoolExecutor(
+                max_workers=MEDIA_PROCESSING_CONCURRENCY,
+                mp_context=context,
+            )
+        return _process_pool
+
+
+def _discard_process_pool(broken: ProcessPoolExecutor) -> None:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is broken:
+            _process_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_shared(func: Callable[[bytes], T], name: str, size: int) -> T:
+    """Worker side: run ``func`` over the bytes published in shared memory."""
+    if sys.version_info >= (3, 13):
+        segment = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        segment = shared_memory.SharedMemory(name=name)
+    try:
+        return func(bytes(segment.buf[:size]))
+    finally:
+        segment.close()
+
+
+def _in_media_process(func: Callable[[bytes], T], data: bytes) -> T:
+    """Run ``func(data)`` in the media process pool, blocking this thread.
+
+    Called from a ``run_media_cpu`` worker thread, so the concurrency cap
+    still bounds how many images are in flight.
+    """
+    segment = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    try:
+        segment.buf[:len(data)] = data
+        pool = _media_process_pool()
+        try:
+            return pool.submit(_run_shared, func, segment.name, len(data)).result()
+        except BrokenProcessPool as exc:
+            # A worker died (typically out of memory on a hostile image);
+            # later images get a fresh pool.
+            _discard_process_pool(pool)
+            raise MediaValidationError('Image could not be normalized') from exc
+    finally:
+        segment.close()
+        segment.unlink()
+
+
 @dataclass(frozen=True)
 class _ProcessedImage:
     original: bytes
@@ -140,7 +230,33 @@ def _encode_thumbnail(image: Image.Image) -> bytes:
         thumbnail.close()
 
 
+def _reduced_jpeg(data: bytes) -> Image.Image | None:
+    """Decode a JPEG at the smallest DCT scale still covering the vision edge.
+
+    Returns None when the image is small enough that no reduction applies.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        width, height = source.size
+        scale = VISION_MAX_EDGE / max(width, height)
+        if scale > 0.5:
+            return None
+        source.draft('RGB', (math.ceil(width * scale), math.ceil(height * scale)))
+        oriented = ImageOps.exif_transpose(source)
+        try:
+            oriented.load()
+            return oriented.convert('RGB')
+        finally:
+            if oriented is not source:
+                oriented.close()
+
+
 def _process_image(data: bytes) -> _ProcessedImage:
+    if MEDIA_PROCESSING_MODE == 'process':
+        return _in_media_process(_normalize_image, data)
+    return _normalize_image(data)
+
+
+def _normalize_image(data: bytes) -> _ProcessedImage:
     try:
         with Image.open(io.BytesIO(data)) as source:
             source_format = (source.format or '').upper()
@@ -168,21 +284,30 @@ def _process_image(data: bytes) -> _ProcessedImage:
         extension = '.jpg' if master_format == 'JPEG' else '.png'
         original = _encode(pixels, master_format)
 
-        vision_image = pixels.copy()
+        # Large JPEGs are decoded a second time at reduced DCT scale for the
+        # derived variants, which is far cheaper than resampling full size.
+        vision_image = None
+        if master_format == 'JPEG':
+            try:
+                vision_image = _reduced_jpeg(data)
+            except (OSError, ValueError):
+                vision_image = None
+        if vision_image is None:
+            vision_image = pixels.copy()
         try:
             vision_image.thumbnail(
                 (VISION_MAX_EDGE, VISION_MAX_EDGE),
                 Image.Resampling.LANCZOS,
             )
             vision = _encode(vision_image, master_format, vision=True)
+
+            try:
+                thumbnail = _encode_thumbnail(vision_image)
+            except Exception:
+                thumbnail = None
         finally:
             vision_image.close()
 
-        try:
-            thumbnail = _encode_thumbnail(pixels)
-        except Exception:
-            thumbnail = None
-
         return _ProcessedImage(
             original=original,
             vision=vision,
@@ -201,6 +326,12 @@ def _process_image(data: bytes) -> _ProcessedImage:
 
 
 def _make_thumbnail(data: bytes) -> bytes:
+    if MEDIA_PROCESSING_MODE == 'process':
+        return _in_media_process(_render_thumbnail, data)
+    return _render_thumbnail(data)
+
+
+def _render_thumbnail(data: bytes) -> bytes:
     try:
         with Image.open(io.BytesIO(data)) as source:
             source_format = (source.format or '').upper()
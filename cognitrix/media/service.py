@@ -1,8 +1,21 @@
-"""Provider-neutral image artifact storage and resolution."""
+"""Provider-neutral image artifact storage and resolution.
+
+Variant files are content addressed within an ownership scope: an image whose
+source bytes match an artifact the same session/user/agent already retains
+gets a new artifact row over the existing original, vision and thumbnail
+files instead of being decoded and written again. A variant file is removed
+only once no remaining artifact row references it.
+
+Only image artifacts are deduplicated. Managed documents
+(``cognitrix.media.document_storage``) keep one file per row: each file is
+pinned by its capability identity and journaled under its own storage key
+for rollback and reconciliation, and a shared file would break both.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import io
 import logging
 import os
@@ -11,6 +24,7 @@ import struct
 import time
 import uuid
 import weakref
+from collections import Counter
 from collections.abc import Awaitable, Callable, Mapping, Sequence
 from pathlib import Path
 from typing import Any
@@ -93,6 +107,44 @@ def _artifact_variant_paths(artifact: Artifact) -> list[Path]:
     return paths
 
 
+async def _shared_variant_paths(session_id: str, excluding: set[str]) -> set[Path]:
+    """Variant files still referenced by session artifacts outside ``excluding``."""
+    remaining = await Artifact.find({'session_id': session_id}) or []
+    return {
+        path
+        for artifact in remaining
+        if str(artifact.id) not in excluding
+        for path in _artifact_variant_paths(artifact)
+    }
+
+
+async def _variant_references(session_id: str) -> Counter[Path]:
+    """How many of the session's artifact rows reference each variant file."""
+    retained = await Artifact.find({'session_id': session_id}) or []
+    return Counter(path for artifact in retained for path in _artifact_variant_paths(artifact))
+
+
+def _release_variant_paths(references: Counter[Path], artifact: Artifact) -> list[Path]:
+    """Drop ``artifact``'s references; return the files no row references now."""
+    paths = list(dict.fromkeys(_artifact_variant_paths(artifact)))
+    references.subtract(paths)
+    return [path for path in paths if references[path] <= 0]
+
+
+async def _unreferenced_variant_paths(artifact: Artifact) -> list[Path]:
+    """Variant files of ``artifact`` that no other artifact row shares."""
+    return _release_variant_paths(await _variant_references(artifact.session_id), artifact)
+
+
+def _content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _classify_snapshot(data: bytes) -> tuple[str | None, str]:
+    """Cheap raster signature kind and content digest of an upload snapshot."""
+    return _raster_signature_kind(data), _content_digest(data)
+
+
 def _retained_physical_bytes(artifacts: Sequence[Artifact]) -> int:
     retained = 0
     seen: set[Path] = set()
@@ -218,19 +270,10 @@ def _process_staged_snapshot(
     return len(data), _process_image(data)
 
 
-def _read_and_process_staged(
-    staged: StagedAttachment,
-    *,
-    allow_unrecognized: bool = False,
-) -> tuple[int, _ProcessedImage | None]:
-    """Read one bounded upload snapshot and decode that exact snapshot."""
+def _read_staged_snapshot(staged: StagedAttachment) -> bytes:
+    """Read one bounded upload snapshot; only that exact snapshot is decoded."""
     with staged.path.open('rb') as stream:
-        data = stream.read(MAX_IMAGE_BYTES + 1)
-    return _process_staged_snapshot(
-        staged,
-        data,
-        allow_unrecognized=allow_unrecognized,
-    )
+        return stream.read(MAX_IMAGE_BYTES + 1)
 
 
 def _read_and_validate_thumbnail(path: Path) -> bool:
@@ -331,7 +374,10 @@ async def _discard_committed_artifact(artifact: Artifact) -> None:
             if deleted == 0:
                 raise RuntimeError('Artifact metadata deletion did not complete')
 
-        await _delete_files_then_rows(_artifact_variant_paths(artifact), delete_row)
+        await _delete_files_then_rows(
+            await _unreferenced_variant_paths(artifact),
+            delete_row,
+        )
     except (Exception, asyncio.CancelledError) as exc:
         raise CommittedArtifactCleanupError(artifact_ref, exc) from exc
 
@@ -364,18 +410,31 @@ class MediaAssetService:
                 raise MediaValidationError('Media ownership requires a session')
             async with _shared_lock(_SESSION_LOCKS, ownership.session_id):
                 if snapshot is None:
-                    input_bytes, processed = await run_media_cpu(
-                        _read_and_process_staged,
-                        staged,
-                        allow_unrecognized=True,
-                    )
-                else:
-                    input_bytes, processed = await run_media_cpu(
-                        _process_staged_snapshot,
-                        staged,
-                        snapshot,
-                        allow_unrecognized=True,
+                    snapshot = await run_media_cpu(_read_staged_snapshot, staged)
+                signature, content_sha256 = await asyncio.to_thread(
+                    _classify_snapshot, snapshot
+                )
+                if (
+                    signature == 'supported'
+                    and len(snapshot) == staged.size_bytes <= MAX_IMAGE_BYTES
+                ):
+                    reused = await self._reuse_retained(
+                        content_sha256,
+                        origin='uploaded',
+                        ownership=ownership,
+                        filename=staged.filename,
+                        metadata={},
                     )
+                    if reused is not None:
+                        input_bytes = len(snapshot)
+                        status = 'reused'
+                        return ref(reused)
+                input_bytes, processed = await run_media_cpu(
+                    _process_staged_snapshot,
+                    staged,
+                    snapshot,
+                    allow_unrecognized=True,
+                )
                 if processed is None:
                     status = 'unrecognized'
                     return None
@@ -388,6 +447,7 @@ class MediaAssetService:
                         ownership=ownership,
                         filename=staged.filename,
                         metadata={},
+                        content_sha256=content_sha256,
                     ),
                     on_cancelled_success=_discard_committed_artifact,
                 )
@@ -433,6 +493,17 @@ class MediaAssetService:
             if not ownership.session_id:
                 raise MediaValidationError('Media ownership requires a session')
             async with _shared_lock(_SESSION_LOCKS, ownership.session_id):
+                content_sha256 = await asyncio.to_thread(_content_digest, data)
+                reused = await self._reuse_retained(
+                    content_sha256,
+                    origin=origin,
+                    ownership=ownership,
+                    filename=filename,
+                    metadata=metadata,
+                )
+                if reused is not None:
+                    status = 'reused'
+                    return ref(reused)
                 processed = await run_media_cpu(_process_image, data)
                 if len(processed.original) > MAX_IMAGE_BYTES:
                     raise MediaValidationError('Sanitized image exceeds the 10 MiB limit')
@@ -443,6 +514,7 @@ class MediaAssetService:
                         ownership=ownership,
                         filename=filename,
                         metadata=metadata,
+                        content_sha256=content_sha256,
                     ),
                     on_cancelled_success=_discard_committed_artifact,
                 )
@@ -457,6 +529,76 @@ class MediaAssetService:
                 started=started,
             )
 
+    async def _reuse_retained(
+        self,
+        content_sha256: str,
+        *,
+        origin: str,
+        ownership: MediaOwnership,
+        filename: str | None,
+        metadata: Mapping[str, Any],
+    ) -> Artifact | None:
+        """Add a row over an owned artifact's variants with the same source bytes.
+
+        Callers hold the session lock. Returns None when no retained artifact
+        in this ownership scope has intact variants for ``content_sha256``.
+        """
+        candidates = await Artifact.find({
+            'session_id': ownership.session_id,
+            'content_sha256': content_sha256,
+        }) or []
+        source = None
+        for candidate in candidates:
+            try:
+                self._check_ownership(candidate, ownership)
+                paths = [
+                    variant_path(candidate, 'original'),
+                    variant_path(candidate, 'vision'),
+                ]
+            except (MediaAccessError, ValueError):
+                continue
+            if all([await asyncio.to_thread(path.is_file) for path in paths]):
+                source = candidate
+                break
+        if source is None:
+            return None
+
+        retained_artifacts = await Artifact.find(
+            {'session_id': ownership.session_id}
+        ) or []
+        if len(retained_artifacts) >= MAX_SESSION_ARTIFACTS:
+            raise MediaQuotaError('This session has reached its retained image limit')
+        artifact_token = str(uuid.uuid4())
+        artifact = Artifact(
+            session_id=ownership.session_id,
+            user_id=ownership.user_id,
+            agent_id=ownership.agent_id,
+            run_id=ownership.run_id,
+            storage_key=source.storage_key,
+            vision_storage_key=source.vision_storage_key,
+            thumbnail_storage_key=source.thumbnail_storage_key,
+            content_sha256=content_sha256,
+            origin=origin,
+            mime_type=source.mime_type,
+            filename=_safe_filename(
+                filename, artifact_token, Path(source.storage_key).suffix
+            ),
+            width=source.width,
+            height=source.height,
+            size_bytes=source.size_bytes,
+            prompt=str(metadata.get('prompt') or '')[:1000],
+            source_artifact_id=metadata.get('source_artifact_id'),
+            model=str(metadata.get('model') or ''),
+        )
+
+        async def save() -> Artifact:
+            await _settle_operation(artifact.save())
+            return artifact
+
+        return await _run_transaction_joined(
+            save(), on_cancelled_success=_discard_committed_artifact
+        )
+
     async def _commit_processed(
         self,
         processed: _ProcessedImage,
@@ -465,6 +607,7 @@ class MediaAssetService:
         ownership: MediaOwnership,
         filename: str | None,
         metadata: Mapping[str, Any],
+        content_sha256: str | None = None,
     ) -> Artifact:
         storage_token = str(uuid.uuid4())
         namespace = artifact_store._storage_namespace(ownership.session_id or 'local')
@@ -543,6 +686,7 @@ class MediaAssetService:
                 storage_key=original_key,
                 vision_storage_key=vision_key,
                 thumbnail_storage_key=thumbnail_key if thumbnail_retained else None,
+                content_sha256=content_sha256,
                 origin=origin,
                 mime_type=processed.mime_type,
                 filename=_safe_filename(filename, storage_token, processed.extension),
@@ -677,7 +821,13 @@ class MediaAssetService:
                         artifact.thumbnail_storage_key = thumbnail_key
                         await _settle_operation(artifact.save())
                         metadata_saved = True
-                        if previous_path is not None and previous_path != final:
+                        if (
+                            previous_path is not None
+                            and previous_path != final
+                            and previous_path not in await _shared_variant_paths(
+                                artifact.session_id, {artifact_id}
+                            )
+                        ):
                             await _remove_paths([previous_path])
                     except BaseException:
                         if not metadata_saved:
@@ -783,11 +933,13 @@ class MediaAssetService:
                         continue
                     self._check_ownership(artifact, ownership)
                     artifacts.append(artifact)
-                artifact_paths = [
-                    (artifact, _artifact_variant_paths(artifact))
-                    for artifact in artifacts
-                ]
-                for artifact, paths in artifact_paths:
+                # One count per session for the whole batch; each deletion
+                # releases its references, so a file goes with its last row.
+                references: dict[str, Counter[Path]] = {}
+                for artifact in artifacts:
+                    if artifact.session_id not in references:
+                        references[artifact.session_id] = await _variant_references(artifact.session_id)
+                    paths = _release_variant_paths(references[artifact.session_id], artifact)
 
                     async def delete_row() -> None:
                         deleted = await _settle_operation(
@@ -3,6 +3,9 @@
 import asyncio
 import hashlib
 import logging
+import os
+import sqlite3
+import threading
 from datetime import datetime
 from typing import Any
 
@@ -15,6 +18,70 @@ from cognitrix.utils.embedding_model import get_embedding_model
 
 logger = logging.getLogger('cognitrix.log')
 
+EMBED_BATCH_SIZE = 32
+
+
+def _timestamp(metadata: dict[str, Any]) -> float:
+    return datetime.fromisoformat(metadata['timestamp']).timestamp()
+
+
+class RecencyIndex:
+    """(timestamp, id) side table so get_recent reads n ids, not the collection.
+
+    Chroma cannot sort, so recency lives in a small SQLite table next to the
+    collection, updated on every store/delete/clear.
+    """
+
+    def __init__(self, path: str | None, collection_name: str):
+        self.collection_name = collection_name
+        self._conn = sqlite3.connect(path or ':memory:', timeout=15, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS memory_recency ('
+                'collection TEXT NOT NULL, id TEXT NOT NULL, ts REAL NOT NULL, '
+                'PRIMARY KEY (collection, id))'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_memory_recency_ts ON memory_recency (collection, ts)'
+            )
+
+    def add(self, items: list[tuple[str, float]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO memory_recency (collection, id, ts) VALUES (?, ?, ?)',
+                [(self.collection_name, memory_id, ts) for memory_id, ts in items],
+            )
+
+    def remove(self, ids: list[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'DELETE FROM memory_recency WHERE collection = ? AND id = ?',
+                [(self.collection_name, memory_id) for memory_id in ids],
+            )
+
+    def replace(self, items: list[tuple[str, float]]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM memory_recency WHERE collection = ?', (self.collection_name,))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO memory_recency (collection, id, ts) VALUES (?, ?, ?)',
+                [(self.collection_name, memory_id, ts) for memory_id, ts in items],
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM memory_recency WHERE collection = ?', (self.collection_name,)
+            ).fetchone()[0]
+
+    def newest(self, n: int) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id FROM memory_recency WHERE collection = ? ORDER BY ts DESC LIMIT ?',
+                (self.collection_name, n),
+            ).fetchall()
+        return [row[0] for row in rows]
+
 
 class ChromaMemoryStore(BaseMemory):
     """ChromaDB-backed vector memory with local persistence."""
@@ -51,6 +118,12 @@ class ChromaMemoryStore(BaseMemory):
 
         self.embedding_model = get_embedding_model(embedding_model)
 
+        recency_path = None
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+            recency_path = os.path.join(persist_directory, 'memory_recency.sqlite3')
+        self.recency = RecencyIndex(recency_path, collection_name)
+
         logger.info(f"ChromaMemoryStore initialized: {collection_name}")
 
     def _generate_id(self, content: str) -> str:
@@ -67,6 +140,16 @@ class ChromaMemoryStore(BaseMemory):
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self._embed, text)
 
+    def _embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts in model batches; one encode call for the whole list."""
+        embeddings = self.embedding_model.encode(texts, batch_size=EMBED_BATCH_SIZE)
+        return embeddings.tolist()
+
+    async def _embed_many_async(self, texts: list[str]) -> list[list[float]]:
+        """Batch embedding in a single executor hop."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._embed_many, texts)
+
     async def _run_sync(self, func, *args, **kwargs):
         """Run a blocking ChromaDB call in the default executor.
 
@@ -87,13 +170,7 @@ class ChromaMemoryStore(BaseMemory):
 
         embedding = await self._embed_async(content)
 
-        # Prepare metadata
-        chroma_metadata = {
-            'content': content[:1000],  # Store truncated content in metadata
-            'timestamp': datetime.now().isoformat(),
-            'importance': importance,
-            **{k: str(v) for k, v in metadata.items()}  # Chroma requires string values
-        }
+        chroma_metadata = self._chroma_metadata(content, metadata, importance)
 
         # Add to collection (offloaded: ChromaDB is synchronous)
         await self._run_sync(
@@ -103,10 +180,62 @@ class ChromaMemoryStore(BaseMemory):
             documents=[content],
             metadatas=[chroma_metadata]
         )
+        await self._run_sync(self.recency.add, [(memory_id, _timestamp(chroma_metadata))])
 
         logger.debug(f"Stored memory: {memory_id[:8]}...")
         return memory_id
 
+    async def store_many(
+        self,
+        contents: list[str],
+        metadatas: list[dict[str, Any]] | None = None,
+        importances: list[float] | None = None
+    ) -> list[str]:
+        """Store several memories with one batched encode and one collection.add."""
+        if not contents:
+            return []
+        metadatas = metadatas or [{} for _ in contents]
+        importances = importances or [1.0] * len(contents)
+        stamp = str(datetime.now())
+        memory_ids = [
+            self._generate_id(f"{content}{stamp}#{index}")
+            for index, content in enumerate(contents)
+        ]
+
+        embeddings = await self._embed_many_async(contents)
+
+        chroma_metadatas = [
+            self._chroma_metadata(content, metadata, importance)
+            for content, metadata, importance in zip(contents, metadatas, importances, strict=True)
+        ]
+        await self._run_sync(
+            self.collection.add,
+            ids=memory_ids,
+            embeddings=embeddings,
+            documents=list(contents),
+            metadatas=chroma_metadatas
+        )
+        await self._run_sync(
+            self.recency.add,
+            [(memory_id, _timestamp(metadata)) for memory_id, metadata in zip(memory_ids, chroma_metadatas, strict=True)]
+        )
+
+        logger.debug(f"Stored {len(memory_ids)} memories")
+        return memory_ids
+
+    def _chroma_metadata(
+        self,
+        content: str,
+        metadata: dict[str, Any],
+        importance: float
+    ) -> dict[str, Any]:
+        return {
+            'content': content[:1000],  # Store truncated content in metadata
+            'timestamp': datetime.now().isoformat(),
+            'importance': importance,
+            **{k: str(v) for k, v in metadata.items()}  # Chroma requires string values
+        }
+
     async def retrieve(
         self,
         query: str,
@@ -116,25 +245,44 @@ class ChromaMemoryStore(BaseMemory):
         """Retrieve relevant memories using semantic search."""
         query_embedding = await self._embed_async(query)
 
-        # Build where clause if filter provided
-        where_clause = None
-        if filter_metadata:
-            where_clause = {k: str(v) for k, v in filter_metadata.items()}
-
         # Query collection (offloaded: ChromaDB is synchronous)
         results = await self._run_sync(
             self.collection.query,
             query_embeddings=[query_embedding],
             n_results=k,
-            where=where_clause
+            where=self._where_clause(filter_metadata)
         )
+        return self._query_entries(results, 0)
 
-        # Convert to MemoryEntry objects
+    async def retrieve_many(
+        self,
+        queries: list[str],
+        k: int = 5,
+        filter_metadata: dict | None = None
+    ) -> list[list[MemoryEntry]]:
+        """Retrieve memories for several queries with one encode and one query."""
+        if not queries:
+            return []
+        query_embeddings = await self._embed_many_async(queries)
+        results = await self._run_sync(
+            self.collection.query,
+            query_embeddings=query_embeddings,
+            n_results=k,
+            where=self._where_clause(filter_metadata)
+        )
+        return [self._query_entries(results, row) for row in range(len(queries))]
+
+    def _where_clause(self, filter_metadata: dict | None) -> dict | None:
+        if not filter_metadata:
+            return None
+        return {k: str(v) for k, v in filter_metadata.items()}
+
+    def _query_entries(self, results: dict[str, Any], row: int) -> list[MemoryEntry]:
+        """Convert one query row of a Chroma result to MemoryEntry objects."""
         entries = []
-        for i, memory_id in enumerate(results['ids'][0]):
-            metadata = results['metadatas'][0][i] if results['metadatas'] else {}
-            document = results['documents'][0][i] if results['documents'] else ""
-            distance = results['distances'][0][i] if results['distances'] else 0
+        for i, memory_id in enumerate(results['ids'][row]):
+            metadata = results['metadatas'][row][i] if results['metadatas'] else {}
+            document = results['documents'][row][i] if results['documents'] else ""
 
             entries.append(MemoryEntry(
                 id=memory_id,
@@ -148,10 +296,36 @@ class ChromaMemoryStore(BaseMemory):
         return entries
 
     async def get_recent(self, n: int = 10) -> list[MemoryEntry]:
-        """Get most recent memories by timestamp."""
-        # Get all entries (Chroma doesn't support sorting, so we filter client-side)
+        """Get most recent memories by timestamp.
+
+        Reads the n newest ids from the recency index and fetches only those.
+        When the index is out of step with the collection (a store created
+        before the index existed, or written by another client) it is rebuilt
+        from one full scan.
+        """
+        collection_count = await self._run_sync(self.collection.count)
+        if await self._run_sync(self.recency.count) == collection_count:
+            ids = await self._run_sync(self.recency.newest, n)
+            if not ids:
+                return []
+            results = await self._run_sync(self.collection.get, ids=ids)
+            by_id = {entry.id: entry for entry in self._get_entries(results)}
+            return [by_id[memory_id] for memory_id in ids if memory_id in by_id]
+
+        # Chroma doesn't support sorting: scan once, sort client-side, reindex.
         results = await self._run_sync(self.collection.get)
+        entries = self._get_entries(results)
+        await self._run_sync(
+            self.recency.replace,
+            [(entry.id, entry.timestamp.timestamp()) for entry in entries]
+        )
+
+        # Sort by timestamp descending and take top n
+        entries.sort(key=lambda x: x.timestamp, reverse=True)
+        return entries[:n]
 
+    def _get_entries(self, results: dict[str, Any]) -> list[MemoryEntry]:
+        """Convert a collection.get result to MemoryEntry objects."""
         entries = []
         for i, memory_id in enumerate(results['ids']):
             metadata = results['metadatas'][i]
@@ -164,15 +338,13 @@ class ChromaMemoryStore(BaseMemory):
                 timestamp=datetime.fromisoformat(metadata.get('timestamp', datetime.now().isoformat())),
                 importance=float(metadata.get('importance', 1.0))
             ))
-
-        # Sort by timestamp descending and take top n
-        entries.sort(key=lambda x: x.timestamp, reverse=True)
-        return entries[:n]
+        return entries
 
     async def delete(self, memory_id: str) -> bool:
         """Delete a memory by ID."""
         try:
             await self._run_sync(self.collection.delete, ids=[memory_id])
+            await self._run_sync(self.recency.remove, [memory_id])
             return True
         except Exception as e:
             logger.error(f"Failed to delete memory {memory_id}: {e}")
@@ -186,6 +358,7 @@ class ChromaMemoryStore(BaseMemory):
             name=self.collection_name,
             metadata={"hnsw:space": "cosine"}
         )
+        await self._run_sync(self.recency.replace, [])
         logger.info(f"Cleared memory collection: {self.collection_name}")
 
     def persist(self):
@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+import weakref
 from typing import TYPE_CHECKING, Any
 
 from cognitrix.memory.chroma_store import ChromaMemoryStore
@@ -13,6 +14,15 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger('cognitrix.log')
 
+WRITE_BEHIND_BATCH_SIZE = 32
+# Bound on queued memories per manager. Memory writes are best-effort and
+# the turn must not wait on them, so a slow or failing store drops the
+# oldest queued memories instead of growing the queue without limit.
+WRITE_BEHIND_MAX_PENDING = 512
+
+# Managers that may hold queued memories; flushed at process shutdown.
+_LIVE_MANAGERS: 'weakref.WeakSet[HybridContextManager]' = weakref.WeakSet()
+
 
 class ImportanceScorer:
     """Scores the importance of a message for memory storage."""
@@ -102,6 +112,11 @@ class HybridContextManager(BaseContextManager):
         self.importance_scorer = ImportanceScorer()
         self.importance_threshold = importance_threshold
         self.max_long_term = max_long_term
+        # Write-behind queue: important messages are embedded and stored in
+        # batches off the turn path (see add_to_memory / flush_memory).
+        self._pending_memories: list[tuple[str, dict[str, Any], float]] = []
+        self._flush_task: asyncio.Task | None = None
+        _LIVE_MANAGERS.add(self)
 
         # Check if vector store is disabled via environment variable
         import os
@@ -219,30 +234,62 @@ class HybridContextManager(BaseContextManager):
         Add message to appropriate memory store.
 
         All messages go to short-term (via session).
-        High-importance messages also go to long-term.
+        High-importance messages are queued for long-term storage and written
+        in batches by a background task, so the turn never waits on the
+        embedding model. flush_memory() waits for the queue to drain.
         """
         # Score importance
         importance = self.importance_scorer.score(message)
 
         # Store in long-term if important enough and vector store is enabled
-        if not self._vector_store_disabled and importance >= self.importance_threshold:
+        if self._vector_store_disabled or importance < self.importance_threshold:
+            return
+        self._pending_memories.append((
+            message.get('content', ''),
+            {
+                'role': message.get('role', 'unknown'),
+                'type': message.get('type', 'text'),
+                'importance_score': importance
+            },
+            importance,
+        ))
+        overflow = len(self._pending_memories) - WRITE_BEHIND_MAX_PENDING
+        if overflow > 0:
+            del self._pending_memories[:overflow]
+            logger.warning(
+                f"Long-term memory queue full ({WRITE_BEHIND_MAX_PENDING}); "
+                f"dropped {overflow} oldest queued memories"
+            )
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._drain_memories())
+
+    async def _drain_memories(self):
+        """Store queued memories, one batched store_many per chunk."""
+        while self._pending_memories:
+            batch = self._pending_memories[:WRITE_BEHIND_BATCH_SIZE]
+            del self._pending_memories[:len(batch)]
             try:
                 lt = await self._ensure_long_term()
                 if lt is None:
+                    self._pending_memories.clear()
                     return
-                await lt.store(
-                    content=message.get('content', ''),
-                    metadata={
-                        'role': message.get('role', 'unknown'),
-                        'type': message.get('type', 'text'),
-                        'importance_score': importance
-                    },
-                    importance=importance
+                await lt.store_many(
+                    [content for content, _, _ in batch],
+                    [metadata for _, metadata, _ in batch],
+                    [importance for _, _, importance in batch],
                 )
-                logger.debug(f"Stored important message (score: {importance:.2f})")
+                logger.debug(f"Stored {len(batch)} important messages in long-term memory")
             except Exception as e:
                 logger.error(f"Failed to store in long-term memory: {e}")
 
+    async def flush_memory(self):
+        """Wait until every queued memory has been written."""
+        task = self._flush_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            await task
+        if self._pending_memories:
+            await self._drain_memories()
+
     async def search_memory(self, query: str, k: int = 5) -> list[str]:
         """Search long-term memory for relevant information."""
         if self._vector_store_disabled:
@@ -277,3 +324,9 @@ class HybridContextManager(BaseContextManager):
         except Exception as e:
             logger.error(f"Memory summary failed: {e}")
             return "Memory unavailable."
+
+
+async def flush_pending_memories() -> None:
+    """Drain the write-behind queue of every live manager (process shutdown)."""
+    for manager in list(_LIVE_MANAGERS):
+        await manager.flush_memory()
@@ -5,7 +5,6 @@ Runtime config (provider, base_url, api_key, model) from env or CLI.
 Groq and Ollama: direct. Others: route through Helicone.
 """
 import asyncio
-import hashlib
 import json
 import logging
 import os
@@ -18,13 +17,23 @@ from openai import AsyncOpenAI, OpenAI
 from pydantic import Field
 
 from cognitrix.errors import ExecutionControlError
+from cognitrix.providers.client_pool import ClientPool
+from cognitrix.providers.response_cache import (
+    cache_entry,
+    get_response_cache,
+    is_cacheable,
+    record_stream,
+    replay_stream,
+    response_cache_key,
+    response_from_entry,
+)
 from cognitrix.utils import file_to_image_data_uri, image_to_base64
 from cognitrix.utils.llm_response import LLMResponse
 
-# Cache async OpenAI clients by effective config to avoid per-request overhead.
-# Async clients keep the server event loop free during the (long) provider call
-# instead of blocking it for every socket read.
-_client_cache: dict[str, AsyncOpenAI] = {}
+# Async OpenAI clients are pooled by effective config to avoid per-request
+# overhead. Async clients keep the server event loop free during the (long)
+# provider call instead of blocking it for every socket read.
+_client_pool: ClientPool | None = None
 
 logging.basicConfig(
     format='%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
@@ -135,28 +144,36 @@ def _resolve_runtime_config(provider: str, overrides: dict[str, Any] | None = No
     return config
 
 
-def _client_cache_key(base_url: str, api_key: str, headers: dict[str, str] | None) -> str:
-    """Stable cache key for OpenAI client config."""
-    payload = {'base_url': base_url, 'api_key': api_key, 'headers': headers or {}}
-    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+def _llm_client_pool() -> ClientPool:
+    global _client_pool
+    if _client_pool is None:
+        from cognitrix.config import settings
+
+        _client_pool = ClientPool(settings.llm_client_pool_size, settings.llm_http_options)
+    return _client_pool
 
 
 def _get_or_create_client(
-    base_url: str, api_key: str, default_headers: dict[str, str] | None = None
+    base_url: str,
+    api_key: str,
+    default_headers: dict[str, str] | None = None,
+    provider: str | None = None,
 ) -> AsyncOpenAI:
-    """Reuse an async OpenAI client per effective config."""
-    key = _client_cache_key(base_url, api_key, default_headers)
-    if key not in _client_cache:
-        # The explicit, budget-accounted retry loop owns provider retries.
-        kwargs: dict[str, Any] = {
-            'api_key': api_key,
-            'base_url': base_url,
-            'max_retries': 0,
-        }
-        if default_headers:
-            kwargs['default_headers'] = default_headers
-        _client_cache[key] = AsyncOpenAI(**kwargs)
-    return _client_cache[key]
+    """Reuse a pooled async OpenAI client per effective config."""
+    return _llm_client_pool().get(base_url, api_key, default_headers, provider)
+
+
+def llm_client_pool_stats() -> dict[str, Any]:
+    """Pool hits/misses/evictions and open provider connections."""
+    return _llm_client_pool().stats()
+
+
+async def close_llm_clients() -> None:
+    """Close every pooled provider client; for application shutdown."""
+    global _client_pool
+    pool, _client_pool = _client_pool, None
+    if pool is not None:
+        await pool.aclose()
 
 
 class LLM(Model):
@@ -399,10 +416,10 @@ class LLMManager:
                 if llm.extra_headers:
                     for k, v in llm.extra_headers.items():
                         headers[k] = str(v)
-                client = _get_or_create_client(helicone_base, llm.api_key, headers)
+                client = _get_or_create_client(helicone_base, llm.api_key, headers, llm.provider)
             else:
                 default_headers = dict(llm.extra_headers) if llm.extra_headers else None
-                client = _get_or_create_client(llm.base_url, llm.api_key, default_headers)
+                client = _get_or_create_client(llm.base_url, llm.api_key, default_headers, llm.provider)
             formatted_messages = LLMManager.format_query(llm, prompt)
             formatted_tools = tools if tools else None
 
@@ -424,9 +441,22 @@ class LLMManager:
             if llm.extra_body:
                 completion_params['extra_body'] = llm.extra_body
 
+            cache = get_response_cache() if is_cacheable(completion_params, kwds.get('cache')) else None
+            cache_key = response_cache_key(llm.provider, completion_params) if cache is not None else ''
+            if cache is not None:
+                entry = await cache.get(cache_key)
+                if entry is not None:
+                    return replay_stream(entry) if stream else response_from_entry(entry)
+
             if stream:
-                return LLMManager._handle_streaming_response(client, completion_params)
-            return await LLMManager._handle_non_streaming_response(client, completion_params)
+                live = LLMManager._handle_streaming_response(client, completion_params)
+                return record_stream(cache, cache_key, live) if cache is not None else live
+            response = await LLMManager._handle_non_streaming_response(client, completion_params)
+            if cache is not None:
+                entry = cache_entry(response)
+                if entry is not None:
+                    await cache.put(cache_key, entry)
+            return response
 
         except ExecutionControlError:
             raise
@@ -496,6 +526,7 @@ class LLMManager:
             in_reasoning = False
             # Accumulate partial tool calls by index for streaming
             tool_call_accum: dict[int, dict[str, Any]] = {}
+            finish_reason = None
             async for chunk in stream:
                 chunk_usage = getattr(chunk, 'usage', None)
                 if chunk_usage:
@@ -505,6 +536,7 @@ class LLMManager:
                     }
                 if not chunk.choices:
                     continue
+                finish_reason = getattr(chunk.choices[0], 'finish_reason', None) or finish_reason
                 delta = chunk.choices[0].delta
                 reasoning = LLMManager._get_reasoning_from_delta(delta)
                 content = delta.content if hasattr(delta, 'content') else None
@@ -570,6 +602,7 @@ class LLMManager:
                             item['extra_content'] = acc['extra_content']
                         parsed.append(item)
                 response.tool_calls = parsed
+            response.finish_reason = finish_reason
             # Final yield delivers tool_calls/finalization only — clear
             # current_chunk so consumers don't print the last chunk twice.
             response.current_chunk = '\n</think>\n' if in_reasoning else ''
@@ -645,6 +678,7 @@ class LLMManager:
                 llm_resp.add_chunk(content)
             if native_tool_calls:
                 llm_resp.tool_calls = native_tool_calls
+            llm_resp.finish_reason = getattr(response.choices[0], 'finish_reason', None)
             resp_usage = getattr(response, 'usage', None)
             if resp_usage:
                 llm_resp.usage = {
@@ -0,0 +1,214 @@
+"""Bounded, least-recently-used pool of AsyncOpenAI clients.
+
+One client (and one httpx connection pool) exists per effective provider
+config: base URL, API key, default headers. Per-user keys and Helicone
+headers multiply those configs, so the pool is capped at
+``settings.llm_client_pool_size``. Evicted clients are closed once their
+in-flight requests drain, and the API lifespan closes the rest on shutdown.
+
+httpx limits, keep-alive and HTTP/2 are tunable per provider through
+``COGNITRIX_LLM_HTTP_JSON``, e.g. ``{"default": {"max_connections": 100},
+"openai": {"http2": true}}``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+logger = logging.getLogger('cognitrix.log')
+
+# Evicted clients get this long before the pool starts checking whether
+# their connections have gone idle; a request may have just taken one.
+RETIRE_GRACE_SECONDS = 5.0
+# Upper bound on waiting for a retired client's streams to finish.
+RETIRE_MAX_WAIT_SECONDS = 600.0
+
+
+@dataclass(frozen=True)
+class HTTPOptions:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+    @classmethod
+    def from_mapping(cls, *layers: dict[str, Any] | None) -> 'HTTPOptions':
+        known = {field.name for field in fields(cls)}
+        merged: dict[str, Any] = {}
+        for layer in layers:
+            merged.update({key: value for key, value in (layer or {}).items() if key in known})
+        return cls(**merged)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def client_config_key(
+    base_url: str, api_key: str, headers: dict[str, str] | None, provider: str | None = None
+) -> str:
+    """Stable key for an effective client config (the API key never leaves the digest)."""
+    payload = {'base_url': base_url, 'api_key': api_key, 'headers': headers or {}, 'provider': provider or ''}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _connection_pool(client: AsyncOpenAI) -> Any:
+    http_client = getattr(client, '_client', None)
+    transport = getattr(http_client, '_transport', None)
+    return getattr(transport, '_pool', None)
+
+
+def connection_counts(client: AsyncOpenAI) -> tuple[int, int]:
+    """(open, active) connections of the client's httpx pool."""
+    connections = getattr(_connection_pool(client), 'connections', None) or []
+    active = sum(1 for connection in connections if not connection.is_idle())
+    return len(connections), active
+
+
+@dataclass
+class _PooledClient:
+    client: AsyncOpenAI
+    provider: str
+    base_url: str
+
+
+class ClientPool:
+    """LRU of AsyncOpenAI clients keyed by effective config."""
+
+    def __init__(self, max_clients: int = 32, http_options: dict[str, dict[str, Any]] | None = None):
+        self.max_clients = max(1, int(max_clients))
+        self.http_options = http_options or {}
+        self._clients: OrderedDict[str, _PooledClient] = OrderedDict()
+        self._retiring: dict[asyncio.Task, AsyncOpenAI] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def options_for(self, provider: str | None) -> HTTPOptions:
+        options = HTTPOptions.from_mapping(
+            self.http_options.get('default'), self.http_options.get((provider or '').lower())
+        )
+        if options.http2 and not _http2_available():
+            logger.warning('HTTP/2 requested for %s but the h2 package is missing; using HTTP/1.1', provider)
+            options = replace(options, http2=False)
+        return options
+
+    def _create(self, base_url: str, api_key: str, headers: dict[str, str] | None, provider: str | None):
+        options = self.options_for(provider)
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=options.max_connections,
+                max_keepalive_connections=options.max_keepalive_connections,
+                keepalive_expiry=options.keepalive_expiry,
+            ),
+            http2=options.http2,
+        )
+        # The explicit, budget-accounted retry loop owns provider retries.
+        kwargs: dict[str, Any] = {
+            'api_key': api_key,
+            'base_url': base_url,
+            'max_retries': 0,
+            'http_client': http_client,
+        }
+        if headers:
+            kwargs['default_headers'] = headers
+        return AsyncOpenAI(**kwargs)
+
+    def get(
+        self,
+        base_url: str,
+        api_key: str,
+        headers: dict[str, str] | None = None,
+        provider: str | None = None,
+    ) -> AsyncOpenAI:
+        key = client_config_key(base_url, api_key, headers, provider)
+        evicted: list[_PooledClient] = []
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return entry.client
+            self.misses += 1
+            entry = _PooledClient(self._create(base_url, api_key, headers, provider), provider or '', base_url)
+            self._clients[key] = entry
+            while len(self._clients) > self.max_clients:
+                evicted.append(self._clients.popitem(last=False)[1])
+                self.evictions += 1
+        for old in evicted:
+            self._retire(old.client)
+        return entry.client
+
+    def _retire(self, client: AsyncOpenAI) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop to close on (sync caller); the client is dropped and its
+            # sockets go with it when collected.
+            return
+        task = loop.create_task(self._close_when_idle(client))
+        self._retiring[task] = client
+        task.add_done_callback(lambda done: self._retiring.pop(done, None))
+
+    async def _close_when_idle(self, client: AsyncOpenAI) -> None:
+        await asyncio.sleep(RETIRE_GRACE_SECONDS)
+        deadline = time.monotonic() + RETIRE_MAX_WAIT_SECONDS
+        while connection_counts(client)[1] and time.monotonic() < deadline:
+            await asyncio.sleep(1.0)
+        await _close(client)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = list(self._clients.values())
+            snapshot = {
+                'clients': len(entries),
+                'max_clients': self.max_clients,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'retiring': len(self._retiring),
+            }
+        open_total = active_total = 0
+        per_provider: dict[str, dict[str, int]] = {}
+        for entry in entries:
+            opened, active = connection_counts(entry.client)
+            open_total += opened
+            active_total += active
+            bucket = per_provider.setdefault(entry.provider or 'unknown', {'clients': 0, 'open_connections': 0})
+            bucket['clients'] += 1
+            bucket['open_connections'] += opened
+        snapshot.update(open_connections=open_total, active_connections=active_total, providers=per_provider)
+        return snapshot
+
+    async def aclose(self) -> None:
+        """Close every pooled and retiring client (application shutdown)."""
+        with self._lock:
+            clients = [entry.client for entry in self._clients.values()]
+            self._clients.clear()
+            retiring = dict(self._retiring)
+        for task in retiring:
+            task.cancel()
+        await asyncio.gather(*retiring, return_exceptions=True)
+        clients.extend(retiring.values())
+        await asyncio.gather(*(_close(client) for client in clients), return_exceptions=True)
+
+
+async def _close(client: AsyncOpenAI) -> None:
+    try:
+        await client.close()
+    except Exception:
+        logger.debug('Error closing an LLM client', exc_info=True)
@@ -0,0 +1,318 @@
+"""Opt-in cache of provider responses for deterministic LLM calls.
+
+Planner, evaluator and compaction prompts are largely repeated
+zero-temperature requests; serving those from a cache skips the provider
+round trip entirely. Enable it with ``COGNITRIX_RESPONSE_CACHE``:
+
+- ``sqlite``: a local table under the Cognitrix workdir
+- ``redis://...`` / ``rediss://...``: shared by every worker
+
+Only requests with ``temperature == 0`` are cached unless the caller passes
+``cache=True``; ``cache=False`` always reaches the provider. Entries expire
+after ``COGNITRIX_RESPONSE_CACHE_TTL_SECONDS`` and the least recently used
+ones are evicted past ``COGNITRIX_RESPONSE_CACHE_MAX_ENTRIES``.
+
+A hit reports zero usage and ``cached=True`` so task accounting records it
+as a zero-cost call. Cache failures are logged and treated as misses.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from cognitrix.utils.llm_response import LLMResponse
+
+logger = logging.getLogger('cognitrix.log')
+
+# Request fields that decide the answer. 'stream' and 'stream_options' only
+# change its delivery, so streaming and non-streaming callers share entries.
+# max_tokens is left out because task budgets clamp it per call; answers cut
+# short by that limit are never stored instead.
+KEY_FIELDS = ('model', 'messages', 'tools', 'response_format', 'temperature', 'extra_body')
+
+
+def response_cache_key(provider: str, params: dict[str, Any]) -> str:
+    """Digest of the normalized request (canonical JSON, sorted keys)."""
+    payload = {'provider': (provider or '').lower(), **{field: params.get(field) for field in KEY_FIELDS}}
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def is_cacheable(params: dict[str, Any], requested: bool | None = None) -> bool:
+    if requested is not None:
+        return bool(requested)
+    try:
+        return float(params.get('temperature') or 0) == 0
+    except (TypeError, ValueError):
+        return False
+
+
+def cache_entry(response: Any) -> dict[str, Any] | None:
+    """Serializable form of a complete response; None for errors and truncations."""
+    if not isinstance(response, LLMResponse) or response.error or response.finish_reason == 'length':
+        return None
+    content = response.llm_response or ''
+    reasoning = response.reasoning or ''
+    # The non-streaming path inlines reasoning into the content; keep them
+    # apart so a streaming replay can wrap the reasoning itself.
+    inlined = f'<think>{reasoning}</think>\n\n'
+    if reasoning and content.startswith(inlined):
+        content = content[len(inlined):]
+    if not content and not reasoning and not response.tool_calls:
+        return None
+    return {'content': content, 'reasoning': reasoning, 'tool_calls': list(response.tool_calls or [])}
+
+
+def _zero_usage(response: LLMResponse) -> LLMResponse:
+    response.usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+    response.cached = True
+    return response
+
+
+def response_from_entry(entry: dict[str, Any]) -> LLMResponse:
+    """Rebuild the non-streaming response shape from a cache entry."""
+    response = LLMResponse()
+    content = entry.get('content') or ''
+    reasoning = entry.get('reasoning') or ''
+    if reasoning:
+        response.add_reasoning_chunk(reasoning)
+        response.add_chunk(f'<think>{reasoning}</think>\n\n{content}')
+    else:
+        response.add_chunk(content)
+    response.tool_calls = list(entry.get('tool_calls') or [])
+    return _zero_usage(response)
+
+
+async def replay_stream(entry: dict[str, Any]) -> AsyncIterator[LLMResponse]:
+    """Synthetic stream with the same chunk framing as a live one."""
+    response = _zero_usage(LLMResponse())
+    reasoning = entry.get('reasoning') or ''
+    content = entry.get('content') or ''
+    if reasoning:
+        response.add_reasoning_chunk(reasoning)
+        response.current_chunk = '<think>' + reasoning
+        yield response
+    if content:
+        response.add_chunk(content)
+        response.current_chunk = ('\n</think>\n' + content) if reasoning else content
+        yield response
+    response.tool_calls = list(entry.get('tool_calls') or [])
+    response.current_chunk = '\n</think>\n' if reasoning and not content else ''
+    yield response
+
+
+async def record_stream(
+    cache: 'ResponseCache', key: str, stream: AsyncIterator[LLMResponse]
+) -> AsyncIterator[LLMResponse]:
+    """Pass a live stream through and cache it once fully consumed."""
+    last = None
+    async for response in stream:
+        last = response
+        yield response
+    entry = cache_entry(last)
+    if entry is not None:
+        await cache.put(key, entry)
+
+
+class ResponseCache:
+    """Best-effort wrapper: backend errors are logged and become misses."""
+
+    def __init__(self, backend: Any, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            return await self.backend.get(key)
+        except Exception:
+            logger.warning('Response cache read failed', exc_info=True)
+            return None
+
+    async def put(self, key: str, entry: dict[str, Any]) -> None:
+        try:
+            await self.backend.put(key, entry, self.ttl_seconds)
+        except Exception:
+            logger.warning('Response cache write failed', exc_info=True)
+
+
+class SQLiteResponseBackend:
+    """Local response cache: TTL per row, LRU eviction past max_entries."""
+
+    def __init__(self, path: str | Path | None, max_entries: int):
+        if path is not None and str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, int(max_entries))
+        self._conn = sqlite3.connect(str(path or ':memory:'), timeout=15, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_response_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, used_at REAL NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_llm_response_cache_used ON llm_response_cache (used_at)'
+            )
+
+    def _get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM llm_response_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute('DELETE FROM llm_response_cache WHERE key = ?', (key,))
+                return None
+            self._conn.execute('UPDATE llm_response_cache SET used_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def _put(self, key: str, entry: dict[str, Any], ttl_seconds: float) -> None:
+        now = time.time()
+        value = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO llm_response_cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)',
+                (key, value, now + ttl_seconds, now),
+            )
+            self._conn.execute('DELETE FROM llm_response_cache WHERE expires_at <= ?', (now,))
+            excess = self._conn.execute('SELECT COUNT(*) FROM llm_response_cache').fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    'DELETE FROM llm_response_cache WHERE key IN '
+                    '(SELECT key FROM llm_response_cache ORDER BY used_at LIMIT ?)',
+                    (excess,),
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM llm_response_cache').fetchone()[0]
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, entry: dict[str, Any], ttl_seconds: float) -> None:
+        await asyncio.to_thread(self._put, key, entry, ttl_seconds)
+
+
+class RedisResponseBackend:
+    """Shared response cache: expiring keys plus a sorted-set LRU index."""
+
+    _GET = """
+local value = redis.call('GET', KEYS[1])
+if value then redis.call('ZADD', KEYS[2], 'XX', ARGV[1], KEYS[1]) end
+return value
+"""
+    _PUT = """
+local entry, index = KEYS[1], KEYS[2]
+local value, ttl, now, limit = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+redis.call('SET', entry, value, 'PX', ttl)
+redis.call('ZADD', index, now, entry)
+redis.call('ZREMRANGEBYSCORE', index, '-inf', now - ttl)
+local excess = redis.call('ZCARD', index) - limit
+if excess > 0 then
+  local stale = redis.call('ZRANGE', index, 0, excess - 1)
+  redis.call('DEL', unpack(stale))
+  redis.call('ZREMRANGEBYRANK', index, 0, excess - 1)
+end
+return 1
+"""
+
+    def __init__(
+        self,
+        client: Any,
+        max_entries: int,
+        *,
+        namespace: str = 'cognitrix:llm-cache',
+        operation_timeout_seconds: float = 1.0,
+    ):
+        self.client = client
+        self.max_entries = max(1, int(max_entries))
+        self.namespace = namespace.rstrip(':')
+        self.operation_timeout_seconds = max(0.001, float(operation_timeout_seconds))
+
+    @classmethod
+    def from_url(cls, url: str, max_entries: int, **kwargs: Any) -> 'RedisResponseBackend':
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(url, decode_responses=True), max_entries, **kwargs)
+
+    async def _eval(self, script: str, key: str, *args: Any) -> Any:
+        return await asyncio.wait_for(
+            self.client.eval(script, 2, f'{self.namespace}:{key}', f'{self.namespace}:index', *args),
+            timeout=self.operation_timeout_seconds,
+        )
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        value = await self._eval(self._GET, key, int(time.time() * 1000))
+        return json.loads(value) if value else None
+
+    async def put(self, key: str, entry: dict[str, Any], ttl_seconds: float) -> None:
+        await self._eval(
+            self._PUT,
+            key,
+            json.dumps(entry, ensure_ascii=False, default=str),
+            max(1, int(ttl_seconds * 1000)),
+            int(time.time() * 1000),
+            self.max_entries,
+        )
+
+
+_cache: ResponseCache | None = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def _build_response_cache() -> ResponseCache | None:
+    from cognitrix.config import settings
+
+    target = settings.response_cache
+    if not target:
+        return None
+    if target.startswith(('redis://', 'rediss://')):
+        try:
+            backend = RedisResponseBackend.from_url(target, settings.response_cache_max_entries)
+        except ImportError:
+            logger.warning('COGNITRIX_RESPONSE_CACHE points at redis but redis is not installed; cache disabled')
+            return None
+    elif target.lower() == 'sqlite':
+        backend = SQLiteResponseBackend(settings.workdir / 'response_cache.sqlite3', settings.response_cache_max_entries)
+    else:
+        logger.warning(f"Unknown COGNITRIX_RESPONSE_CACHE backend {target!r}; cache disabled")
+        return None
+    return ResponseCache(backend, settings.response_cache_ttl_seconds)
+
+
+def get_response_cache() -> ResponseCache | None:
+    """The process-wide response cache, or None when not configured."""
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _cache_lock:
+            if not _cache_configured:
+                _cache = _build_response_cache()
+                _cache_configured = True
+    return _cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """Install a cache explicitly (tests, embedding applications)."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
+
+
+def reset_response_cache() -> None:
+    """Forget the configured cache; the next lookup re-reads settings."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = None
+        _cache_configured = False
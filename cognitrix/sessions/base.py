@@ -4,6 +4,7 @@ import logging
 import os
 import time
 from collections.abc import Callable
+from contextvars import ContextVar
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Literal, Optional, Self
 
@@ -19,6 +20,7 @@ from cognitrix.safety.approval_gate import OPERATION_BLOCKED_PREFIX
 
 if TYPE_CHECKING:
     from cognitrix.agents.base import Agent
+    from cognitrix.sessions.context import HistoryLedger
     from cognitrix.teams.base import Team
 
 logger = logging.getLogger('cognitrix.log')
@@ -58,6 +60,10 @@ _TOOL_PREVIEW_MAX = 4000
 _MALFORMED_TOOL_LABEL = 'Malformed tool call'
 _STOPPED_TOOL_TEXT = 'Stopped by user.'
 
+# Set while Session.save writes its own row: the transcript lives in the
+# SessionMessage log, so the legacy ``chat`` column is written empty.
+_SAVING_SESSION_ROW: ContextVar[bool] = ContextVar('saving_session_row', default=False)
+
 
 def _tool_preview(data: Any) -> str:
     """Stringify and cap for the chat UI.
@@ -160,12 +166,137 @@ class Session(Model):
         delete the instance. The previous implementation called cls.delete()
         which recursed infinitely.
         """
+        from cognitrix.sessions import messages as message_log
+
         session = await cls.get(session_id)
         if not session:
             return False
         await Model.delete(session)
+        await message_log.delete_log(str(session_id))
         return True
 
+    @classmethod
+    async def get(cls, id) -> Self | None:
+        session = await super().get(id)
+        if session is not None:
+            await session.load_chat()
+        return session
+
+    @classmethod
+    async def find_one(cls, conditions: dict[str, Any] | None = None) -> Self | None:
+        session = await super().find_one(conditions or {})
+        if session is not None:
+            await session.load_chat()
+        return session
+
+    def model_dump(self, *args, **kwargs) -> dict[str, Any]:
+        data = super().model_dump(*args, **kwargs)
+        if _SAVING_SESSION_ROW.get():
+            data['chat'] = []
+        return data
+
+    def _chat_log_state(self):
+        from cognitrix.sessions.messages import ChatWindow
+
+        state = self.__dict__.get('_chat_log')
+        if state is None:
+            state = ChatWindow()
+            object.__setattr__(self, '_chat_log', state)
+        return state
+
+    async def load_chat(self, limit: int = MAX_CHAT_HISTORY) -> list[dict[str, Any]]:
+        """Page in the newest ``limit`` messages of the visible history.
+
+        A row still carrying a legacy ``chat`` blob is migrated first: the
+        blob becomes the session's first log entries (unless an interrupted
+        migration already wrote them) and the column is cleared.
+        """
+        from cognitrix.sessions import messages as message_log
+
+        if not self.id:
+            return self.chat
+        session_id = str(self.id)
+        await self._migrate_legacy_chat()
+        self._use_window(await message_log.load_window(session_id, limit))
+        return self.chat
+
+    @classmethod
+    async def load_chats(cls, sessions: list[Self], limit: int = MAX_CHAT_HISTORY) -> list[Self]:
+        """``load_chat`` for every session not loaded yet, in two log reads.
+
+        ``all()``/``find()`` return rows without their history so listing
+        sessions stays one query; list views that show titles or message
+        counts hydrate only the sessions they return.
+        """
+        from cognitrix.sessions import messages as message_log
+
+        pending = [
+            session for session in sessions
+            if session.id and '_chat_log' not in session.__dict__
+        ]
+        for session in pending:
+            await session._migrate_legacy_chat()
+        windows = await message_log.load_windows([str(session.id) for session in pending], limit)
+        for session in pending:
+            session._use_window(windows[str(session.id)])
+        return sessions
+
+    async def _migrate_legacy_chat(self) -> None:
+        from cognitrix.sessions import messages as message_log
+
+        if not self.chat or '_chat_log' in self.__dict__:
+            return
+        session_id = str(self.id)
+        if await message_log.import_legacy(session_id, list(self.chat)):
+            logger.info('Migrated %s chat messages of session %s to the message log', len(self.chat), session_id)
+        await type(self).update_one({'id': session_id}, {'chat': []})
+
+    def _use_window(self, window) -> None:
+        from cognitrix.sessions.messages import ChatWindow
+
+        self.chat = window.messages
+        object.__setattr__(self, '_chat_log', ChatWindow(
+            messages=list(window.messages),
+            sequences=window.sequences,
+            last_sequence=window.last_sequence,
+        ))
+
+    async def save(self) -> Self:
+        """Write the session row, then append only new history to the log.
+
+        History rewrites (compaction, clearing) become a window marker, so
+        earlier messages are never rewritten or deleted here.
+        """
+        from cognitrix.sessions import messages as message_log
+
+        current = list(self.chat)
+        token = _SAVING_SESSION_ROW.set(True)
+        try:
+            await super().save()
+        finally:
+            _SAVING_SESSION_ROW.reset(token)
+
+        state = self._chat_log_state()
+        sync = message_log.plan_sync(state.messages, state.sequences, current)
+        if sync.window is None and not sync.appended:
+            object.__setattr__(self, '_chat_log', message_log.ChatWindow(
+                messages=current,
+                sequences=sync.sequences,
+                last_sequence=state.last_sequence,
+            ))
+            return self
+        window_sequence, appended = await message_log.append(
+            str(self.id),
+            sync.appended,
+            after=state.last_sequence,
+            window=sync.window,
+        )
+        object.__setattr__(self, '_chat_log', message_log.ChatWindow(
+            messages=current,
+            sequences=[*sync.sequences, *appended],
+            last_sequence=max([state.last_sequence, window_sequence or 0, *appended]),
+        ))
+        return self
 
     def update_history(self, message: dict[str, Any] | list[dict[str, Any]]):
         if isinstance(message, list):
@@ -176,6 +307,19 @@ class Session(Model):
         # builder trims any orphan tool message left at the new start.
         if len(self.chat) > MAX_CHAT_HISTORY:
             del self.chat[:len(self.chat) - MAX_CHAT_HISTORY]
+        ledger = self.__dict__.get('_history_ledger')
+        if ledger is not None:
+            ledger.sync(self.chat)
+
+    def history_ledger(self) -> 'HistoryLedger':
+        """Running token counts and turn starts of ``chat``, kept across turns."""
+        from cognitrix.sessions.context import HistoryLedger
+
+        ledger = self.__dict__.get('_history_ledger')
+        if ledger is None:
+            ledger = HistoryLedger()
+            object.__setattr__(self, '_history_ledger', ledger)
+        return ledger
 
     @property
     async def agent(self):
@@ -226,14 +370,17 @@ class Session(Model):
         Runs at turn end only. Destroys nothing without a produced summary:
         if the summarizer errors or returns nothing, history is left as-is.
         The summary is stored as a user message (type 'summary') so every
-        provider accepts it and the window shaper anchors on it.
+        provider accepts it and the window shaper anchors on it. The folded
+        turns stay in the message log; save() records the summary as a window
+        marker rather than rewriting the history.
         """
         from cognitrix.sessions.context import partition_turns
-        from cognitrix.utils.tokens import estimate_tokens
+        from cognitrix.utils.tokens import atokenizer_for_llm
 
         llm = agent.llm
         budget = max(2000, llm.get_context_window() - llm.max_tokens - 2000)
-        if estimate_tokens(self.chat) <= budget * COMPACT_THRESHOLD:
+        ledger = self.history_ledger().sync(self.chat, await atokenizer_for_llm(llm))
+        if ledger.total <= budget * COMPACT_THRESHOLD:
             return
 
         turns = partition_turns(self.chat)
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterator
 from typing import TYPE_CHECKING, Any
 
-from cognitrix.utils.tokens import estimate_tokens
+from cognitrix.utils.tokens import (
+    HEURISTIC,
+    Tokenizer,
+    atokenizer_for_llm,
+    count_messages,
+    estimate_tokens,
+)
 
 if TYPE_CHECKING:
     from cognitrix.agents.base import Agent
@@ -25,6 +33,13 @@ class BaseContextManager(ABC):
         pass
 
 
+def _is_user_request(m: dict[str, Any]) -> bool:
+    return (
+        str(m.get('role', '')).lower() == 'user'
+        and m.get('type', 'text') in {'text', 'summary'}
+    )
+
+
 def partition_turns(chat: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
     """Split chat into turns; each turn starts at a user text/summary message.
 
@@ -35,11 +50,7 @@ def partition_turns(chat: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
     turns: list[list[dict[str, Any]]] = []
     current: list[dict[str, Any]] = []
     for m in chat:
-        is_user_request = (
-            str(m.get('role', '')).lower() == 'user'
-            and m.get('type', 'text') in {'text', 'summary'}
-        )
-        if is_user_request and current:
+        if _is_user_request(m) and current:
             turns.append(current)
             current = []
         current.append(m)
@@ -48,6 +59,25 @@ def partition_turns(chat: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
     return turns
 
 
+def _slim_message(m: dict[str, Any]) -> dict[str, Any] | None:
+    """A past-turn message as the window keeps it, or None when dropped."""
+    role = str(m.get('role', '')).lower()
+    mtype = m.get('type', 'text')
+    if role == 'user' and mtype in ('image', 'image_selection'):
+        artifact = m.get('artifact') or {}
+        artifact_id = str(artifact.get('id') or 'unknown')
+        return {
+            'role': m.get('role', 'User'),
+            'type': 'text',
+            'content': f'[Previously supplied image: {artifact_id}]',
+        }
+    if role == 'user' and mtype in ('text', 'summary'):
+        return m
+    if role == 'assistant' and mtype == 'text' and not m.get('tool_calls'):
+        return m
+    return None
+
+
 def _slim_past_turn(turn: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Past turns only need the dialogue: user text/summary + assistant text.
 
@@ -55,57 +85,163 @@ def _slim_past_turn(turn: list[dict[str, Any]]) -> list[dict[str, Any]]:
     dropping them keeps the window protocol-valid by construction (it always
     starts at a user message, never mid tool-exchange).
     """
-    kept = []
-    for m in turn:
-        role = str(m.get('role', '')).lower()
-        mtype = m.get('type', 'text')
-        if role == 'user' and mtype in ('image', 'image_selection'):
-            artifact = m.get('artifact') or {}
-            artifact_id = str(artifact.get('id') or 'unknown')
-            kept.append({
-                'role': m.get('role', 'User'),
-                'type': 'text',
-                'content': f'[Previously supplied image: {artifact_id}]',
-            })
-        elif role == 'user' and mtype in ('text', 'summary'):
-            kept.append(m)
-        elif role == 'assistant' and mtype == 'text' and not m.get('tool_calls'):
-            kept.append(m)
-    return kept
+    return [slim for m in turn if (slim := _slim_message(m)) is not None]
+
+
+class HistoryLedger:
+    """Running token counts and turn starts for one chat list.
+
+    Holds prefix sums of each message's full and slimmed (past-turn) token
+    count plus the index of every user request. sync() folds in only what
+    changed since the last call — appended messages, a front trim, a tail
+    truncation — so shaping a prompt or checking the compaction threshold
+    costs O(new messages). Any other rewrite of the list rebuilds it.
+    Indices in ``_starts`` and ``_positions`` are absolute: ``base`` counts
+    the messages trimmed off the front.
+    """
+
+    def __init__(self):
+        self._reset(HEURISTIC)
+
+    def _reset(self, tokenizer: Tokenizer) -> None:
+        self.tokenizer = tokenizer
+        self.base = 0
+        self.messages: list[dict[str, Any]] = []
+        self._full = [0]
+        self._slim = [0]
+        self._starts: list[int] = []
+        self._starts_lo = 0
+        self._positions: dict[int, int] = {}
+
+    @property
+    def total(self) -> int:
+        """Token count of the whole synced history."""
+        return self._full[-1] - self._full[0]
+
+    def count(self, index: int) -> int:
+        return self._full[index + 1] - self._full[index]
+
+    def slim_cost(self, start: int, end: int) -> int:
+        return self._slim[end] - self._slim[start]
+
+    def sync(self, chat: list[dict[str, Any]], tokenizer: Tokenizer | None = None) -> 'HistoryLedger':
+        tokenizer = tokenizer or self.tokenizer
+        if tokenizer.name != self.tokenizer.name:
+            self._reset(tokenizer)
+        self.tokenizer = tokenizer
+        if self.messages:
+            first = self._positions.get(id(chat[0])) if chat else None
+            if first is None:
+                self._reset(tokenizer)
+            elif first > self.base:
+                self._trim_front(first - self.base)
+        kept = min(len(self.messages), len(chat))
+        if kept and (chat[0] is not self.messages[0] or chat[kept - 1] is not self.messages[kept - 1]):
+            self._reset(tokenizer)
+            kept = 0
+        if kept < len(self.messages):
+            self._trim_back(kept)
+        if len(chat) > kept:
+            self._extend(chat[kept:])
+        return self
+
+    def _extend(self, new: list[dict[str, Any]]) -> None:
+        counts = count_messages(new, self.tokenizer)
+        slims = [_slim_message(m) for m in new]
+        slim_counts = iter(count_messages([m for m in slims if m is not None], self.tokenizer))
+        for m, count, slim in zip(new, counts, slims, strict=True):
+            index = self.base + len(self.messages)
+            self._positions.setdefault(id(m), index)
+            if _is_user_request(m):
+                self._starts.append(index)
+            self.messages.append(m)
+            self._full.append(self._full[-1] + count)
+            self._slim.append(self._slim[-1] + (next(slim_counts) if slim is not None else 0))
+
+    def _forget(self, start: int, end: int) -> None:
+        for offset, m in enumerate(self.messages[start:end], start=self.base + start):
+            if self._positions.get(id(m)) == offset:
+                del self._positions[id(m)]
+
+    def _trim_front(self, count: int) -> None:
+        self._forget(0, count)
+        del self.messages[:count]
+        del self._full[:count]
+        del self._slim[:count]
+        self.base += count
+        self._starts_lo = bisect_left(self._starts, self.base, lo=self._starts_lo)
+        if self._starts_lo > len(self._starts) // 2:
+            del self._starts[:self._starts_lo]
+            self._starts_lo = 0
+
+    def _trim_back(self, kept: int) -> None:
+        self._forget(kept, len(self.messages))
+        del self.messages[kept:]
+        del self._full[kept + 1:]
+        del self._slim[kept + 1:]
+        while len(self._starts) > self._starts_lo and self._starts[-1] >= self.base + kept:
+            self._starts.pop()
+
+    def turn_bounds(self) -> Iterator[tuple[int, int]]:
+        """(start, end) of each turn, newest first, as in partition_turns."""
+        end = len(self.messages)
+        for position in range(len(self._starts) - 1, self._starts_lo - 1, -1):
+            start = self._starts[position] - self.base
+            yield start, end
+            end = start
+        if end > 0:
+            yield 0, end
 
 
 def shape_history(
     chat: list[dict[str, Any]],
     budget_tokens: int,
     max_past_turns: int = 20,
+    tokenizer: Tokenizer | None = None,
+    ledger: HistoryLedger | None = None,
 ) -> list[dict[str, Any]]:
     """Select history for the prompt under a token budget.
 
     The current (last) turn is kept whole — the tool-call protocol needs its
     assistant tool_calls + tool results. Older turns are slimmed to plain
     dialogue and added newest-first until the budget or turn cap is hit.
+    Pass the model's ``tokenizer`` for exact counts; the default is the
+    chars//4 heuristic. A session's ``ledger`` carries counts across calls,
+    so only messages added since the last prompt are counted.
     """
-    turns = partition_turns(chat)
-    if not turns:
+    ledger = (ledger or HistoryLedger()).sync(chat, tokenizer or HEURISTIC)
+    bounds = ledger.turn_bounds()
+    current = next(bounds, None)
+    if current is None:
         return []
 
-    selected = [m for m in turns[-1] if m.get('type') != 'turn_timing']
-    used = estimate_tokens(selected)
+    start, end = current
+    kept = [
+        index for index in range(start, end)
+        if ledger.messages[index].get('type') != 'turn_timing'
+    ]
+    selected = [ledger.messages[index] for index in kept]
+    used = sum(ledger.count(index) for index in kept)
 
     past_added = 0
-    for turn in reversed(turns[:-1]):
-        slim = _slim_past_turn(turn)
-        if not slim:
+    for start, end in bounds:
+        cost = ledger.slim_cost(start, end)
+        if not cost:
             continue
-        cost = estimate_tokens(slim)
         if used + cost > budget_tokens or past_added >= max_past_turns:
             break
-        selected = slim + selected
+        selected = _slim_past_turn(ledger.messages[start:end]) + selected
         used += cost
         past_added += 1
     return selected
 
 
+def _session_ledger(session: 'Session') -> HistoryLedger | None:
+    history_ledger = getattr(session, 'history_ledger', None)
+    ledger = history_ledger() if callable(history_ledger) else None
+    return ledger if isinstance(ledger, HistoryLedger) else None
+
+
 def _trim_to_valid_start(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Safety net for histories that don't start at a user message.
 
@@ -143,13 +279,17 @@ class SlidingWindowContextManager(BaseContextManager):
         }
 
         llm = agent.llm
+        tokenizer = await atokenizer_for_llm(llm)
         # Reserve room for the model's output plus a safety margin.
         budget = max(
             2000,
-            llm.get_context_window() - estimate_tokens(system_content) - llm.max_tokens - 1000,
+            llm.get_context_window() - estimate_tokens(system_content, tokenizer) - llm.max_tokens - 1000,
         )
 
-        recent_history = shape_history(session.chat, budget, max_past_turns=self.max_messages)
+        recent_history = shape_history(
+            session.chat, budget, max_past_turns=self.max_messages, tokenizer=tokenizer,
+            ledger=_session_ledger(session),
+        )
         recent_history = _trim_to_valid_start(recent_history)
 
         from cognitrix.media.context import MediaContextBuilder
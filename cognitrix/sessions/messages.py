@@ -0,0 +1,451 @@
+"""Append-only chat log backing ``Session.chat``.
+
+Each session message is one ``SessionMessage`` row with a per-session
+``sequence``. Saving a session inserts only the messages appended since the
+last sync; the session row itself no longer carries the transcript.
+
+Rewrites of the visible history (compaction, clearing, a replaced list) are
+recorded as a ``window`` marker instead of deleting rows. A marker holds the
+messages that now head the history (for example the compaction summary) and
+``folded_through``, the last sequence the new history no longer shows. The
+visible history is therefore the latest marker's head followed by every
+message row after ``folded_through``.
+"""
+
+import logging
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from typing import Any
+
+from odbms import Model
+from pydantic import Field
+
+logger = logging.getLogger('cognitrix.log')
+
+MESSAGE_KIND = 'message'
+WINDOW_KIND = 'window'
+MAX_APPEND_ATTEMPTS = 8
+
+
+class SessionMessage(Model):
+    session_id: str
+    sequence: int
+    kind: str = MESSAGE_KIND
+    message: dict[str, Any] = Field(default_factory=dict)
+    head: list[dict[str, Any]] = Field(default_factory=list)
+    folded_through: int | None = None
+
+
+@dataclass
+class ChatWindow:
+    """The visible slice of a session's log and the sequence of each entry.
+
+    Head messages restored from a window marker have no sequence of their own.
+    """
+    messages: list[dict[str, Any]] = field(default_factory=list)
+    sequences: list[int | None] = field(default_factory=list)
+    last_sequence: int = 0
+
+
+@dataclass
+class _LogSetup:
+    complete: bool = False
+
+
+_LOG_SETUP_BY_DATABASE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _marker(dbms: str):
+    return (lambda name: f':{name}') if dbms == 'sqlite' else (lambda name: f'%({name})s')
+
+
+async def ensure_message_log() -> None:
+    """Create the log table and its ``(session_id, sequence)`` unique index.
+
+    Startup runs this from ``config._ensure_schema``; the per-database guard
+    keeps direct and test callers safe without repeating the DDL. Appends and
+    the legacy migration rely on the index to detect a concurrent writer, so
+    MongoDB gets the same unique index.
+    """
+    from odbms import DBMS
+
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    if dbms not in ('sqlite', 'postgresql', 'mysql', 'mongodb'):
+        return
+    try:
+        setup = _LOG_SETUP_BY_DATABASE.setdefault(database, _LogSetup())
+    except TypeError:
+        # Database stand-ins that cannot be weakly referenced are never cached.
+        setup = _LogSetup()
+    if setup.complete:
+        return
+    if dbms == 'mongodb':
+        mongo_database = getattr(database, 'db', None)
+        if mongo_database is not None:
+            await mongo_database[SessionMessage.table_name()].create_index(
+                [('session_id', 1), ('sequence', 1)],
+                name='ux_session_messages_session_sequence',
+                unique=True,
+            )
+        setup.complete = True
+        return
+    create = getattr(SessionMessage, '_create_table_async', None) or SessionMessage.create_table
+    result = create()
+    if hasattr(result, '__await__'):
+        await result
+    exists = '' if dbms == 'mysql' else 'IF NOT EXISTS '
+    try:
+        await database.query(
+            f'CREATE UNIQUE INDEX {exists}ux_session_messages_session_sequence '
+            f'ON {SessionMessage.table_name()} (session_id, sequence)'
+        )
+    except Exception:
+        # MySQL has no IF NOT EXISTS for indexes; a duplicate is success.
+        logger.debug('Could not establish session message index', exc_info=True)
+    setup.complete = True
+
+
+async def load_window(session_id: str, limit: int) -> ChatWindow:
+    """Read the latest window marker and at most ``limit`` newest messages."""
+    return (await load_windows([session_id], limit))[session_id]
+
+
+async def load_windows(session_ids: list[str], limit: int) -> dict[str, ChatWindow]:
+    """``load_window`` for many sessions with one marker and one message read.
+
+    SQL backends rank rows per session with ``ROW_NUMBER()`` so each session
+    still contributes only its latest marker and ``limit`` newest messages.
+    MongoDB reads the same two slices per session with sorted, limited finds.
+    """
+    from odbms import DBMS
+
+    from cognitrix.tasks.repository import _relational_records
+
+    session_ids = list(dict.fromkeys(session_ids))
+    if not session_ids:
+        return {}
+    await ensure_message_log()
+    windows: dict[str, SessionMessage] = {}
+    messages: dict[str, list[SessionMessage]] = {session_id: [] for session_id in session_ids}
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    if dbms in ('sqlite', 'postgresql', 'mysql'):
+        marker = _marker(dbms)
+        table = SessionMessage.table_name()
+        ids = {f's{position}': session_id for position, session_id in enumerate(session_ids)}
+        rows = await _relational_records(
+            database,
+            f'SELECT * FROM (SELECT {table}.*, ROW_NUMBER() OVER '
+            '(PARTITION BY session_id ORDER BY sequence DESC) AS log_rank '
+            f'FROM {table} WHERE kind = {marker("kind")} '
+            f'AND session_id IN ({", ".join(marker(name) for name in ids)})) ranked '
+            'WHERE log_rank = 1',
+            {'kind': WINDOW_KIND, **ids},
+        )
+        for row in rows:
+            row.pop('log_rank', None)
+            window = SessionMessage(**SessionMessage.normalise(row))
+            windows[window.session_id] = window
+        params: dict[str, Any] = {'kind': MESSAGE_KIND, 'limit': limit}
+        ranges = []
+        for name, session_id in ids.items():
+            window = windows.get(session_id)
+            params[name] = session_id
+            params[f'{name}_folded'] = (
+                window.folded_through if window and window.folded_through is not None else 0
+            )
+            ranges.append(
+                f'(session_id = {marker(name)} AND sequence > {marker(f"{name}_folded")})'
+            )
+        rows = await _relational_records(
+            database,
+            f'SELECT * FROM (SELECT {table}.*, ROW_NUMBER() OVER '
+            '(PARTITION BY session_id ORDER BY sequence DESC) AS log_rank '
+            f'FROM {table} WHERE kind = {marker("kind")} AND ({" OR ".join(ranges)})) ranked '
+            f'WHERE log_rank <= {marker("limit")} ORDER BY sequence',
+            params,
+        )
+        for row in rows:
+            row.pop('log_rank', None)
+            message = SessionMessage(**SessionMessage.normalise(row))
+            messages[message.session_id].append(message)
+    else:
+        for session_id in session_ids:
+            window = await _latest_row(database, {'session_id': session_id, 'kind': WINDOW_KIND})
+            if window is not None:
+                windows[session_id] = window
+            if limit <= 0:
+                continue
+            folded = window.folded_through if window and window.folded_through is not None else 0
+            # The newest rows, so the find's limit trims the oldest.
+            rows = await database.find(
+                SessionMessage.table_name(),
+                {'session_id': session_id, 'kind': MESSAGE_KIND, 'sequence': {'$gt': folded}},
+                sort=[('sequence', -1)],
+                limit=limit,
+            )
+            messages[session_id] = [
+                SessionMessage(**SessionMessage.normalise(row)) for row in reversed(rows)
+            ]
+
+    loaded: dict[str, ChatWindow] = {}
+    for session_id in session_ids:
+        window = windows.get(session_id)
+        rows = messages[session_id]
+        head = list(window.head) if window is not None else []
+        last = window.sequence if window is not None else 0
+        if rows:
+            last = max(last, rows[-1].sequence)
+        loaded[session_id] = ChatWindow(
+            messages=head + [row.message for row in rows],
+            sequences=[None] * len(head) + [row.sequence for row in rows],
+            last_sequence=last,
+        )
+    return loaded
+
+
+async def last_sequence(session_id: str) -> int:
+    """Highest sequence written for a session, including window markers."""
+    from odbms import DBMS
+
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    if dbms in ('sqlite', 'postgresql', 'mysql'):
+        from cognitrix.tasks.repository import _relational_records
+
+        marker = _marker(dbms)
+        rows = await _relational_records(
+            database,
+            f'SELECT MAX(sequence) AS last_sequence FROM {SessionMessage.table_name()} '
+            f'WHERE session_id = {marker("session_id")}',
+            {'session_id': session_id},
+        )
+        value = rows[0].get('last_sequence') if rows else None
+        return int(value or 0)
+    latest = await _latest_row(database, {'session_id': session_id})
+    return latest.sequence if latest is not None else 0
+
+
+async def _latest_row(database, conditions: dict[str, Any]) -> SessionMessage | None:
+    """The highest-sequence MongoDB log row matching ``conditions``."""
+    rows = await database.find(
+        SessionMessage.table_name(),
+        conditions,
+        sort=[('sequence', -1)],
+        limit=1,
+    )
+    return SessionMessage(**SessionMessage.normalise(rows[0])) if rows else None
+
+
+async def _insert_rows(rows: list[SessionMessage]) -> None:
+    from odbms import DBMS
+
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    if dbms not in ('sqlite', 'postgresql', 'mysql'):
+        for row in rows:
+            await row.save()
+        return
+    marker = _marker(dbms)
+    columns: list[str] = []
+    params: dict[str, Any] = {}
+    values: list[str] = []
+    for position, row in enumerate(rows):
+        row.id = row.id or str(uuid.uuid4())
+        data = SessionMessage.normalise(row.model_dump(mode='json'), 'params')
+        columns = columns or list(data)
+        params.update({f'm{position}_{key}': value for key, value in data.items()})
+        values.append('(' + ', '.join(marker(f'm{position}_{column}') for column in columns) + ')')
+    await database.query(
+        f'INSERT INTO {SessionMessage.table_name()} ({", ".join(columns)}) '
+        f'VALUES {", ".join(values)}',
+        params,
+    )
+
+
+async def append(
+    session_id: str,
+    messages: list[dict[str, Any]],
+    *,
+    after: int,
+    window: dict[str, Any] | None = None,
+) -> tuple[int | None, list[int]]:
+    """Append an optional window marker plus messages in one statement.
+
+    ``after`` is the caller's last known sequence. A concurrent writer that
+    already claimed those sequences makes the unique index reject the insert;
+    the batch is then renumbered after the current tail and retried.
+
+    Returns the marker sequence (if any) and the message sequences.
+    """
+    await ensure_message_log()
+    start = after
+    for _ in range(MAX_APPEND_ATTEMPTS):
+        rows: list[SessionMessage] = []
+        sequence = start
+        marker_sequence = None
+        if window is not None:
+            sequence += 1
+            marker_sequence = sequence
+            rows.append(SessionMessage(
+                session_id=session_id,
+                sequence=sequence,
+                kind=WINDOW_KIND,
+                head=window['head'],
+                folded_through=(
+                    sequence - 1
+                    if window['folded_through'] is None
+                    else window['folded_through']
+                ),
+            ))
+        sequences: list[int] = []
+        for message in messages:
+            sequence += 1
+            sequences.append(sequence)
+            rows.append(SessionMessage(
+                session_id=session_id,
+                sequence=sequence,
+                message=message,
+            ))
+        if not rows:
+            return None, []
+        try:
+            await _insert_rows(rows)
+            return marker_sequence, sequences
+        except Exception:
+            current = await last_sequence(session_id)
+            if current <= start:
+                raise
+            start = current
+    raise RuntimeError(f'Session {session_id} message log changed too frequently')
+
+
+async def import_legacy(session_id: str, messages: list[dict[str, Any]]) -> bool:
+    """Write a legacy ``chat`` blob as sequences ``1..n`` of an empty log.
+
+    The fixed sequences make the migration idempotent: a concurrent migrator
+    (another worker running ``migrate_legacy_chats``, or a second load of the
+    same session) collides on the unique index, and that conflict means the
+    transcript is already there. Returns False when it was.
+    """
+    await ensure_message_log()
+    if not messages or await last_sequence(session_id):
+        return False
+    try:
+        await _insert_rows([
+            SessionMessage(session_id=session_id, sequence=sequence, message=message)
+            for sequence, message in enumerate(messages, start=1)
+        ])
+    except Exception:
+        if not await last_sequence(session_id):
+            raise
+        return False
+    return True
+
+
+async def delete_log(session_id: str) -> None:
+    await ensure_message_log()
+    await SessionMessage.delete_many({'session_id': session_id})
+
+
+@dataclass
+class LogSync:
+    """What a save must write to bring the log in line with ``Session.chat``.
+
+    ``window`` is None for a pure append (or a front trim); otherwise it holds
+    the new ``head`` and ``folded_through`` (None meaning "everything written
+    so far"). ``sequences`` are the known sequences of the messages that are
+    not in ``appended``.
+    """
+    window: dict[str, Any] | None
+    appended: list[dict[str, Any]]
+    sequences: list[int | None]
+
+
+def plan_sync(
+    synced: list[dict[str, Any]],
+    sequences: list[int | None],
+    current: list[dict[str, Any]],
+) -> LogSync:
+    """Diff ``current`` against the last synced window.
+
+    Messages are matched by identity: ``update_history`` appends new dicts
+    and trims from the front, so an unchanged message is the same object.
+    Whatever part of ``current`` continues the synced tail is kept; messages
+    placed before it become a window head, messages after it are appended.
+    """
+    positions = {id(message): index for index, message in enumerate(synced)}
+    for start, message in enumerate(current):
+        j = positions.get(id(message))
+        if j is None:
+            continue
+        tail = len(synced) - j
+        if len(current) - start < tail or any(
+            current[start + offset] is not synced[j + offset]
+            for offset in range(tail)
+        ):
+            continue
+        appended = current[start + tail:]
+        kept = sequences[j:]
+        if start == 0:
+            return LogSync(None, appended, kept)
+        if kept[0] is None:
+            break
+        return LogSync(
+            {'head': current[:start], 'folded_through': kept[0] - 1},
+            appended,
+            [None] * start + kept,
+        )
+    if not synced:
+        return LogSync(None, list(current), [])
+    return LogSync({'head': list(current), 'folded_through': None}, [], [None] * len(current))
+
+
+async def migrate_legacy_chats() -> int:
+    """Move every remaining ``Session.chat`` blob into the message log.
+
+    Sessions also migrate lazily when loaded; this startup pass keeps
+    untouched legacy rows from carrying their blob indefinitely.
+    """
+    from odbms import DBMS
+
+    from cognitrix.sessions.base import Session
+
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    try:
+        if dbms in ('sqlite', 'postgresql', 'mysql'):
+            from cognitrix.tasks.repository import _relational_records
+
+            rows = await _relational_records(
+                database,
+                f'SELECT id FROM {Session.table_name()} WHERE chat IS NOT NULL '
+                "AND TRIM(chat) NOT IN ('', '[]', 'null')",
+                {},
+            )
+            session_ids = [str(row['id']) for row in rows if row.get('id')]
+        elif dbms == 'mongodb':
+            rows = await database.find(
+                Session.table_name(),
+                {'chat': {'$exists': True, '$nin': [None, []]}},
+                limit=0,
+            )
+            session_ids = [str(row.get('id') or row.get('_id')) for row in rows]
+        else:
+            return 0
+    except Exception:
+        # A fresh database has no sessions table until create_table runs, and
+        # sessions still migrate lazily on load.
+        logger.debug('No legacy session chats to migrate', exc_info=True)
+        return 0
+
+    migrated = 0
+    for session_id in session_ids:
+        try:
+            if await Session.get(session_id) is not None:
+                migrated += 1
+        except Exception:
+            logger.exception('Could not migrate chat history of session %s', session_id)
+    return migrated
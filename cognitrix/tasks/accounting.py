@@ -27,6 +27,7 @@ class TaskUsageCollector:
     prompt_tokens: int = 0
     completion_tokens: int = 0
     llm_calls: int = 0
+    cached_llm_calls: int = 0
     tool_calls: int = 0
     tool_attempts: int = 0
     duration_seconds: float = 0.0
@@ -39,10 +40,13 @@ class TaskUsageCollector:
         completion_tokens: int,
         duration_seconds: float,
         cost_usd: Decimal,
+        cached: bool = False,
     ) -> None:
         self.prompt_tokens += prompt_tokens
         self.completion_tokens += completion_tokens
         self.llm_calls += 1
+        if cached:
+            self.cached_llm_calls += 1
         self.duration_seconds += max(0.0, duration_seconds)
         self.cost_usd += cost_usd
         if self.parent is not None:
@@ -51,6 +55,7 @@ class TaskUsageCollector:
                 completion_tokens=completion_tokens,
                 duration_seconds=duration_seconds,
                 cost_usd=cost_usd,
+                cached=cached,
             )
 
     def record_tool_attempt(self, *, first_for_call: bool) -> None:
@@ -65,6 +70,7 @@ class TaskUsageCollector:
             "prompt_tokens": self.prompt_tokens,
             "completion_tokens": self.completion_tokens,
             "llm_calls": self.llm_calls,
+            "cached_llm_calls": self.cached_llm_calls,
             "tool_calls": self.tool_calls,
             "tool_attempts": self.tool_attempts,
             "duration_seconds": self.duration_seconds,
@@ -129,6 +135,8 @@ class _LLMCall:
         prompt: int,
         completion: int,
         reservation: TokenReservation,
+        *,
+        cached: bool = False,
     ) -> None:
         collector = _CURRENT_USAGE.get()
         if collector is None:
@@ -147,6 +155,7 @@ class _LLMCall:
             completion_tokens=completion,
             duration_seconds=time.monotonic() - self.started_at,
             cost_usd=cost,
+            cached=cached,
         )
 
     async def _finish_attempt(self, response: Any) -> None:
@@ -169,7 +178,9 @@ class _LLMCall:
             completion = self.output_tokens
             actual = prompt + completion
 
-        self._record_usage(prompt, completion, reservation)
+        # Response-cache hits report zero usage, so they close as zero-cost calls.
+        cached = bool(getattr(response, "cached", False))
+        self._record_usage(prompt, completion, reservation, cached=cached)
         self.reservation = None
         self.provider_started = False
 
@@ -3,10 +3,10 @@
 from html import escape
 from typing import Any
 
-from cognitrix.sessions.context import BaseContextManager, _trim_to_valid_start, shape_history
+from cognitrix.sessions.context import BaseContextManager, _session_ledger, _trim_to_valid_start, shape_history
 from cognitrix.tasks.results import StepResult
 from cognitrix.tasks.runtime import AgentRuntimeSnapshot
-from cognitrix.utils.tokens import estimate_tokens
+from cognitrix.utils.tokens import atokenizer_for_llm, estimate_tokens
 
 
 DEFAULT_DEPENDENCY_CONTEXT_CHARS = 12_000
@@ -67,14 +67,17 @@ class TaskContextManager(BaseContextManager):
 
     async def build_prompt(self, agent, session) -> list[dict[str, Any]]:
         system = self.snapshot.system_prompt
+        tokenizer = await atokenizer_for_llm(agent.llm)
         budget = max(
             0,
             agent.llm.get_context_window()
-            - estimate_tokens(system)
+            - estimate_tokens(system, tokenizer)
             - agent.llm.max_tokens
             - 1_000,
         )
-        history = _trim_to_valid_start(shape_history(session.chat, budget))
+        history = _trim_to_valid_start(
+            shape_history(session.chat, budget, tokenizer=tokenizer, ledger=_session_ledger(session))
+        )
         return [
             {"role": "system", "type": "text", "content": system},
             *history,
@@ -3,11 +3,17 @@
 The scheduler is intentionally persistence-agnostic. Callers provide one
 executor and, optionally, a transition callback that persists lifecycle state.
 All graph validation happens before either callback can run.
+
+Dispatch is O(nodes + edges) over a run: each node keeps a count of
+unfinished dependencies, a completion decrements its dependents' counts, and
+nodes whose count reaches zero enter a ready heap ordered by priority
+(critical-path length by default, then node id).
 """
 
 from __future__ import annotations
 
 import asyncio
+import heapq
 from collections import deque
 from dataclasses import dataclass
 from decimal import Decimal
@@ -94,7 +100,19 @@ Persist = Callable[
 ]
 
 
-def _validated_nodes(nodes: Sequence[DagNode[PayloadT]]) -> dict[int, DagNode[PayloadT]]:
+PersistStarted = Callable[[Sequence[DagNode[PayloadT]]], Awaitable[None]]
+Priority = Callable[[DagNode[PayloadT]], float]
+
+
+@dataclass(frozen=True, slots=True)
+class _DagGraph(Generic[PayloadT]):
+    by_id: dict[int, DagNode[PayloadT]]
+    dependents: dict[int, list[int]]
+    order: list[int]
+    """Topological order (Kahn's algorithm, lowest id first)."""
+
+
+def _validated_graph(nodes: Sequence[DagNode[PayloadT]]) -> _DagGraph[PayloadT]:
     by_id: dict[int, DagNode[PayloadT]] = {}
     for node in nodes:
         if node.node_id in by_id:
@@ -105,11 +123,10 @@ def _validated_nodes(nodes: Sequence[DagNode[PayloadT]]) -> dict[int, DagNode[Pa
             )
         by_id[node.node_id] = node
 
-    known = set(by_id)
     for node in by_id.values():
         if node.node_id in node.dependencies:
             raise DagValidationError(f"node {node.node_id} cannot depend on itself")
-        missing = set(node.dependencies) - known
+        missing = [dependency for dependency in node.dependencies if dependency not in by_id]
         if missing:
             raise DagValidationError(
                 f"missing dependency for node {node.node_id}: {sorted(missing)}"
@@ -122,17 +139,28 @@ def _validated_nodes(nodes: Sequence[DagNode[PayloadT]]) -> dict[int, DagNode[Pa
             dependents[dependency].append(node.node_id)
 
     ready = deque(sorted(node_id for node_id, degree in indegree.items() if degree == 0))
-    visited = 0
+    order: list[int] = []
     while ready:
         node_id = ready.popleft()
-        visited += 1
+        order.append(node_id)
         for dependent in sorted(dependents[node_id]):
             indegree[dependent] -= 1
             if indegree[dependent] == 0:
                 ready.append(dependent)
-    if visited != len(by_id):
+    if len(order) != len(by_id):
         raise DagValidationError("cycle detected in task graph")
-    return by_id
+    return _DagGraph(by_id, dependents, order)
+
+
+def _critical_path_lengths(graph: _DagGraph[PayloadT]) -> dict[int, int]:
+    """Nodes on the longest chain from each node to a sink, inclusive."""
+    lengths: dict[int, int] = {}
+    for node_id in reversed(graph.order):
+        lengths[node_id] = 1 + max(
+            (lengths[dependent] for dependent in graph.dependents[node_id]),
+            default=0,
+        )
+    return lengths
 
 
 async def run_dag(
@@ -142,6 +170,8 @@ async def run_dag(
     max_parallel: int,
     completed: Mapping[int, ResultT] | None = None,
     persist: Persist[PayloadT, ResultT] | None = None,
+    persist_started: PersistStarted[PayloadT] | None = None,
+    priority: Priority[PayloadT] | None = None,
     cancel_event: asyncio.Event | None = None,
 ) -> dict[int, ResultT]:
     """Execute validated nodes as soon as their own dependencies are ready.
@@ -149,10 +179,15 @@ async def run_dag(
     Successful results are returned by node id. A pre-completed mapping seeds
     resumed work and suppresses both execution and transition callbacks for
     those nodes.
+
+    Ready nodes launch highest ``priority`` first (critical-path length when
+    omitted). ``persist_started`` records the RUNNING transition of a whole
+    launch wave in one call; without it ``persist`` is called per node.
     """
     if max_parallel <= 0:
         raise DagValidationError("max_parallel must be positive")
-    by_id = _validated_nodes(nodes)
+    graph = _validated_graph(nodes)
+    by_id = graph.by_id
     results: dict[int, ResultT] = dict(completed or {})
     unknown_completed = set(results) - set(by_id)
     if unknown_completed:
@@ -160,8 +195,18 @@ async def run_dag(
             f"pre-completed nodes are absent from graph: {sorted(unknown_completed)}"
         )
 
-    pending = set(by_id) - set(results)
-    completed_ids = set(results)
+    if priority is None:
+        lengths = _critical_path_lengths(graph)
+        rank = {node_id: -float(length) for node_id, length in lengths.items()}
+    else:
+        rank = {node_id: -float(priority(node)) for node_id, node in by_id.items()}
+    waiting = {
+        node_id: sum(1 for dependency in node.dependencies if dependency not in results)
+        for node_id, node in by_id.items()
+        if node_id not in results
+    }
+    ready_heap = [(rank[node_id], node_id) for node_id, count in waiting.items() if count == 0]
+    heapq.heapify(ready_heap)
     active: dict[asyncio.Task[ResultT], DagNode[PayloadT]] = {}
     cancel_waiter = (
         asyncio.create_task(cancel_event.wait(), name="task-dag-cancel-waiter")
@@ -189,6 +234,31 @@ async def run_dag(
                 results,
             ) from exc
 
+    async def notify_started(wave: list[DagNode[PayloadT]]) -> None:
+        if persist_started is None:
+            for node in wave:
+                await notify(node, DagNodeState.RUNNING)
+            return
+        try:
+            await persist_started(wave)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            raise DagPersistenceError(
+                wave[0].node_id,
+                DagNodeState.RUNNING,
+                exc,
+                results,
+            ) from exc
+
+    def release_dependents(node_id: int) -> None:
+        for dependent in graph.dependents[node_id]:
+            if dependent not in waiting:
+                continue
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                heapq.heappush(ready_heap, (rank[dependent], dependent))
+
     async def cleanup_active() -> None:
         remaining = list(active.items())
         for task, _ in remaining:
@@ -220,24 +290,24 @@ async def run_dag(
         active.clear()
 
     try:
-        while pending or active:
+        while ready_heap or active:
             if cancel_event is not None and cancel_event.is_set():
                 raise DagExecutionCancelled(results)
 
-            ready = sorted(
-                node_id
-                for node_id in pending
-                if set(by_id[node_id].dependencies) <= completed_ids
-            )
-            for node_id in ready[: max_parallel - len(active)]:
-                node = by_id[node_id]
-                await notify(node, DagNodeState.RUNNING)
-                pending.remove(node_id)
-                task = asyncio.create_task(
-                    execute(node),
-                    name=f"task-dag-node-{node_id}",
-                )
-                active[task] = node
+            slots = max_parallel - len(active)
+            wave = [
+                by_id[heapq.heappop(ready_heap)[1]]
+                for _ in range(min(slots, len(ready_heap)))
+            ]
+            if wave:
+                await notify_started(wave)
+                for node in wave:
+                    del waiting[node.node_id]
+                    task = asyncio.create_task(
+                        execute(node),
+                        name=f"task-dag-node-{node.node_id}",
+                    )
+                    active[task] = node
 
             if not active:
                 # Validation makes this unreachable unless caller-owned state
@@ -274,7 +344,7 @@ async def run_dag(
                 else:
                     await notify(node, DagNodeState.DONE, result=result)
                     results[node.node_id] = result
-                    completed_ids.add(node.node_id)
+                    release_dependents(node.node_id)
 
             # Persist every child that was already complete in this scheduler
             # tick before honoring cancellation. Typed results that won the
@@ -285,6 +355,10 @@ async def run_dag(
                 node, cause = first_failure
                 raise DagNodeFailed(node.node_id, cause, results) from cause
 
+        if waiting:
+            # Validation makes this unreachable unless caller-owned state
+            # was mutated during execution.
+            raise DagValidationError("task graph made no scheduling progress")
         return {node_id: results[node_id] for node_id in sorted(results)}
     finally:
         await cleanup_active()
@@ -309,6 +383,7 @@ def _fallback_result(results: Sequence[StepResult]) -> StepResult:
             prompt_tokens=sum(result.usage.prompt_tokens for result in results),
             completion_tokens=sum(result.usage.completion_tokens for result in results),
             llm_calls=sum(result.usage.llm_calls for result in results),
+            cached_llm_calls=sum(result.usage.cached_llm_calls for result in results),
             tool_calls=sum(result.usage.tool_calls for result in results),
             tool_attempts=sum(result.usage.tool_attempts for result in results),
             duration_seconds=sum(result.usage.duration_seconds for result in results),
@@ -0,0 +1,376 @@
+"""Push fan-out of durable task-run events to live subscribers.
+
+``RunRepository.flush_outbox`` publishes every event it delivers, terminal
+transitions publish a terminal marker, and accepted cancel requests publish a
+cancel signal. Subscribers (the SSE run stream, a worker's cancellation
+watcher) receive them from an in-process queue, so an idle watcher costs no
+database reads; the event table is only read to catch up from a cursor.
+
+Workers usually run in another process, so messages also cross a transport:
+
+- ``redis://`` / ``rediss://`` URL: Redis pub/sub
+- ``postgres``: ``LISTEN``/``NOTIFY`` on the application database
+- ``unix``: datagram sockets in a shared directory (processes on one host)
+- ``local``: in-process only
+
+Every transport is at-most-once. A message larger than a NOTIFY payload is
+sent without its events, and subscribers catch up from the database.
+Subscribers also resync on a slow timer in case a message was lost.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from cognitrix.tasks.events import TaskRunEvent, event_payload
+
+logger = logging.getLogger("cognitrix.log")
+
+EVENT_CHANNEL = "cognitrix_run_events"
+# Postgres caps NOTIFY payloads at 8000 bytes; keep every transport under it.
+MAX_INLINE_PAYLOAD_BYTES = 7900
+SUBSCRIBER_QUEUE_SIZE = 1024
+LISTEN_RETRY_MAX_SECONDS = 30.0
+
+Deliver = Callable[[str], None]
+
+
+class RunEventSubscription:
+    """Bounded queue of bus messages for one run.
+
+    A subscriber that falls behind loses queued messages and is flagged
+    ``overflowed``; it must then catch up from the database.
+    """
+
+    def __init__(self, bus: "RunEventBus", run_id: str):
+        self.bus = bus
+        self.run_id = run_id
+        self.overflowed = False
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, message: dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+
+    async def next(self, timeout: float | None) -> dict[str, Any] | None:
+        """The next message, or None when ``timeout`` passes first."""
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus._unsubscribe(self)
+
+    def __enter__(self) -> "RunEventSubscription":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+class RunEventBus:
+    def __init__(self, transport: Any | None = None, *, resync_seconds: float | None = None):
+        self.transport = transport
+        self._origin = uuid.uuid4().hex
+        self._subscribers: dict[str, set[RunEventSubscription]] = defaultdict(set)
+        self._listener: asyncio.Task | None = None
+        cross_process = bool(getattr(transport, "cross_process", False))
+        # Without a cross-process transport, events flushed by a worker in
+        # another process never arrive here, so watchers fall back to polling.
+        self.resync_seconds = resync_seconds or (30.0 if cross_process else 0.5)
+
+    def subscribe(self, run_id: str) -> RunEventSubscription:
+        subscription = RunEventSubscription(self, run_id)
+        self._subscribers[run_id].add(subscription)
+        self._ensure_listener()
+        return subscription
+
+    def _unsubscribe(self, subscription: RunEventSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.run_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.run_id]
+
+    def subscriber_count(self, run_id: str | None = None) -> int:
+        if run_id is not None:
+            return len(self._subscribers.get(run_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _ensure_listener(self) -> None:
+        if self.transport is None:
+            return
+        loop = asyncio.get_running_loop()
+        if self._listener is not None and not self._listener.done() and self._listener.get_loop() is loop:
+            return
+        self._listener = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                await self.transport.listen(self._receive)
+                delay = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Task event transport listener failed; retrying in %.0fs", delay, exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LISTEN_RETRY_MAX_SECONDS)
+
+    def _receive(self, raw: str | bytes) -> None:
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.debug("Dropping malformed task event message")
+            return
+        if isinstance(message, dict) and message.get("origin") != self._origin:
+            self._dispatch(message)
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        for subscription in list(self._subscribers.get(str(message.get("run_id")), ())):
+            subscription.offer(message)
+
+    async def publish(
+        self,
+        run_id: str,
+        events: Iterable[TaskRunEvent] = (),
+        *,
+        terminal: bool = False,
+        cancel: bool = False,
+    ) -> None:
+        """Fan out delivered events (or a terminal/cancel marker) to every subscriber."""
+        payloads = [event_payload(event) for event in events]
+        if not payloads and not terminal and not cancel:
+            return
+        message: dict[str, Any] = {
+            "origin": self._origin,
+            "run_id": run_id,
+            "events": payloads,
+            "through": max((payload["sequence"] for payload in payloads), default=None),
+            "terminal": terminal,
+            "cancel": cancel,
+        }
+        self._dispatch(message)
+        if self.transport is None:
+            return
+        encoded = json.dumps(message, default=str)
+        if len(encoded.encode("utf-8")) > MAX_INLINE_PAYLOAD_BYTES:
+            encoded = json.dumps({**message, "events": None})
+        try:
+            await self.transport.publish(encoded)
+        except Exception:
+            # Delivery is best effort; subscribers resync from the database.
+            logger.warning("Could not publish task events for run %s", run_id, exc_info=True)
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        close = getattr(self.transport, "aclose", None)
+        if close is not None:
+            await close()
+
+
+class RedisEventTransport:
+    cross_process = True
+
+    def __init__(self, url: str, channel: str = EVENT_CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._client: Any = None
+
+    def _redis(self) -> Any:
+        if self._client is None:
+            from redis.asyncio import Redis
+
+            self._client = Redis.from_url(self.url, decode_responses=True)
+        return self._client
+
+    async def publish(self, message: str) -> None:
+        await self._redis().publish(self.channel, message)
+
+    async def listen(self, deliver: Deliver) -> None:
+        pubsub = self._redis().pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    deliver(item["data"])
+        finally:
+            await pubsub.aclose()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class PostgresEventTransport:
+    """LISTEN/NOTIFY over the application database's aiopg pool.
+
+    The listener holds one pooled connection for the life of the process.
+    """
+
+    cross_process = True
+
+    def __init__(self, channel: str = EVENT_CHANNEL):
+        self.channel = channel
+
+    async def publish(self, message: str) -> None:
+        from odbms import DBMS
+
+        await DBMS.Database.query(
+            "SELECT pg_notify(%(channel)s, %(payload)s)",
+            {"channel": self.channel, "payload": message},
+        )
+
+    async def listen(self, deliver: Deliver) -> None:
+        from odbms import DBMS
+
+        async with DBMS.Database._pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(f"LISTEN {self.channel}")
+            while True:
+                notification = await connection.notifies.get()
+                deliver(notification.payload)
+
+
+class UnixSocketEventTransport:
+    """Host-local fan-out: one datagram socket per listening process.
+
+    Publishers send to every socket in the directory and remove sockets
+    whose process is gone. A full receive buffer drops the datagram.
+    """
+
+    cross_process = True
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._sender: socket.socket | None = None
+
+    async def publish(self, message: str) -> None:
+        data = message.encode("utf-8")
+        if self._sender is None:
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+        for path in self.directory.glob("*.sock"):
+            try:
+                self._sender.sendto(data, str(path))
+            except (ConnectionRefusedError, FileNotFoundError):
+                path.unlink(missing_ok=True)
+            except OSError:
+                logger.debug("Task event datagram to %s dropped", path, exc_info=True)
+
+    async def listen(self, deliver: Deliver) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(str(path))
+        receiver.setblocking(False)
+        loop = asyncio.get_running_loop()
+
+        def readable() -> None:
+            while True:
+                try:
+                    data = receiver.recv(MAX_INLINE_PAYLOAD_BYTES * 2)
+                except (BlockingIOError, InterruptedError):
+                    return
+                deliver(data.decode("utf-8"))
+
+        loop.add_reader(receiver.fileno(), readable)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            loop.remove_reader(receiver.fileno())
+            receiver.close()
+            path.unlink(missing_ok=True)
+
+    async def aclose(self) -> None:
+        if self._sender is not None:
+            self._sender.close()
+            self._sender = None
+
+
+def build_event_transport(target: str | None = None) -> Any | None:
+    """Transport for ``COGNITRIX_EVENT_TRANSPORT``, inferred from the deployment when unset."""
+    from cognitrix.config import settings
+
+    target = (target if target is not None else settings.task_event_transport).strip()
+    if not target:
+        broker = os.getenv("TASK_LIMIT_REDIS_URL") or os.getenv("CELERY_BROKER_URL") or ""
+        if broker.startswith(("redis://", "rediss://")):
+            target = broker
+        elif settings.db_type in ("postgres", "postgresql"):
+            target = "postgres"
+        elif hasattr(socket, "AF_UNIX"):
+            target = "unix"
+        else:
+            target = "local"
+    if target.startswith(("redis://", "rediss://")):
+        return RedisEventTransport(target)
+    if target in ("postgres", "postgresql"):
+        return PostgresEventTransport()
+    if target == "unix":
+        return UnixSocketEventTransport(settings.workdir / "run-events")
+    if target != "local":
+        logger.warning("Unknown COGNITRIX_EVENT_TRANSPORT %r; events stay in-process", target)
+    return None
+
+
+_bus: RunEventBus | None = None
+
+
+def run_event_bus() -> RunEventBus:
+    """The process-wide bus, built from settings on first use."""
+    global _bus
+    if _bus is None:
+        from cognitrix.config import settings
+
+        _bus = RunEventBus(build_event_transport(), resync_seconds=settings.task_event_resync_seconds)
+    return _bus
+
+
+def set_run_event_bus(bus: RunEventBus | None) -> None:
+    global _bus
+    _bus = bus
+
+
+async def publish_run_events(run_id: str, events: list[TaskRunEvent]) -> None:
+    if events:
+        await run_event_bus().publish(run_id, events)
+
+
+async def publish_run_terminal(run_id: str) -> None:
+    await run_event_bus().publish(run_id, terminal=True)
+
+
+async def publish_run_cancel(run_id: str, *, terminal: bool = False) -> None:
+    """Signal the run's worker that cancellation was accepted."""
+    await run_event_bus().publish(run_id, terminal=terminal, cancel=True)
+
+
+async def close_run_event_bus() -> None:
+    global _bus
+    bus, _bus = _bus, None
+    if bus is not None:
+        await bus.aclose()
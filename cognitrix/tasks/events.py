@@ -17,6 +17,10 @@ TEXT_FLUSH_SECONDS = 0.15
 TEXT_FLUSH_CHARS = 256
 EVENT_PAGE_SIZE = 256
 MAX_EVENT_PAGE_SIZE = 1000
+# Durable emitters hand events to a background writer; a full queue makes
+# producers wait, and the writer appends up to a batch per run CAS.
+WRITE_QUEUE_SIZE = 1024
+WRITE_BATCH_SIZE = 64
 
 
 class TaskRunEvent(Model):
@@ -39,6 +43,21 @@ class _PendingText:
     attempt: int = 1
 
 
+@dataclass
+class _QueuedWrite:
+    event: dict[str, Any]
+    done: asyncio.Future | None = None
+
+
+def _settle(done: asyncio.Future | None, result: Any = None, error: BaseException | None = None) -> None:
+    if done is None or done.done():
+        return
+    if error is not None:
+        done.set_exception(error)
+    else:
+        done.set_result(result)
+
+
 def event_payload(event: TaskRunEvent) -> dict[str, Any]:
     return {
         'type': 'task_run_event',
@@ -214,12 +233,26 @@ async def step_tool_calls(run_id: str, step_index: int) -> list[dict[str, Any]]:
 
 
 class TaskRunEventEmitter:
+    """Sequenced events for one task run.
+
+    Without a lease claim every event is saved as it is emitted. With one,
+    events go through ``RunRepository`` on a background writer: ``text_delta``
+    and ``flush_text`` only enqueue, so a token stream never waits on the
+    database, and the writer appends everything queued in one CAS and one
+    outbox drain. ``emit`` and ``drain`` are barriers that return once every
+    earlier event is durable, which keeps step and run transitions ordered
+    after the text they follow.
+    """
+
     def __init__(self, run_id: str, *, claim=None):
         self.run_id = run_id
         self._claim = claim
         self._sequence = 0
         self._lock = asyncio.Lock()
         self._pending: dict[tuple[str, str], _PendingText] = {}
+        self._writes: asyncio.Queue[_QueuedWrite] | None = None
+        self._writer: asyncio.Task | None = None
+        self._write_error: BaseException | None = None
 
     async def _save_locked(
         self,
@@ -230,29 +263,6 @@ class TaskRunEventEmitter:
         agent_name: str | None = None,
         data: dict[str, Any] | None = None,
     ) -> TaskRunEvent | None:
-        if self._claim is not None:
-            from cognitrix.tasks.repository import LeaseLost, RunRepository
-
-            try:
-                return await RunRepository().emit_event(
-                    self.run_id,
-                    claim=self._claim,
-                    kind=kind,
-                    session_id=session_id,
-                    step_index=step_index,
-                    agent_name=agent_name,
-                    data=data,
-                )
-            except LeaseLost:
-                raise
-            except Exception:
-                logger.exception(
-                    'Could not persist durable task-run event %s for %s',
-                    kind,
-                    self.run_id,
-                )
-                return None
-
         self._sequence += 1
         event = TaskRunEvent(
             run_id=self.run_id,
@@ -270,9 +280,120 @@ class TaskRunEventEmitter:
             logger.exception('Could not persist task-run event %s for %s', kind, self.run_id)
             return None
 
+    def _raise_write_error(self) -> None:
+        if self._write_error is not None:
+            raise self._write_error
+
+    async def _enqueue_locked(self, kind: str, *, wait: bool, **fields) -> asyncio.Future | None:
+        self._raise_write_error()
+        loop = asyncio.get_running_loop()
+        if self._writes is None:
+            self._writes = asyncio.Queue(WRITE_QUEUE_SIZE)
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._write_loop(), name=f'task-run-events-{self.run_id}')
+        done = loop.create_future() if wait else None
+        event = {
+            'kind': kind,
+            'session_id': fields.get('session_id'),
+            'step_index': fields.get('step_index'),
+            'agent_name': fields.get('agent_name'),
+            'data': fields.get('data') or {},
+        }
+        await self._writes.put(_QueuedWrite(event, done))
+        if self._write_error is not None:
+            # The lease was lost while this put waited for room: the writer
+            # has already exited, so nothing else will settle the item.
+            self._fail_queued(self._write_error)
+            raise self._write_error
+        return done
+
+    def _fail_queued(self, error: BaseException) -> None:
+        writes = self._writes
+        while writes is not None and not writes.empty():
+            _settle(writes.get_nowait().done, error=error)
+            writes.task_done()
+
+    async def _write_loop(self) -> None:
+        from cognitrix.tasks.repository import LeaseLost, RunRepository
+
+        repository = RunRepository()
+        writes = self._writes
+        assert writes is not None
+        while True:
+            batch = [await writes.get()]
+            while len(batch) < WRITE_BATCH_SIZE and not writes.empty():
+                batch.append(writes.get_nowait())
+            try:
+                stored = await repository.emit_events(
+                    self.run_id,
+                    claim=self._claim,
+                    events=[item.event for item in batch],
+                )
+            except LeaseLost as exc:
+                # A fenced worker must stop: fail this batch, everything
+                # queued behind it and every later call.
+                self._write_error = exc
+                for item in batch:
+                    _settle(item.done, error=exc)
+                    writes.task_done()
+                self._fail_queued(exc)
+                return
+            except Exception:
+                logger.exception(
+                    'Could not persist %d durable task-run events for %s',
+                    len(batch),
+                    self.run_id,
+                )
+                stored = [None] * len(batch)
+            for item, event in zip(batch, stored, strict=True):
+                _settle(item.done, event)
+                writes.task_done()
+
+    async def drain(self) -> None:
+        """Wait until every queued event is durable (or has failed).
+
+        Items left in the queue once the writer has stopped are failed
+        rather than waited on, so a lost lease cannot hang the caller.
+        """
+        writes = self._writes
+        if writes is not None:
+            joined = asyncio.ensure_future(writes.join())
+            try:
+                while not joined.done():
+                    writer = self._writer
+                    if writer is None or writer.done():
+                        self._fail_queued(self._write_error or RuntimeError(
+                            f'Task-run event writer for {self.run_id} stopped'
+                        ))
+                        break
+                    await asyncio.wait({joined, writer}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                joined.cancel()
+        self._raise_write_error()
+
+    async def aclose(self) -> None:
+        """Drain queued events, then stop the background writer."""
+        try:
+            await self.drain()
+        finally:
+            if self._writer is not None:
+                self._writer.cancel()
+                await asyncio.gather(self._writer, return_exceptions=True)
+                self._writer = None
+
     async def emit(self, kind: str, **kwargs) -> TaskRunEvent | None:
+        if self._claim is None:
+            async with self._lock:
+                return await self._save_locked(kind, **kwargs)
         async with self._lock:
-            return await self._save_locked(kind, **kwargs)
+            done = await self._enqueue_locked(kind, wait=True, **kwargs)
+        return await done
+
+    async def _write_text_locked(self, **fields) -> TaskRunEvent | None:
+        if self._claim is None:
+            return await self._save_locked('text_delta', **fields)
+        await self._enqueue_locked('text_delta', wait=False, **fields)
+        return None
 
     async def text_delta(
         self,
@@ -305,8 +426,7 @@ class TaskRunEventEmitter:
             pending.content = ''
             pending.emitted = True
             pending.last_flush = now
-            return await self._save_locked(
-                'text_delta',
+            return await self._write_text_locked(
                 session_id=session_id,
                 step_index=step_index,
                 agent_name=agent_name,
@@ -321,8 +441,7 @@ class TaskRunEventEmitter:
             chunk = pending.content
             pending.content = ''
             pending.last_flush = time.monotonic()
-            return await self._save_locked(
-                'text_delta',
+            return await self._write_text_locked(
                 session_id=session_id,
                 step_index=pending.step_index,
                 agent_name=pending.agent_name,
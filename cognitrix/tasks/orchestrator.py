@@ -22,6 +22,7 @@ from cognitrix.providers.limits import (
     LimitBackendUnavailable,
     LimitExceeded,
 )
+from cognitrix.tasks.event_bus import RunEventBus, run_event_bus
 from cognitrix.tasks.events import TaskRunEventEmitter
 from cognitrix.tasks.budget import (
     BudgetExceeded,
@@ -45,6 +46,7 @@ from cognitrix.tasks.evaluation import evaluate_step
 from cognitrix.tasks.executor import TaskStepExecutor
 from cognitrix.tasks.metrics import TaskRunPhase, TaskRunPhaseRecorder
 from cognitrix.tasks.repository import (
+    MAX_CAS_ATTEMPTS,
     ActiveRunExists,
     LeaseClaim,
     LeaseLost,
@@ -80,6 +82,10 @@ STEP_TIMEOUT = int(os.getenv('COGNITRIX_STEP_TIMEOUT', '600'))
 GATE_THRESHOLD = float(os.getenv('COGNITRIX_GATE_THRESHOLD', '7'))
 MAX_PARALLEL_STEPS = int(os.getenv('COGNITRIX_MAX_PARALLEL_STEPS', '3'))
 MAX_PLAN_STEPS = 10
+# Cancels arrive on the run event bus; this poll only covers a lost signal.
+# It starts fast and backs off to the bus's resync interval (capped).
+CANCEL_POLL_MIN_SECONDS = 0.1
+CANCEL_POLL_MAX_SECONDS = 5.0
 
 
 def _now() -> str:
@@ -694,18 +700,56 @@ async def _synthesize_step_results(
     )
 
 
-async def _watch_run_cancellation(run: TaskRun, cancel_event: asyncio.Event) -> None:
-    try:
+_CANCEL_SIGNAL_STATUSES = {TaskRunStatus.CANCELLING.value, TaskRunStatus.CANCELLED.value}
+
+
+def _cancel_signalled(message: dict[str, Any]) -> bool:
+    if message.get('cancel'):
+        return True
+    return any(
+        payload.get('kind') == 'run_status'
+        and (payload.get('data') or {}).get('status') in _CANCEL_SIGNAL_STATUSES
+        for payload in message.get('events') or ()
+    )
+
+
+async def _watch_run_cancellation(
+    run: TaskRun,
+    cancel_event: asyncio.Event,
+    *,
+    bus: RunEventBus | None = None,
+) -> None:
+    """Set ``cancel_event`` once the run is asked to cancel.
+
+    The cancel signal is pushed on the run event bus. The database is read on
+    start, after a terminal marker or a dropped message, and on a poll that
+    doubles from ``CANCEL_POLL_MIN_SECONDS`` while nothing happens.
+    """
+    bus = bus or run_event_bus()
+    ceiling = min(CANCEL_POLL_MAX_SECONDS, max(CANCEL_POLL_MIN_SECONDS, bus.resync_seconds))
+    loop = asyncio.get_running_loop()
+    delay = CANCEL_POLL_MIN_SECONDS
+    # Subscribe before the first read so a cancel between the two is not lost.
+    with bus.subscribe(run.id) as subscription:
         while not cancel_event.is_set():
             if await _cancel_requested(run):
                 cancel_event.set()
                 return
-            try:
-                await asyncio.wait_for(cancel_event.wait(), timeout=0.1)
-            except asyncio.TimeoutError:
-                pass
-    except asyncio.CancelledError:
-        raise
+            deadline = loop.time() + delay
+            recheck = False
+            while not recheck and not cancel_event.is_set():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                message = await subscription.next(remaining)
+                if message is None:
+                    break
+                if _cancel_signalled(message):
+                    cancel_event.set()
+                    return
+                recheck = bool(message.get('terminal')) or subscription.overflowed
+            subscription.overflowed = False
+            delay = CANCEL_POLL_MIN_SECONDS if recheck else min(delay * 2, ceiling)
 
 
 def _exception_chain(exc: BaseException) -> list[BaseException]:
@@ -800,23 +844,29 @@ async def _cancel_unfinished_steps(
     claim: LeaseClaim,
     emitter: TaskRunEventEmitter,
 ) -> None:
-    rows = await TaskRunStep.find({'run_id': run.id})
-    rows.sort(key=lambda row: row.step_index)
-    for row in rows:
-        if row.status not in (TaskRunStepStatus.PENDING, TaskRunStepStatus.RUNNING):
-            continue
-        await _transition_durable_step(
-            repository,
-            run,
-            claim,
-            emitter,
-            row.step_index,
-            updates={
-                'status': TaskRunStepStatus.CANCELLED,
-                'completed_at': _now(),
-            },
-            expected_statuses={row.status},
-        )
+    unfinished = {TaskRunStepStatus.PENDING, TaskRunStepStatus.RUNNING}
+    for attempt in range(MAX_CAS_ATTEMPTS):
+        rows = await TaskRunStep.find({'run_id': run.id})
+        try:
+            cancelled = await repository.transition_steps(
+                run.id,
+                [row.step_index for row in rows if row.status in unfinished],
+                claim=claim,
+                updates={
+                    'status': TaskRunStepStatus.CANCELLED,
+                    'completed_at': _now(),
+                },
+                expected_statuses=unfinished,
+            )
+            break
+        except RunStateConflict:
+            # A step finished after the read; re-read so it is left alone.
+            if attempt == MAX_CAS_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(0)
+    for row in cancelled:
+        _mirror_step_projection(run, row)
+    await asyncio.gather(*(_emit_step_status(emitter, row) for row in cancelled))
 
 
 async def _execute_compiled_steps(
@@ -1116,6 +1166,23 @@ async def _execute_compiled_steps(
             )
         by_index[row.step_index] = row
 
+    async def persist_started(wave: list[DagNode[TaskRunStep]]) -> None:
+        started = await repository.transition_steps(
+            run.id,
+            [node.node_id for node in wave],
+            claim=claim,
+            updates={
+                'status': TaskRunStepStatus.RUNNING,
+                'started_at': _now(),
+            },
+            expected_statuses={TaskRunStepStatus.PENDING},
+        )
+        for row in started:
+            _mirror_step_projection(run, row)
+            by_index[row.step_index] = row
+        # Enqueued together so the event writer flushes them as one batch.
+        await asyncio.gather(*(_emit_step_status(emitter, row) for row in started))
+
     max_parallel = MAX_PARALLEL_STEPS
     if ledger.budget.max_parallel is not None:
         max_parallel = min(max_parallel, ledger.budget.max_parallel)
@@ -1125,6 +1192,7 @@ async def _execute_compiled_steps(
         max_parallel=max_parallel,
         completed=completed,
         persist=persist,
+        persist_started=persist_started,
         cancel_event=cancel_event,
     )
 
@@ -1378,6 +1446,8 @@ async def run(
             final_result = await finalize_results(ordered_results, synthesize)
             await usage_writer.persist()
 
+        # Barrier: every streamed event is durable before the terminal CAS.
+        await emitter.drain()
         applied = await _set_run_status(
             run_rec,
             TaskRunStatus.COMPLETED,
@@ -1414,6 +1484,7 @@ async def run(
             claim,
             emitter,
         )
+        await emitter.drain()
         applied = await _set_run_status(
             run_rec,
             TaskRunStatus.CANCELLED,
@@ -1444,6 +1515,7 @@ async def run(
                 claim,
                 emitter,
             )
+            await emitter.drain()
         except Exception:
             logger.exception(
                 "Could not cancel unfinished steps for run %s",
@@ -1481,6 +1553,10 @@ async def run(
             watcher.cancel()
         if watchers:
             await asyncio.gather(*watchers, return_exceptions=True)
+        try:
+            await emitter.aclose()
+        except Exception:
+            logger.debug("Task run %s event writer closed with an error", run_rec.id, exc_info=True)
         if lease_entered:
             await lease_controller.__aexit__(*sys.exc_info())
         await deliver_completion_notification(run_rec.id)
@@ -5,7 +5,8 @@ from __future__ import annotations
 import asyncio
 import logging
 import math
-from dataclasses import dataclass
+import weakref
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 
 from cognitrix.tasks.metrics import TaskRunMetricError
@@ -273,27 +274,25 @@ class LeaseController:
             and run.lease_generation == self.claim.generation
         )
 
+    async def _lease_failed(self, exc: Exception) -> None:
+        """Record a failed renewal reported by the shared heartbeat service."""
+        if await self._terminalized_by_current_claim():
+            # The body committed its terminal CAS while this final heartbeat
+            # was in flight.  The durable outcome wins; there is no live lease
+            # left to maintain.
+            self._stop.set()
+            return
+        self._error = exc
+        self._failed.set()
+        self._stop.set()
+
     async def _heartbeat_loop(self) -> None:
-        while not self._stop.is_set():
-            try:
-                await asyncio.wait_for(
-                    self._stop.wait(),
-                    timeout=self.heartbeat_interval,
-                )
-            except TimeoutError:
-                try:
-                    await self.heartbeat()
-                except Exception as exc:
-                    if await self._terminalized_by_current_claim():
-                        # The body committed its terminal CAS while this final
-                        # heartbeat was in flight.  The durable outcome wins;
-                        # there is no live lease left to maintain.
-                        self._stop.set()
-                        return
-                    self._error = exc
-                    self._failed.set()
-                    self._stop.set()
-                    return
+        heartbeats = lease_heartbeats()
+        heartbeats.register(self)
+        try:
+            await self._stop.wait()
+        finally:
+            await heartbeats.unregister(self)
 
     def checkpoint(self) -> None:
         """Raise a heartbeat failure at a cooperative execution boundary."""
@@ -323,3 +322,125 @@ class LeaseController:
             await task
         if exc_type is None and self._error is not None:
             raise self._error
+
+
+@dataclass(eq=False)
+class _HeartbeatGroup:
+    interval: float
+    members: list[LeaseController] = field(default_factory=list)
+    renewing: tuple[LeaseController, ...] = ()
+    renewed: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+
+
+class LeaseHeartbeatService:
+    """Renew every lease held in this process with one batched write per tick.
+
+    Controllers sharing a repository type, lease length and interval form a
+    group; each interval the group's claims go to ``heartbeat_many`` in one
+    call. Repositories without ``heartbeat_many`` are renewed claim by claim.
+    A failed claim is reported to its own controller only.
+    """
+
+    def __init__(self) -> None:
+        self._groups: dict[tuple, _HeartbeatGroup] = {}
+
+    @staticmethod
+    def _key(controller: LeaseController) -> tuple:
+        return (
+            type(controller.repository),
+            controller.lease_seconds,
+            controller.heartbeat_interval,
+        )
+
+    def register(self, controller: LeaseController) -> None:
+        key = self._key(controller)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _HeartbeatGroup(controller.heartbeat_interval)
+        group.members.append(controller)
+        if group.task is None or group.task.done():
+            group.task = asyncio.create_task(self._run(key, group))
+
+    async def unregister(self, controller: LeaseController) -> None:
+        """Stop renewing ``controller`` once any renewal it is part of lands."""
+        key = self._key(controller)
+        group = self._groups.get(key)
+        if group is None:
+            return
+        if controller in group.members:
+            group.members.remove(controller)
+        if controller in group.renewing:
+            await group.renewed.wait()
+        if not group.members and not group.renewing and self._groups.get(key) is group:
+            del self._groups[key]
+            if group.task is not None:
+                group.task.cancel()
+
+    async def _run(self, key: tuple, group: _HeartbeatGroup) -> None:
+        try:
+            while group.members:
+                await asyncio.sleep(group.interval)
+                members = tuple(group.members)
+                if not members:
+                    break
+                group.renewing = members
+                group.renewed = asyncio.Event()
+                try:
+                    await self._renew(group, members)
+                finally:
+                    group.renewing = ()
+                    group.renewed.set()
+        finally:
+            if self._groups.get(key) is group and not group.members:
+                del self._groups[key]
+
+    async def _renew(
+        self,
+        group: _HeartbeatGroup,
+        members: tuple[LeaseController, ...],
+    ) -> None:
+        repository = members[0].repository
+        heartbeat_many = getattr(repository, "heartbeat_many", None)
+        if heartbeat_many is None:
+            outcomes = await asyncio.gather(
+                *(member.heartbeat() for member in members),
+                return_exceptions=True,
+            )
+            errors = [
+                outcome if isinstance(outcome, Exception) else None
+                for outcome in outcomes
+            ]
+        else:
+            try:
+                errors = await heartbeat_many(
+                    [member.claim for member in members],
+                    lease_seconds=members[0].lease_seconds,
+                )
+            except Exception as exc:
+                errors = [exc] * len(members)
+        failed = [
+            (member, error)
+            for member, error in zip(members, errors, strict=True)
+            if error is not None
+        ]
+        for member, _ in failed:
+            if member in group.members:
+                group.members.remove(member)
+        await asyncio.gather(
+            *(member._lease_failed(error) for member, error in failed)
+        )
+
+
+_heartbeat_services: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, LeaseHeartbeatService
+] = weakref.WeakKeyDictionary()
+
+
+def lease_heartbeats() -> LeaseHeartbeatService:
+    """The heartbeat service shared by every lease on the running loop."""
+    loop = asyncio.get_running_loop()
+    service = _heartbeat_services.get(loop)
+    if service is None:
+        service = _heartbeat_services[loop] = LeaseHeartbeatService()
+    return service
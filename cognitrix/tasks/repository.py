@@ -11,10 +11,11 @@ from __future__ import annotations
 import asyncio
 import copy
 import inspect
+import json
 import logging
 import uuid
 import weakref
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
@@ -23,6 +24,7 @@ from typing import Any, Iterable
 from pydantic import BaseModel
 
 from cognitrix.errors import ExecutionControlError
+from cognitrix.tasks.event_bus import publish_run_cancel, publish_run_events, publish_run_terminal
 from cognitrix.tasks.events import TaskRunEvent
 from cognitrix.tasks.metrics import TaskRunPhaseMetric
 from cognitrix.tasks.results import StepResult
@@ -45,6 +47,11 @@ DEFAULT_HEAD_RECONCILIATION_BATCH_SIZE = 100
 DEFAULT_NOTIFICATION_LEASE_SECONDS = 60
 MAX_NOTIFICATION_ATTEMPTS = 8
 NOTIFICATION_BACKOFF_SECONDS = (30, 120, 600, 1800, 3600, 7200, 21600)
+OUTBOX_BATCH_SIZE = 256
+# SQLite caps a compound SELECT at 500 terms.
+STEP_INSERT_BATCH_SIZE = 200
+# Three bound parameters per claim keeps a renewal under SQLite's 999 limit.
+HEARTBEAT_BATCH_SIZE = 200
 _ACTIVE_STATUSES = {
     TaskRunStatus.QUEUED,
     TaskRunStatus.RUNNING,
@@ -678,6 +685,17 @@ async def _insert_with_explicit_id(model, instance) -> None:
     )
 
 
+def _is_unique_violation(exc: BaseException) -> bool:
+    """Whether a driver error is a unique-index conflict.
+
+    Matched by class name so no optional driver has to be importable:
+    sqlite3/pymysql ``IntegrityError``, psycopg ``UniqueViolation`` (an
+    ``IntegrityError``) and pymongo ``DuplicateKeyError``.
+    """
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    return bool(names & {"IntegrityError", "UniqueViolation", "DuplicateKeyError"})
+
+
 async def _cursor_records(cursor) -> list[dict[str, Any]]:
     if cursor is None:
         return []
@@ -838,6 +856,11 @@ class RunRepository:
                 "CREATE UNIQUE INDEX IF NOT EXISTS "
                 "ux_task_run_steps_run_step "
                 "ON taskrunsteps (run_id, step_index)",
+                # Keyset pages of the task and run list views.
+                "CREATE INDEX IF NOT EXISTS ix_task_runs_task_created_id "
+                "ON taskruns (task_id, created_at, id)",
+                "CREATE INDEX IF NOT EXISTS ix_tasks_created_id "
+                "ON tasks (created_at, id)",
             ]
             if dbms in ("sqlite", "postgresql"):
                 statements.append(
@@ -1029,6 +1052,7 @@ class RunRepository:
             raise TaskRunHeadInvariantError(
                 f"Task-run head reconciliation is unsupported for {dbms!r}"
             )
+        await self._ensure_indexes()
         marker = ":after_task" if dbms == "sqlite" else "%(after_task)s"
         after_task = ""
         reconciled = 0
@@ -1787,6 +1811,97 @@ class RunRepository:
 
         raise RunStateConflict(f"Task run {run_id} changed too frequently")
 
+    async def heartbeat_many(
+        self,
+        claims: Sequence[LeaseClaim],
+        *,
+        lease_seconds: int = 60,
+    ) -> list[Exception | None]:
+        """Renew many exact live leases, one fenced UPDATE per batch.
+
+        Returns one entry per claim: ``None`` when renewed, else the error
+        ``heartbeat`` would have raised for it. A batch whose row count falls
+        short is settled claim by claim, so a lost lease is reported only to
+        its own claim.
+        """
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be positive")
+
+        from odbms import DBMS
+
+        database = DBMS.Database
+        dbms = getattr(database, "dbms", "")
+        claims = list(claims)
+        results: list[Exception | None] = [None] * len(claims)
+        unsettled: list[int] = []
+        if dbms not in ("sqlite", "postgresql", "mysql"):
+            unsettled = list(range(len(claims)))
+        else:
+            marker = (
+                (lambda name: f":{name}")
+                if dbms == "sqlite"
+                else (lambda name: f"%({name})s")
+            )
+            now = _database_time_expression(dbms)
+            expiry = _database_lease_expiry_expression(
+                dbms,
+                marker("lease_seconds"),
+            )
+            for start in range(0, len(claims), HEARTBEAT_BATCH_SIZE):
+                indexes = range(start, min(start + HEARTBEAT_BATCH_SIZE, len(claims)))
+                params: dict[str, Any] = {
+                    "running_status": TaskRunStatus.RUNNING.value,
+                    "cancelling_status": TaskRunStatus.CANCELLING.value,
+                    "lease_seconds": lease_seconds,
+                }
+                matches = []
+                for index in indexes:
+                    claim = claims[index]
+                    params[f"run_id_{index}"] = claim.run_id
+                    params[f"lease_owner_{index}"] = claim.owner
+                    params[f"lease_generation_{index}"] = claim.generation
+                    matches.append(
+                        f"(id = {marker(f'run_id_{index}')} "
+                        f"AND lease_owner = {marker(f'lease_owner_{index}')} "
+                        f"AND lease_generation = {marker(f'lease_generation_{index}')})"
+                    )
+                try:
+                    cursor = await database.query(
+                        f"UPDATE {TaskRun.table_name()} SET "
+                        f"heartbeat_at = {now}, "
+                        f"lease_expires_at = {expiry}, "
+                        f"version = version + 1, "
+                        f"updated_at = {_database_updated_at_expression(dbms)} "
+                        f"WHERE status IN ({marker('running_status')}, "
+                        f"{marker('cancelling_status')}) "
+                        f"AND {_lease_expiry_predicate(dbms, 'lease_expires_at')} "
+                        f"AND ({' OR '.join(matches)})",
+                        params,
+                    )
+                    changed = int(getattr(cursor, "rowcount", 0) or 0)
+                except Exception:
+                    logger.warning(
+                        "Batched lease heartbeat failed; renewing claims one by one",
+                        exc_info=True,
+                    )
+                    changed = -1
+                if changed != len(indexes):
+                    unsettled.extend(indexes)
+
+        async def settle(index: int) -> None:
+            claim = claims[index]
+            try:
+                await self.heartbeat(
+                    claim.run_id,
+                    claim=claim,
+                    lease_seconds=lease_seconds,
+                )
+            except Exception as exc:
+                results[index] = exc
+
+        await asyncio.gather(*(settle(index) for index in unsettled))
+        return results
+
     async def _heartbeat_update(
         self,
         run: TaskRun,
@@ -1913,12 +2028,12 @@ class RunRepository:
         expected_statuses: Iterable[TaskRunStatus | str] | None = None,
         event: dict[str, Any] | None = None,
     ) -> TaskRun:
-        run, _ = await self._mutate(
+        run, _, _ = await self._mutate(
             run_id,
             claim=claim,
             updates=updates,
             expected_statuses=expected_statuses,
-            event=event,
+            events=[event] if event is not None else (),
         )
         return run
 
@@ -2080,11 +2195,33 @@ class RunRepository:
                 f"{sorted(extras)}"
             )
 
+        candidates: list[TaskRunStep] = []
         for position, index in enumerate(sorted(entries)):
             candidate = _step_from_plan_entry(run, entries[index], position)
             if index in by_index:
                 _assert_same_step_definition(by_index[index], candidate)
                 continue
+            candidates.append(candidate)
+
+        if candidates:
+            await self._require_step_write(run_id, claim)
+            if claim is None:
+                raise LeaseLost(f"Lease lost for task run {run_id}")
+            try:
+                inserted = await self._fenced_step_insert(candidates, claim=claim)
+            except Exception as exc:
+                if not _is_unique_violation(exc):
+                    raise
+                # A concurrent idempotent compiler won at least one index, so
+                # the statement inserted nothing; reconcile row by row below.
+                inserted = 0
+            if inserted == len(candidates):
+                candidates = []
+            else:
+                await self._require_step_write(run_id, claim)
+
+        for candidate in candidates:
+            index = candidate.step_index
             await self._require_step_write(run_id, claim)
             if claim is None:
                 raise LeaseLost(f"Lease lost for task run {run_id}")
@@ -2128,13 +2265,20 @@ class RunRepository:
 
     async def _fenced_step_insert(
         self,
-        candidate: TaskRunStep,
+        candidate: TaskRunStep | Sequence[TaskRunStep],
         *,
         claim: LeaseClaim,
     ) -> int:
-        """Insert a step only while the exact run lease remains live."""
+        """Insert steps only while the exact run lease remains live.
+
+        Several candidates are inserted by one ``INSERT ... SELECT`` per
+        ``STEP_INSERT_BATCH_SIZE`` rows, so a compiled plan costs one round
+        trip instead of one per step. Each statement is atomic; the return
+        value is the rows inserted.
+        """
         from odbms import DBMS
 
+        candidates = [candidate] if isinstance(candidate, TaskRunStep) else list(candidate)
         database = DBMS.Database
         dbms = getattr(database, "dbms", "")
         if dbms not in ("sqlite", "postgresql", "mysql"):
@@ -2142,40 +2286,65 @@ class RunRepository:
                 "Atomic task-step lease fencing requires a relational database"
             )
 
-        candidate.id = candidate.id or str(uuid.uuid4())
-        values = TaskRunStep.normalise(
-            candidate.model_dump(mode="json"),
-            "params",
-        )
         marker = (
             (lambda name: f":{name}")
             if dbms == "sqlite"
             else (lambda name: f"%({name})s")
         )
-        params = {f"step_{key}": value for key, value in values.items()}
-        params.update(
-            run_id=claim.run_id,
-            lease_owner=claim.owner,
-            lease_generation=claim.generation,
-            running_status=TaskRunStatus.RUNNING.value,
-            cancelling_status=TaskRunStatus.CANCELLING.value,
-        )
-        columns = ", ".join(values)
-        selected = ", ".join(marker(f"step_{column}") for column in values)
         lock_clause = "" if dbms == "sqlite" else " FOR UPDATE"
-        cursor = await database.query(
-            f"INSERT INTO {TaskRunStep.table_name()} ({columns}) "
-            f"SELECT {selected} WHERE EXISTS (SELECT 1 FROM taskruns "
+        fence = (
+            f"WHERE EXISTS (SELECT 1 FROM taskruns "
             f"WHERE taskruns.id = {marker('run_id')} "
             f"AND taskruns.status IN ({marker('running_status')}, "
             f"{marker('cancelling_status')}) "
             f"AND taskruns.lease_owner = {marker('lease_owner')} "
             f"AND taskruns.lease_generation = {marker('lease_generation')} "
             f"AND {_lease_expiry_predicate(dbms, 'taskruns.lease_expires_at')}"
-            f"{lock_clause})",
-            params,
-        )
-        return int(getattr(cursor, "rowcount", 0) or 0)
+            f"{lock_clause})"
+        )
+        inserted = 0
+        for start in range(0, len(candidates), STEP_INSERT_BATCH_SIZE):
+            batch = candidates[start:start + STEP_INSERT_BATCH_SIZE]
+            rows = []
+            for item in batch:
+                item.id = item.id or str(uuid.uuid4())
+                rows.append(TaskRunStep.normalise(item.model_dump(mode="json"), "params"))
+            columns = list(rows[0])
+            params: dict[str, Any] = {
+                "run_id": claim.run_id,
+                "lease_owner": claim.owner,
+                "lease_generation": claim.generation,
+                "running_status": TaskRunStatus.RUNNING.value,
+                "cancelling_status": TaskRunStatus.CANCELLING.value,
+            }
+            if dbms == "postgresql":
+                # The row type of the table gives every column its real type;
+                # a UNION of literals would type them all as text.
+                params["rows"] = json.dumps(rows, default=str)
+                source = (
+                    f"jsonb_populate_recordset(NULL::{TaskRunStep.table_name()}, "
+                    f"{marker('rows')}::jsonb) AS batch"
+                )
+            else:
+                selects = []
+                for position, values in enumerate(rows):
+                    params.update({f"s{position}_{key}": values[key] for key in columns})
+                    selects.append(
+                        "SELECT "
+                        + ", ".join(
+                            f"{marker(f's{position}_{column}')} AS {column}"
+                            for column in columns
+                        )
+                    )
+                source = f"({' UNION ALL '.join(selects)}) AS batch"
+            column_list = ", ".join(columns)
+            cursor = await database.query(
+                f"INSERT INTO {TaskRunStep.table_name()} ({column_list}) "
+                f"SELECT {column_list} FROM {source} {fence}",
+                params,
+            )
+            inserted += int(getattr(cursor, "rowcount", 0) or 0)
+        return inserted
 
     async def transition_step(
         self,
@@ -2243,6 +2412,83 @@ class RunRepository:
             )
         return stored
 
+    async def transition_steps(
+        self,
+        run_id: str,
+        step_indexes: Sequence[int],
+        *,
+        claim: LeaseClaim | None,
+        updates: dict[str, Any],
+        expected_statuses: Iterable[TaskRunStepStatus | str],
+    ) -> list[TaskRunStep]:
+        """CAS sibling step rows with a single fenced write.
+
+        All rows move together or none do: the write only applies while
+        every row is still in ``expected_statuses``, so a row that moved
+        first (or has moved since it was read) fails the call with
+        ``RunStateConflict`` and leaves its siblings untouched.
+        """
+        await self._ensure_indexes()
+        indexes = sorted(set(step_indexes))
+        if not indexes:
+            return []
+        expected = _step_status_set(expected_statuses) or set()
+        patch = _step_update_patch(dict(updates))
+
+        await self._require_step_write(run_id, claim)
+        rows = await self._step_rows(run_id, indexes)
+        missing = sorted(set(indexes) - {row.step_index for row in rows})
+        if missing:
+            raise RunStateConflict(f"Task run {run_id} has no steps {missing}")
+        moved = [row for row in rows if row.status.value not in expected]
+        if moved:
+            raise RunStateConflict(
+                f"Task run {run_id} steps {[row.step_index for row in moved]} "
+                f"are not {' or '.join(sorted(expected))}"
+            )
+        current_statuses = {row.status.value for row in rows}
+        for current_status in current_statuses:
+            _require_legal_step_transition(current_status, str(patch.get("status", current_status)))
+        if claim is None:
+            raise LeaseLost(f"Lease lost for task run {run_id}")
+        updated = await self._fenced_step_update(
+            rows,
+            current_status=current_statuses,
+            claim=claim,
+            patch=patch,
+        )
+        if updated != len(rows):
+            # Nothing was written. Raises LeaseLost when the fence moved;
+            # otherwise a step raced.
+            await self._require_step_write(run_id, claim)
+            raise RunStateConflict(
+                f"Task run {run_id} steps {indexes} changed during a batch transition"
+            )
+        return await self._step_rows(run_id, indexes)
+
+    async def _step_rows(self, run_id: str, step_indexes: Sequence[int]) -> list[TaskRunStep]:
+        """Read selected step rows of a run in one query, ordered by index."""
+        from odbms import DBMS
+
+        database = DBMS.Database
+        dbms = getattr(database, "dbms", "")
+        marker = (
+            (lambda name: f":{name}")
+            if dbms == "sqlite"
+            else (lambda name: f"%({name})s")
+        )
+        params: dict[str, Any] = {"run_id": run_id}
+        params.update({f"step_{position}": index for position, index in enumerate(step_indexes)})
+        placeholders = ", ".join(marker(f"step_{position}") for position in range(len(step_indexes)))
+        records = await _relational_records(
+            database,
+            f"SELECT * FROM {TaskRunStep.table_name()} "
+            f"WHERE run_id = {marker('run_id')} AND step_index IN ({placeholders}) "
+            "ORDER BY step_index",
+            params,
+        )
+        return [TaskRunStep(**TaskRunStep.normalise(record)) for record in records]
+
     async def backfill_step_runtime(
         self,
         run_id: str,
@@ -2311,20 +2557,25 @@ class RunRepository:
 
     async def _fenced_step_update(
         self,
-        row: TaskRunStep,
+        row: TaskRunStep | Sequence[TaskRunStep],
         *,
-        current_status: str,
+        current_status: str | Iterable[str],
         claim: LeaseClaim,
         patch: dict[str, Any],
         require_runtime_snapshot_missing: bool = False,
     ) -> int:
-        """Update a step only while its exact run lease is still authoritative.
+        """Update steps only while their exact run lease is still authoritative.
 
         The run predicate and step mutation deliberately share one SQL
         statement. A separate preflight read cannot fence another process:
         recovery could advance ``lease_generation`` between that read and the
-        step-row update.
+        step-row update. Several rows, in any of several current statuses,
+        can be updated by the same statement, and then only while all of
+        them still match, so a batch is never applied in part; the return
+        value is the rows changed.
         """
+        rows = [row] if isinstance(row, TaskRunStep) else list(row)
+        statuses = [current_status] if isinstance(current_status, str) else sorted(current_status)
         from odbms import DBMS
 
         database = DBMS.Database
@@ -2347,9 +2598,9 @@ class RunRepository:
             else (lambda name: f"%({name})s")
         )
         params = {f"set_{key}": value for key, value in values.items()}
+        params.update({f"step_id_{position}": item.id for position, item in enumerate(rows)})
+        params.update({f"step_status_{position}": status for position, status in enumerate(statuses)})
         params.update(
-            step_id=row.id,
-            step_status=current_status,
             run_id=claim.run_id,
             lease_owner=claim.owner,
             lease_generation=claim.generation,
@@ -2365,11 +2616,24 @@ class RunRepository:
             else ""
         )
         lock_clause = "" if dbms == "sqlite" else " FOR UPDATE"
+        step_ids = ", ".join(marker(f"step_id_{position}") for position in range(len(rows)))
+        step_statuses = ", ".join(marker(f"step_status_{position}") for position in range(len(statuses)))
+        batch_clause = ""
+        if len(rows) > 1:
+            # Lock and count the batch first; one raced row leaves them all.
+            params["step_count"] = len(rows)
+            batch_clause = (
+                "AND (SELECT COUNT(*) FROM (SELECT id FROM "
+                f"{TaskRunStep.table_name()} WHERE id IN ({step_ids}) "
+                f"AND status IN ({step_statuses}){lock_clause}) AS fenced_steps) "
+                f"= {marker('step_count')} "
+            )
         cursor = await database.query(
             f"UPDATE {TaskRunStep.table_name()} SET {assignments} "
-            f"WHERE id = {marker('step_id')} "
-            f"AND status = {marker('step_status')} "
+            f"WHERE id IN ({step_ids}) "
+            f"AND status IN ({step_statuses}) "
             f"{runtime_snapshot_clause}"
+            f"{batch_clause}"
             "AND EXISTS (SELECT 1 FROM taskruns "
             f"WHERE taskruns.id = {marker('run_id')} "
             f"AND taskruns.status IN ({marker('running_status')}, "
@@ -2523,9 +2787,15 @@ class RunRepository:
         claim: LeaseClaim | None,
         updates: dict[str, Any],
         expected_statuses: Iterable[TaskRunStatus | str] | None,
-        event: dict[str, Any] | None,
-    ) -> tuple[TaskRun, dict[str, Any] | None]:
+        events: Iterable[dict[str, Any]] = (),
+    ) -> tuple[TaskRun, list[dict[str, Any]], list[TaskRunEvent]]:
+        """CAS ``updates`` plus a batch of outbox envelopes in one write.
+
+        Returns the stored run, the appended envelopes and the events the
+        follow-up outbox flush delivered (empty for a terminal transition).
+        """
         expected = _status_set(expected_statuses)
+        events = list(events)
         updates = _run_update_patch(dict(updates))
         database_clock = _uses_database_lease_clock()
 
@@ -2577,12 +2847,13 @@ class RunRepository:
                     _terminal_notification_state(run)
                 )
             patch["version"] = run.version + 1
-            envelope = None
-            if event is not None:
-                sequence = run.next_event_sequence + 1
-                envelope = _event_envelope(run_id, sequence, event)
-                patch["next_event_sequence"] = sequence
-                patch["event_outbox"] = [*run.event_outbox, envelope]
+            envelopes = [
+                _event_envelope(run_id, run.next_event_sequence + offset, event)
+                for offset, event in enumerate(events, start=1)
+            ]
+            if envelopes:
+                patch["next_event_sequence"] = envelopes[-1]["sequence"]
+                patch["event_outbox"] = [*run.event_outbox, *envelopes]
 
             query: dict[str, Any] = {"id": run_id, "version": run.version}
             if expected is not None and len(expected) == 1:
@@ -2614,17 +2885,20 @@ class RunRepository:
                 # touching the event store so delivery failure cannot strand a
                 # completed run as the task's active head.
                 await self._release_active(run.task_id, run.id)
-            if envelope is not None:
+            delivered: list[TaskRunEvent] = []
+            if envelopes:
                 if terminal:
                     await self._flush_outbox_best_effort(run_id)
                 else:
-                    await self.flush_outbox(run_id)
+                    delivered = await self.flush_outbox(run_id)
+            if terminal:
+                await publish_run_terminal(run_id)
             stored = await TaskRun.get(run_id)
             if stored is None:
                 raise RunStateConflict(f"Task run {run_id} disappeared")
             if stored.status in _TERMINAL_STATUSES and not terminal:
                 await self._release_active(stored.task_id, stored.id)
-            return stored, envelope
+            return stored, envelopes, delivered
 
         raise RunStateConflict(f"Task run {run_id} changed too frequently")
 
@@ -2639,26 +2913,179 @@ class RunRepository:
         agent_name: str | None = None,
         data: dict[str, Any] | None = None,
     ) -> TaskRunEvent:
-        _, envelope = await self._mutate(
+        stored = await self.emit_events(
             run_id,
             claim=claim,
-            updates={},
-            expected_statuses=None,
-            event={
+            events=[{
                 "kind": kind,
                 "session_id": session_id,
                 "step_index": step_index,
                 "agent_name": agent_name,
                 "data": data or {},
-            },
-        )
-        assert envelope is not None
-        stored = await TaskRunEvent.find_one(
-            {"run_id": run_id, "sequence": envelope["sequence"]}
+            }],
         )
-        return stored or TaskRunEvent(**envelope)
+        return stored[0]
+
+    async def emit_events(
+        self,
+        run_id: str,
+        *,
+        claim: LeaseClaim | None,
+        events: Iterable[dict[str, Any]],
+    ) -> list[TaskRunEvent]:
+        """Append several events with one run CAS and one outbox drain."""
+        _, envelopes, delivered = await self._mutate(
+            run_id,
+            claim=claim,
+            updates={},
+            expected_statuses=None,
+            events=events,
+        )
+        by_sequence = {event.sequence: event for event in delivered}
+        stored: list[TaskRunEvent] = []
+        for envelope in envelopes:
+            event = by_sequence.get(envelope["sequence"])
+            if event is None:
+                # Another writer drained this envelope first.
+                event = await TaskRunEvent.find_one(
+                    {"run_id": run_id, "sequence": envelope["sequence"]}
+                )
+            stored.append(event or TaskRunEvent(**envelope))
+        return stored
 
     async def flush_outbox(self, run_id: str) -> list[TaskRunEvent]:
+        """Deliver pending envelopes and acknowledge them from the run head.
+
+        Relational backends drain up to ``OUTBOX_BATCH_SIZE`` envelopes per
+        round: one run read, one idempotent multi-row insert keyed on
+        ``(run_id, sequence)``, one version CAS that trims the delivered prefix
+        and one range read of the stored rows. Other adapters keep the
+        per-envelope path. Delivered events are then pushed to live watchers
+        through the run event bus.
+        """
+        from odbms import DBMS
+
+        if getattr(DBMS.Database, "dbms", "") not in ("sqlite", "postgresql", "mysql"):
+            delivered = await self._flush_outbox_serial(run_id)
+        else:
+            delivered = await self._flush_outbox_batched(run_id)
+        # Live watchers get the delivered rows pushed; none of them re-reads.
+        await publish_run_events(run_id, delivered)
+        return delivered
+
+    async def _flush_outbox_batched(self, run_id: str) -> list[TaskRunEvent]:
+        """Drain the outbox in multi-row batches (relational adapters)."""
+        await self._ensure_indexes()
+
+        delivered: list[TaskRunEvent] = []
+        attempts = 0
+        while attempts < MAX_CAS_ATTEMPTS * 4:
+            attempts += 1
+            run = await TaskRun.get(run_id)
+            if run is None or not run.event_outbox:
+                return delivered
+
+            batch = [dict(envelope) for envelope in run.event_outbox[:OUTBOX_BATCH_SIZE]]
+            await self._insert_outbox_batch(batch)
+            changed = await TaskRun.update_one(
+                {"id": run_id, "version": run.version},
+                {
+                    "event_outbox": list(run.event_outbox[len(batch):]),
+                    "version": run.version + 1,
+                },
+            )
+            if changed != 1:
+                await asyncio.sleep(0)
+                continue
+
+            sequences = [int(envelope["sequence"]) for envelope in batch]
+            persisted = await self._stored_outbox_events(run_id, sequences)
+            missing = set(sequences) - {event.sequence for event in persisted}
+            if missing:
+                raise RunStateConflict(
+                    f"Task run {run_id} acknowledged undelivered events: "
+                    f"{sorted(missing)}"
+                )
+            delivered.extend(persisted)
+        raise RunStateConflict(f"Could not drain event outbox for task run {run_id}")
+
+    async def _insert_outbox_batch(self, envelopes: list[dict[str, Any]]) -> int:
+        """Insert envelopes in one statement, ignoring already delivered rows."""
+        from odbms import DBMS
+
+        database = DBMS.Database
+        dbms = getattr(database, "dbms", "")
+        marker = (
+            (lambda name: f":{name}")
+            if dbms == "sqlite"
+            else (lambda name: f"%({name})s")
+        )
+        columns: list[str] = []
+        params: dict[str, Any] = {}
+        rows: list[str] = []
+        for position, envelope in enumerate(envelopes):
+            candidate = TaskRunEvent(**envelope)
+            candidate.id = str(uuid.uuid4())
+            values = TaskRunEvent.normalise(
+                candidate.model_dump(mode="json"),
+                "params",
+            )
+            columns = columns or list(values)
+            params.update(
+                {f"e{position}_{key}": value for key, value in values.items()}
+            )
+            rows.append(
+                "("
+                + ", ".join(marker(f"e{position}_{column}") for column in columns)
+                + ")"
+            )
+        if not rows:
+            return 0
+        if dbms == "mysql":
+            conflict = " ON DUPLICATE KEY UPDATE id = id"
+        else:
+            conflict = " ON CONFLICT (run_id, sequence) DO NOTHING"
+        cursor = await database.query(
+            f"INSERT INTO {TaskRunEvent.table_name()} ({', '.join(columns)}) "
+            f"VALUES {', '.join(rows)}{conflict}",
+            params,
+        )
+        return int(getattr(cursor, "rowcount", 0) or 0)
+
+    async def _stored_outbox_events(
+        self,
+        run_id: str,
+        sequences: list[int],
+    ) -> list[TaskRunEvent]:
+        """Read the durable rows for one acknowledged batch in one range scan."""
+        from odbms import DBMS
+
+        database = DBMS.Database
+        dbms = getattr(database, "dbms", "")
+        marker = (
+            (lambda name: f":{name}")
+            if dbms == "sqlite"
+            else (lambda name: f"%({name})s")
+        )
+        rows = await _relational_records(
+            database,
+            f"SELECT * FROM {TaskRunEvent.table_name()} "
+            f"WHERE run_id = {marker('run_id')} "
+            f"AND sequence >= {marker('first_sequence')} "
+            f"AND sequence <= {marker('last_sequence')} "
+            "ORDER BY sequence ASC",
+            {
+                "run_id": run_id,
+                "first_sequence": min(sequences),
+                "last_sequence": max(sequences),
+            },
+        )
+        wanted = set(sequences)
+        events = [TaskRunEvent(**TaskRunEvent.normalise(row)) for row in rows]
+        return [event for event in events if event.sequence in wanted]
+
+    async def _flush_outbox_serial(self, run_id: str) -> list[TaskRunEvent]:
+        """Deliver one envelope per CAS for adapters without multi-row upserts."""
         delivered: list[TaskRunEvent] = []
         attempts = 0
         while attempts < MAX_CAS_ATTEMPTS * 4:
@@ -2713,7 +3140,11 @@ class RunRepository:
             return []
 
     async def recover_outboxes(self) -> list[str]:
-        """Drain every stranded event envelope after process restart."""
+        """Drain every stranded event envelope after process restart.
+
+        Each candidate run goes through ``flush_outbox``, so recovery uses the
+        same batched insert and single trimming CAS as live delivery.
+        """
         recovered: list[str] = []
         for run in await self._outbox_candidates():
             if not run.event_outbox:
@@ -2859,6 +3290,7 @@ class RunRepository:
         # failed flush leaves an outbox for startup recovery, not a stuck head.
         await self._release_active(observed.task_id, observed.id)
         await self._flush_outbox_best_effort(observed.id)
+        await publish_run_terminal(observed.id)
         stored = await TaskRun.get(observed.id)
         if stored is None:
             raise RunStateConflict(f"Task run {observed.id} disappeared")
@@ -2969,6 +3401,9 @@ class RunRepository:
                     # cannot strand a terminal run as the task's active head.
                     await self._release_active(run.task_id, run.id)
                 await self._flush_outbox_best_effort(run_id)
+                # Wakes the worker's cancellation watcher even when the outbox
+                # flush (and its run_status push) failed.
+                await publish_run_cancel(run_id, terminal=terminal)
                 stored = await TaskRun.get(run_id)
                 if stored is None:
                     raise RunStateConflict(f"Task run {run_id} disappeared")
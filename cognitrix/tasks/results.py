@@ -49,6 +49,7 @@ class UsageSummary(_MappingModel):
     prompt_tokens: int = 0
     completion_tokens: int = 0
     llm_calls: int = 0
+    cached_llm_calls: int = 0
     tool_calls: int = 0
     tool_attempts: int = 0
     duration_seconds: float = 0.0
@@ -1,10 +1,14 @@
 """Task schedule engine.
 
-One asyncio loop (started by the FastAPI lifespan — never by the Celery
-worker) ticks every TICK_SECONDS, claims due tasks by compare-and-set on
-next_run_at, and enqueues them through the normal Celery start path. The
-claim advances the schedule BEFORE enqueueing, so a crash mid-fire loses at
-most one occurrence instead of double-firing.
+Every API process runs one asyncio loop (started by the FastAPI lifespan —
+never by the Celery worker), and the holder of the scheduler lease
+(scheduler_lease.py) is the only one that ticks. A tick reads due tasks with
+an indexed ``next_run_at <= now`` range query, page by page, claims them by
+compare-and-set on next_run_at, and enqueues them through the normal Celery
+start path. The claim advances the schedule BEFORE enqueueing, so a crash
+mid-fire loses at most one occurrence instead of double-firing. Between
+ticks the leader sleeps until the earliest next_run_at, capped at
+TICK_SECONDS so schedules saved by other processes are still picked up.
 
 Timezone contract: everything stored is naive UTC '%Y-%m-%d %H:%M:%S'
 (the sqlite adapter's *_at format). Cron expressions are the exception in
@@ -14,18 +18,26 @@ server time) and the resulting instant is converted back to naive UTC.
 
 import asyncio
 import logging
+import weakref
 from datetime import datetime, timedelta, timezone
 
 from croniter import croniter
 
 from cognitrix.models.api_key import normalize_expiry
 from cognitrix.tasks.base import Task
+from cognitrix.tasks.scheduler_lease import build_leader_lease
 
 logger = logging.getLogger('cognitrix.log')
 
 FMT = '%Y-%m-%d %H:%M:%S'
 MIN_INTERVAL = 60
 TICK_SECONDS = 20
+MIN_SLEEP_SECONDS = 1
+DUE_PAGE_SIZE = 200
+CLAIM_CONCURRENCY = 16
+DUE_INDEX = 'ix_tasks_schedule_due'
+
+_indexed_databases: weakref.WeakSet = weakref.WeakSet()
 
 SCHEDULE_FIELDS = ('schedule_at', 'schedule_interval', 'schedule_cron',
                    'next_run_at', 'schedule_enabled', 'schedule_requested_by',
@@ -87,76 +99,190 @@ def compute_next_run(task: Task, now: datetime | None = None) -> str | None:
     return None
 
 
+async def _ensure_due_index(database, dbms: str) -> None:
+    """Best-effort index behind the due-task range query (once per database)."""
+    if database in _indexed_databases:
+        return
+    exists = '' if dbms == 'mysql' else 'IF NOT EXISTS '
+    try:
+        await database.query(
+            f'CREATE INDEX {exists}{DUE_INDEX} ON {Task.table_name()} (schedule_enabled, next_run_at)'
+        )
+    except Exception:
+        # mysql has no IF NOT EXISTS: a second process hits "duplicate key name".
+        logger.debug('Could not create %s', DUE_INDEX, exc_info=True)
+    _indexed_databases.add(database)
+
+
+async def scheduled_tasks(until: datetime | None, *, limit: int) -> list[Task]:
+    """Enabled, undeleted tasks by next_run_at (up to ``until`` when given)."""
+    from odbms import DBMS
+
+    from cognitrix.tasks.repository import _relational_records
+
+    database = DBMS.Database
+    dbms = getattr(database, 'dbms', '')
+    cutoff = until.strftime(FMT) if until is not None else None
+    if dbms == 'mongodb':
+        window = {'$ne': None, **({'$lte': cutoff} if cutoff else {})}
+        rows = await database.find(
+            Task.table_name(),
+            {'schedule_enabled': True, 'deleted_at': None, 'next_run_at': window},
+            limit=limit,
+            sort=[('next_run_at', 1)],
+        )
+    elif dbms in ('sqlite', 'postgresql', 'mysql'):
+        await _ensure_due_index(database, dbms)
+        marker, suffix = (':', '') if dbms == 'sqlite' else ('%(', ')s')
+        params = {'enabled': True, 'limit': limit}
+        window = ''
+        if cutoff:
+            window = f'AND next_run_at <= {marker}cutoff{suffix} '
+            params['cutoff'] = cutoff
+        rows = await _relational_records(
+            database,
+            f'SELECT * FROM {Task.table_name()} '
+            f'WHERE schedule_enabled = {marker}enabled{suffix} '
+            f'AND next_run_at IS NOT NULL {window}'
+            "AND (deleted_at IS NULL OR deleted_at = '') "
+            f'ORDER BY next_run_at LIMIT {marker}limit{suffix}',
+            params,
+        )
+    else:
+        # Adapters without a native range query: scan and filter here.
+        tasks = [task for task in await Task.find({'schedule_enabled': True}) or []
+                 if task.next_run_at and not task.deleted_at
+                 and (cutoff is None or task.next_run_at <= cutoff)]
+        return sorted(tasks, key=lambda task: task.next_run_at)[:limit]
+    return [Task(**Task.normalise(row)) for row in rows]
+
+
+async def next_due_at() -> datetime | None:
+    """Earliest next_run_at among enabled schedules, if any parses."""
+    upcoming = await scheduled_tasks(None, limit=1)
+    if not upcoming:
+        return None
+    try:
+        return datetime.fromisoformat(upcoming[0].next_run_at)
+    except ValueError:
+        return None
+
+
+async def _fire(task: Task, now: datetime) -> tuple[bool, bool]:
+    """Claim and enqueue one due task: (claimed, enqueued)."""
+    try:
+        if task.deleted_at or not task.next_run_at:
+            return False, False
+        if datetime.fromisoformat(task.next_run_at) > now:
+            return False, False
+
+        prev = {'next_run_at': task.next_run_at, 'schedule_enabled': True}
+        if task.schedule_at:  # one-shot: fire once, then off
+            claim = {'next_run_at': None, 'schedule_enabled': False}
+        else:
+            claim = {'next_run_at': compute_next_run(task, now)}
+        # Non-null claim values that uniquely pin our claim for this id, for
+        # a CAS revert later. Kept as its own dict: Model.update_one mutates
+        # the data dict it's handed (injects updated_at), so `claim` is not
+        # reusable as a WHERE clause afterwards.
+        claim_cond = {'id': task.id, **{k: v for k, v in claim.items() if v is not None}}
+        # CAS on the exact stored string — rowcount 0 means another writer
+        # (a concurrent tick or an edit) got there first.
+        claimed = await Task.update_one(
+            {'id': task.id, 'next_run_at': task.next_run_at}, dict(claim))
+        if claimed != 1:
+            return False, False
+        for key, value in claim.items():
+            setattr(task, key, value)
+
+        from cognitrix.api.routes.tasks import _enqueue_task_start
+        try:
+            await _enqueue_task_start(
+                task,
+                actor_key='scheduler',
+                requested_by=task.schedule_requested_by,
+                authority_kind=task.schedule_authority_kind,
+                authority_id=task.schedule_authority_id,
+            )
+            return True, True
+        except Exception as exc:
+            status = getattr(exc, 'status_code', None)
+            if status == 409 and not task.schedule_at:
+                # Recurring overlap: drop this occurrence, schedule already
+                # advanced to the next one.
+                logger.debug('Scheduler skipped task %s: run already active', task.id)
+                return True, False
+            # One-shot blocked by an active run, broker down, or an
+            # unexpected failure: put the claim back so it retries next
+            # tick instead of silently never firing. CAS the revert on
+            # our own claim values (broker probes make this window
+            # seconds-long) so a concurrent pause/edit isn't clobbered.
+            await Task.update_one(dict(claim_cond), dict(prev))
+            logger.warning('Scheduler could not start task %s (%s); will retry',
+                           task.id, exc)
+            return False, False
+    except Exception:
+        logger.exception('Scheduler skipped task %s', getattr(task, 'id', '?'))
+        return False, False
+
+
 async def tick(now: datetime | None = None) -> int:
-    """One scheduler pass. Returns the number of runs enqueued."""
+    """One scheduler pass. Returns the number of runs enqueued.
+
+    Due tasks are read a page at a time and claimed concurrently (at most
+    CLAIM_CONCURRENCY in flight). Another page is read only when the last one
+    was full and made progress; rows that failed and reverted stay due for
+    the next tick.
+    """
     now = now or _utcnow()
     fired = 0
-    tasks = await Task.find({'schedule_enabled': True})
-    for task in tasks or []:
-        try:
-            if task.deleted_at:
-                continue
-            if not task.next_run_at:
-                continue
-            if datetime.fromisoformat(task.next_run_at) > now:
-                continue
-
-            prev = {'next_run_at': task.next_run_at, 'schedule_enabled': True}
-            if task.schedule_at:  # one-shot: fire once, then off
-                claim = {'next_run_at': None, 'schedule_enabled': False}
-            else:
-                claim = {'next_run_at': compute_next_run(task, now)}
-            # Non-null claim values that uniquely pin our claim for this id, for
-            # a CAS revert later. Kept as its own dict: Model.update_one mutates
-            # the data dict it's handed (injects updated_at), so `claim` is not
-            # reusable as a WHERE clause afterwards.
-            claim_cond = {'id': task.id, **{k: v for k, v in claim.items() if v is not None}}
-            # CAS on the exact stored string — rowcount 0 means another writer
-            # (a concurrent tick or an edit) got there first.
-            claimed = await Task.update_one(
-                {'id': task.id, 'next_run_at': task.next_run_at}, dict(claim))
-            if claimed != 1:
-                continue
-            for key, value in claim.items():
-                setattr(task, key, value)
-
-            from cognitrix.api.routes.tasks import _enqueue_task_start
-            try:
-                await _enqueue_task_start(
-                    task,
-                    actor_key='scheduler',
-                    requested_by=task.schedule_requested_by,
-                    authority_kind=task.schedule_authority_kind,
-                    authority_id=task.schedule_authority_id,
-                )
-                fired += 1
-            except Exception as exc:
-                status = getattr(exc, 'status_code', None)
-                if status == 409 and not task.schedule_at:
-                    # Recurring overlap: drop this occurrence, schedule already
-                    # advanced to the next one.
-                    logger.debug('Scheduler skipped task %s: run already active', task.id)
-                else:
-                    # One-shot blocked by an active run, broker down, or an
-                    # unexpected failure: put the claim back so it retries next
-                    # tick instead of silently never firing. CAS the revert on
-                    # our own claim values (broker probes make this window
-                    # seconds-long) so a concurrent pause/edit isn't clobbered.
-                    await Task.update_one(dict(claim_cond), dict(prev))
-                    logger.warning('Scheduler could not start task %s (%s); will retry',
-                                   task.id, exc)
-        except Exception:
-            logger.exception('Scheduler skipped task %s', getattr(task, 'id', '?'))
-    return fired
-
-
-async def scheduler_loop() -> None:
-    # ponytail: per-process — single uvicorn worker assumed; distributed lock
-    # (or moving to celery beat) if this ever runs multi-instance.
-    logger.info('Task scheduler started (tick every %ss)', TICK_SECONDS)
+    slots = asyncio.Semaphore(CLAIM_CONCURRENCY)
+
+    async def fire(task: Task) -> tuple[bool, bool]:
+        async with slots:
+            return await _fire(task, now)
+
     while True:
-        try:
-            await tick()
-        except Exception:
-            logger.exception('Scheduler tick failed')
-        await asyncio.sleep(TICK_SECONDS)
+        page = await scheduled_tasks(now, limit=DUE_PAGE_SIZE)
+        outcomes = await asyncio.gather(*(fire(task) for task in page))
+        fired += sum(1 for _claimed, enqueued in outcomes if enqueued)
+        if len(page) < DUE_PAGE_SIZE or not any(claimed for claimed, _ in outcomes):
+            return fired
+
+
+def _sleep_seconds(now: datetime, next_due: datetime | None) -> float:
+    if next_due is None or next_due <= now:
+        # Nothing scheduled, or only rows that just failed to start: retry
+        # on the regular cadence rather than spinning.
+        return TICK_SECONDS
+    return min(TICK_SECONDS, max(MIN_SLEEP_SECONDS, (next_due - now).total_seconds()))
+
+
+async def scheduler_loop(lease=None) -> None:
+    lease = lease or build_leader_lease()
+    logger.info('Task scheduler started (%s)', type(lease).__name__)
+    leading = False
+    try:
+        while True:
+            delay = TICK_SECONDS
+            try:
+                is_leader = await lease.acquire()
+                if is_leader != leading:
+                    logger.info('Task scheduler %s the scheduler lease',
+                                'acquired' if is_leader else 'lost')
+                leading = is_leader
+                if leading:
+                    await tick()
+                    delay = _sleep_seconds(_utcnow(), await next_due_at())
+            except Exception:
+                logger.exception('Scheduler tick failed')
+            await asyncio.sleep(delay)
+    finally:
+        if leading:
+            try:
+                await lease.release()
+            except Exception:
+                logger.debug('Could not release the scheduler lease', exc_info=True)
+        close = getattr(lease, 'aclose', None)
+        if close is not None:
+            await close()
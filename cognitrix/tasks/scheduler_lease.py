@@ -0,0 +1,168 @@
+"""Leader election for the task scheduler.
+
+Every API process starts ``scheduler_loop``; only the holder of the
+scheduler lease ticks. The lease is a key with a TTL that the leader renews
+on every loop iteration and releases on shutdown. A leader that dies stops
+renewing, and another process takes over once the TTL passes.
+
+Backends (``COGNITRIX_SCHEDULER_LEADER``):
+
+- blank / ``auto``: Redis when a Redis broker is configured, else the database
+- ``redis://`` / ``rediss://`` URL: ``SET NX PX`` plus owner-checked renewal
+- ``database``: a ``schedulerleases`` row claimed by compare-and-set
+- ``none``: no election; every process ticks (the per-task CAS claim still
+  prevents double fires)
+
+The database lease compares process clocks, so hosts need NTP-level clock
+agreement; the TTL is far larger than the skew that matters.
+"""
+
+import logging
+import os
+import socket
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from odbms import Model
+
+logger = logging.getLogger('cognitrix.log')
+
+FMT = '%Y-%m-%d %H:%M:%S'
+LEASE_NAME = 'task-scheduler'
+LEASE_SECONDS = 60
+
+
+class SchedulerLease(Model):
+    """One row per elected role; ``id`` is the lease name."""
+
+    owner: str
+    expires_at: str
+    """Naive-UTC expiry; any process may claim the row after it."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def lease_owner_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+class DatabaseLeaderLease:
+    def __init__(self, name: str = LEASE_NAME, owner: str | None = None, ttl_seconds: int = LEASE_SECONDS):
+        self.name = name
+        self.owner = owner or lease_owner_id()
+        self.ttl_seconds = ttl_seconds
+
+    async def acquire(self) -> bool:
+        """Take or renew the lease; True while this process holds it."""
+        now = _utcnow()
+        expires_at = (now + timedelta(seconds=self.ttl_seconds)).strftime(FMT)
+        lease = await SchedulerLease.get(self.name)
+        if lease is None:
+            from cognitrix.tasks.repository import _insert_with_explicit_id
+
+            candidate = SchedulerLease(owner=self.owner, expires_at=expires_at)
+            candidate.id = self.name
+            try:
+                await _insert_with_explicit_id(SchedulerLease, candidate)
+            except Exception:
+                # Lost the insert race on the primary key.
+                logger.debug('Scheduler lease %s was created concurrently', self.name, exc_info=True)
+                return False
+            return True
+        if lease.owner == self.owner:
+            return await SchedulerLease.update_one(
+                {'id': self.name, 'owner': self.owner}, {'expires_at': expires_at}
+            ) == 1
+        if lease.expires_at > now.strftime(FMT):
+            return False
+        # CAS on the row we saw expire: one contender wins the takeover.
+        return await SchedulerLease.update_one(
+            {'id': self.name, 'owner': lease.owner, 'expires_at': lease.expires_at},
+            {'owner': self.owner, 'expires_at': expires_at},
+        ) == 1
+
+    async def release(self) -> None:
+        past = (_utcnow() - timedelta(seconds=1)).strftime(FMT)
+        await SchedulerLease.update_one({'id': self.name, 'owner': self.owner}, {'expires_at': past})
+
+
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLeaderLease:
+    def __init__(
+        self,
+        url: str,
+        name: str = LEASE_NAME,
+        owner: str | None = None,
+        ttl_seconds: int = LEASE_SECONDS,
+        *,
+        client=None,
+    ):
+        self.url = url
+        self.key = f'cognitrix:lease:{name}'
+        self.owner = owner or lease_owner_id()
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+
+    def _redis(self):
+        if self._client is None:
+            from redis.asyncio import Redis
+
+            self._client = Redis.from_url(self.url, decode_responses=True)
+        return self._client
+
+    async def acquire(self) -> bool:
+        client = self._redis()
+        ttl_ms = int(self.ttl_seconds * 1000)
+        if await client.set(self.key, self.owner, nx=True, px=ttl_ms):
+            return True
+        return bool(await client.eval(_RENEW_SCRIPT, 1, self.key, self.owner, ttl_ms))
+
+    async def release(self) -> None:
+        await self._redis().eval(_RELEASE_SCRIPT, 1, self.key, self.owner)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class NoLeaderLease:
+    """Election disabled: every process considers itself the leader."""
+
+    async def acquire(self) -> bool:
+        return True
+
+    async def release(self) -> None:
+        return None
+
+
+def build_leader_lease(target: str | None = None):
+    from cognitrix.config import settings
+
+    target = (target if target is not None else settings.scheduler_leader).strip()
+    if target.lower() in ('', 'auto'):
+        broker = os.getenv('TASK_LIMIT_REDIS_URL') or os.getenv('CELERY_BROKER_URL') or ''
+        target = broker if broker.startswith(('redis://', 'rediss://')) else 'database'
+    if target.startswith(('redis://', 'rediss://')):
+        return RedisLeaderLease(target)
+    if target.lower() == 'none':
+        return NoLeaderLease()
+    if target.lower() != 'database':
+        logger.warning('Unknown COGNITRIX_SCHEDULER_LEADER %r; electing through the database', target)
+    return DatabaseLeaderLease()
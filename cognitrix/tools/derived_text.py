@@ -0,0 +1,144 @@
+"""In-process cache of text derived from documents the Read tool pages through.
+
+Paged reads of one document used to repeat the expensive part on every call:
+reopening and re-parsing a PDF, re-reading and re-verifying a managed upload,
+or scanning a whole text file to count its lines. The cache keeps what those
+calls derive:
+
+* PDFs: page count plus the extracted text of every page seen so far. A miss
+  extracts the requested pages and the ``PDF_READAHEAD_PAGES`` after them, so
+  an agent paging forward reopens the document rarely.
+* Local text files: the byte offset of every line start, so a range is read
+  with one seek.
+* Managed text documents: the decoded lines.
+
+Local files are keyed by path, device, inode, size and mtime; managed
+documents by the SHA-256 their capability pins, so a hit skips the storage
+read. Entries are evicted least-recently-used once their combined size exceeds
+``COGNITRIX_READ_CACHE_MB``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+PDF_READAHEAD_PAGES = 50
+
+
+@dataclass
+class PdfText:
+    """Extracted page text of one PDF; pages are filled in as they are read."""
+
+    page_count: int
+    pages: dict[int, str] = field(default_factory=dict)
+
+    def missing(self, wanted: Iterable[int]) -> list[int]:
+        return [page for page in wanted if page not in self.pages]
+
+    def extract(self, doc, wanted: Iterable[int], extract_page: Callable[[Any], str]) -> None:
+        """Fill ``wanted`` pages, reading ahead past the last one."""
+        wanted = sorted(set(wanted))
+        if not wanted:
+            return
+        stop = min(self.page_count, wanted[-1] + 1 + PDF_READAHEAD_PAGES)
+        for page in [*wanted, *range(wanted[-1] + 1, stop)]:
+            if page not in self.pages:
+                self.pages[page] = extract_page(doc[page])
+
+    @property
+    def weight(self) -> int:
+        return sum(len(text) for text in self.pages.values())
+
+
+def line_offsets(data: bytes) -> np.ndarray:
+    """Start offset of every line plus the end offset of the last one.
+
+    Lines end at ``\\n``, ``\\r\\n`` or a lone ``\\r``, as in text-mode
+    iteration, so ``len(offsets) - 1`` is the line count ``open()`` sees.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    newlines = buffer == 10
+    returns = buffer == 13
+    returns[:-1] &= ~newlines[1:]
+    ends = np.flatnonzero(newlines | returns) + 1
+    offsets = [np.zeros(1, dtype=np.int64), ends.astype(np.int64)]
+    if len(data) and (not len(ends) or ends[-1] != len(data)):
+        offsets.append(np.array([len(data)], dtype=np.int64))
+    return np.concatenate(offsets)
+
+
+def file_key(path: os.PathLike | str, stat: os.stat_result) -> tuple:
+    return (os.fspath(path), stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _weight(value: Any) -> int:
+    if isinstance(value, PdfText):
+        return value.weight
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(len(item) for item in value)
+    return 1
+
+
+class DerivedTextCache:
+    """LRU map of derived document text bounded by approximate size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store (or re-weigh, after a ``PdfText`` grew) one entry."""
+        weight = _weight(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if weight > self.max_bytes:
+                return
+            self._entries[key] = (value, weight)
+            self._bytes += weight
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_cache: DerivedTextCache | None = None
+
+
+def derived_text_cache() -> DerivedTextCache:
+    global _cache
+    if _cache is None:
+        from cognitrix.config import settings
+
+        _cache = DerivedTextCache(int(settings.read_cache_mb * 1024 * 1024))
+    return _cache
+
+
+def set_derived_text_cache(cache: DerivedTextCache | None) -> None:
+    """Install a cache (tests); None restores the settings-sized default."""
+    global _cache
+    _cache = cache
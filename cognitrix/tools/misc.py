@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import contextvars
 import fnmatch
+import hashlib
 import html
 import logging
+import mmap
 import os
 import re
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -30,6 +34,7 @@ from cognitrix.config import settings
 from cognitrix.media import document_storage
 from cognitrix.media.document_capabilities import storage_record
 from cognitrix.media.types import MediaAccessError, MediaValidationError
+from cognitrix.tools import derived_text, search_index
 from cognitrix.tools.tool import tool
 from cognitrix.tools.utils import (
     DocumentCapability,
@@ -61,6 +66,10 @@ MAX_SEARCH_ENTRIES = 5_000
 MAX_SEARCH_DIRECTORIES = 1_000
 MAX_SEARCH_SECONDS = 5.0
 MAX_REGEX_MATCH_SECONDS = 0.02
+MAX_SEARCH_CONTEXT_LINES = 20
+MAX_SEARCH_WORKERS = 8
+# Whole-buffer scans run over line-aligned windows of about this many chars.
+SEARCH_WINDOW_CHARS = 256 * 1024
 
 
 def _truncate_output_line(value: str) -> str:
@@ -124,57 +133,125 @@ class _SearchEntry:
     is_directory: bool
 
 
-def _bounded_search_lines(
-    stream,
-    byte_budget: int,
-    budget: _SearchBudget | None = None,
-):
-    """Yield bounded decoded lines and the bytes consumed for each line."""
-    remaining = max(0, byte_budget)
-    line_number = 0
-    while remaining:
-        if budget is not None and not budget.within_deadline():
-            return
-        read_limit = min(MAX_FILE_LINE_CHARS + 2, remaining)
-        first = stream.readline(read_limit)
-        if not first:
+@dataclass
+class _FileSearch:
+    matches: list[dict] = field(default_factory=list)
+    timed_out: bool = False
+
+
+def _map_search_text(path: Path, byte_limit: int) -> str:
+    """Decode up to ``byte_limit`` bytes of a file through a read-only mmap."""
+    with open(path, 'rb') as stream:
+        try:
+            mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files and special filesystems cannot be mapped.
+            return stream.read(byte_limit).decode('utf-8', errors='replace')
+        with mapped, memoryview(mapped) as view, view[:byte_limit] as window:
+            text = str(window, 'utf-8', 'replace')
+    # Line ends are matched as \n only, as the per-line reader stripped \r\n.
+    return text.replace('\r\n', '\n') if '\r' in text else text
+
+
+def _context_lines(text: str, start: int, end: int, count: int, line_number: int):
+    """``count`` lines before the line at ``start`` and after the one ending at ``end``."""
+    before = []
+    cursor = start
+    for offset in range(1, count + 1):
+        if cursor == 0:
+            break
+        previous = text.rfind('\n', 0, cursor - 1) + 1
+        before.append((line_number - offset, _truncate_output_line(text[previous:cursor - 1])))
+        cursor = previous
+    after = []
+    cursor = end
+    for offset in range(1, count + 1):
+        if cursor >= len(text) or (cursor == len(text) - 1 and text[cursor] == '\n'):
             break
+        following = text.find('\n', cursor + 1)
+        following = len(text) if following < 0 else following
+        after.append((line_number + offset, _truncate_output_line(text[cursor + 1:following])))
+        cursor = following
+    return list(reversed(before)), after
 
-        remaining -= len(first)
-        line_number += 1
-        line_bytes = len(first)
-        complete = (
-            first.endswith(b'\n')
-            or len(first) < read_limit
-            or remaining == 0
-        )
-        content = first.rstrip(b'\r\n')
-        prefix = content[:MAX_FILE_LINE_CHARS]
-        truncated = len(content) > MAX_FILE_LINE_CHARS or not complete
-
-        while not complete and remaining:
-            if budget is not None and not budget.within_deadline():
-                return
-            discard_limit = min(64 * 1024, remaining)
-            discarded = stream.readline(discard_limit)
-            if not discarded:
-                complete = True
-                break
-            remaining -= len(discarded)
-            line_bytes += len(discarded)
-            complete = (
-                discarded.endswith(b'\n')
-                or len(discarded) < discard_limit
+
+def _search_file(
+    path: Path,
+    byte_limit: int,
+    compiled_pattern,
+    budget: _SearchBudget,
+    *,
+    max_matches: int,
+    context: int,
+    stop: threading.Event,
+) -> _FileSearch:
+    """Search one mapped file, reporting at most one match per line.
+
+    Candidates come from whole-window regex scans; each candidate line is then
+    confirmed against its first ``MAX_FILE_LINE_CHARS`` chars, so results match
+    the per-line contract and no regex ever sees an unbounded line.
+    """
+    result = _FileSearch()
+    if stop.is_set():
+        return result
+    try:
+        text = _map_search_text(path, byte_limit)
+    except (OSError, UnicodeDecodeError):
+        return result
+    position = 0
+    line_number = 1
+    line_start = 0
+    while position < len(text) and not stop.is_set():
+        if not budget.within_deadline():
+            return result
+        window_end = text.rfind('\n', position, position + SEARCH_WINDOW_CHARS) + 1
+        if window_end <= position or position + SEARCH_WINDOW_CHARS >= len(text):
+            window_end = text.find('\n', position + SEARCH_WINDOW_CHARS)
+            window_end = len(text) if window_end < 0 else window_end + 1
+        timeout = MAX_REGEX_MATCH_SECONDS * max(1, (window_end - position) // MAX_FILE_LINE_CHARS)
+        try:
+            candidate = compiled_pattern.search(
+                text[position:window_end],
+                timeout=min(timeout, max(MAX_REGEX_MATCH_SECONDS, budget.deadline - time.monotonic())),
+                concurrent=True,
             )
+        except TimeoutError:
+            result.timed_out = budget.within_deadline()
+            return result
+        if candidate is None:
+            position = window_end
+            continue
 
-        search_text = prefix.decode('utf-8', errors='replace')
-        display_text = search_text
-        if truncated:
-            omitted = max(1, line_bytes - len(prefix))
-            display_text += (
-                f'... [line truncated; at least {omitted} bytes omitted]'
+        found = position + candidate.start()
+        newline = text.rfind('\n', line_start, found)
+        line_number += text.count('\n', line_start, found)
+        if newline >= 0:
+            line_start = newline + 1
+        line_end = text.find('\n', line_start)
+        line_end = len(text) if line_end < 0 else line_end
+        line = text[line_start:line_end]
+        try:
+            confirmed = compiled_pattern.search(
+                line[:MAX_FILE_LINE_CHARS],
+                timeout=MAX_REGEX_MATCH_SECONDS,
+                concurrent=True,
             )
-        yield line_number, search_text, display_text, line_bytes
+        except TimeoutError:
+            result.timed_out = True
+            return result
+        if confirmed:
+            before, after = _context_lines(text, line_start, line_end, context, line_number)
+            result.matches.append({
+                'file': str(path),
+                'line': line_number,
+                'content': _truncate_output_line(line),
+                'before': before,
+                'after': after,
+            })
+            if len(result.matches) >= max_matches:
+                return result
+        position = line_end + 1
+    return result
 
 
 class ManagedUploadAccessError(ValueError):
@@ -307,6 +384,39 @@ def _collect_search_entries(
     return collected
 
 
+def _authorize_search_path(value: str) -> Path | None:
+    try:
+        return _resolve_tool_path(value, allow_upload_root=True)
+    except (ManagedUploadAccessError, PathEscapesRoot):
+        return None
+
+
+def _search_index_snapshot() -> search_index.IndexSnapshot | None:
+    """The tools root's index when enabled and swept at least once."""
+    index = search_index.index_for(Path(settings.tools_root).expanduser().resolve())
+    if index is None:
+        return None
+    return index.current(_authorize_search_path)
+
+
+def _indexed_search_files(
+    snapshot: search_index.IndexSnapshot,
+    root: Path,
+    pattern: str,
+    exclude: str | None,
+):
+    """Files the index cannot rule out, re-authorized before they are read."""
+    for candidate in snapshot.candidates(root, pattern):
+        if exclude and any(
+            fnmatch.fnmatch(part, exclude)
+            for part in candidate.relative_to(root).parts[:-1]
+        ):
+            continue
+        authorized = _authorize_search_path(os.fspath(candidate))
+        if authorized is not None:
+            yield authorized
+
+
 def _pyautogui():
     """Import pyautogui lazily. It (and its tkinter/cv2 deps) added ~0.15s+ to
     every startup and can crash on import in a headless server/worker, yet is
@@ -382,9 +492,56 @@ def _bounded_pdf_pages(page_range: str | None, total_pages: int) -> tuple[list[i
     return requested[:MAX_PDF_PAGES_PER_READ], len(requested) > MAX_PDF_PAGES_PER_READ
 
 
-def _render_pdf(doc, display_name: str, page_range: str | None = None) -> str:
+def _pdf_page_text(page) -> str:
+    return (
+        page.get_text('text')
+        .strip()
+        .encode('ascii', 'ignore')
+        .decode('ascii')
+    )
+
+
+def _pdf_text(key, page_range: str | None, open_document) -> derived_text.PdfText:
+    """Cached page text covering ``page_range``; opens the PDF only on a miss."""
+    cache = derived_text.derived_text_cache()
+    text = cache.get(key)
+    if text is not None:
+        pages, _ = _bounded_pdf_pages(page_range, text.page_count)
+        if not text.missing(pages):
+            return text
+    doc = open_document()
     try:
-        total_pages = len(doc)
+        if text is None:
+            text = derived_text.PdfText(len(doc))
+        pages, _ = _bounded_pdf_pages(page_range, text.page_count)
+        text.extract(doc, pages, _pdf_page_text)
+    finally:
+        doc.close()
+    cache.put(key, text)
+    return text
+
+
+def _cached_pdf_render(key, display_name: str, page_range: str | None) -> str | None:
+    """Render from cached page text, or None when any page is missing."""
+    text = derived_text.derived_text_cache().get(key)
+    if text is None:
+        return None
+    try:
+        pages, _ = _bounded_pdf_pages(page_range, text.page_count)
+    except ValueError as exc:
+        return f'Error reading PDF: {exc}'
+    if text.missing(pages):
+        return None
+    return _render_pdf(text, display_name, page_range)
+
+
+def _render_pdf(
+    text: derived_text.PdfText,
+    display_name: str,
+    page_range: str | None = None,
+) -> str:
+    try:
+        total_pages = text.page_count
         pages, limited = _bounded_pdf_pages(page_range, total_pages)
         if not pages:
             return 'Error: page_range selected no pages'
@@ -405,22 +562,16 @@ def _render_pdf(doc, display_name: str, page_range: str | None = None) -> str:
             (MAX_TOOL_OUTPUT_CHARS - 2_000) // max(1, len(pages)),
         )
         for page_number in pages:
-            text = (
-                doc[page_number]
-                .get_text('text')
-                .strip()
-                .encode('ascii', 'ignore')
-                .decode('ascii')
-            )
+            page_text = text.pages[page_number]
             lines.append(f'### Page {page_number + 1}')
-            if not text:
+            if not page_text:
                 lines.append('*(no text content; possibly a scanned/image page)*')
-            elif len(text) <= per_page_limit:
-                lines.append(text)
+            elif len(page_text) <= per_page_limit:
+                lines.append(page_text)
             else:
-                omitted = len(text) - per_page_limit
+                omitted = len(page_text) - per_page_limit
                 lines.append(
-                    text[:per_page_limit]
+                    page_text[:per_page_limit]
                     + f'\n[Page text truncated; {omitted} chars omitted]'
                 )
             lines.append('')
@@ -440,15 +591,15 @@ def _read_pdf(path: Path, page_range: str | None = None) -> str:
     except ImportError:
         return "Error: PyMuPDF is required to read PDF files.\nInstall with: pip install pymupdf"
 
-    doc = None
     try:
-        doc = fitz.open(str(path))
-        return _render_pdf(doc, path.name, page_range)
+        text = _pdf_text(
+            derived_text.file_key(path, path.stat()),
+            page_range,
+            lambda: fitz.open(str(path)),
+        )
+        return _render_pdf(text, path.name, page_range)
     except Exception as exc:
         return f'Error reading PDF: {exc}'
-    finally:
-        if doc is not None:
-            doc.close()
 
 
 def _read_pdf_bytes(
@@ -462,15 +613,16 @@ def _read_pdf_bytes(
     except ImportError:
         return "Error: PyMuPDF is required to read PDF files.\nInstall with: pip install pymupdf"
 
-    doc = None
     try:
-        doc = fitz.open(stream=content, filetype='pdf')
-        return _render_pdf(doc, display_name, page_range)
+        # Keyed like managed documents, whose capabilities pin this digest.
+        text = _pdf_text(
+            ('sha256', hashlib.sha256(content).hexdigest()),
+            page_range,
+            lambda: fitz.open(stream=content, filetype='pdf'),
+        )
+        return _render_pdf(text, display_name, page_range)
     except Exception as exc:
         return f'Error reading PDF: {exc}'
-    finally:
-        if doc is not None:
-            doc.close()
 
 
 def _read_managed_document(
@@ -481,23 +633,33 @@ def _read_managed_document(
     show_line_numbers: bool,
     page_range: str | None,
 ) -> str:
-    try:
-        content = document_storage.read_document_sync(storage_record(capability))
-    except (MediaAccessError, MediaValidationError) as exc:
-        return f'Error: {exc}'
+    display_name = capability.filename or capability.storage_key
     if capability.mime_type == 'application/pdf':
-        return _read_pdf_bytes(
-            content,
-            capability.filename or capability.storage_key,
-            page_range,
+        cached = _cached_pdf_render(
+            ('sha256', capability.sha256), display_name, page_range
         )
+        if cached is not None:
+            return cached
+        try:
+            content = document_storage.read_document_sync(storage_record(capability))
+        except (MediaAccessError, MediaValidationError) as exc:
+            return f'Error: {exc}'
+        return _read_pdf_bytes(content, display_name, page_range)
     if start_line < 1:
         start_line = 1
     if end_line is not None and start_line > end_line:
         return f'Error: start_line ({start_line}) > end_line ({end_line})'
 
-    text = content.decode('utf-8', errors='replace')
-    lines = text.splitlines()
+    cache = derived_text.derived_text_cache()
+    lines_key = ('lines', capability.sha256)
+    lines = cache.get(lines_key)
+    if lines is None:
+        try:
+            content = document_storage.read_document_sync(storage_record(capability))
+        except (MediaAccessError, MediaValidationError) as exc:
+            return f'Error: {exc}'
+        lines = tuple(content.decode('utf-8', errors='replace').splitlines())
+        cache.put(lines_key, lines)
     total_lines = len(lines)
     if start_line > total_lines:
         return f'Error: start_line ({start_line}) is past end of file ({total_lines})'
@@ -518,7 +680,7 @@ def _read_managed_document(
         selected_chars = projected
     shown_end = start_line + len(selected) - 1
     value = (
-        f'File: {capability.filename or capability.storage_key}\n'
+        f'File: {display_name}\n'
         f'Lines: {start_line}-{shown_end} of {total_lines}\n\n'
         + '\n'.join(selected)
     )
@@ -592,34 +754,34 @@ def Read(file_path: str, start_line: int = 1, end_line: int | None = None, show_
 
         selected: list[str] = []
         selected_chars = 0
-        total_lines = 0
         last_selected = start_line - 1
         resume_line: int | None = None
         payload_budget = MAX_TOOL_OUTPUT_CHARS - 1_000
-        with open(path, encoding='utf-8', errors='replace') as f:
-            for line_number, line in enumerate(f, 1):
-                total_lines = line_number
-                if line_number < start_line:
-                    continue
-                if end_line is not None and line_number > end_line:
-                    continue
-                if resume_line is not None:
-                    continue
-                rendered = _truncate_output_line(line)
+        cache = derived_text.derived_text_cache()
+        with open(path, 'rb') as f:
+            # Cached line offsets turn a paged read into one seek.
+            offsets_key = derived_text.file_key(path, os.fstat(f.fileno()))
+            offsets = cache.get(offsets_key)
+            if offsets is None:
+                offsets = derived_text.line_offsets(f.read())
+                cache.put(offsets_key, offsets)
+            total_lines = len(offsets) - 1
+            if start_line > total_lines:
+                return f"Error: start_line ({start_line}) is past end of file ({total_lines})"
+            f.seek(int(offsets[start_line - 1]))
+            for line_number in range(start_line, min(total_lines, end_line or total_lines) + 1):
+                raw = f.read(int(offsets[line_number] - offsets[line_number - 1]))
+                rendered = _truncate_output_line(raw.decode('utf-8', errors='replace'))
                 if show_line_numbers:
                     rendered = f'{line_number:6d}: {rendered}'
                 projected = selected_chars + len(rendered) + (1 if selected else 0)
                 if projected > payload_budget:
-                    if resume_line is None:
-                        resume_line = line_number
-                    continue
+                    resume_line = line_number
+                    break
                 selected.append(rendered)
                 selected_chars = projected
                 last_selected = line_number
 
-        if start_line > total_lines:
-            return f"Error: start_line ({start_line}) is past end of file ({total_lines})"
-
         shown_end = last_selected if selected else min(total_lines, end_line or total_lines)
         value = (
             f'File: {path}\nLines: {start_line}-{shown_end} of {total_lines}\n\n'
@@ -777,7 +939,8 @@ def Grep(pattern: str, path: str = ".", include: str | None = None, exclude: str
         budget = _SearchBudget(time.monotonic() + MAX_SEARCH_SECONDS)
         results = []
         limits_hit: set[str] = set()
-        flags = regex_engine.IGNORECASE if ignore_case else 0
+        # ^ and $ keep their per-line meaning in whole-buffer scans.
+        flags = regex_engine.MULTILINE | (regex_engine.IGNORECASE if ignore_case else 0)
 
         try:
             compiled_pattern = regex_engine.compile(pattern, flags)
@@ -790,78 +953,85 @@ def Grep(pattern: str, path: str = ".", include: str | None = None, exclude: str
         if search_path.is_file():
             files_to_search = [search_path]
         else:
+            snapshot = _search_index_snapshot()
+            if snapshot is not None:
+                candidates = _indexed_search_files(snapshot, search_path, pattern, exclude)
+            else:
+                candidates = (
+                    entry.path
+                    for entry in _collect_search_entries(
+                        search_path,
+                        budget,
+                        recursive=True,
+                        exclude_directory=exclude,
+                    )
+                    if not entry.is_directory
+                )
             enumerated_files = 0
-            entries = _collect_search_entries(
-                search_path,
-                budget,
-                recursive=True,
-                exclude_directory=exclude,
-            )
-            for entry in entries:
-                if entry.is_directory:
-                    continue
+            for candidate in candidates:
                 if enumerated_files >= MAX_SEARCH_FILES:
                     limits_hit.add(
                         f'{MAX_SEARCH_FILES}-file enumeration limit'
                     )
                     break
                 enumerated_files += 1
-                name = entry.path.name
+                name = candidate.name
                 if include and not fnmatch.fnmatch(name, include):
                     continue
                 if exclude and fnmatch.fnmatch(name, exclude):
                     continue
-                files_to_search.append(entry.path)
+                files_to_search.append(candidate)
 
+        # Reserve each file's bytes in enumeration order, then search the
+        # admitted files on a worker pool; results keep enumeration order.
+        admitted: list[tuple[Path, int]] = []
         total_scanned_bytes = 0
         for file_path in files_to_search:
-            if not budget.within_deadline():
-                break
             try:
                 file_size = file_path.stat().st_size
-                if file_size > MAX_SEARCH_FILE_BYTES:
-                    limits_hit.add(
-                        f'{MAX_SEARCH_FILE_BYTES}-byte per-file limit'
-                    )
-                    continue
-                remaining_total = MAX_SEARCH_TOTAL_BYTES - total_scanned_bytes
-                if file_size > remaining_total:
-                    limits_hit.add(
-                        f'{MAX_SEARCH_TOTAL_BYTES}-byte total scan limit'
-                    )
-                    continue
-
-                with open(file_path, 'rb') as f:
-                    for (
-                        line_num,
-                        search_line,
-                        display_line,
-                        line_bytes,
-                    ) in _bounded_search_lines(f, file_size, budget):
-                        total_scanned_bytes += line_bytes
-                        try:
-                            matched = compiled_pattern.search(
-                                search_line,
-                                timeout=MAX_REGEX_MATCH_SECONDS,
-                            )
-                        except TimeoutError:
-                            return (
-                                'Error: regular expression timed out; '
-                                'use a simpler or more specific pattern'
-                            )
-                        if matched:
-                            results.append({
-                                'file': str(file_path),
-                                'line': line_num,
-                                'content': display_line,
-                            })
-                            if len(results) >= max_results:
-                                break
-            except (OSError, UnicodeDecodeError):
+            except OSError:
                 continue
+            if file_size > MAX_SEARCH_FILE_BYTES:
+                limits_hit.add(
+                    f'{MAX_SEARCH_FILE_BYTES}-byte per-file limit'
+                )
+                continue
+            if file_size > MAX_SEARCH_TOTAL_BYTES - total_scanned_bytes:
+                limits_hit.add(
+                    f'{MAX_SEARCH_TOTAL_BYTES}-byte total scan limit'
+                )
+                continue
+            total_scanned_bytes += file_size
+            admitted.append((file_path, file_size))
 
-            if len(results) >= max_results:
-                break
+        context = max(0, min(int(context), MAX_SEARCH_CONTEXT_LINES))
+        stop = threading.Event()
+
+        def search(item: tuple[Path, int]) -> _FileSearch:
+            return _search_file(
+                item[0],
+                item[1],
+                compiled_pattern,
+                budget,
+                max_matches=max_results,
+                context=context,
+                stop=stop,
+            )
+
+        workers = max(1, min(MAX_SEARCH_WORKERS, os.cpu_count() or 1, len(admitted)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='grep') as pool:
+            try:
+                for found in pool.map(search, admitted):
+                    if found.timed_out:
+                        return (
+                            'Error: regular expression timed out; '
+                            'use a simpler or more specific pattern'
+                        )
+                    results.extend(found.matches[:max_results - len(results)])
+                    if len(results) >= max_results or not budget.within_deadline():
+                        break
+            finally:
+                stop.set()
 
         if budget.limit_reason:
             limits_hit.add(budget.limit_reason)
@@ -875,7 +1045,11 @@ def Grep(pattern: str, path: str = ".", include: str | None = None, exclude: str
         for r in results:
             if context > 0:
                 output.append(f"\n--- {r['file']} (line {r['line']}) ---")
+            for line_num, line in r['before']:
+                output.append(f"{r['file']}-{line_num}- {line}")
             output.append(f"{r['file']}:{r['line']}: {r['content']}")
+            for line_num, line in r['after']:
+                output.append(f"{r['file']}-{line_num}- {line}")
 
         return _hard_cap_output(
             '\n'.join(output) + limit_note,
@@ -931,11 +1105,18 @@ def Glob(pattern: str, path: str = ".", recursive: bool = True, include_dirs: bo
             pattern = pattern.replace('**', '*')
             recursive = True
 
-        entries = _collect_search_entries(
-            search_path,
-            budget,
-            recursive=recursive,
-        )
+        snapshot = _search_index_snapshot()
+        if snapshot is not None:
+            entries = (
+                _SearchEntry(entry_path, is_directory)
+                for entry_path, is_directory in snapshot.entries(search_path, recursive=recursive)
+            )
+        else:
+            entries = _collect_search_entries(
+                search_path,
+                budget,
+                recursive=recursive,
+            )
         enumerated_candidates = 0
         for entry in entries:
             if entry.is_directory and not include_dirs:
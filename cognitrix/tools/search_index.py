@@ -0,0 +1,488 @@
+"""Persistent trigram index for workspace Grep/Glob.
+
+Opt-in with ``COGNITRIX_SEARCH_INDEX=true``. Each search root gets one index
+under ``<workdir>/search-index/``: the authorized directory listing plus, per
+file, a fixed-size signature of the (ASCII-lowercased) byte trigrams it
+contains. ``Glob`` is answered from the listing and ``Grep`` only scans files
+whose signature holds every trigram its pattern requires; the scan still
+confirms each match, so signature false positives cost time, never results.
+
+The index is refreshed by a background sweep, started at most every
+``COGNITRIX_SEARCH_INDEX_SWEEP_SECONDS``: it re-walks the tree and stats every
+entry, and re-reads only files whose size or mtime changed. Queries do not
+wait for it: a directory whose mtime moved since the sweep is listed again,
+and a file whose size or mtime moved, or that the sweep never saw, is always
+a ``Grep`` candidate. Queries therefore cost stats, not reads. Until the
+first sweep of a process completes (cheap when a stored index is reused)
+callers get ``None`` and search the tree directly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import regex
+
+try:
+    from re import _parser as _sre_parser
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse as _sre_parser
+
+logger = logging.getLogger('cognitrix.log')
+
+INDEX_VERSION = 2
+SIGNATURE_BITS = 8192
+SIGNATURE_BYTES = SIGNATURE_BITS // 8
+# Bytes read per file when building a signature; larger files always match.
+MAX_INDEXED_FILE_BYTES = 10 * 1024 * 1024
+
+_FULL_SIGNATURE = b'\xff' * SIGNATURE_BYTES
+_EMPTY_SIGNATURE = bytes(SIGNATURE_BYTES)
+_REPEATS = tuple(
+    getattr(_sre_parser, name)
+    for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+    if hasattr(_sre_parser, name)
+)
+
+Authorize = Callable[[str], 'Path | None']
+Listing = list[tuple[Path, bool]]
+
+
+def _buckets(data: bytes) -> np.ndarray:
+    """Signature bit of every trigram in ``data`` (ASCII-lowercased)."""
+    if len(data) < 3:
+        return np.empty(0, dtype=np.uint32)
+    values = np.frombuffer(data.lower(), dtype=np.uint8).astype(np.uint32)
+    trigrams = (values[:-2] << 16) | (values[1:-1] << 8) | values[2:]
+    hashed = (trigrams.astype(np.uint64) * 0x9E3779B1) & 0xFFFFFFFF
+    return (hashed >> (32 - SIGNATURE_BITS.bit_length() + 1)).astype(np.uint32)
+
+
+def signature(data: bytes) -> bytes:
+    bits = np.zeros(SIGNATURE_BITS, dtype=bool)
+    bits[_buckets(data)] = True
+    return np.packbits(bits, bitorder='little').tobytes()
+
+
+def required_literals(pattern: str) -> list[str]:
+    """ASCII literal runs (3+ chars) every match of ``pattern`` must contain.
+
+    Alternations, classes and optional repeats end a run. ``Grep`` compiles
+    with ``regex``, but the runs come from the stdlib parser, so a pattern
+    either parser rejects or might read differently (``regex``'s fuzzy
+    ``{e<=1}`` is a literal brace to ``re``; ``[[`` is a nested set only to
+    ``regex``) requires nothing, which makes every file a candidate.
+    """
+    try:
+        regex.compile(pattern)
+        with warnings.catch_warnings():
+            # re warns where it parses syntax regex gives another meaning.
+            warnings.simplefilter('error')
+            parsed = _sre_parser.parse(pattern)
+    except Exception:
+        return []
+    if _has_literal_brace(parsed):
+        return []
+    runs: list[str] = []
+    _collect_runs(parsed, runs)
+    return runs
+
+
+def _has_literal_brace(items) -> bool:
+    for op, argument in items:
+        if op is _sre_parser.LITERAL and argument == ord('{'):
+            return True
+        if any(_has_literal_brace(nested) for nested in _subpatterns(argument)):
+            return True
+    return False
+
+
+def _subpatterns(argument) -> Iterator:
+    if isinstance(argument, _sre_parser.SubPattern):
+        yield argument
+    elif isinstance(argument, (tuple, list)):
+        for item in argument:
+            yield from _subpatterns(item)
+
+
+def _collect_runs(items, runs: list[str]) -> None:
+    current: list[str] = []
+
+    def close() -> None:
+        if len(current) >= 3:
+            runs.append(''.join(current))
+        current.clear()
+
+    for op, argument in items:
+        if op is _sre_parser.LITERAL and 0 < argument < 128 and argument not in (10, 13):
+            current.append(chr(argument))
+            continue
+        close()
+        if op is _sre_parser.SUBPATTERN:
+            _collect_runs(argument[-1], runs)
+        elif op in _REPEATS and argument[0] >= 1:
+            _collect_runs(argument[2], runs)
+    close()
+
+
+def _list_directory(directory: str | Path, authorize: Authorize) -> tuple[int | None, Listing]:
+    """``directory``'s mtime and authorized entries, as ``_collect_search_entries`` orders them.
+
+    The mtime is taken before the listing, so an entry added while listing
+    leaves it stale rather than hiding the entry.
+    """
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda item: item.name.casefold())
+    except OSError:
+        return None, []
+    listing: Listing = []
+    for entry in entries:
+        try:
+            is_directory = entry.is_dir(follow_symlinks=False)
+            is_file = entry.is_file(follow_symlinks=True)
+        except OSError:
+            continue
+        if not is_directory and not is_file:
+            continue
+        authorized = authorize(entry.path)
+        if authorized is not None:
+            listing.append((authorized, is_directory))
+    return mtime_ns, listing
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """One sweep's listing, in the order ``_collect_search_entries`` walks.
+
+    ``children`` holds each directory's listing as positions into ``paths``;
+    ``directory_mtimes`` says whether that listing still holds.
+    """
+
+    root: Path
+    paths: tuple[str, ...]
+    is_directory: np.ndarray
+    sizes: np.ndarray
+    mtimes: np.ndarray
+    signatures: np.ndarray
+    children: dict[str, tuple[int, ...]]
+    directory_mtimes: dict[str, int]
+    positions: dict[str, int]
+    authorize: Authorize
+    swept_at: float
+
+    def _listing(self, directory: str) -> list[tuple[Path, bool, int | None]]:
+        stored = self.children.get(directory)
+        if stored is not None:
+            try:
+                unchanged = os.stat(directory).st_mtime_ns == self.directory_mtimes.get(directory)
+            except OSError:
+                return []
+            if unchanged:
+                return [(Path(self.paths[position]), bool(self.is_directory[position]), position)
+                        for position in stored]
+        _, listing = _list_directory(directory, self.authorize)
+        return [(path, is_directory, self.positions.get(str(path))) for path, is_directory in listing]
+
+    def _walk(self, directory: Path, *, recursive: bool) -> Iterator[tuple[Path, bool, int | None]]:
+        """Depth-first from ``directory``; only directories that changed are listed again."""
+        pending = [str(directory)]
+        while pending:
+            child_directories: list[str] = []
+            for path, is_directory, position in self._listing(pending.pop()):
+                yield path, is_directory, position
+                if is_directory and recursive:
+                    child_directories.append(str(path))
+            pending.extend(reversed(child_directories))
+
+    def _changed(self, path: Path, position: int) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size != self.sizes[position] or stat.st_mtime_ns != self.mtimes[position]
+
+    def entries(self, directory: Path, *, recursive: bool = True) -> Iterator[tuple[Path, bool]]:
+        for path, is_directory, _ in self._walk(directory, recursive=recursive):
+            yield path, is_directory
+
+    def candidates(self, directory: Path, pattern: str) -> Iterator[Path]:
+        """Files under ``directory`` that may match: every required trigram, or not indexed as swept."""
+        matches = ~self.is_directory
+        wanted = np.unique(np.concatenate(
+            [_buckets(run.encode('ascii')) for run in required_literals(pattern)]
+            or [np.empty(0, dtype=np.uint32)]
+        ))
+        for bucket in wanted:
+            byte, bit = divmod(int(bucket), 8)
+            matches &= (self.signatures[:, byte] & (1 << bit)) != 0
+        for path, is_directory, position in self._walk(directory, recursive=True):
+            if is_directory:
+                continue
+            if position is None or self.is_directory[position] or matches[position] or self._changed(path, position):
+                yield path
+
+
+@dataclass(frozen=True)
+class _Stored:
+    is_directory: bool
+    size: int
+    mtime_ns: int
+    signature: bytes
+
+
+_DIRECTORY = _Stored(True, 0, 0, _EMPTY_SIGNATURE)
+
+
+class SearchIndex:
+    """The index of one search root; sweeps run on a background thread."""
+
+    def __init__(
+        self,
+        root: Path,
+        store: Path,
+        *,
+        sweep_seconds: float,
+        max_entries: int,
+    ):
+        self.root = root
+        self.store = store
+        self.sweep_seconds = sweep_seconds
+        self.max_entries = max_entries
+        self._snapshot: IndexSnapshot | None = None
+        self._stored: dict[str, _Stored] | None = None
+        self._lock = threading.Lock()
+        self._sweeping: threading.Thread | None = None
+        self._requested_at = 0.0
+
+    def current(self, authorize: Authorize) -> IndexSnapshot | None:
+        """The latest snapshot, starting a sweep when it is due."""
+        now = time.monotonic()
+        with self._lock:
+            due = now - self._requested_at >= self.sweep_seconds
+            if due and (self._sweeping is None or not self._sweeping.is_alive()):
+                self._requested_at = now
+                self._sweeping = threading.Thread(
+                    target=self._sweep_safely,
+                    args=(authorize,),
+                    name='search-index-sweep',
+                    daemon=True,
+                )
+                self._sweeping.start()
+            return self._snapshot
+
+    def wait(self, timeout: float | None = None) -> IndexSnapshot | None:
+        """Block until the running sweep, if any, completes."""
+        sweeping = self._sweeping
+        if sweeping is not None:
+            sweeping.join(timeout)
+        return self._snapshot
+
+    def _sweep_safely(self, authorize: Authorize) -> None:
+        try:
+            self.sweep(authorize)
+        except Exception:
+            logger.warning('Search index sweep failed for %s', self.root, exc_info=True)
+
+    def sweep(self, authorize: Authorize) -> IndexSnapshot | None:
+        """Walk and stat the root, re-reading only files that changed."""
+        started = time.perf_counter()
+        previous = self._stored if self._stored is not None else self._load()
+        current: dict[str, _Stored] = {}
+        updated: dict[str, _Stored] = {}
+        positions: dict[str, int] = {}
+        children: dict[str, tuple[int, ...]] = {}
+        directory_mtimes: dict[str, int] = {}
+        for directory, mtime_ns, listing in self._walk(authorize):
+            if mtime_ns is not None:
+                directory_mtimes[directory] = mtime_ns
+            block: list[int] = []
+            for path, is_directory in listing:
+                if len(current) >= self.max_entries:
+                    logger.warning(
+                        'Search index for %s stopped at %d entries; searches walk the tree',
+                        self.root,
+                        self.max_entries,
+                    )
+                    self._stored = None
+                    self._snapshot = None
+                    return None
+                key = str(path)
+                if key not in current:
+                    entry = self._entry(path, is_directory, previous.get(key))
+                    if entry is None:
+                        continue
+                    if entry != previous.get(key):
+                        updated[key] = entry
+                    positions[key] = len(current)
+                    current[key] = entry
+                block.append(positions[key])
+            children[directory] = tuple(block)
+        removed = previous.keys() - current.keys()
+        if updated or removed:
+            self._save(updated, removed)
+        self._stored = current
+        self._snapshot = IndexSnapshot(
+            root=self.root,
+            paths=tuple(current),
+            is_directory=np.fromiter(
+                (entry.is_directory for entry in current.values()), dtype=bool, count=len(current)
+            ),
+            sizes=np.fromiter((entry.size for entry in current.values()), dtype=np.int64, count=len(current)),
+            mtimes=np.fromiter(
+                (entry.mtime_ns for entry in current.values()), dtype=np.int64, count=len(current)
+            ),
+            signatures=np.frombuffer(
+                b''.join(entry.signature for entry in current.values()), dtype=np.uint8
+            ).reshape(len(current), SIGNATURE_BYTES),
+            children=children,
+            directory_mtimes=directory_mtimes,
+            positions=positions,
+            authorize=authorize,
+            swept_at=time.monotonic(),
+        )
+        logger.debug(
+            'Search index for %s: %d entries, %d re-read in %.3fs',
+            self.root,
+            len(current),
+            sum(not entry.is_directory for entry in updated.values()),
+            time.perf_counter() - started,
+        )
+        return self._snapshot
+
+    def _entry(self, path: Path, is_directory: bool, known: _Stored | None) -> _Stored | None:
+        """``path``'s stored row, reusing ``known`` while size and mtime hold."""
+        if is_directory:
+            return _DIRECTORY
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        if (
+            known is not None
+            and not known.is_directory
+            and known.size == stat.st_size
+            and known.mtime_ns == stat.st_mtime_ns
+        ):
+            return known
+        return _Stored(False, stat.st_size, stat.st_mtime_ns, self._file_signature(path, stat.st_size))
+
+    @staticmethod
+    def _file_signature(path: Path, size: int) -> bytes:
+        if size > MAX_INDEXED_FILE_BYTES:
+            return _FULL_SIGNATURE
+        try:
+            with open(path, 'rb') as stream:
+                return signature(stream.read(MAX_INDEXED_FILE_BYTES))
+        except OSError:
+            return _FULL_SIGNATURE
+
+    def _walk(self, authorize: Authorize) -> Iterator[tuple[str, int | None, Listing]]:
+        """Each directory's listing, depth-first as ``_collect_search_entries``."""
+        pending = [self.root]
+        while pending:
+            current = pending.pop()
+            mtime_ns, listing = _list_directory(current, authorize)
+            yield str(current), mtime_ns, listing
+            pending.extend(reversed([path for path, is_directory in listing if is_directory]))
+
+    def _connect(self) -> sqlite3.Connection:
+        self.store.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.store)
+        connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        meta = dict(connection.execute('SELECT key, value FROM meta'))
+        if meta and (meta.get('version') != str(INDEX_VERSION) or meta.get('root') != str(self.root)):
+            # Rows are updated in place, so a store of another layout or root starts over.
+            with connection:
+                connection.execute('DROP TABLE IF EXISTS entries')
+                connection.execute('DELETE FROM meta')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'path TEXT PRIMARY KEY, is_directory INTEGER NOT NULL, '
+            'size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, signature BLOB NOT NULL)'
+        )
+        return connection
+
+    def _load(self) -> dict[str, _Stored]:
+        try:
+            connection = self._connect()
+        except sqlite3.Error:
+            logger.debug('Could not open search index %s', self.store, exc_info=True)
+            return {}
+        try:
+            meta = dict(connection.execute('SELECT key, value FROM meta'))
+            if meta.get('version') != str(INDEX_VERSION) or meta.get('root') != str(self.root):
+                return {}
+            return {
+                path: _Stored(bool(is_directory), size, mtime_ns, bytes(stored))
+                for path, is_directory, size, mtime_ns, stored in connection.execute(
+                    'SELECT path, is_directory, size, mtime_ns, signature FROM entries'
+                )
+                if len(stored) == SIGNATURE_BYTES
+            }
+        except sqlite3.Error:
+            logger.debug('Could not read search index %s', self.store, exc_info=True)
+            return {}
+        finally:
+            connection.close()
+
+    def _save(self, updated: dict[str, _Stored], removed: Iterable[str]) -> None:
+        """Write new and changed rows, and delete rows of vanished paths."""
+        try:
+            connection = self._connect()
+        except sqlite3.Error:
+            logger.debug('Could not open search index %s', self.store, exc_info=True)
+            return
+        try:
+            with connection:
+                connection.executemany('DELETE FROM entries WHERE path = ?', ((path,) for path in removed))
+                connection.executemany(
+                    'INSERT OR REPLACE INTO entries (path, is_directory, size, mtime_ns, signature) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (
+                        (path, int(entry.is_directory), entry.size, entry.mtime_ns, entry.signature)
+                        for path, entry in updated.items()
+                    ),
+                )
+                connection.executemany(
+                    'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                    (('version', str(INDEX_VERSION)), ('root', str(self.root))),
+                )
+        except sqlite3.Error:
+            logger.warning('Could not persist search index %s', self.store, exc_info=True)
+        finally:
+            connection.close()
+
+
+_indexes: dict[Path, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(root: Path) -> SearchIndex | None:
+    """The process-wide index of ``root``, or None when indexing is off."""
+    from cognitrix.config import settings
+
+    if not settings.search_index:
+        return None
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            digest = hashlib.sha256(str(root).encode('utf-8')).hexdigest()[:16]
+            index = _indexes[root] = SearchIndex(
+                root,
+                settings.workdir / 'search-index' / f'{digest}.sqlite',
+                sweep_seconds=settings.search_index_sweep_seconds,
+                max_entries=settings.search_index_max_entries,
+            )
+        return index
@@ -0,0 +1,140 @@
+"""Merge streamed text deltas before they are framed for a browser.
+
+Providers stream one delta per token or two, and every delta sent to a
+browser costs a JSON encode, an SSE/WebSocket frame and a socket write.
+``DeltaCoalescer`` wraps a turn's output callable: the first delta of a
+burst goes out at once (first-token latency is unchanged), later deltas are
+merged until ``COGNITRIX_STREAM_COALESCE_MS`` passes or
+``COGNITRIX_STREAM_COALESCE_BYTES`` of text accumulate. Any other payload
+(tool events, approvals, errors) flushes the merged text first, so ordering
+is preserved. A window of 0 disables merging.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger('cognitrix.log')
+
+# The shape Session streams for text deltas; anything else is sent as is.
+_DELTA_KEYS = frozenset({'type', 'content', 'action', 'complete'})
+
+Sink = Callable[[Any], Awaitable[Any]]
+
+
+def _is_delta(payload: Any) -> bool:
+    return (
+        isinstance(payload, dict)
+        and payload.keys() <= _DELTA_KEYS
+        and payload.get('complete') is False
+        and isinstance(payload.get('content'), str)
+    )
+
+
+class DeltaCoalescer:
+    """Output callable that merges consecutive text deltas within a window."""
+
+    def __init__(
+        self,
+        sink: Sink,
+        *,
+        window_seconds: float | None = None,
+        max_bytes: int | None = None,
+    ):
+        from cognitrix.config import settings
+
+        self.sink = sink
+        self.window_seconds = (
+            settings.stream_coalesce_ms / 1000 if window_seconds is None else window_seconds
+        )
+        self.max_bytes = settings.stream_coalesce_bytes if max_bytes is None else max_bytes
+        self.deltas = 0
+        self.frames = 0
+        self.bytes = 0
+        self._pending: dict | None = None
+        self._parts: list[str] = []
+        self._pending_bytes = 0
+        self._bursting = False
+        self._timer: asyncio.Task | None = None
+        self._error: BaseException | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Deltas received, frames sent and text bytes sent so far."""
+        return {'deltas': self.deltas, 'frames': self.frames, 'bytes': self.bytes}
+
+    async def __call__(self, payload: Any) -> None:
+        self._raise_timer_error()
+        delta = _is_delta(payload)
+        if delta:
+            self.deltas += 1
+        async with self._lock:
+            if not delta or self.window_seconds <= 0:
+                await self._flush_locked()
+                self._bursting = False
+                await self._send(payload)
+                return
+            if self._pending is not None and any(
+                self._pending.get(key) != payload.get(key) for key in ('type', 'action')
+            ):
+                await self._flush_locked()
+            if not self._bursting:
+                self._bursting = True
+                await self._send(payload)
+                return
+            if self._pending is None:
+                self._pending = payload
+            self._parts.append(payload['content'])
+            self._pending_bytes += len(payload['content'].encode('utf-8'))
+            if self._pending_bytes >= self.max_bytes:
+                await self._flush_locked()
+            elif self._timer is None:
+                self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        async with self._lock:
+            self._timer = None
+            try:
+                await self._flush_locked()
+            except Exception as error:
+                # Surfaced to the producer on its next call.
+                self._error = error
+
+    async def _flush_locked(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        if self._pending is None:
+            return
+        payload = {**self._pending, 'content': ''.join(self._parts)}
+        self._pending = None
+        self._parts = []
+        self._pending_bytes = 0
+        await self._send(payload)
+
+    async def _send(self, payload: Any) -> None:
+        self.frames += 1
+        if isinstance(payload, dict) and isinstance(payload.get('content'), str):
+            self.bytes += len(payload['content'].encode('utf-8'))
+        await self.sink(payload)
+
+    def _raise_timer_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def aclose(self) -> None:
+        """Send any merged text; call once the turn stops producing output."""
+        self._raise_timer_error()
+        async with self._lock:
+            await self._flush_locked()
+            self._bursting = False
+        logger.debug(
+            'Turn output: %d deltas in %d frames (%d bytes)',
+            self.deltas,
+            self.frames,
+            self.bytes,
+        )
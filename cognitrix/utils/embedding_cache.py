@@ -0,0 +1,197 @@
+"""Persistent, content-addressed cache of text embeddings.
+
+Each model variant (name, backend, quantization) gets one append-only file
+of fixed-size records: a 16-byte
+SHA-256 prefix of the text followed by the float32 vector. The file is
+memory-mapped for reads, so a warm cache costs one dict lookup and a row
+copy instead of a model forward pass. An in-process LRU sits in front.
+
+Appends hold an advisory file lock (POSIX) so several processes can share
+one cache directory; a torn trailing record is truncated before the next
+append.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process appends only
+    fcntl = None
+
+logger = logging.getLogger('cognitrix.log')
+
+KEY_BYTES = 16
+LRU_SIZE = 4096
+# encode() keyword arguments that do not change the vectors produced.
+CACHE_SAFE_KWARGS = frozenset({'show_progress_bar'})
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).digest()[:KEY_BYTES]
+
+
+class EmbeddingStore:
+    """Append-only memory-mapped file of (key, float32 vector) records."""
+
+    def __init__(self, path: Path, dim: int):
+        self.path = Path(path)
+        self.dim = dim
+        self.dtype = np.dtype([('key', f'V{KEY_BYTES}'), ('vector', '<f4', (dim,))])
+        self._index: dict[bytes, int] = {}
+        self._rows = 0
+        self._map: np.memmap | None = None
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._refresh()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _refresh(self) -> None:
+        """Index records appended since the last look (by any process)."""
+        try:
+            rows = self.path.stat().st_size // self.dtype.itemsize
+        except FileNotFoundError:
+            return
+        if rows <= self._rows:
+            return
+        self._map = np.memmap(self.path, dtype=self.dtype, mode='r', shape=(rows,))
+        for offset, key in enumerate(self._map['key'][self._rows:rows], start=self._rows):
+            self._index.setdefault(key.tobytes(), offset)
+        self._rows = rows
+
+    def get_many(self, keys: Sequence[bytes]) -> list[np.ndarray | None]:
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                self._refresh()
+            found: list[np.ndarray | None] = []
+            for key in keys:
+                row = self._index.get(key)
+                found.append(None if row is None else np.array(self._map['vector'][row]))
+            return found
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        with self._lock:
+            fresh = {}
+            for key, vector in zip(keys, vectors, strict=True):
+                if key not in self._index:
+                    fresh.setdefault(key, vector)
+            if not fresh:
+                return
+            records = np.empty(len(fresh), dtype=self.dtype)
+            records['key'] = [np.void(key) for key in fresh]
+            records['vector'] = np.asarray(list(fresh.values()), dtype='<f4')
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                size = os.fstat(fd).st_size
+                if size % self.dtype.itemsize:
+                    # A writer died mid-record; drop the torn tail.
+                    os.ftruncate(fd, size - size % self.dtype.itemsize)
+                data = memoryview(records.tobytes())
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            self._refresh()
+
+
+class CachedEmbeddingModel:
+    """Drop-in ``encode`` front for a SentenceTransformer with a persistent cache.
+
+    Only texts never seen before (by this process, or any process sharing
+    the cache directory) reach the model. Other attributes pass through.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        model_name: str,
+        directory: Path,
+        lru_size: int = LRU_SIZE,
+        variant: str = '',
+    ):
+        self.model = model
+        self.model_name = model_name
+        self.variant = variant
+        self.directory = Path(directory)
+        self.lru_size = lru_size
+        self._lru: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._store: EmbeddingStore | None = None
+        self._lock = threading.Lock()
+        dim = getattr(model, 'get_sentence_embedding_dimension', None)
+        dim = dim() if callable(dim) else None
+        if isinstance(dim, int) and dim > 0:
+            self._open_store(dim)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def _open_store(self, dim: int) -> EmbeddingStore:
+        if self._store is None:
+            name = f'{self.model_name}-{self.variant}' if self.variant else self.model_name
+            safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+            self._store = EmbeddingStore(self.directory / f'{safe_name}-{dim}.f32', dim)
+        return self._store
+
+    def encode(self, sentences: str | Sequence[str], batch_size: int = 32, **kwargs: Any) -> np.ndarray:
+        if not CACHE_SAFE_KWARGS.issuperset(kwargs):
+            return self.model.encode(sentences, batch_size=batch_size, **kwargs)
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [text_key(text) for text in texts]
+        vectors: list[np.ndarray | None] = self._lru_get(keys)
+
+        missing = [index for index, vector in enumerate(vectors) if vector is None]
+        if missing and self._store is not None:
+            stored = self._store.get_many([keys[index] for index in missing])
+            for index, vector in zip(missing, stored, strict=True):
+                vectors[index] = vector
+            missing = [index for index in missing if vectors[index] is None]
+        if missing:
+            encoded = np.asarray(
+                self.model.encode([texts[index] for index in missing], batch_size=batch_size, **kwargs),
+                dtype=np.float32,
+            )
+            try:
+                self._open_store(encoded.shape[-1]).put_many([keys[index] for index in missing], encoded)
+            except OSError:
+                logger.warning('Could not persist embeddings for %s', self.model_name, exc_info=True)
+            for index, vector in zip(missing, encoded, strict=True):
+                vectors[index] = vector
+        self._lru_put(keys, vectors)
+
+        if single:
+            return vectors[0].copy()
+        if not vectors:
+            return np.empty((0, self._store.dim if self._store else 0), dtype=np.float32)
+        return np.stack(vectors)
+
+    def _lru_get(self, keys: list[bytes]) -> list[np.ndarray | None]:
+        with self._lock:
+            found: list[np.ndarray | None] = []
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                found.append(vector)
+            return found
+
+    def _lru_put(self, keys: list[bytes], vectors: list[np.ndarray | None]) -> None:
+        with self._lock:
+            for key, vector in zip(keys, vectors, strict=True):
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
@@ -1,43 +1,293 @@
-"""Shared embedding model utilities."""
+"""Shared embedding model utilities.
+
+Models live in a keyed registry: one entry per (model name, backend,
+quantization). The registry is bounded by model count and by the memory
+the loaded weights account for, and drops entries idle for longer than
+``settings.embedding_idle_seconds``: on every acquire, and from a daemon
+timer armed for the next entry to go idle, so a process that stops
+embedding still frees the weights. Callers get a stable handle, so an
+evicted model is simply reloaded on its next use.
+"""
 
 import logging
-from typing import Optional
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
 
 logger = logging.getLogger('cognitrix.log')
 
-_embedding_model_cache: Optional['SentenceTransformer'] = None
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'openvino')
+
+
+@dataclass
+class _LoadedModel:
+    model: Any
+    nbytes: int
+    last_used: float
+
+
+ModelKey = tuple[str, str, bool]
+
+_registry: 'OrderedDict[ModelKey, _LoadedModel]' = OrderedDict()
+_handles: dict[ModelKey, Any] = {}
+_registry_lock = threading.Lock()
+_load_locks: dict[ModelKey, threading.Lock] = {}
+_idle_timer: threading.Timer | None = None
+
+
+def _settings():
+    from cognitrix.config import settings
+
+    return settings
+
+
+# Weight files the ONNX and OpenVINO backends load (OpenVINO: .xml + .bin).
+_WEIGHT_FILE_SUFFIXES = ('.onnx', '.onnx_data', '.xml', '.bin')
+
+
+def _model_bytes(model: Any) -> int:
+    """Resident size of the model's weights.
+
+    torch models are measured from their tensors. ONNX/OpenVINO models hold
+    their weights outside torch, so their size is estimated from the weight
+    files the backend loaded.
+    """
+    total = 0
+    parameters = getattr(model, 'parameters', None)
+    if callable(parameters):
+        try:
+            total = sum(p.numel() * p.element_size() for p in parameters())
+            buffers = getattr(model, 'buffers', None)
+            if callable(buffers):
+                total += sum(b.numel() * b.element_size() for b in buffers())
+        except Exception:
+            total = 0
+    return total or _weight_file_bytes(model)
+
+
+def _weight_file_bytes(model: Any) -> int:
+    """Size on disk of the ONNX/OpenVINO weight files behind ``model``."""
+    try:
+        modules = list(model) if hasattr(model, '__iter__') else [model]
+    except Exception:
+        modules = [model]
+    directories: set[Path] = set()
+    for module in modules:
+        backend_model = getattr(module, 'auto_model', module)
+        for attribute in ('model_path', 'model_save_dir'):
+            location = getattr(backend_model, attribute, None)
+            if location is None:
+                continue
+            location = Path(location)
+            directories.add(location.parent if location.is_file() else location)
+    total = 0
+    for directory in directories:
+        try:
+            total += sum(
+                path.stat().st_size
+                for path in directory.iterdir()
+                if path.suffix in _WEIGHT_FILE_SUFFIXES and path.is_file()
+            )
+        except OSError:
+            continue
+    return total
+
+
+def _load_model(model_name: str, backend: str, quantize: bool) -> Any:
+    from sentence_transformers import SentenceTransformer
+
+    if backend != 'torch':
+        try:
+            return SentenceTransformer(model_name, device='cpu', backend=backend)
+        except Exception as e:
+            # The ONNX/OpenVINO backends need optimum; keep serving on torch.
+            logger.warning(f"Embedding backend {backend} unavailable for {model_name} ({e}); using torch")
+    if not quantize:
+        return SentenceTransformer(model_name)
+    import torch
+
+    model = SentenceTransformer(model_name, device='cpu')
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _evict(keep: ModelKey | None) -> None:
+    """Drop idle entries, then least recently used ones until within bounds."""
+    settings = _settings()
+    now = time.monotonic()
+    for key, entry in list(_registry.items()):
+        if key != keep and now - entry.last_used > settings.embedding_idle_seconds:
+            del _registry[key]
+            logger.info(f"Evicted idle embedding model: {key[0]}")
+    budget = settings.embedding_memory_budget_mb * 1024 * 1024
+    while len(_registry) > 1 and (
+        len(_registry) > settings.embedding_max_models
+        or sum(entry.nbytes for entry in _registry.values()) > budget
+    ):
+        key = next(key for key in _registry if key != keep)
+        del _registry[key]
+        logger.info(f"Evicted embedding model to stay within bounds: {key[0]}")
+
+
+def _schedule_idle_sweep() -> None:
+    """Arm the idle timer for the entry that goes idle first (lock held)."""
+    global _idle_timer
+    if _idle_timer is not None or not _registry:
+        return
+    idle_at = min(entry.last_used for entry in _registry.values()) + _settings().embedding_idle_seconds
+    _idle_timer = threading.Timer(max(0.0, idle_at - time.monotonic()) + 0.01, _idle_sweep)
+    _idle_timer.daemon = True
+    _idle_timer.start()
 
 
-def get_embedding_model(model_name: str = "all-MiniLM-L6-v2"):
+def _idle_sweep() -> None:
+    global _idle_timer
+    with _registry_lock:
+        _idle_timer = None
+        _evict(keep=None)
+        _schedule_idle_sweep()
+
+
+def _acquire(key: ModelKey) -> Any:
+    """Return the loaded model for ``key``, loading it if absent."""
+    with _registry_lock:
+        entry = _registry.get(key)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            _registry.move_to_end(key)
+            _evict(keep=key)
+            return entry.model
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+    with load_lock:
+        with _registry_lock:
+            entry = _registry.get(key)
+            if entry is not None:
+                return entry.model
+        model_name, backend, quantize = key
+        logger.info(f"Loading embedding model: {model_name} ({backend}{', int8' if quantize else ''})")
+        try:
+            model = _load_model(model_name, backend, quantize)
+        except Exception as e:
+            logger.error(f"Failed to load embedding model: {e}")
+            raise
+        with _registry_lock:
+            _registry[key] = _LoadedModel(model, _model_bytes(model), time.monotonic())
+            _evict(keep=key)
+            _schedule_idle_sweep()
+        logger.info(f"Embedding model loaded: {model_name}")
+        return model
+
+
+class EmbeddingModelHandle:
+    """Stable reference to a registry entry; reloads the model after eviction."""
+
+    def __init__(self, key: ModelKey):
+        self.key = key
+
+    def encode(self, *args: Any, **kwargs: Any) -> Any:
+        return _acquire(self.key).encode(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_acquire(self.key), name)
+
+
+def _with_embedding_cache(model, key: ModelKey):
+    """Front the model with the persistent embedding cache unless disabled.
+
+    The backend and quantization are part of the cache name: their vectors
+    differ from the plain torch model's, so variants never share a file.
     """
-    Get or create singleton embedding model.
-    
-    Uses module-level caching to ensure only one instance
-    of the embedding model is loaded across all components.
-    
+    if os.environ.get('DISABLE_EMBEDDING_CACHE', '').lower() == 'true':
+        return model
+    from cognitrix.config import COGNITRIX_WORKDIR
+    from cognitrix.utils.embedding_cache import CachedEmbeddingModel
+
+    model_name, backend, quantize = key
+    variant = f"{backend}-int8" if quantize else backend
+    return CachedEmbeddingModel(model, model_name, COGNITRIX_WORKDIR / 'embedding_cache', variant=variant)
+
+
+def get_embedding_model(
+    model_name: str = "all-MiniLM-L6-v2",
+    backend: str | None = None,
+    quantize: bool | None = None,
+):
+    """
+    Get the shared embedding model for ``model_name``.
+
+    Every caller asking for the same model, backend and quantization gets
+    the same object; different model names no longer share whichever loaded
+    first. Its encode() goes through the on-disk embedding cache, so a text
+    already embedded by any caller (or an earlier process) skips the model.
+
     Args:
         model_name: Name of the sentence transformer model
-        
+        backend: 'torch', 'onnx' or 'openvino' (default: settings.embedding_backend)
+        quantize: int8 dynamic quantization for torch CPU inference
+            (default: settings.embedding_quantize)
+
     Returns:
-        SentenceTransformer instance
+        An encode()-compatible handle onto the SentenceTransformer
     """
-    global _embedding_model_cache
+    settings = _settings()
+    backend = (backend or settings.embedding_backend).lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    quantize = settings.embedding_quantize if quantize is None else quantize
+    key = (model_name, backend, bool(quantize and backend == 'torch'))
+
+    # Load eagerly so configuration errors surface to the caller.
+    _acquire(key)
+    with _registry_lock:
+        handle = _handles.get(key)
+    if handle is None:
+        created = _with_embedding_cache(EmbeddingModelHandle(key), key)
+        with _registry_lock:
+            handle = _handles.setdefault(key, created)
+    return handle
 
-    if _embedding_model_cache is None:
-        logger.info(f"Loading embedding model: {model_name}")
+
+def warm_up_embedding_models(model_names: list[str] | None = None) -> None:
+    """Load (and run once) the configured models; for API startup."""
+    for model_name in model_names if model_names is not None else _settings().embedding_warmup_models:
         try:
-            from sentence_transformers import SentenceTransformer
-            _embedding_model_cache = SentenceTransformer(model_name)
-            logger.info(f"Embedding model loaded: {model_name}")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            raise
+            get_embedding_model(model_name).encode(['warm up'])
+        except Exception:
+            logger.exception(f"Embedding model warm-up failed: {model_name}")
+
+
+def embedding_model_stats() -> list[dict[str, Any]]:
+    """Loaded models with their accounted memory and idle time."""
+    now = time.monotonic()
+    with _registry_lock:
+        return [
+            {
+                'model': key[0],
+                'backend': key[1],
+                'quantized': key[2],
+                'bytes': entry.nbytes,
+                'idle_seconds': now - entry.last_used,
+            }
+            for key, entry in _registry.items()
+        ]
+
 
-    return _embedding_model_cache
+def evict_idle_embedding_models() -> None:
+    """Drop models idle past the configured limit."""
+    with _registry_lock:
+        _evict(keep=None)
 
 
 def clear_embedding_model_cache():
-    """Clear the cached embedding model."""
-    global _embedding_model_cache
-    _embedding_model_cache = None
+    """Clear every loaded embedding model."""
+    global _idle_timer
+    with _registry_lock:
+        _registry.clear()
+        _handles.clear()
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+            _idle_timer = None
     logger.info("Embedding model cache cleared")
@@ -29,6 +29,10 @@ class LLMResponse(Model):
     """Set when the response represents a provider/transport error, not a real answer."""
     usage: dict[str, int] | None = None
     """Real token usage from the provider: {'prompt_tokens': N, 'completion_tokens': N}."""
+    finish_reason: str | None = None
+    """Provider stop reason ('stop', 'length', 'tool_calls', ...), when reported."""
+    cached: bool = False
+    """Served from the provider response cache; usage is zero."""
     tool_calls: list[dict[str, Any]] = []
     artifacts: dict[str, Any] | list[dict[str, Any]] | None = None
     observation: str | None = None
@@ -41,6 +41,14 @@ from cognitrix.session_ownership import (
 )
 from cognitrix.tasks.handler import handle_multi_step_task
 from cognitrix.tools.utils import ToolExecutionContext
+from cognitrix.utils.coalesce import DeltaCoalescer
+from cognitrix.utils.stream_state import (
+    StreamEntry,
+    StreamWriter,
+    entry_id_key,
+    stream_state,
+    valid_entry_id,
+)
 
 logger = logging.getLogger('cognitrix.log')
 
@@ -101,6 +109,10 @@ class SSEManager:
         self.agent = agent
         self.user_key: str | None = None
         self.stream_id: str | None = None
+        # Key of the shared output log; set for registry-managed streams so
+        # another API node can resume this stream's turn output.
+        self.stream_key: str | None = None
+        self._stream_writer: StreamWriter | None = None
         self.action_queue = asyncio.Queue(maxsize=_SSE_QUEUE_MAXSIZE)
         # Turn output belongs to the browser stream, not to one transient HTTP
         # response. A reconnect can therefore resume draining the same turn.
@@ -110,6 +122,10 @@ class SSEManager:
         # slow/disconnected consumer while preserving bounded streamed output.
         self.turn_terminal_event: asyncio.Event | None = None
         self.turn_terminal: dict | None = None
+        self.turn_terminal_id: str | None = None
+        # Event ids are '<turn epoch ms>-<sequence>' (see stream_state).
+        self._turn_epoch = 0
+        self._turn_sequence = 0
         self.completed_output_at: float | None = None
         self.active_task: asyncio.Task | None = None
         self._active_task_started = True
@@ -212,9 +228,33 @@ class SSEManager:
         self.turn_output_queue = queue
         self.turn_terminal_event = terminal_event
         self.turn_terminal = None
+        self.turn_terminal_id = None
         self.completed_output_at = None
+        self._turn_epoch = max(int(time.time() * 1000), self._turn_epoch + 1)
+        self._turn_sequence = 0
         return queue, terminal_event
 
+    def _record_output(self, payload, *, terminal: bool = False) -> str:
+        """Assign the next event id of this turn and mirror it to the shared log."""
+        self._turn_sequence += 1
+        entry_id = f'{self._turn_epoch}-{self._turn_sequence}'
+        writer = self._output_writer()
+        if writer is not None:
+            writer.submit(StreamEntry(entry_id, payload, terminal))
+        return entry_id
+
+    def _output_writer(self) -> StreamWriter | None:
+        if self.stream_key is None:
+            return None
+        if self._stream_writer is None or self._stream_writer.key != self.stream_key:
+            self._stream_writer = StreamWriter(stream_state(), self.stream_key)
+        return self._stream_writer
+
+    def _note_delivered(self, entry_id: str, *, terminal: bool = False) -> None:
+        writer = self._output_writer()
+        if writer is not None:
+            writer.note_delivered(entry_id, flush=terminal)
+
     def _complete_turn_output(
         self,
         task: asyncio.Task,
@@ -229,6 +269,7 @@ class SSEManager:
             and self.turn_terminal_event is terminal_event
         ):
             self.turn_terminal = terminal
+            self.turn_terminal_id = self._record_output(terminal, terminal=True)
             self.completed_output_at = time.monotonic()
             terminal_event.set()
         self.finish_turn(task)
@@ -538,7 +579,7 @@ class SSEManager:
                     **payload,
                     'session_id': session.id if session is not None else requested_sid,
                 }
-            await output_queue.put(payload)
+            await output_queue.put((self._record_output(payload), payload))
 
         def mark_adopted() -> None:
             nonlocal adopted, adoption_task, ingestion_emitted
@@ -564,14 +605,15 @@ class SSEManager:
                         )
                     )
             if promoted is not None and not ingestion_emitted:
-                output_queue.put_nowait({
+                ingested = {
                     'type': 'attachments_ingested',
                     'artifacts': [
                         item.model_dump() for item in promoted.image_refs
                     ],
                     'document_count': len(promoted.document_paths),
                     'session_id': session.id,
-                })
+                }
+                output_queue.put_nowait((self._record_output(ingested), ingested))
                 ingestion_emitted = True
 
         try:
@@ -708,14 +750,17 @@ class SSEManager:
                     set_media_turn_context,
                 )
 
+                # Approvals and questions share the coalescer so they flush
+                # merged text ahead of themselves.
+                output = DeltaCoalescer(emit)
                 token = web_turn_ctx.set({
-                    'emit': emit,
+                    'emit': output,
                     'session_id': session.id,
                     'bypass': bypass,
                     'user_key': self.user_key,
                 })
                 question_token = question_turn_ctx.set(QuestionTurnContext(
-                    emit=emit,
+                    emit=output,
                     session_id=str(session.id),
                     stream_id=str(self.stream_id or 'default'),
                     user_key=str(self.user_key or ''),
@@ -732,7 +777,7 @@ class SSEManager:
                         self.agent,
                         interface='web',
                         stream=True,
-                        output=emit,
+                        output=output,
                         wsquery={'type': 'generate', 'action': 'chat_message'},
                         attachments=attachments,
                         tool_context=ToolExecutionContext(
@@ -752,9 +797,12 @@ class SSEManager:
                             'Session did not durably adopt promoted attachments'
                         )
                 finally:
-                    reset_media_turn_context(media_token)
-                    question_turn_ctx.reset(question_token)
-                    web_turn_ctx.reset(token)
+                    try:
+                        await output.aclose()
+                    finally:
+                        reset_media_turn_context(media_token)
+                        question_turn_ctx.reset(question_token)
+                        web_turn_ctx.reset(token)
         except asyncio.CancelledError:
             terminal = {
                 'type': 'turn_stopped',
@@ -816,6 +864,50 @@ class SSEManager:
             if adoption_error is not None:
                 raise adoption_error
 
+    async def _resume_shared_output(
+        self,
+        request: Request,
+        superseded: asyncio.Event,
+        last_event_id: str | None,
+    ):
+        """Replay a turn owned by another process from the shared output log.
+
+        Follows the log until the turn's terminal entry, or until the log
+        expires because its owner stopped appending. A malformed
+        ``Last-Event-ID`` resumes nothing.
+        """
+        if last_event_id and valid_entry_id(last_event_id) is None:
+            return
+        state = stream_state()
+        key = self.stream_key
+        after = last_event_id or await state.offset(key)
+        if after is None:
+            return
+        tail = await state.tail(key)
+        if tail is None or (
+            tail.terminal and entry_id_key(tail.id) <= entry_id_key(after)
+        ):
+            return
+        while not superseded.is_set() and not await request.is_disconnected():
+            entries = await state.read(key, after, timeout=1.0)
+            if not entries:
+                if await state.tail(key) is None:
+                    return
+                yield {'event': 'ping', 'data': ''}
+                continue
+            for entry in entries:
+                after = entry.id
+                if entry.terminal:
+                    await state.ack(key, after)
+                yield {
+                    'event': 'message',
+                    'id': entry.id,
+                    'data': json.dumps(entry.payload),
+                }
+                if entry.terminal:
+                    return
+            await state.ack(key, after)
+
     async def sse_endpoint(self, request: Request):
         async def event_generator(superseded: asyncio.Event):
             snapshot = pending_question(
@@ -823,6 +915,17 @@ class SSEManager:
             )
             if snapshot is not None:
                 yield {'event': 'message', 'data': json.dumps(snapshot)}
+            headers = getattr(request, 'headers', None) or {}
+            last_event_id = headers.get('last-event-id')
+            if (
+                self.stream_key is not None
+                and self.turn_output_queue is None
+                and not self.turn_pending
+            ):
+                async for event in self._resume_shared_output(
+                    request, superseded, last_event_id
+                ):
+                    yield event
             while True:
                 # A turn may outlive the HTTP response that started it. Drain
                 # its manager-owned output before accepting another action.
@@ -839,21 +942,36 @@ class SSEManager:
                         continue
                     if item is _TURN_TERMINAL:
                         terminal = self.turn_terminal
+                        terminal_id = self.turn_terminal_id
                         if self.turn_output_queue is turn_queue:
                             self.turn_output_queue = None
                             self.turn_terminal_event = None
                             self.turn_terminal = None
+                            self.turn_terminal_id = None
                             self.completed_output_at = None
                         if self._replay_queue is turn_queue:
                             self._replay_queue = None
                             self._replay_item = _NO_REPLAY
                         if terminal is not None:
+                            if terminal_id is not None:
+                                self._note_delivered(terminal_id, terminal=True)
                             yield {
                                 'event': 'message',
+                                'id': terminal_id,
                                 'data': json.dumps(terminal),
                             }
                         continue
-                    yield {'event': 'message', 'data': json.dumps(item)}
+                    entry_id, payload = item
+                    # Already delivered by another node that replayed the
+                    # shared log to this browser.
+                    if entry_id_key(entry_id) <= entry_id_key(last_event_id):
+                        continue
+                    self._note_delivered(entry_id)
+                    yield {
+                        'event': 'message',
+                        'id': entry_id,
+                        'data': json.dumps(payload),
+                    }
                     continue
 
                 if superseded.is_set() or await request.is_disconnected():
@@ -921,7 +1039,7 @@ class SSEManager:
                             item for item in all_sessions
                             if str(item.id) in owned_ids or str(item.id) in durable_ids
                         ]
-                        sessions = [sess.json() for sess in allowed]
+                        sessions = [sess.json() for sess in await Session.load_chats(allowed)]
                         yield {'event': 'message', 'data': json.dumps({'type': 'sessions', 'content': sessions, 'action': 'list'})}
 
                     elif action['action'] == 'get':
@@ -1053,4 +1171,5 @@ def get_sse_manager(user_id: str, agent_id: str, agent,
         mgr.agent = agent
     mgr.user_key = user_key
     mgr.stream_id = str(stream_id or 'default')
+    mgr.stream_key = ':'.join(key)
     return mgr
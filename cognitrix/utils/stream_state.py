@@ -0,0 +1,332 @@
+"""Shared turn-output log for browser chat streams.
+
+``SSEManager`` state (action queue, running turn) lives in the API process
+that owns the stream, but every turn event is also appended to a per-stream
+log here, under an id that is sent to the browser as the SSE event id. When
+a reconnecting EventSource lands on another API node, that node replays the
+log after the browser's ``Last-Event-ID`` and follows it until the turn's
+terminal event, so load balancers need no sticky sessions for output.
+
+Backends (``COGNITRIX_SSE_STREAM_STATE``):
+
+- blank / ``auto``: Redis when a Redis broker is configured, else local
+- ``redis://`` / ``rediss://`` URL: one Redis stream per browser stream
+- ``local``: in-process stand-in (one API process)
+
+Logs are bounded twice: by entry count (oldest entries are trimmed) and by
+idle time (a log expires ``ttl_seconds`` after its last append). Each log
+also keeps a consumer offset, the highest entry id delivered to any
+consumer, used when a reconnect carries no ``Last-Event-ID``.
+
+Entry ids are ``<turn ms>-<sequence>``, assigned by the producer so the
+local consumer and the shared log agree on them.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger('cognitrix.log')
+
+STREAM_MAXLEN = 2000
+STREAM_TTL_SECONDS = 600.0
+READ_COUNT = 256
+_ENTRY_ID = re.compile(r'(\d{1,20})-(\d{1,20})')
+
+
+@dataclass(frozen=True)
+class StreamEntry:
+    id: str
+    payload: Any
+    terminal: bool = False
+
+
+def entry_id_key(entry_id: str | None) -> tuple[int, int]:
+    """Sort key of an entry id; malformed or missing ids sort first."""
+    try:
+        epoch, _, sequence = str(entry_id or '').partition('-')
+        return int(epoch), int(sequence or 0)
+    except ValueError:
+        return 0, 0
+
+
+def valid_entry_id(entry_id: str | None) -> str | None:
+    """``entry_id`` if it is a well-formed ``<ms>-<sequence>`` id, else None.
+
+    ``Last-Event-ID`` comes from the client; Redis rejects a malformed or
+    out-of-range id in ``XREAD``, so only validated ids reach it.
+    """
+    match = _ENTRY_ID.fullmatch(str(entry_id or ''))
+    if match is None or any(int(part) >= 2 ** 64 for part in match.groups()):
+        return None
+    return entry_id
+
+
+@dataclass
+class _LocalLog:
+    entries: deque
+    offset: str | None = None
+    touched_at: float = field(default_factory=time.monotonic)
+    waiters: set[asyncio.Future] = field(default_factory=set)
+
+
+class LocalStreamState:
+    """In-process stand-in with the same retention rules as Redis."""
+
+    def __init__(self, maxlen: int = STREAM_MAXLEN, ttl_seconds: float = STREAM_TTL_SECONDS):
+        self.maxlen = maxlen
+        self.ttl_seconds = ttl_seconds
+        self._logs: dict[str, _LocalLog] = {}
+
+    def _log(self, key: str, *, create: bool = False) -> _LocalLog | None:
+        now = time.monotonic()
+        for stale in [name for name, log in self._logs.items() if now - log.touched_at >= self.ttl_seconds]:
+            del self._logs[stale]
+        log = self._logs.get(key)
+        if log is None and create:
+            log = self._logs[key] = _LocalLog(deque(maxlen=self.maxlen))
+        return log
+
+    async def append(self, key: str, entries: list[StreamEntry], *, offset: str | None = None) -> None:
+        log = self._log(key, create=True)
+        for entry in entries:
+            if log.entries and entry_id_key(entry.id) <= entry_id_key(log.entries[-1].id):
+                raise ValueError(f'Stream entry {entry.id} does not follow {log.entries[-1].id}')
+            log.entries.append(entry)
+        if offset is not None:
+            self._advance(log, offset)
+        log.touched_at = time.monotonic()
+        for waiter in list(log.waiters):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def read(self, key: str, after: str | None, *, timeout: float | None = None) -> list[StreamEntry]:
+        """Entries after ``after``, waiting up to ``timeout`` for the first one."""
+        floor = entry_id_key(after)
+        log = self._log(key)
+        entries = [entry for entry in (log.entries if log else ()) if entry_id_key(entry.id) > floor]
+        if entries or not timeout:
+            return entries[:READ_COUNT]
+        log = self._log(key, create=True)
+        waiter = asyncio.get_running_loop().create_future()
+        log.waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            return []
+        finally:
+            log.waiters.discard(waiter)
+        return await self.read(key, after)
+
+    async def tail(self, key: str) -> StreamEntry | None:
+        log = self._log(key)
+        return log.entries[-1] if log and log.entries else None
+
+    async def offset(self, key: str) -> str | None:
+        log = self._log(key)
+        return log.offset if log else None
+
+    async def ack(self, key: str, entry_id: str) -> None:
+        log = self._log(key)
+        if log is not None:
+            self._advance(log, entry_id)
+
+    @staticmethod
+    def _advance(log: _LocalLog, entry_id: str) -> None:
+        if entry_id_key(entry_id) > entry_id_key(log.offset):
+            log.offset = entry_id
+
+    async def aclose(self) -> None:
+        self._logs.clear()
+
+
+# Offsets only move forward: two nodes may deliver the same turn.
+_ADVANCE_OFFSET_SCRIPT = """
+local function parts(id)
+    local epoch, sequence = string.match(id or '', '^(%d+)-(%d+)$')
+    return tonumber(epoch) or 0, tonumber(sequence) or 0
+end
+local current = redis.call('GET', KEYS[1])
+if current then
+    local current_epoch, current_sequence = parts(current)
+    local epoch, sequence = parts(ARGV[1])
+    if epoch < current_epoch or (epoch == current_epoch and sequence <= current_sequence) then
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+
+class RedisStreamState:
+    """Redis streams: ``XADD`` with approximate ``MAXLEN`` trimming and an idle ``EXPIRE``."""
+
+    def __init__(
+        self,
+        url: str,
+        maxlen: int = STREAM_MAXLEN,
+        ttl_seconds: float = STREAM_TTL_SECONDS,
+        *,
+        client=None,
+    ):
+        self.url = url
+        self.maxlen = maxlen
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+
+    def _redis(self):
+        if self._client is None:
+            from redis.asyncio import Redis
+
+            self._client = Redis.from_url(self.url, decode_responses=True)
+        return self._client
+
+    @staticmethod
+    def _stream(key: str) -> str:
+        return f'cognitrix:sse:{key}'
+
+    @staticmethod
+    def _offset(key: str) -> str:
+        return f'cognitrix:sse:{key}:offset'
+
+    @staticmethod
+    def _entry(entry_id: str, fields: dict[str, str]) -> StreamEntry:
+        return StreamEntry(entry_id, json.loads(fields['data']), fields.get('terminal') == '1')
+
+    async def append(self, key: str, entries: list[StreamEntry], *, offset: str | None = None) -> None:
+        stream = self._stream(key)
+        ttl = int(self.ttl_seconds)
+        async with self._redis().pipeline(transaction=False) as pipe:
+            for entry in entries:
+                pipe.xadd(
+                    stream,
+                    {'data': json.dumps(entry.payload, default=str), 'terminal': '1' if entry.terminal else '0'},
+                    id=entry.id,
+                    maxlen=self.maxlen,
+                    approximate=True,
+                )
+            pipe.expire(stream, ttl)
+            if offset is not None:
+                pipe.eval(_ADVANCE_OFFSET_SCRIPT, 1, self._offset(key), offset, ttl)
+            await pipe.execute()
+
+    async def read(self, key: str, after: str | None, *, timeout: float | None = None) -> list[StreamEntry]:
+        block = int(timeout * 1000) if timeout else None
+        response = await self._redis().xread(
+            {self._stream(key): after or '0-0'}, count=READ_COUNT, block=block
+        )
+        return [self._entry(entry_id, fields) for _stream, items in response or () for entry_id, fields in items]
+
+    async def tail(self, key: str) -> StreamEntry | None:
+        items = await self._redis().xrevrange(self._stream(key), count=1)
+        return self._entry(*items[0]) if items else None
+
+    async def offset(self, key: str) -> str | None:
+        return await self._redis().get(self._offset(key))
+
+    async def ack(self, key: str, entry_id: str) -> None:
+        await self._redis().eval(_ADVANCE_OFFSET_SCRIPT, 1, self._offset(key), entry_id, int(self.ttl_seconds))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StreamWriter:
+    """Ordered, non-blocking appends of one browser stream's turn output.
+
+    ``submit`` never awaits, so the producing turn is never slowed by the
+    shared log; a short-lived task drains submissions in order and batches
+    whatever accumulated while the previous write was in flight.
+    """
+
+    def __init__(self, state, key: str):
+        self.state = state
+        self.key = key
+        self._pending: list[StreamEntry] = []
+        self._offset: str | None = None
+        self._task: asyncio.Task | None = None
+
+    def submit(self, entry: StreamEntry) -> None:
+        self._pending.append(entry)
+        self._kick()
+
+    def note_delivered(self, entry_id: str, *, flush: bool = False) -> None:
+        """Record the consumer offset with the next batch of appends (now when ``flush``)."""
+        self._offset = entry_id
+        if flush:
+            self._kick()
+
+    def _kick(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+        except RuntimeError:
+            self._pending.clear()
+
+    async def _drain(self) -> None:
+        while self._pending or self._offset is not None:
+            batch, self._pending = self._pending, []
+            offset, self._offset = self._offset, None
+            try:
+                if batch:
+                    await self.state.append(self.key, batch, offset=offset)
+                else:
+                    await self.state.ack(self.key, offset)
+            except Exception:
+                # The local consumer is unaffected; only cross-node resume of
+                # these entries is lost.
+                logger.warning('Could not record chat stream output for %s', self.key, exc_info=True)
+
+    async def flush(self) -> None:
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+
+def build_stream_state(target: str | None = None):
+    """Backend for ``COGNITRIX_SSE_STREAM_STATE``, inferred from the broker when unset."""
+    from cognitrix.config import settings
+
+    target = (target if target is not None else settings.sse_stream_state).strip()
+    if target.lower() in ('', 'auto'):
+        broker = os.getenv('TASK_LIMIT_REDIS_URL') or os.getenv('CELERY_BROKER_URL') or ''
+        target = broker if broker.startswith(('redis://', 'rediss://')) else 'local'
+    ttl = settings.sse_stream_ttl_seconds
+    if target.startswith(('redis://', 'rediss://')):
+        return RedisStreamState(target, ttl_seconds=ttl)
+    if target.lower() != 'local':
+        logger.warning('Unknown COGNITRIX_SSE_STREAM_STATE %r; keeping chat output in-process', target)
+    return LocalStreamState(ttl_seconds=ttl)
+
+
+_state = None
+
+
+def stream_state():
+    """The process-wide backend, built from settings on first use."""
+    global _state
+    if _state is None:
+        _state = build_stream_state()
+    return _state
+
+
+def set_stream_state(state) -> None:
+    global _state
+    _state = state
+
+
+async def close_stream_state() -> None:
+    global _state
+    state, _state = _state, None
+    if state is not None:
+        await state.aclose()
@@ -1,25 +1,265 @@
 """Token estimation for context budgeting.
 
-ponytail: chars//4 heuristic — good enough to budget a prompt window and
-trigger compaction. Swap in a real tokenizer only if the estimate proves
-too loose in practice; real usage numbers come from the provider anyway
+A model's own BPE is used once ``tiktoken`` has loaded it; until then, when
+it cannot be loaded, or when tiktoken has no BPE for the model (Claude,
+Gemini, local models), the chars//4 heuristic stands in.
+``COGNITRIX_TOKENIZER_FALLBACK=<encoding>`` (e.g. ``o200k_base``) opts in to
+counting those models with that encoding instead, an approximation of their
+own tokenizers. The heuristic is loose on code and badly
+undercounts CJK text, which is why the window shaper and compaction ask for
+the model's tokenizer. Real usage numbers still come from the provider
 (LLMResponse.usage).
+
+Loading an encoding can download its BPE file on a cold cache, so it happens
+on a worker thread: async callers wait for it up to
+``TOKENIZER_LOAD_TIMEOUT`` seconds, sync callers never wait.
+
+Counts from a real tokenizer are cached by content hash, so a message that
+was already counted (every prompt rebuild re-counts the whole history) is
+never tokenized again.
 """
 
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
+logger = logging.getLogger('cognitrix.log')
+
 CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+TOKEN_CACHE_SIZE = 16_384
+TOKENIZER_LOAD_TIMEOUT = 10.0
+
+
+
+class Tokenizer:
+    """Counts tokens in text; the base class is the chars//4 heuristic."""
+
+    name = 'heuristic'
+
+    def count(self, text: str) -> int:
+        return len(text) // CHARS_PER_TOKEN
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        return [self.count(text) for text in texts]
+
+
+class TiktokenTokenizer(Tokenizer):
+    """A tiktoken BPE encoding with a content-hash LRU in front of it."""
+
+    def __init__(self, encoding: Any):
+        self.encoding = encoding
+        self.name = f'tiktoken:{encoding.name}'
+
+    def count(self, text: str) -> int:
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        keys = [_cache_key(self.name, text) for text in texts]
+        counts = _CACHE.get_many(keys)
+        missing = [index for index, count in enumerate(counts) if count is None]
+        if missing:
+            encoded = self.encoding.encode_batch(
+                [texts[index] for index in missing],
+                disallowed_special=(),
+            )
+            for index, tokens in zip(missing, encoded, strict=True):
+                counts[index] = len(tokens)
+            _CACHE.put_many([(keys[index], counts[index]) for index in missing])
+        return counts
+
+
+class _CountCache:
+    """Thread-safe LRU of token counts keyed by (tokenizer, content digest)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[tuple[str, bytes]]) -> list[int | None]:
+        with self._lock:
+            counts: list[int | None] = []
+            for key in keys:
+                count = self._counts.get(key)
+                if count is not None:
+                    self._counts.move_to_end(key)
+                counts.append(count)
+            return counts
+
+    def put_many(self, items: list[tuple[tuple[str, bytes], int]]) -> None:
+        with self._lock:
+            for key, count in items:
+                self._counts[key] = count
+                self._counts.move_to_end(key)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+_CACHE = _CountCache(TOKEN_CACHE_SIZE)
+HEURISTIC = Tokenizer()
+_TOKENIZERS: dict[tuple[str, str], Tokenizer] = {}
+_ENCODINGS: dict[str, Tokenizer] = {}
+_LOADING: dict[str, Future] = {}
+_TOKENIZERS_LOCK = threading.Lock()
+_LOADER = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cognitrix-tokenizer')
+
+
+def _cache_key(name: str, text: str) -> tuple[str, bytes]:
+    digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    return name, digest
+
+
+def _load_encoding(encoding_name: str) -> Tokenizer:
+    """One load attempt per encoding; failures fall back to the heuristic."""
+    if encoding_name in _ENCODINGS:
+        return _ENCODINGS[encoding_name]
+    tokenizer = HEURISTIC
+    try:
+        import tiktoken
+
+        tokenizer = TiktokenTokenizer(tiktoken.get_encoding(encoding_name))
+    except Exception:
+        # Missing package, or the BPE file is neither cached nor downloadable.
+        logger.debug('Tokenizer %s unavailable; using the chars//4 heuristic', encoding_name, exc_info=True)
+    _ENCODINGS[encoding_name] = tokenizer
+    return tokenizer
+
+
+def _encoding_name(model: str) -> str | None:
+    """tiktoken's encoding for ``model``, else the opted-in fallback, if any."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    # Router-style names ("openai/gpt-4o") carry the vendor as a prefix.
+    for candidate in (model, model.rsplit('/', 1)[-1]):
+        try:
+            return tiktoken.encoding_name_for_model(candidate)
+        except KeyError:
+            continue
+    return os.getenv('COGNITRIX_TOKENIZER_FALLBACK') or None
+
+
+def _encoding_load(model: str) -> tuple[str | None, Future | None]:
+    """The encoding name for ``model`` and its (possibly finished) load.
+
+    Both are None when there is no encoding for the model.
+    """
+    name = _encoding_name(model)
+    if name is None:
+        return None, None
+    with _TOKENIZERS_LOCK:
+        future = _LOADING.get(name)
+        if future is None:
+            future = _LOADER.submit(_load_encoding, name)
+            _LOADING[name] = future
+    return name, future
+
+
+def tokenizer_for(model: str | None = None, provider: str | None = None) -> Tokenizer:
+    """Best offline tokenizer for a provider/model pair, without blocking.
+
+    An encoding that is still loading is started in the background and the
+    heuristic answers meanwhile. ``COGNITRIX_TOKENIZER=heuristic`` forces the
+    chars//4 estimate.
+    """
+    if os.getenv('COGNITRIX_TOKENIZER', '').lower() == 'heuristic' or not model:
+        return HEURISTIC
+    key = ((provider or '').lower(), model)
+    tokenizer = _TOKENIZERS.get(key)
+    if tokenizer is None:
+        _, future = _encoding_load(model)
+        if future is None:
+            tokenizer = _TOKENIZERS[key] = HEURISTIC
+            return tokenizer
+        if not future.done():
+            return HEURISTIC
+        tokenizer = _TOKENIZERS[key] = future.result()
+    return tokenizer
+
+
+async def atokenizer_for(model: str | None = None, provider: str | None = None) -> Tokenizer:
+    """``tokenizer_for`` that waits (off the event loop) for a first load.
+
+    A load that takes longer than ``TOKENIZER_LOAD_TIMEOUT`` (an offline
+    download, a slow mirror) keeps running in the background; this call
+    counts with the heuristic instead.
+    """
+    if os.getenv('COGNITRIX_TOKENIZER', '').lower() == 'heuristic' or not model:
+        return HEURISTIC
+    key = ((provider or '').lower(), model)
+    tokenizer = _TOKENIZERS.get(key)
+    if tokenizer is not None:
+        return tokenizer
+    name, future = await asyncio.to_thread(_encoding_load, model)
+    if future is None:
+        _TOKENIZERS[key] = HEURISTIC
+        return HEURISTIC
+    try:
+        loaded = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), TOKENIZER_LOAD_TIMEOUT)
+    except TimeoutError:
+        logger.debug('Tokenizer %s still loading; using the chars//4 heuristic', name)
+        return HEURISTIC
+    _TOKENIZERS[key] = loaded
+    return loaded
+
+
+def tokenizer_for_llm(llm: Any) -> Tokenizer:
+    return tokenizer_for(getattr(llm, 'model', None) or None, getattr(llm, 'provider', None) or None)
+
+
+async def atokenizer_for_llm(llm: Any) -> Tokenizer:
+    return await atokenizer_for(getattr(llm, 'model', None) or None, getattr(llm, 'provider', None) or None)
+
+
+def _message_texts(message: dict[str, Any]) -> list[str]:
+    texts = [str(message.get('content') or '')]
+    texts.extend(str(tc) for tc in message.get('tool_calls') or [])
+    return texts
+
+
+def count_messages(messages: list[Any], tokenizer: Tokenizer | None = None) -> list[int]:
+    """Token count of each message, tokenizing every uncached text in one batch."""
+    tokenizer = tokenizer or HEURISTIC
+    texts: list[str] = []
+    spans: list[tuple[int, int, int]] = []
+    for message in messages:
+        start = len(texts)
+        if isinstance(message, dict):
+            texts.extend(_message_texts(message))
+            overhead = MESSAGE_OVERHEAD_TOKENS
+        else:
+            if message is not None:
+                texts.append(message if isinstance(message, str) else str(message))
+            overhead = 0
+        spans.append((start, len(texts), overhead))
+    counts = tokenizer.count_batch(texts) if texts else []
+    return [sum(counts[start:end]) + overhead for start, end, overhead in spans]
 
 
-def estimate_tokens(content: str | dict[str, Any] | list[Any] | None) -> int:
-    """Rough token count for a string, a message dict, or a message list."""
+def estimate_tokens(
+    content: str | dict[str, Any] | list[Any] | None,
+    tokenizer: Tokenizer | None = None,
+) -> int:
+    """Token count for a string, a message dict, or a message list."""
     if content is None:
         return 0
+    tokenizer = tokenizer or HEURISTIC
     if isinstance(content, str):
-        return len(content) // CHARS_PER_TOKEN
+        return tokenizer.count(content)
     if isinstance(content, dict):
-        total = estimate_tokens(str(content.get('content') or ''))
-        for tc in content.get('tool_calls') or []:
-            total += estimate_tokens(str(tc))
-        return total + 4  # per-message overhead
-    return sum(estimate_tokens(m) for m in content)
+        return count_messages([content], tokenizer)[0]
+    return sum(count_messages(list(content), tokenizer))
@@ -38,6 +38,7 @@ from cognitrix.tools.utils import (
     reset_execution_context,
     set_execution_context,
 )
+from cognitrix.utils.coalesce import DeltaCoalescer
 
 logger = logging.getLogger('cognitrix.log')
 _active_websocket: ContextVar[WebSocket | None] = ContextVar(
@@ -418,16 +419,20 @@ class WebSocketManager:
                             agent.system_prompt = task_details_generator
                             prompt = default_prompt
                         session.chat = []
-                        await session(
-                            prompt,
-                            agent,
-                            interface='web',
-                            stream=True,
-                            output=websocket.send_json,
-                            wsquery=query,
-                            save_history=False,
-                            tool_context=tool_context,
-                        )
+                        output = DeltaCoalescer(websocket.send_json)
+                        try:
+                            await session(
+                                prompt,
+                                agent,
+                                interface='web',
+                                stream=True,
+                                output=output,
+                                wsquery=query,
+                                save_history=False,
+                                tool_context=tool_context,
+                            )
+                        finally:
+                            await output.aclose()
 
                     elif query_type == 'multistep':
                         binding, session, tool_context = await _authorize_turn(
@@ -471,15 +476,19 @@ class WebSocketManager:
                         binding, session, tool_context = await _authorize_turn(
                             query, user_key, session, web_agent,
                         )
-                        await session(
-                            str(query.get('content') or ''),
-                            web_agent,
-                            interface='web',
-                            stream=True,
-                            output=websocket.send_json,
-                            wsquery=query,
-                            tool_context=tool_context,
-                        )
+                        output = DeltaCoalescer(websocket.send_json)
+                        try:
+                            await session(
+                                str(query.get('content') or ''),
+                                web_agent,
+                                interface='web',
+                                stream=True,
+                                output=output,
+                                wsquery=query,
+                                tool_context=tool_context,
+                            )
+                        finally:
+                            await output.aclose()
                 except OwnershipNotFound:
                     await websocket.send_json({
                         'type': 'error',
@@ -17,3 +17,34 @@ def mock_llm_response():
 def mock_embedding():
     """Create a mock embedding vector."""
     return [0.1, 0.2, 0.3, 0.4, 0.5]
+
+
+@pytest.fixture(autouse=True)
+def local_run_event_bus():
+    """Keep run-event pushes in-process; no sockets or brokers in tests."""
+    from cognitrix.tasks.event_bus import RunEventBus, set_run_event_bus
+
+    set_run_event_bus(RunEventBus())
+    yield
+    set_run_event_bus(None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_derived_text_cache():
+    """Read's derived-text cache never carries entries between tests."""
+    from cognitrix.tools.derived_text import DerivedTextCache, set_derived_text_cache
+
+    set_derived_text_cache(DerivedTextCache(64 * 1024 * 1024))
+    yield
+    set_derived_text_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def local_stream_state():
+    """Chat-stream output logs stay in-process and per test."""
+    from cognitrix.utils.stream_state import LocalStreamState, set_stream_state
+
+    state = LocalStreamState()
+    set_stream_state(state)
+    yield state
+    set_stream_state(None)
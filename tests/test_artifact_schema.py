@@ -145,6 +145,7 @@ async def test_ensure_schema_adds_artifact_metadata_columns_without_destructive_
         'ALTER TABLE artifacts ADD COLUMN vision_storage_key TEXT',
         'ALTER TABLE artifacts ADD COLUMN thumbnail_storage_key TEXT',
         'ALTER TABLE artifacts ADD COLUMN created_at TEXT',
+        'ALTER TABLE artifacts ADD COLUMN content_sha256 TEXT',
     ]
     assert not any(
         destructive in statement.upper()
@@ -0,0 +1,52 @@
+"""Bounded AsyncOpenAI client pool."""
+
+import asyncio
+
+import pytest
+
+import cognitrix.providers.client_pool as client_pool
+from cognitrix.providers.client_pool import ClientPool
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_clients_and_closes_evicted_ones(monkeypatch):
+    monkeypatch.setattr(client_pool, 'RETIRE_GRACE_SECONDS', 0)
+    pool = ClientPool(max_clients=2)
+
+    first = pool.get('https://a.test/v1', 'key-a', provider='openai')
+    assert pool.get('https://a.test/v1', 'key-a', provider='openai') is first
+    pool.get('https://a.test/v1', 'key-b', provider='openai')
+    pool.get('https://a.test/v1', 'key-c', provider='openai')
+    await asyncio.sleep(0.05)
+
+    stats = pool.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['clients']) == (1, 3, 1, 2)
+    assert first.is_closed()
+    assert stats['providers'] == {'openai': {'clients': 2, 'open_connections': 0}}
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_pooled_and_retiring_clients():
+    pool = ClientPool(max_clients=1)
+    retired = pool.get('https://a.test/v1', 'key-a')
+    current = pool.get('https://a.test/v1', 'key-b')
+
+    await pool.aclose()
+
+    assert retired.is_closed() and current.is_closed()
+    assert pool.stats()['clients'] == 0
+
+
+def test_http_options_layer_provider_over_default(monkeypatch):
+    monkeypatch.setattr(client_pool, '_http2_available', lambda: False)
+    pool = ClientPool(http_options={
+        'default': {'max_connections': 50, 'keepalive_expiry': 10},
+        'groq': {'max_connections': 8, 'http2': True, 'unknown': 1},
+    })
+
+    groq = pool.options_for('groq')
+    other = pool.options_for('openai')
+
+    assert (groq.max_connections, groq.keepalive_expiry, groq.http2) == (8, 10, False)
+    assert (other.max_connections, other.max_keepalive_connections) == (50, 20)
@@ -50,6 +50,119 @@ def test_estimate_tokens():
     assert 200 <= estimate_tokens(msgs) <= 220  # content + small per-message overhead
 
 
+class _CountingEncoding:
+    """Stands in for a tiktoken encoding: one token per word."""
+
+    name = "fake_words"
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode_batch(self, texts, disallowed_special=()):
+        self.encoded.extend(texts)
+        return [text.split() for text in texts]
+
+
+def test_tokenizer_counts_each_content_once():
+    from cognitrix.utils.tokens import TiktokenTokenizer, count_messages
+
+    encoding = _CountingEncoding()
+    tokenizer = TiktokenTokenizer(encoding)
+    msgs = [_user("one two three"), _assistant("four five")]
+
+    assert count_messages(msgs, tokenizer) == [3 + 4, 2 + 4]
+    assert estimate_tokens(msgs + [_user("six")], tokenizer) == 3 + 2 + 1 + 12
+    assert encoding.encoded == ["one two three", "four five", "six"]
+
+
+@pytest.mark.asyncio
+async def test_tokenizer_falls_back_to_heuristic_when_unavailable(monkeypatch):
+    import tiktoken
+
+    from cognitrix.utils import tokens
+
+    def unavailable(name):
+        raise OSError("no cached BPE")
+
+    monkeypatch.setattr(tiktoken, "get_encoding", unavailable)
+    monkeypatch.setattr(tokens, "_TOKENIZERS", {})
+    monkeypatch.setattr(tokens, "_ENCODINGS", {})
+    monkeypatch.setattr(tokens, "_LOADING", {})
+
+    assert await tokens.atokenizer_for("gpt-4o", "openai") is tokens.HEURISTIC
+    assert tokens.tokenizer_for("gpt-4o", "openai") is tokens.HEURISTIC
+    assert tokens.tokenizer_for(None) is tokens.HEURISTIC
+    monkeypatch.setenv("COGNITRIX_TOKENIZER", "heuristic")
+    assert tokens.tokenizer_for("claude-sonnet", "anthropic") is tokens.HEURISTIC
+
+
+@pytest.mark.asyncio
+async def test_models_without_a_tiktoken_bpe_use_the_heuristic_unless_opted_in(monkeypatch):
+    import tiktoken
+
+    from cognitrix.utils import tokens
+
+    loaded = []
+
+    def get_encoding(name):
+        loaded.append(name)
+        return _CountingEncoding()
+
+    monkeypatch.setattr(tiktoken, "get_encoding", get_encoding)
+    monkeypatch.setattr(tokens, "_TOKENIZERS", {})
+    monkeypatch.setattr(tokens, "_ENCODINGS", {})
+    monkeypatch.setattr(tokens, "_LOADING", {})
+    monkeypatch.delenv("COGNITRIX_TOKENIZER_FALLBACK", raising=False)
+
+    assert tokens.tokenizer_for("claude-sonnet", "anthropic") is tokens.HEURISTIC
+    assert await tokens.atokenizer_for("llama3.1:8b", "ollama") is tokens.HEURISTIC
+    assert loaded == []
+
+    monkeypatch.setenv("COGNITRIX_TOKENIZER_FALLBACK", "o200k_base")
+    approximated = await tokens.atokenizer_for("gemini-2.5-pro", "google")
+    assert isinstance(approximated, tokens.TiktokenTokenizer)
+    assert loaded == ["o200k_base"]
+
+
+@pytest.mark.asyncio
+async def test_slow_tokenizer_load_does_not_block_prompt_building(monkeypatch):
+    import threading
+
+    import tiktoken
+
+    from cognitrix.utils import tokens
+
+    release = threading.Event()
+
+    def downloading(name):
+        release.wait(5)
+        return _CountingEncoding()
+
+    monkeypatch.setattr(tiktoken, "get_encoding", downloading)
+    monkeypatch.setattr(tokens, "_TOKENIZERS", {})
+    monkeypatch.setattr(tokens, "_ENCODINGS", {})
+    monkeypatch.setattr(tokens, "_LOADING", {})
+    monkeypatch.setattr(tokens, "TOKENIZER_LOAD_TIMEOUT", 0.05)
+
+    assert tokens.tokenizer_for("gpt-4o", "openai") is tokens.HEURISTIC
+    assert await tokens.atokenizer_for("gpt-4o", "openai") is tokens.HEURISTIC
+
+    release.set()
+    loaded = await tokens.atokenizer_for("gpt-4o", "openai")
+    assert isinstance(loaded, tokens.TiktokenTokenizer)
+    assert tokens.tokenizer_for("gpt-4o", "openai") is loaded
+
+
+def test_shape_history_uses_the_given_tokenizer():
+    from cognitrix.utils.tokens import TiktokenTokenizer
+
+    tokenizer = TiktokenTokenizer(_CountingEncoding())
+    chat = [_user("old " * 50), _assistant("ok"), _user("new question")]
+
+    assert shape_history(chat, budget_tokens=20, tokenizer=tokenizer) == [_user("new question")]
+    assert len(shape_history(chat, budget_tokens=100, tokenizer=tokenizer)) == 3
+
+
 def test_context_window_defaults():
     assert _llm().get_context_window() == 128_000
     assert LLM(provider="google", base_url="http://x", api_key="k", model="m").get_context_window() == 1_000_000
@@ -177,6 +290,56 @@ def test_past_images_are_safe_text_placeholders():
     assert shaped[0] == {"role": "User", "type": "text", "content": "[Previously supplied image: old]"}
 
 
+class _CountingHeuristic:
+    """chars//4 that records every text it is asked to count."""
+
+    name = "heuristic"
+
+    def __init__(self):
+        self.counted = []
+
+    def count_batch(self, texts):
+        self.counted.extend(texts)
+        return [len(text) // 4 for text in texts]
+
+
+def test_session_ledger_counts_only_new_messages():
+    from cognitrix.sessions.base import Session
+
+    tokenizer = _CountingHeuristic()
+    session = Session(agent_id="a")
+    session.update_history([_user("first " * 10), *_tool_exchange(0), _assistant("done")])
+    shape_history(session.chat, 100_000, tokenizer=tokenizer, ledger=session.history_ledger())
+    tokenizer.counted.clear()
+
+    session.update_history([_user("second"), _assistant("reply")])
+    shaped = shape_history(session.chat, 100_000, tokenizer=tokenizer, ledger=session.history_ledger())
+
+    assert tokenizer.counted == ["second", "reply", "second", "reply"]  # full + slimmed forms
+    assert shaped == shape_history(session.chat, 100_000)
+    assert session.history_ledger().total == estimate_tokens(session.chat)
+
+
+def test_ledger_matches_fresh_shaping_across_edits():
+    from cognitrix.sessions.context import HistoryLedger
+
+    ledger = HistoryLedger()
+    chat = []
+    for i in range(30):
+        chat.append(_user(f"question {i} " * (i % 5 + 1)))
+        chat.extend(_tool_exchange(i, payload="x" * 40))
+        chat.append(_assistant(f"answer {i}"))
+        if i % 7 == 3:
+            del chat[:5]  # front trim, as update_history bounds growth
+        if i % 11 == 5:
+            del chat[-2:]  # tail truncation, as a failed attachment turn rolls back
+        if i == 20:
+            chat = [_user("summary")] + chat[-6:]  # compaction rewrite
+        for budget in (50, 400, 100_000):
+            assert shape_history(chat, budget, ledger=ledger) == shape_history(chat, budget)
+        assert ledger.total == estimate_tokens(chat)
+
+
 def test_tool_outcome_model_content_omits_storage_and_ownership():
     from cognitrix.agents.base import _tool_result_entry
 
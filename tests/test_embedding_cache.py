@@ -0,0 +1,72 @@
+"""Persistent embedding cache in front of the shared embedding model."""
+
+import numpy as np
+
+from cognitrix.utils.embedding_cache import CachedEmbeddingModel, EmbeddingStore, text_key
+
+
+class _FakeModel:
+    """Deterministic 3-dim embeddings; records every text it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        texts = [sentences] if isinstance(sentences, str) else list(sentences)
+        self.encoded.extend(texts)
+        vectors = np.array([[len(text), text.count('a'), 1.0] for text in texts], dtype=np.float32)
+        return vectors[0] if isinstance(sentences, str) else vectors
+
+
+def test_repeated_texts_skip_the_model(tmp_path):
+    model = _FakeModel()
+    cached = CachedEmbeddingModel(model, 'fake', tmp_path)
+
+    first = cached.encode(['alpha', 'beta'])
+    again = cached.encode(['beta', 'gamma', 'alpha'])
+    single = cached.encode('alpha')
+
+    assert model.encoded == ['alpha', 'beta', 'gamma']
+    assert first.shape == (2, 3) and again.shape == (3, 3) and single.shape == (3,)
+    np.testing.assert_array_equal(single, first[0])
+    np.testing.assert_array_equal(again[0], first[1])
+
+
+def test_cache_is_shared_through_disk(tmp_path):
+    CachedEmbeddingModel(_FakeModel(), 'org/fake model', tmp_path).encode(['alpha', 'beta'])
+
+    model = _FakeModel()
+    other = CachedEmbeddingModel(model, 'org/fake model', tmp_path, lru_size=1)
+    vectors = other.encode(['beta', 'alpha'])
+
+    assert model.encoded == []
+    np.testing.assert_array_equal(vectors[0], [4, 1, 1])
+    assert [path.name for path in tmp_path.iterdir()] == ['org_fake_model-3.f32']
+
+
+def test_unsafe_encode_options_bypass_the_cache(tmp_path):
+    model = _FakeModel()
+    cached = CachedEmbeddingModel(model, 'fake', tmp_path)
+
+    cached.encode('alpha')
+    cached.encode('alpha', normalize_embeddings=True)
+
+    assert model.encoded == ['alpha', 'alpha']
+
+
+def test_torn_tail_is_dropped_before_the_next_append(tmp_path):
+    store = EmbeddingStore(tmp_path / 'm-3.f32', 3)
+    store.put_many([text_key('a')], np.ones((1, 3), dtype=np.float32))
+    with open(store.path, 'ab') as handle:
+        handle.write(b'\x00' * 7)
+
+    reopened = EmbeddingStore(store.path, 3)
+    reopened.put_many([text_key('b')], np.full((1, 3), 2, dtype=np.float32))
+
+    assert store.path.stat().st_size == 2 * reopened.dtype.itemsize
+    a, b = EmbeddingStore(store.path, 3).get_many([text_key('a'), text_key('b')])
+    np.testing.assert_array_equal(a, [1, 1, 1])
+    np.testing.assert_array_equal(b, [2, 2, 2])
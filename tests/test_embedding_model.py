@@ -0,0 +1,162 @@
+"""Keyed, bounded embedding model registry."""
+
+import pytest
+
+from cognitrix.utils import embedding_model
+
+
+class _Param:
+    def __init__(self, count):
+        self.count = count
+
+    def numel(self):
+        return self.count
+
+    def element_size(self):
+        return 4
+
+
+class _FakeModel:
+    def __init__(self, name, params=1024):
+        self.name = name
+        self.params = params
+
+    def parameters(self):
+        return [_Param(self.params)]
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        import numpy as np
+
+        return np.array([[len(self.name), len(text)] for text in sentences], dtype=np.float32)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    from cognitrix.config import settings
+
+    loads = []
+
+    def load(model_name, backend, quantize):
+        loads.append((model_name, backend, quantize))
+        return _FakeModel(model_name, params=1024 * 1024 if model_name == 'big' else 1024)
+
+    monkeypatch.setattr(embedding_model, '_load_model', load)
+    monkeypatch.setenv('DISABLE_EMBEDDING_CACHE', 'true')
+    monkeypatch.setattr(settings, 'embedding_max_models', 2)
+    monkeypatch.setattr(settings, 'embedding_memory_budget_mb', 3)
+    monkeypatch.setattr(settings, 'embedding_idle_seconds', 1800.0)
+    monkeypatch.setattr(settings, 'embedding_backend', 'torch')
+    monkeypatch.setattr(settings, 'embedding_quantize', False)
+    embedding_model.clear_embedding_model_cache()
+    yield loads
+    embedding_model.clear_embedding_model_cache()
+
+
+def test_models_are_keyed_by_name(registry):
+    first = embedding_model.get_embedding_model('alpha')
+    second = embedding_model.get_embedding_model('beta')
+
+    assert embedding_model.get_embedding_model('alpha') is first
+    assert first.encode(['x'])[0][0] == len('alpha')
+    assert second.encode(['x'])[0][0] == len('beta')
+    assert registry == [('alpha', 'torch', False), ('beta', 'torch', False)]
+
+
+def test_registry_is_bounded_and_reloads_evicted_models(registry):
+    alpha = embedding_model.get_embedding_model('alpha')
+    embedding_model.get_embedding_model('beta')
+    embedding_model.get_embedding_model('gamma')
+
+    assert [stat['model'] for stat in embedding_model.embedding_model_stats()] == ['beta', 'gamma']
+
+    alpha.encode(['x'])
+    assert registry[-1] == ('alpha', 'torch', False)
+
+
+def test_memory_budget_and_idle_eviction(registry, monkeypatch):
+    from cognitrix.config import settings
+
+    embedding_model.get_embedding_model('alpha')
+    embedding_model.get_embedding_model('big')  # 4 MiB of weights > 3 MiB budget
+    stats = embedding_model.embedding_model_stats()
+    assert [(stat['model'], stat['bytes']) for stat in stats] == [('big', 4 * 1024 * 1024)]
+
+    monkeypatch.setattr(settings, 'embedding_idle_seconds', -1.0)
+    embedding_model.evict_idle_embedding_models()
+    assert embedding_model.embedding_model_stats() == []
+
+
+def test_idle_models_are_evicted_without_further_use(registry, monkeypatch):
+    import time
+
+    from cognitrix.config import settings
+
+    monkeypatch.setattr(settings, 'embedding_idle_seconds', 0.05)
+    embedding_model.get_embedding_model('alpha')
+
+    deadline = time.monotonic() + 5
+    while embedding_model.embedding_model_stats() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert embedding_model.embedding_model_stats() == []
+
+
+def test_variants_of_one_model_keep_separate_embedding_caches(registry, monkeypatch, tmp_path):
+    from cognitrix import config
+
+    monkeypatch.delenv('DISABLE_EMBEDDING_CACHE')
+    monkeypatch.setattr(config, 'COGNITRIX_WORKDIR', tmp_path)
+    embedding_model.get_embedding_model('alpha').encode(['x'])
+    embedding_model.get_embedding_model('alpha', quantize=True).encode(['x'])
+    embedding_model.get_embedding_model('alpha', backend='onnx').encode(['x'])
+
+    assert sorted(path.name for path in (tmp_path / 'embedding_cache').iterdir()) == [
+        'alpha-onnx-2.f32', 'alpha-torch-2.f32', 'alpha-torch-int8-2.f32',
+    ]
+
+
+def test_backend_and_quantization_select_distinct_entries(registry):
+    embedding_model.get_embedding_model('alpha', quantize=True)
+    embedding_model.get_embedding_model('alpha', backend='onnx', quantize=True)
+
+    assert registry == [('alpha', 'torch', True), ('alpha', 'onnx', False)]
+    with pytest.raises(ValueError, match='Unknown embedding backend'):
+        embedding_model.get_embedding_model('alpha', backend='tpu')
+
+
+def test_warm_up_loads_configured_models(registry):
+    embedding_model.warm_up_embedding_models(['alpha', 'beta'])
+
+    assert [load[0] for load in registry] == ['alpha', 'beta']
+
+
+def test_onnx_and_openvino_models_are_sized_from_their_weight_files(tmp_path):
+    from types import SimpleNamespace
+
+    onnx = tmp_path / 'onnx'
+    onnx.mkdir()
+    (onnx / 'model.onnx').write_bytes(b'x' * 3000)
+    (onnx / 'model.onnx_data').write_bytes(b'x' * 7000)
+    (onnx / 'tokenizer.json').write_bytes(b'x' * 500)
+    openvino = tmp_path / 'openvino'
+    openvino.mkdir()
+    (openvino / 'openvino_model.xml').write_bytes(b'x' * 100)
+    (openvino / 'openvino_model.bin').write_bytes(b'x' * 9000)
+
+    class _Backed:
+        """A SentenceTransformer whose transformer runs outside torch."""
+
+        def __init__(self, auto_model):
+            self.modules = [SimpleNamespace(auto_model=auto_model), SimpleNamespace()]
+
+        def parameters(self):
+            return []
+
+        def __iter__(self):
+            return iter(self.modules)
+
+    assert embedding_model._model_bytes(_Backed(SimpleNamespace(model_path=onnx / 'model.onnx'))) == 10000
+    assert embedding_model._model_bytes(_Backed(SimpleNamespace(model_save_dir=str(openvino)))) == 9100
+    assert embedding_model._model_bytes(_FakeModel('torch', params=10)) == 40
@@ -7,7 +7,7 @@ from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
-from PIL import Image
+from PIL import Image, JpegImagePlugin
 
 from cognitrix.artifacts import Artifact, variant_path
 from cognitrix.media import (
@@ -578,6 +578,112 @@ async def test_delete_artifacts_removes_all_variants_and_only_authorized_rows(
     assert all(path.exists() for path in other_paths)
 
 
+@pytest.mark.asyncio
+async def test_repeated_upload_shares_variants_until_the_last_reference_is_deleted(
+    monkeypatch, artifact_store, tmp_path, rgb_jpeg_bytes
+):
+    from cognitrix.media import service as service_module
+
+    rows, _ = artifact_store
+    decoded = []
+    process_image = service_module._process_image
+    monkeypatch.setattr(
+        service_module,
+        '_process_image',
+        lambda data: decoded.append(len(data)) or process_image(data),
+    )
+    service = MediaAssetService()
+    ownership = MediaOwnership('session', 'user', 'agent')
+
+    first = await service.ingest_staged_image(
+        _stage(tmp_path, rgb_jpeg_bytes, filename='first.jpg'), ownership
+    )
+    second = await service.ingest_staged_image(
+        _stage(tmp_path, rgb_jpeg_bytes, filename='again.jpg'), ownership
+    )
+    other_agent = await service.ingest_staged_image(
+        _stage(tmp_path, rgb_jpeg_bytes, filename='first.jpg'),
+        MediaOwnership('session', 'user', 'other-agent'),
+    )
+
+    assert len(decoded) == 2
+    original, repeat = rows[first.id], rows[second.id]
+    assert first.id != second.id and repeat.filename == 'again.jpg'
+    assert (repeat.storage_key, repeat.vision_storage_key, repeat.thumbnail_storage_key) == (
+        original.storage_key, original.vision_storage_key, original.thumbnail_storage_key
+    )
+    assert rows[other_agent.id].storage_key != original.storage_key
+    shared = [variant_path(original, variant) for variant in ('original', 'vision', 'thumbnail')]
+
+    await service.delete_artifacts([first.id], ownership)
+    assert all(path.is_file() for path in shared)
+    resolved = await service.resolve_image(second.id, ownership, 'vision')
+    assert resolved.data == shared[1].read_bytes()
+
+    await service.delete_artifacts([second.id], ownership)
+    assert not any(path.exists() for path in shared)
+
+
+@pytest.mark.asyncio
+async def test_batch_delete_counts_references_once_and_frees_files_with_the_last_row(
+    monkeypatch, artifact_store, tmp_path, rgb_jpeg_bytes
+):
+    from cognitrix.media import service as service_module
+
+    rows, _ = artifact_store
+    service = MediaAssetService()
+    ownership = MediaOwnership('session', 'user', 'agent')
+    artifacts = [
+        await service.ingest_staged_image(
+            _stage(tmp_path, rgb_jpeg_bytes, filename=f'copy{number}.jpg'), ownership
+        )
+        for number in range(3)
+    ]
+    shared = [variant_path(rows[artifacts[0].id], variant) for variant in ('original', 'vision', 'thumbnail')]
+    lookups = []
+    find = service_module.Artifact.find
+
+    async def counting(query, *args, **kwargs):
+        lookups.append(query)
+        return await find(query, *args, **kwargs)
+
+    monkeypatch.setattr(service_module.Artifact, 'find', counting)
+
+    await service.delete_artifacts([artifacts[0].id, artifacts[1].id], ownership)
+    assert lookups == [{'session_id': 'session'}]
+    assert all(path.is_file() for path in shared)
+
+    await service.delete_artifacts([artifacts[2].id], ownership)
+    assert not any(path.exists() for path in shared)
+
+
+@pytest.mark.asyncio
+async def test_generated_image_reuses_a_retained_digest_with_its_own_metadata(
+    monkeypatch, artifact_store, rgba_png_bytes
+):
+    from cognitrix.media import service as service_module
+
+    rows, _ = artifact_store
+    service = MediaAssetService()
+    ownership = MediaOwnership('session', 'user', 'agent')
+    first = await service.store_generated_image(
+        rgba_png_bytes, {'prompt': 'a square'}, ownership
+    )
+    monkeypatch.setattr(
+        service_module,
+        '_process_image',
+        lambda _data: pytest.fail('retained content must not be decoded again'),
+    )
+
+    again = await service.store_generated_image(
+        rgba_png_bytes, {'prompt': 'the same square'}, ownership
+    )
+
+    assert rows[again.id].storage_key == rows[first.id].storage_key
+    assert rows[again.id].prompt == 'the same square'
+    assert rows[again.id].content_sha256 == rows[first.id].content_sha256
+
+
 @pytest.mark.asyncio
 async def test_concurrent_commits_serialize_the_final_session_quota_check(
     monkeypatch, artifact_store
@@ -717,6 +823,53 @@ async def test_run_media_cpu_is_bounded_and_uses_worker_threads(monkeypatch):
     assert event_loop_thread not in worker_threads
 
 
+def test_large_jpeg_variants_come_from_a_reduced_decode(monkeypatch):
+    from cognitrix.media import processing
+
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    data = _image_bytes('RGB', (4000, 2000), (200, 40, 10), 'JPEG', exif=exif)
+    drafts = []
+    draft = JpegImagePlugin.JpegImageFile.draft
+
+    def record(image, mode, size):
+        drafts.append(size)
+        return draft(image, mode, size)
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, 'draft', record)
+    processed = processing._process_image(data)
+
+    assert drafts == [(1568, 784)]
+    assert (processed.width, processed.height) == (2000, 4000)
+    with Image.open(io.BytesIO(processed.vision)) as vision:
+        assert vision.size == (784, 1568)
+    with Image.open(io.BytesIO(processed.thumbnail)) as thumbnail:
+        assert thumbnail.size == (192, 384)
+
+
+@pytest.mark.asyncio
+async def test_process_mode_normalizes_images_in_worker_processes(
+    monkeypatch, rgba_png_bytes
+):
+    from cognitrix.media import processing
+
+    monkeypatch.setattr(processing, 'MEDIA_PROCESSING_MODE', 'process')
+    monkeypatch.setattr(processing, 'MEDIA_PROCESSING_CONCURRENCY', 1)
+    monkeypatch.setattr(processing, '_process_pool', None)
+    try:
+        processed = await processing.run_media_cpu(processing._process_image, rgba_png_bytes)
+        with pytest.raises(MediaValidationError):
+            await processing.run_media_cpu(processing._process_image, b'not an image')
+        used_pool = processing._process_pool
+    finally:
+        pool = processing._process_pool
+        if pool is not None:
+            pool.shutdown()
+
+    assert used_pool is not None
+    assert processed == processing._normalize_image(rgba_png_bytes)
+
+
 @pytest.mark.asyncio
 async def test_legacy_thumbnail_is_created_once_for_concurrent_resolvers(
     monkeypatch, artifact_store
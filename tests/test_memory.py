@@ -7,7 +7,7 @@ import numpy as np
 import pytest
 
 from cognitrix.memory.base import MemoryEntry
-from cognitrix.memory.chroma_store import ChromaMemoryStore
+from cognitrix.memory.chroma_store import EMBED_BATCH_SIZE, ChromaMemoryStore
 from cognitrix.memory.hybrid_context import HybridContextManager, ImportanceScorer
 
 
@@ -36,11 +36,11 @@ class TestChromaMemoryStore:
             yield mock_model
 
     @pytest.fixture
-    def memory_store(self, mock_chroma_client, mock_embedding_model):
+    def memory_store(self, mock_chroma_client, mock_embedding_model, tmp_path):
         """Create a memory store with mocked dependencies."""
         return ChromaMemoryStore(
             collection_name="test_collection",
-            persist_directory="/tmp/test_chroma"
+            persist_directory=str(tmp_path / "test_chroma")
         )
 
     @pytest.mark.asyncio
@@ -178,6 +178,50 @@ class TestChromaMemoryStore:
         assert id1 == id2
         assert len(id1) == 32  # MD5 hex
 
+    @pytest.mark.asyncio
+    async def test_store_many_encodes_once_and_adds_once(
+        self, memory_store, mock_chroma_client, mock_embedding_model
+    ):
+        """A batch is one encode call and one collection.add."""
+        _, mock_collection = mock_chroma_client
+        mock_embedding_model.encode.return_value = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+
+        memory_ids = await memory_store.store_many(
+            ["one", "two", "three"],
+            [{"role": "user"}, {"role": "assistant"}, {}],
+            [0.9, 0.8, 0.7],
+        )
+
+        mock_embedding_model.encode.assert_called_once_with(
+            ["one", "two", "three"], batch_size=EMBED_BATCH_SIZE
+        )
+        mock_collection.add.assert_called_once()
+        call_args = mock_collection.add.call_args[1]
+        assert call_args['ids'] == memory_ids
+        assert len(set(memory_ids)) == 3
+        assert call_args['embeddings'] == [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]
+        assert call_args['metadatas'][1]['role'] == 'assistant'
+        assert call_args['metadatas'][2]['importance'] == 0.7
+
+    @pytest.mark.asyncio
+    async def test_retrieve_many_queries_once(self, memory_store, mock_chroma_client, mock_embedding_model):
+        """Several queries share one encode call and one collection.query."""
+        _, mock_collection = mock_chroma_client
+        mock_embedding_model.encode.return_value = np.array([[0.1, 0.2], [0.3, 0.4]])
+        now = datetime.now().isoformat()
+        mock_collection.query.return_value = {
+            'ids': [['a'], ['b']],
+            'documents': [['Content A'], ['Content B']],
+            'metadatas': [[{'timestamp': now}], [{'timestamp': now}]],
+            'distances': [[0.1], [0.2]],
+        }
+
+        results = await memory_store.retrieve_many(["first", "second"], k=1)
+
+        mock_collection.query.assert_called_once()
+        assert mock_collection.query.call_args[1]['query_embeddings'] == [[0.1, 0.2], [0.3, 0.4]]
+        assert [[entry.content for entry in row] for row in results] == [['Content A'], ['Content B']]
+
     @pytest.mark.asyncio
     async def test_embed_async(self, memory_store, mock_embedding_model):
         """Test async embedding generation."""
@@ -381,11 +425,49 @@ class TestHybridContextManager:
         }
 
         await manager.add_to_memory(message)
+        await manager.flush_memory()
+
+        mock_store.store_many.assert_called_once()
+        contents, metadatas, importances = mock_store.store_many.call_args[0]
+        assert contents == [message['content']]
+        assert metadatas[0]['role'] == 'system'
+        assert importances[0] >= manager.importance_threshold
 
-        mock_store.store.assert_called_once()
-        call_args = mock_store.store.call_args
-        assert 'importance' in call_args[1]
-        assert call_args[1]['importance'] >= manager.importance_threshold
+    @pytest.mark.asyncio
+    async def test_add_to_memory_does_not_wait_and_batches_a_turn(self, hybrid_manager):
+        """Messages queued in one turn are written by one store_many call."""
+        manager, mock_store = hybrid_manager
+        important = 'Critical error: the deployment failed and must be remembered'
+
+        await manager.add_to_memory({'content': important, 'role': 'user', 'type': 'text'})
+        await manager.add_to_memory({'content': important + ' again', 'role': 'assistant', 'type': 'text'})
+        mock_store.store_many.assert_not_called()
+
+        await manager.flush_memory()
+
+        mock_store.store_many.assert_called_once()
+        assert mock_store.store_many.call_args[0][0] == [important, important + ' again']
+
+    @pytest.mark.asyncio
+    async def test_write_behind_queue_drops_oldest_past_its_bound(self, hybrid_manager, monkeypatch):
+        """A store that cannot keep up never grows the queue past its cap."""
+        from cognitrix.memory import hybrid_context
+
+        manager, mock_store = hybrid_manager
+        monkeypatch.setattr(hybrid_context, 'WRITE_BEHIND_MAX_PENDING', 3)
+
+        for number in range(5):
+            await manager.add_to_memory({
+                'content': f'Critical error {number} must be remembered',
+                'role': 'system',
+                'type': 'text',
+            })
+        assert len(manager._pending_memories) == 3
+
+        await manager.flush_memory()
+
+        stored = [content for call in mock_store.store_many.call_args_list for content in call[0][0]]
+        assert stored == [f'Critical error {number} must be remembered' for number in (2, 3, 4)]
 
     @pytest.mark.asyncio
     async def test_search_memory(self, hybrid_manager):
@@ -458,7 +540,7 @@ class TestHybridContextManager:
     async def test_add_to_memory_error_handling(self, hybrid_manager):
         """Test that store errors are handled gracefully."""
         manager, mock_store = hybrid_manager
-        mock_store.store.side_effect = Exception("Store failed")
+        mock_store.store_many.side_effect = Exception("Store failed")
 
         # High importance message should trigger store
         message = {
@@ -469,13 +551,14 @@ class TestHybridContextManager:
 
         # Should not raise exception
         await manager.add_to_memory(message)
+        await manager.flush_memory()
 
 
 class TestMemoryIntegration:
     """Integration tests for memory components working together."""
 
     @pytest.mark.asyncio
-    async def test_memory_workflow(self):
+    async def test_memory_workflow(self, tmp_path):
         """Test complete memory storage and retrieval workflow."""
         with patch('cognitrix.memory.chroma_store.chromadb') as mock_chromadb, \
              patch('cognitrix.memory.chroma_store.get_embedding_model') as mock_get_model:
@@ -492,7 +575,7 @@ class TestMemoryIntegration:
             mock_get_model.return_value = mock_model
 
             # Create store
-            store = ChromaMemoryStore(collection_name="test")
+            store = ChromaMemoryStore(collection_name="test", persist_directory=str(tmp_path))
 
             # Store a memory
             memory_id = await store.store(
@@ -515,6 +598,46 @@ class TestMemoryIntegration:
             assert len(results) == 1
             assert results[0].content == "Important information"
 
+    @pytest.mark.asyncio
+    async def test_get_recent_fetches_only_newest_ids(self, tmp_path):
+        """get_recent reads n ids from the recency index, not the whole collection."""
+        with patch('cognitrix.memory.chroma_store.get_embedding_model') as mock_get_model:
+            mock_model = MagicMock()
+            mock_model.encode.side_effect = lambda texts, **_: np.array(
+                [[float(len(text)), 1.0, 0.5] for text in texts]
+            )
+            mock_get_model.return_value = mock_model
+            store = ChromaMemoryStore(collection_name="recent", persist_directory=str(tmp_path))
+
+        for index in range(5):
+            await store.store_many([f"memory {index}"], [{}], [0.5])
+        await store.delete((await store.get_recent(1))[0].id)
+
+        reads = []
+        collection_get = store.collection.get
+        store.collection.get = lambda **kwargs: reads.append(kwargs) or collection_get(**kwargs)
+
+        recent = await store.get_recent(n=2)
+
+        assert [entry.content for entry in recent] == ["memory 3", "memory 2"]
+        assert [sorted(read) for read in reads] == [["ids"]]
+        assert len(reads[0]["ids"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_get_recent_rebuilds_a_missing_index(self, tmp_path):
+        """A collection written before the index existed is indexed by one scan."""
+        with patch('cognitrix.memory.chroma_store.get_embedding_model') as mock_get_model:
+            mock_model = MagicMock()
+            mock_model.encode.side_effect = lambda texts, **_: np.array([[1.0, 0.0, 0.0] for _ in texts])
+            mock_get_model.return_value = mock_model
+            store = ChromaMemoryStore(collection_name="legacy", persist_directory=str(tmp_path))
+
+        await store.store_many(["old", "older"], [{}, {}], [0.5, 0.5])
+        await store._run_sync(store.recency.replace, [])
+
+        assert len(await store.get_recent(n=5)) == 2
+        assert store.recency.count() == 2
+
     @pytest.mark.asyncio
     async def test_hybrid_context_full_flow(self):
         """Test full hybrid context flow."""
@@ -480,6 +480,12 @@ async def test_run_uses_one_emitter_and_publishes_authoritative_terminal_status(
             events.append((kind, kwargs))
             timeline.append(('event', kind, kwargs.get('data', {}).get('status')))
 
+        async def drain(self):
+            timeline.append(('drain',))
+
+        async def aclose(self):
+            return None
+
     monkeypatch.setattr(orch, 'TaskRunEventEmitter', RecordingEmitter)
 
     class FakeTask(SimpleNamespace):
@@ -627,6 +633,12 @@ async def test_run_stops_after_authoritative_force_cancelled_state(monkeypatch):
         async def emit(self, kind, **kwargs):
             events.append((kind, kwargs))
 
+        async def drain(self):
+            return None
+
+        async def aclose(self):
+            return None
+
     monkeypatch.setattr(orch, 'TaskRunEventEmitter', RecordingEmitter)
 
     class FakeTask(SimpleNamespace):
@@ -213,11 +213,12 @@ async def test_lost_production_renewal_interrupts_owner_with_control_error():
 
 def test_openai_sdk_hidden_retries_are_disabled(monkeypatch):
     import cognitrix.providers.base as provider
+    import cognitrix.providers.client_pool as client_pool
 
     captured = []
-    provider._client_cache.clear()
+    monkeypatch.setattr(provider, "_client_pool", None)
     monkeypatch.setattr(
-        provider,
+        client_pool,
         "AsyncOpenAI",
         lambda **kwargs: captured.append(kwargs) or object(),
     )
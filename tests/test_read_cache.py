@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from cognitrix.config import settings
+from cognitrix.media import document_storage
+from cognitrix.tools import derived_text
+from cognitrix.tools.misc import Read
+from cognitrix.tools.utils import (
+    DocumentCapability,
+    ToolExecutionContext,
+    reset_execution_context,
+    set_execution_context,
+)
+
+
+class _Page:
+    def __init__(self, number, extracted):
+        self.number = number
+        self.extracted = extracted
+
+    def get_text(self, _kind):
+        self.extracted.append(self.number)
+        return f'text of page {self.number}'
+
+
+class _Document:
+    def __init__(self, pages, extracted):
+        self.pages = [_Page(index + 1, extracted) for index in range(pages)]
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, index):
+        return self.pages[index]
+
+    def close(self):
+        pass
+
+
+def _fake_fitz(monkeypatch, pages):
+    opened, extracted = [], []
+
+    def open_document(*_args, **_kwargs):
+        opened.append(1)
+        return _Document(pages, extracted)
+
+    monkeypatch.setitem(sys.modules, 'fitz', SimpleNamespace(open=open_document))
+    return opened, extracted
+
+
+def test_line_offsets_split_lines_like_text_mode(tmp_path):
+    data = b'one\r\ntwo\rthree\n\nfour'
+    target = tmp_path / 'mixed.txt'
+    target.write_bytes(data)
+    offsets = derived_text.line_offsets(data)
+    with open(target, encoding='utf-8', newline=None) as stream:
+        expected = [line.rstrip('\n') for line in stream]
+
+    assert len(offsets) - 1 == len(expected)
+    assert [
+        data[start:end].decode().rstrip('\r\n')
+        for start, end in zip(offsets[:-1], offsets[1:], strict=True)
+    ] == expected
+    assert len(derived_text.line_offsets(b'')) == 1
+    assert len(derived_text.line_offsets(b'a\n')) == 2
+
+
+@pytest.mark.asyncio
+async def test_paging_through_a_pdf_opens_it_once_until_it_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'tools_root', tmp_path.resolve())
+    target = tmp_path / 'book.pdf'
+    target.write_bytes(b'%PDF-fake')
+    opened, extracted = _fake_fitz(monkeypatch, 300)
+
+    first = await Read.run(file_path='book.pdf', page_range='1-5')
+    second = await Read.run(file_path='book.pdf', page_range='6-10')
+    third = await Read.run(file_path='book.pdf', page_range='30,31')
+
+    assert opened == [1]
+    assert len(extracted) == 5 + derived_text.PDF_READAHEAD_PAGES
+    assert 'text of page 5' in first.content
+    assert 'text of page 10' in second.content
+    assert 'text of page 31' in third.content
+
+    await Read.run(file_path='book.pdf', page_range='200')
+    target.write_bytes(b'%PDF-fake, edited')
+    os.utime(target, ns=(1, 1))
+    await Read.run(file_path='book.pdf', page_range='1')
+
+    assert opened == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_text_reads_seek_through_cached_line_offsets(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'tools_root', tmp_path.resolve())
+    (tmp_path / 'log.txt').write_text(''.join(f'line {n}\n' for n in range(1, 1001)))
+    indexed = []
+    line_offsets = derived_text.line_offsets
+    monkeypatch.setattr(
+        derived_text,
+        'line_offsets',
+        lambda data: indexed.append(len(data)) or line_offsets(data),
+    )
+
+    head = await Read.run(file_path='log.txt', end_line=2)
+    tail = await Read.run(file_path='log.txt', start_line=999, show_line_numbers=False)
+    past = await Read.run(file_path='log.txt', start_line=1001)
+
+    assert len(indexed) == 1
+    assert head.content.endswith('     1: line 1\n     2: line 2')
+    assert 'Lines: 999-1000 of 1000' in tail.content
+    assert tail.content.endswith('line 999\nline 1000')
+    assert 'past end of file (1000)' in past.content
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('mime_type', 'content', 'arguments', 'expected'),
+    [
+        ('text/plain', b'alpha\nbeta\ngamma\n', {'start_line': 2}, 'beta'),
+        ('application/pdf', b'%PDF-managed', {'page_range': '2'}, 'text of page 2'),
+    ],
+)
+async def test_managed_documents_are_read_from_storage_once(
+    monkeypatch, mime_type, content, arguments, expected
+):
+    _fake_fitz(monkeypatch, 3)
+    grant = DocumentCapability(
+        document_id='doc-1',
+        storage_key=(
+            'uploads/d_aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa_'
+            'bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb/'
+            'f_0123456789abcdef0123456789abcdef.txt'
+        ),
+        mime_type=mime_type,
+        filename='notes',
+        size_bytes=len(content),
+        sha256=hashlib.sha256(content).hexdigest(),
+        tools_root_identity='v1:1:d:01',
+        uploads_identity='v1:1:d:02',
+        directory_identity='v1:1:d:03',
+        file_identity='v1:1:f:04',
+    )
+    reads = []
+    monkeypatch.setattr(
+        document_storage,
+        'read_document_sync',
+        lambda record: reads.append(record) or content,
+    )
+    token = set_execution_context(ToolExecutionContext(document_capabilities=(grant,)))
+    try:
+        results = [
+            await Read.run(file_path=grant.storage_key, **arguments)
+            for _ in range(2)
+        ]
+    finally:
+        reset_execution_context(token)
+
+    assert len(reads) == 1
+    assert results[0].content == results[1].content
+    assert expected in results[0].content
@@ -0,0 +1,138 @@
+"""Opt-in provider response cache for deterministic LLM calls."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import cognitrix.providers.base as provider
+from cognitrix.providers.base import LLM
+from cognitrix.providers.response_cache import (
+    ResponseCache,
+    SQLiteResponseBackend,
+    reset_response_cache,
+    response_cache_key,
+    set_response_cache,
+)
+from cognitrix.tasks.accounting import capture_task_usage, task_accounting_scope
+from cognitrix.tasks.budget import BudgetLedger, TaskBudget
+
+
+class _Slot:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        return None
+
+
+class _Limiter:
+    def slot(self, *_args):
+        return _Slot()
+
+
+class _Completions:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **params):
+        self.calls.append(params)
+        message = SimpleNamespace(content='planned', tool_calls=None)
+        usage = SimpleNamespace(prompt_tokens=11, completion_tokens=5)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def completions(monkeypatch, tmp_path):
+    completions = _Completions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(provider, '_get_or_create_client', lambda *_args, **_kwargs: client)
+    set_response_cache(ResponseCache(SQLiteResponseBackend(tmp_path / 'cache.sqlite3', 100), 60))
+    yield completions
+    reset_response_cache()
+
+
+def _llm(temperature=0):
+    return LLM(
+        provider='groq',
+        model='model',
+        temperature=temperature,
+        api_key='secret',
+        base_url='https://provider.test/v1',
+    )
+
+
+def test_key_ignores_delivery_and_dict_order():
+    params = {'model': 'm', 'messages': [{'role': 'user', 'content': 'hi'}], 'temperature': 0}
+    reordered = {'temperature': 0, 'stream': True, 'stream_options': {'include_usage': True},
+                 'messages': [{'content': 'hi', 'role': 'user'}], 'model': 'm'}
+
+    assert response_cache_key('groq', params) == response_cache_key('groq', reordered)
+    assert response_cache_key('groq', params) != response_cache_key('groq', {**params, 'temperature': 0.5})
+    assert response_cache_key('groq', params) != response_cache_key('openai', params)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_expires_and_evicts_least_recently_used(tmp_path):
+    backend = SQLiteResponseBackend(tmp_path / 'cache.sqlite3', max_entries=2)
+
+    await backend.put('a', {'content': 'A'}, 60)
+    await backend.put('b', {'content': 'B'}, 60)
+    time.sleep(0.01)
+    assert await backend.get('a') == {'content': 'A'}
+    await backend.put('c', {'content': 'C'}, 60)
+    await backend.put('gone', {'content': 'stale'}, -1)
+
+    assert await backend.get('b') is None
+    assert await backend.get('gone') is None
+    assert await backend.get('a') == {'content': 'A'}
+    assert len(backend) == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_deterministic_call_is_served_from_cache(completions):
+    prompt = [{'role': 'user', 'content': 'plan this'}]
+
+    first = await _llm()(prompt)
+    second = await _llm()(prompt)
+    await _llm(temperature=0.7)(prompt)
+    await _llm()(prompt, cache=False)
+
+    assert len(completions.calls) == 3
+    assert second.llm_response == first.llm_response == 'planned'
+    assert second.cached and not first.cached
+    assert second.usage == {'prompt_tokens': 0, 'completion_tokens': 0}
+
+
+@pytest.mark.asyncio
+async def test_streaming_caller_gets_a_replayed_stream(completions):
+    prompt = [{'role': 'user', 'content': 'plan this'}]
+    await _llm()(prompt)
+
+    chunks = []
+    last = None
+    async for response in await _llm()(prompt, stream=True):
+        chunks.append(response.current_chunk)
+        last = response
+
+    assert len(completions.calls) == 1
+    assert ''.join(chunks) == 'planned'
+    assert last.llm_response == 'planned' and last.cached
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_are_accounted_as_zero_cost_calls(completions):
+    prompt = [{'role': 'user', 'content': 'plan this'}]
+    ledger = BudgetLedger(TaskBudget(max_tokens=1000, max_llm_calls=5))
+
+    async with task_accounting_scope(ledger, actor_key='system', limiter=_Limiter()):
+        async with capture_task_usage() as usage:
+            await _llm()(prompt)
+            await _llm()(prompt)
+
+    snapshot = usage.snapshot()
+    assert snapshot['llm_calls'] == 2
+    assert snapshot['cached_llm_calls'] == 1
+    assert snapshot['prompt_tokens'] == 11
+    assert snapshot['completion_tokens'] == 5
+    assert ledger.snapshot()['total_tokens'] == 16
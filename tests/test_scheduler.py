@@ -275,6 +275,51 @@ async def test_tick_unexpected_error_reverts_and_continues(sched_db, enqueue):
     assert fresh.next_run_at == '2030-06-01 11:59:00'  # reverted, will retry
 
 
+async def test_due_query_is_an_ordered_limited_range(sched_db, enqueue, monkeypatch):
+    import cognitrix.tasks.scheduler as scheduler
+
+    late = await _mk(schedule_interval=300, next_run_at='2030-06-01 11:58:00')
+    early = await _mk(schedule_interval=300, next_run_at='2030-06-01 11:30:00')
+    await _mk(schedule_interval=300, next_run_at='2030-06-01 12:30:00')
+    deleted = await _mk(schedule_interval=300, next_run_at='2030-06-01 11:00:00')
+    await Task.update_one({'id': deleted.id}, {'deleted_at': '2030-06-01 10:00:00'})
+
+    due = await scheduler.scheduled_tasks(NOW, limit=10)
+    assert [t.id for t in due] == [early.id, late.id]
+    assert [t.id for t in await scheduler.scheduled_tasks(NOW, limit=1)] == [early.id]
+
+    # Pages are re-read until a short page: both fire with a page size of 1.
+    monkeypatch.setattr(scheduler, 'DUE_PAGE_SIZE', 1)
+    assert await tick(NOW) == 2
+    assert await scheduler.next_due_at() == datetime(2030, 6, 1, 12, 5)
+
+
+def test_scheduler_sleeps_until_next_due_within_the_tick_cap():
+    from cognitrix.tasks.scheduler import TICK_SECONDS, _sleep_seconds
+
+    assert _sleep_seconds(NOW, NOW + timedelta(seconds=7)) == 7
+    assert _sleep_seconds(NOW, NOW + timedelta(hours=1)) == TICK_SECONDS
+    assert _sleep_seconds(NOW, None) == TICK_SECONDS
+    assert _sleep_seconds(NOW, NOW - timedelta(seconds=5)) == TICK_SECONDS
+
+
+async def test_database_lease_elects_one_scheduler(sched_db):
+    from cognitrix.tasks.scheduler_lease import DatabaseLeaderLease, SchedulerLease
+
+    create = getattr(SchedulerLease, '_create_table_async', None) or SchedulerLease.create_table
+    await create()
+    first = DatabaseLeaderLease(owner='api-1')
+    second = DatabaseLeaderLease(owner='api-2')
+
+    assert await first.acquire() is True
+    assert await second.acquire() is False
+    assert await first.acquire() is True  # renewal
+
+    await first.release()
+    assert await second.acquire() is True
+    assert await first.acquire() is False
+
+
 # --- save_task / toggle routes -------------------------------------------------
 
 def _jwt_ctx():
@@ -0,0 +1,169 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from cognitrix.config import settings
+from cognitrix.tools import misc, search_index
+from cognitrix.tools.misc import Glob, Grep
+
+
+@pytest.fixture
+def indexed_root(tmp_path, monkeypatch):
+    root = tmp_path / 'root'
+    root.mkdir()
+    monkeypatch.setattr(settings, 'tools_root', root.resolve())
+    monkeypatch.setattr(settings, 'workdir', tmp_path / 'work')
+    monkeypatch.setattr(settings, 'search_index', True)
+    monkeypatch.setattr(settings, 'search_index_sweep_seconds', 3600)
+    monkeypatch.setattr(search_index, '_indexes', {})
+    return root.resolve()
+
+
+def _swept(root):
+    index = search_index.index_for(root)
+    index.current(misc._authorize_search_path)
+    return index.wait(5)
+
+
+def test_required_literals_skip_optional_and_alternate_parts():
+    assert search_index.required_literals('def handle_(request|reply)') == ['def handle_']
+    assert search_index.required_literals(r'(?:abc)+x?yz\d{2}tail') == ['abc', 'tail']
+    assert search_index.required_literals('a|bcdef') == []
+    assert search_index.required_literals('(unbalanced') == []
+
+
+def test_required_literals_require_nothing_where_regex_reads_the_pattern_differently():
+    # Fuzzy matching and nested sets are literal text to the stdlib parser.
+    assert search_index.required_literals('(?:needle){e<=1}') == []
+    assert search_index.required_literals('x(?=ab{e<=1})cdef') == []
+    assert search_index.required_literals('[[:alpha:]]value') == []
+    assert search_index.required_literals(r'\p{Lu}+word') == []
+
+
+@pytest.mark.asyncio
+async def test_grep_scans_only_candidate_files(indexed_root, monkeypatch):
+    (indexed_root / 'src').mkdir()
+    (indexed_root / 'vendor').mkdir()
+    (indexed_root / 'src' / 'hit.py').write_text('x = 1\ndef Needle_Value():\n')
+    (indexed_root / 'vendor' / 'hit.py').write_text('def needle_value():\n')
+    for number in range(20):
+        (indexed_root / 'src' / f'other{number}.py').write_text(f'value = {number}\n')
+    _swept(indexed_root)
+    scanned = []
+    search_file = misc._search_file
+
+    def spy(path, *args, **kwargs):
+        scanned.append(path.name)
+        return search_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(misc, '_search_file', spy)
+
+    result = await Grep.run(pattern=r'def needle_\w+', path='.', exclude='vendor')
+
+    assert scanned == ['hit.py']
+    assert 'hit.py:2: def Needle_Value():' in result.content
+    assert 'vendor' not in result.content
+
+
+def test_sweep_rereads_only_changed_files_and_reuses_the_stored_index(indexed_root, monkeypatch):
+    (indexed_root / 'a.txt').write_text('alpha')
+    (indexed_root / 'b.txt').write_text('beta')
+    _swept(indexed_root)
+    reads = []
+    file_signature = search_index.SearchIndex._file_signature
+
+    def counting(path, size):
+        reads.append(path.name)
+        return file_signature(path, size)
+
+    monkeypatch.setattr(search_index.SearchIndex, '_file_signature', staticmethod(counting))
+    target = indexed_root / 'b.txt'
+    target.write_text('gamma!')
+    os.utime(target, ns=(1, 1))
+    snapshot = search_index.index_for(indexed_root).sweep(misc._authorize_search_path)
+
+    assert reads == ['b.txt']
+    assert [path.name for path in snapshot.candidates(indexed_root, 'gamma')] == ['b.txt']
+
+    monkeypatch.setattr(search_index, '_indexes', {})
+    reads.clear()
+    reloaded = _swept(indexed_root)
+
+    assert reads == []
+    assert reloaded.paths == snapshot.paths
+
+
+@pytest.mark.asyncio
+async def test_grep_scans_files_changed_or_created_since_the_sweep(indexed_root):
+    (indexed_root / 'pkg').mkdir()
+    (indexed_root / 'pkg' / 'edited.py').write_text('value = 1\n')
+    (indexed_root / 'pkg' / 'other.py').write_text('value = 2\n')
+    _swept(indexed_root)
+    (indexed_root / 'pkg' / 'edited.py').write_text('def needle_late():\n')
+    (indexed_root / 'pkg' / 'created.py').write_text('def needle_new():\n')
+
+    result = await Grep.run(pattern=r'def needle_\w+', path='.')
+
+    assert 'edited.py:1: def needle_late():' in result.content
+    assert 'created.py:1: def needle_new():' in result.content
+    assert 'other.py' not in result.content
+
+
+def test_sweep_writes_only_changed_rows(indexed_root, monkeypatch):
+    (indexed_root / 'a.txt').write_text('alpha')
+    (indexed_root / 'b.txt').write_text('beta')
+    (indexed_root / 'c.txt').write_text('gamma')
+    index = search_index.index_for(indexed_root)
+    index.sweep(misc._authorize_search_path)
+    saves = []
+    save = search_index.SearchIndex._save
+
+    def recording(self, updated, removed):
+        saves.append((sorted(Path(path).name for path in updated), sorted(Path(path).name for path in removed)))
+        return save(self, updated, removed)
+
+    monkeypatch.setattr(search_index.SearchIndex, '_save', recording)
+    (indexed_root / 'a.txt').unlink()
+    (indexed_root / 'b.txt').write_text('beta, longer')
+    index.sweep(misc._authorize_search_path)
+    index.sweep(misc._authorize_search_path)
+
+    assert saves == [(['b.txt'], ['a.txt'])]
+    monkeypatch.setattr(search_index, '_indexes', {})
+    stored = search_index.index_for(indexed_root)._load()
+    assert sorted(Path(path).name for path in stored) == ['b.txt', 'c.txt']
+    assert stored[str(indexed_root / 'b.txt')].size == len('beta, longer')
+
+
+@pytest.mark.asyncio
+async def test_glob_is_served_from_the_cached_listing(indexed_root, monkeypatch):
+    (indexed_root / 'pkg').mkdir()
+    (indexed_root / 'top.py').write_text('')
+    (indexed_root / 'pkg' / 'inner.py').write_text('')
+    _swept(indexed_root)
+    (indexed_root / 'late.py').write_text('')
+    listed = []
+    list_directory = search_index._list_directory
+
+    def spy(directory, authorize):
+        listed.append(Path(directory))
+        return list_directory(directory, authorize)
+
+    monkeypatch.setattr(search_index, '_list_directory', spy)
+
+    recursive = await Glob.run(pattern='*.py', path='.')
+    shallow = await Glob.run(pattern='*', path='.', recursive=False, include_dirs=True)
+
+    assert recursive.content.splitlines()[2:] == [
+        str(indexed_root / 'late.py'),
+        str(indexed_root / 'top.py'),
+        str(indexed_root / 'pkg' / 'inner.py'),
+    ]
+    assert shallow.content.splitlines()[2:] == [
+        str(indexed_root / 'late.py'),
+        str(indexed_root / 'pkg'),
+        str(indexed_root / 'top.py'),
+    ]
+    # Only the directory that gained an entry is listed again.
+    assert listed == [indexed_root, indexed_root]
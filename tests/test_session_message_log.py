@@ -0,0 +1,261 @@
+"""Session.chat persistence through the append-only SessionMessage log."""
+
+import pytest
+
+
+async def _sqlite_sessions(tmp_path):
+    from odbms import DBMS
+
+    from cognitrix.config import _patch_odbms_sqlite
+
+    await DBMS.initialize_async('sqlite', database=str(tmp_path / 'log.db'))
+    _patch_odbms_sqlite()
+
+    from cognitrix.sessions.base import Session
+    from cognitrix.sessions.messages import ensure_message_log
+
+    create = getattr(Session, '_create_table_async', None) or Session.create_table
+    await create()
+    await ensure_message_log()
+    return Session
+
+
+def _text(role, content):
+    return {'role': role, 'type': 'text', 'content': content}
+
+
+async def _log_rows(session_id):
+    from cognitrix.sessions.messages import SessionMessage
+
+    rows = await SessionMessage.find({'session_id': session_id})
+    return sorted(rows, key=lambda row: row.sequence)
+
+
+@pytest.mark.asyncio
+async def test_resave_appends_only_new_messages(tmp_path):
+    Session = await _sqlite_sessions(tmp_path)
+
+    session = Session(agent_id='agent-1')
+    session.update_history([_text('User', 'hi'), _text('assistant', 'hello')])
+    await session.save()
+    session.update_history(_text('User', 'again'))
+    await session.save()
+    await session.save()
+
+    rows = await _log_rows(session.id)
+    assert [row.sequence for row in rows] == [1, 2, 3]
+    assert [row.message['content'] for row in rows] == ['hi', 'hello', 'again']
+
+    loaded = await Session.get(session.id)
+    assert [message['content'] for message in loaded.chat] == ['hi', 'hello', 'again']
+    # The session row no longer carries the transcript.
+    from odbms import DBMS
+    cursor = await DBMS.Database.query(
+        f'SELECT chat FROM {Session.table_name()} WHERE id = :id', {'id': session.id}
+    )
+    assert cursor.fetchone()[0] in ('[]', '', None)
+
+
+@pytest.mark.asyncio
+async def test_compaction_records_window_marker_without_rewriting(tmp_path):
+    Session = await _sqlite_sessions(tmp_path)
+
+    session = Session(agent_id='agent-1')
+    session.update_history([_text('User', f'turn {index}') for index in range(4)])
+    await session.save()
+
+    summary = {'role': 'User', 'type': 'summary', 'content': 'earlier turns'}
+    session.chat = [summary, *session.chat[2:]]
+    session.update_history(_text('assistant', 'next'))
+    await session.save()
+
+    rows = await _log_rows(session.id)
+    assert [row.kind for row in rows] == ['message'] * 4 + ['window', 'message']
+    assert rows[4].head == [summary]
+    assert rows[4].folded_through == 2
+
+    loaded = await Session.get(session.id)
+    assert [message['content'] for message in loaded.chat] == [
+        'earlier turns', 'turn 2', 'turn 3', 'next',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cleared_history_stays_cleared_after_reload(tmp_path):
+    Session = await _sqlite_sessions(tmp_path)
+
+    session = Session(agent_id='agent-1')
+    session.update_history([_text('User', 'hi'), _text('assistant', 'hello')])
+    await session.save()
+    session.chat = []
+    await session.save()
+
+    loaded = await Session.get(session.id)
+    assert loaded.chat == []
+
+    loaded.update_history(_text('User', 'fresh'))
+    await loaded.save()
+    reloaded = await Session.get(session.id)
+    assert [message['content'] for message in reloaded.chat] == ['fresh']
+
+
+@pytest.mark.asyncio
+async def test_load_pages_in_only_the_newest_messages(tmp_path):
+    Session = await _sqlite_sessions(tmp_path)
+
+    session = Session(agent_id='agent-1')
+    session.update_history([_text('User', str(index)) for index in range(10)])
+    await session.save()
+
+    loaded = await Session.get(session.id)
+    await loaded.load_chat(limit=3)
+    assert [message['content'] for message in loaded.chat] == ['7', '8', '9']
+
+    loaded.update_history(_text('assistant', '10'))
+    await loaded.save()
+    assert [row.sequence for row in await _log_rows(session.id)][-1] == 11
+
+
+@pytest.mark.asyncio
+async def test_legacy_chat_blob_migrates_once(tmp_path):
+    from odbms import Model
+
+    Session = await _sqlite_sessions(tmp_path)
+    from cognitrix.sessions.messages import migrate_legacy_chats
+
+    legacy = Session(agent_id='agent-1', chat=[_text('User', 'old'), _text('assistant', 'reply')])
+    await Model.save(legacy)
+
+    assert await migrate_legacy_chats() == 1
+    assert await migrate_legacy_chats() == 0
+
+    rows = await _log_rows(legacy.id)
+    assert [row.message['content'] for row in rows] == ['old', 'reply']
+    loaded = await Session.get(legacy.id)
+    assert [message['content'] for message in loaded.chat] == ['old', 'reply']
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_message_log(tmp_path):
+    Session = await _sqlite_sessions(tmp_path)
+
+    session = Session(agent_id='agent-1')
+    session.update_history(_text('User', 'hi'))
+    await session.save()
+
+    assert await Session.delete(session.id) is True
+    assert await _log_rows(session.id) == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_legacy_migrations_write_the_transcript_once(tmp_path, monkeypatch):
+    import asyncio
+
+    from odbms import Model
+
+    from cognitrix.sessions import messages as message_log
+
+    Session = await _sqlite_sessions(tmp_path)
+    legacy = Session(agent_id='agent-1', chat=[_text('User', 'a'), _text('assistant', 'b')])
+    await Model.save(legacy)
+    copies = [Session(**legacy.model_dump()) for _ in range(2)]
+    # Both migrators see an empty log before either one writes.
+    barrier = asyncio.Barrier(2)
+    last_sequence = message_log.last_sequence
+    checked = []
+
+    async def racing(session_id):
+        value = await last_sequence(session_id)
+        if len(checked) < 2:
+            checked.append(value)
+            await barrier.wait()
+        return value
+
+    monkeypatch.setattr(message_log, 'last_sequence', racing)
+    await asyncio.gather(*(copy.load_chat() for copy in copies))
+
+    rows = await _log_rows(legacy.id)
+    assert checked == [0, 0]
+    assert [row.message['content'] for row in rows] == ['a', 'b']
+    assert [message['content'] for message in copies[1].chat] == ['a', 'b']
+
+
+@pytest.mark.asyncio
+async def test_listing_sessions_defers_history_to_one_batched_load(tmp_path):
+    Session = await _sqlite_sessions(tmp_path)
+    for index in range(3):
+        session = Session(agent_id='agent-1')
+        session.update_history([_text('User', f'{index}-{turn}') for turn in range(4)])
+        await session.save()
+    compacted = await Session.get(session.id)
+    compacted.chat = [{'role': 'User', 'type': 'summary', 'content': 'summary'}, *compacted.chat[3:]]
+    await compacted.save()
+
+    listed = await Session.all()
+    assert all(row.chat == [] for row in listed)
+
+    from odbms import DBMS
+    statements = []
+    query = DBMS.Database.query
+
+    async def counting(statement, *args, **kwargs):
+        statements.append(statement)
+        return await query(statement, *args, **kwargs)
+
+    DBMS.Database.query = counting
+    try:
+        await Session.load_chats(listed, limit=2)
+    finally:
+        DBMS.Database.query = query
+
+    assert len(statements) == 2
+    chats = sorted([message['content'] for message in row.chat] for row in listed)
+    assert chats == [['0-2', '0-3'], ['1-2', '1-3'], ['summary', '2-3']]
+
+
+class _MongoLog:
+    """A MongoDB stand-in whose unbounded find is capped like odbms's."""
+
+    dbms = 'mongodb'
+    db = None
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def find(self, table, conditions, sort=None, limit=100):
+        def matches(row):
+            for key, wanted in conditions.items():
+                if isinstance(wanted, dict):
+                    if '$gt' in wanted and not row[key] > wanted['$gt']:
+                        return False
+                elif row[key] != wanted:
+                    return False
+            return True
+
+        rows = [row for row in self.rows if matches(row)]
+        for key, direction in reversed(sort or []):
+            rows.sort(key=lambda row: row[key], reverse=direction < 0)
+        return [dict(row) for row in rows[:limit]]
+
+
+@pytest.mark.asyncio
+async def test_mongo_log_pages_the_window_past_the_find_cap(monkeypatch):
+    from odbms import DBMS
+
+    from cognitrix.sessions import messages as message_log
+
+    rows = [
+        {'id': f'm{sequence}', 'session_id': 's1', 'sequence': sequence, 'kind': 'message',
+         'message': _text('User', f'turn {sequence}'), 'head': [], 'folded_through': None}
+        for sequence in range(1, 251)
+    ]
+    rows[9] = {'id': 'w10', 'session_id': 's1', 'sequence': 10, 'kind': 'window', 'message': {},
+               'head': [_text('User', 'summary')], 'folded_through': 9}
+    monkeypatch.setattr(DBMS, 'Database', _MongoLog(rows))
+
+    assert await message_log.last_sequence('s1') == 250
+    window = await message_log.load_window('s1', 120)
+
+    assert window.last_sequence == 250
+    assert window.sequences == [None, *range(131, 251)]
+    assert [message['content'] for message in window.messages[:2]] == ['summary', 'turn 131']
@@ -52,6 +52,11 @@ def _async_value(value):
     return get_value
 
 
+async def _loaded_as_is(sessions, *_args, **_kwargs):
+    # These stub rows carry their chat in memory; there is no log to read.
+    return sessions
+
+
 def _patch_unbound_task_session(monkeypatch, session: Session) -> None:
     from cognitrix.api.routes import sessions as routes
 
@@ -185,6 +190,7 @@ async def test_session_list_filters_inaccessible_runs_but_keeps_ordinary_session
     )
 
     monkeypatch.setattr(Session, "all", staticmethod(_async_value([ordinary, protected])))
+    monkeypatch.setattr(Session, "load_chats", staticmethod(_loaded_as_is))
     monkeypatch.setattr(routes, "_owned_sessions", _async_value([ordinary]))
     monkeypatch.setattr(
         routes.SessionOwnership,
@@ -269,6 +275,7 @@ async def test_legacy_team_session_list_filters_task_run_acl(monkeypatch):
     )
 
     monkeypatch.setattr(Session, "find", staticmethod(_async_value([ordinary, protected])))
+    monkeypatch.setattr(Session, "load_chats", staticmethod(_loaded_as_is))
     monkeypatch.setattr(routes, "_owned_sessions", _async_value([ordinary]))
     monkeypatch.setattr(
         routes.SessionOwnership,
@@ -705,8 +705,12 @@ async def test_session_save_failure_removes_unadopted_refs_from_memory(monkeypat
 
 @pytest.mark.asyncio
 async def test_media_classifier_ignores_declared_mime_but_rejects_recognized_corruption(
-    tmp_path,
+    tmp_path, monkeypatch
 ):
+    # Recognized rasters are first looked up by digest; none is retained.
+    monkeypatch.setattr(
+        media_service.Artifact, 'find', lambda _query: asyncio.sleep(0, result=[])
+    )
     service = MediaAssetService()
     ownership = MediaOwnership('session-1', 'user-1', 'agent-1')
     text_path = tmp_path / 'declared-image'
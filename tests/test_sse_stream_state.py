@@ -0,0 +1,218 @@
+"""Shared chat-stream output lets any API node resume a browser stream."""
+
+import asyncio
+import json
+import types
+
+import pytest
+
+from cognitrix.utils import sse
+from cognitrix.utils.stream_state import LocalStreamState, StreamEntry, entry_id_key
+
+
+class Request:
+    def __init__(self, last_event_id=None):
+        self.headers = {'last-event-id': last_event_id} if last_event_id else {}
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def _agent(aid):
+    return types.SimpleNamespace(id=aid, name='A')
+
+
+@pytest.mark.asyncio
+async def test_reconnect_on_another_node_resumes_after_last_event_id(local_stream_state):
+    sse._SSE_MANAGERS.clear()
+    release = asyncio.Event()
+
+    class Session:
+        id = 'session-1'
+
+        async def __call__(self, *args, output, **kwargs):
+            await output({'type': 'generate', 'content': 'one'})
+            await release.wait()
+            await output({'type': 'generate', 'content': 'two'})
+
+    owner = sse.get_sse_manager('userA', 'agent1', _agent('agent1'), stream_id='browser-a')
+    owner.begin_turn()
+    session = Session()
+    owner._resolve_session = lambda _sid: asyncio.sleep(0, result=session)
+    await owner.action_queue.put({'type': 'chat_message', 'content': 'hi', 'session_id': session.id})
+
+    first_request = Request()
+    first = (await owner.sse_endpoint(first_request)).body_iterator
+    delivered = await asyncio.wait_for(anext(first), timeout=1)
+    first_request.disconnected = True
+    await first.aclose()
+
+    # The load balancer sends the reconnect to a node without this manager.
+    sse._SSE_MANAGERS.clear()
+    other = sse.get_sse_manager('userA', 'agent1', _agent('agent1'), stream_id='browser-a')
+    assert other is not owner and other.turn_output_queue is None
+    resumed = (await other.sse_endpoint(Request(delivered['id']))).body_iterator
+    release.set()
+
+    second = await asyncio.wait_for(anext(resumed), timeout=2)
+    terminal = await asyncio.wait_for(anext(resumed), timeout=2)
+    assert json.loads(second['data'])['content'] == 'two'
+    assert json.loads(terminal['data'])['type'] == 'turn_complete'
+    assert entry_id_key(delivered['id']) < entry_id_key(second['id']) < entry_id_key(terminal['id'])
+    assert await local_stream_state.offset(owner.stream_key) == terminal['id']
+    await resumed.aclose()
+
+
+@pytest.mark.asyncio
+async def test_finished_turn_is_not_replayed_to_a_caught_up_browser(local_stream_state):
+    sse._SSE_MANAGERS.clear()
+    manager = sse.get_sse_manager('userA', 'agent1', _agent('agent1'), stream_id='browser-a')
+    await local_stream_state.append(manager.stream_key, [
+        StreamEntry('5-1', {'type': 'generate', 'content': 'x'}),
+        StreamEntry('5-2', {'type': 'turn_complete', 'content': ''}, terminal=True),
+    ])
+
+    replayed = [event async for event in manager._resume_shared_output(Request(), asyncio.Event(), '5-2')]
+
+    assert replayed == []
+
+
+@pytest.mark.asyncio
+async def test_local_state_bounds_entries_and_expires_idle_logs(monkeypatch):
+    state = LocalStreamState(maxlen=2, ttl_seconds=30)
+    await state.append('k', [StreamEntry(f'1-{n}', n) for n in range(1, 4)], offset='1-2')
+
+    assert [entry.payload for entry in await state.read('k', None)] == [2, 3]
+    assert [entry.payload for entry in await state.read('k', '1-2')] == [3]
+    assert await state.offset('k') == '1-2'
+    with pytest.raises(ValueError):
+        await state.append('k', [StreamEntry('1-3', 4)])
+
+    waiting = asyncio.create_task(state.read('k', '1-3', timeout=1))
+    await asyncio.sleep(0)
+    await state.append('k', [StreamEntry('2-1', 'next')])
+    assert [entry.id for entry in await waiting] == ['2-1']
+
+    state._logs['k'].touched_at -= 31
+    assert await state.tail('k') is None
+
+
+class _FakeRedis:
+    """The stream, key and script commands RedisStreamState issues."""
+
+    def __init__(self):
+        self.streams: dict[str, list[tuple[str, dict[str, str]]]] = {}
+        self.values: dict[str, str] = {}
+        self.expiries: dict[str, int] = {}
+        self.closed = False
+
+    @staticmethod
+    def _id(entry_id):
+        parts = str(entry_id).split('-')
+        if len(parts) != 2 or not all(part.isdigit() and int(part) < 2 ** 64 for part in parts):
+            raise ValueError('ERR Invalid stream ID specified as stream command argument')
+        return entry_id_key(entry_id)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def xadd(self, stream, fields, id, maxlen, approximate):
+        entries = self.streams.setdefault(stream, [])
+        if entries and self._id(id) <= self._id(entries[-1][0]):
+            raise ValueError('ERR The ID specified in XADD is equal or smaller than the target stream top item')
+        entries.append((id, fields))
+        del entries[:-maxlen]
+
+    async def expire(self, key, ttl):
+        self.expiries[key] = ttl
+
+    async def eval(self, script, numkeys, key, entry_id, ttl):
+        current = self.values.get(key)
+        self.expiries[key] = int(ttl)
+        if current is None or entry_id_key(entry_id) > entry_id_key(current):
+            self.values[key] = entry_id
+            return 1
+        return 0
+
+    async def xread(self, streams, count, block=None):
+        (stream, after), = streams.items()
+        floor = self._id(after)
+        items = [item for item in self.streams.get(stream, []) if self._id(item[0]) > floor][:count]
+        return [[stream, items]] if items else []
+
+    async def xrevrange(self, stream, count):
+        return list(reversed(self.streams.get(stream, [])))[:count]
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def aclose(self):
+        self.closed = True
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append(getattr(self.redis, name)(*args, **kwargs))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+@pytest.mark.asyncio
+async def test_redis_state_appends_trims_and_reads_after_an_id():
+    from cognitrix.utils.stream_state import RedisStreamState
+
+    redis = _FakeRedis()
+    state = RedisStreamState('redis://unused', maxlen=2, ttl_seconds=30, client=redis)
+    await state.append('k', [
+        StreamEntry('1-1', {'n': 1}),
+        StreamEntry('1-2', {'n': 2}),
+        StreamEntry('1-3', {'n': 3}, terminal=True),
+    ], offset='1-2')
+
+    assert [(entry.id, entry.payload) for entry in await state.read('k', None)] == [
+        ('1-2', {'n': 2}), ('1-3', {'n': 3}),
+    ]
+    assert [entry.id for entry in await state.read('k', '1-2', timeout=0.1)] == ['1-3']
+    assert (await state.tail('k')).terminal is True
+    assert redis.expiries == {'cognitrix:sse:k': 30, 'cognitrix:sse:k:offset': 30}
+
+    assert await state.offset('k') == '1-2'
+    await state.ack('k', '1-1')
+    assert await state.offset('k') == '1-2'
+    await state.ack('k', '1-3')
+    assert await state.offset('k') == '1-3'
+
+    await state.aclose()
+    assert redis.closed
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('last_event_id', ['garbage', '1-2-3', '-1-0', '99999999999999999999999-1'])
+async def test_malformed_last_event_id_resumes_nothing(last_event_id):
+    from cognitrix.utils.stream_state import RedisStreamState, set_stream_state
+
+    sse._SSE_MANAGERS.clear()
+    state = RedisStreamState('redis://unused', client=_FakeRedis())
+    manager = sse.get_sse_manager('userA', 'agent1', _agent('agent1'), stream_id='browser-a')
+    await state.append(manager.stream_key, [StreamEntry('5-1', {'type': 'generate', 'content': 'x'})])
+    set_stream_state(state)
+    try:
+        replayed = [
+            event async for event in manager._resume_shared_output(Request(), asyncio.Event(), last_event_id)
+        ]
+    finally:
+        set_stream_state(None)
+
+    assert replayed == []
@@ -0,0 +1,65 @@
+"""Coalescing streamed chat deltas into fewer browser frames."""
+
+import asyncio
+
+import pytest
+
+from cognitrix.utils.coalesce import DeltaCoalescer
+
+
+def _delta(text):
+    return {'type': 'generate', 'content': text, 'action': 'chat_message', 'complete': False}
+
+
+@pytest.mark.asyncio
+async def test_first_delta_is_immediate_and_the_rest_merge_within_the_window():
+    sent = []
+
+    async def sink(payload):
+        sent.append(payload)
+
+    output = DeltaCoalescer(sink, window_seconds=0.02, max_bytes=1024)
+    await output(_delta('Hel'))
+    assert [item['content'] for item in sent] == ['Hel']
+
+    for piece in ('lo', ', ', 'wor', 'ld'):
+        await output(_delta(piece))
+    assert len(sent) == 1
+    await asyncio.sleep(0.05)
+
+    assert [item['content'] for item in sent] == ['Hel', 'lo, world']
+    await output.aclose()
+    assert output.stats == {'deltas': 5, 'frames': 2, 'bytes': 12}
+
+
+@pytest.mark.asyncio
+async def test_size_limit_and_other_events_flush_in_order():
+    sent = []
+
+    async def sink(payload):
+        sent.append(payload)
+
+    output = DeltaCoalescer(sink, window_seconds=60, max_bytes=4)
+    await output(_delta('a'))
+    await output(_delta('bb'))
+    await output(_delta('cc'))
+    await output(_delta('d'))
+    await output({'type': 'tool', 'status': 'started', 'tool_name': 'search'})
+    await output(_delta('e'))
+    await output.aclose()
+
+    assert [item.get('content', item.get('tool_name')) for item in sent] == ['a', 'bbcc', 'd', 'search', 'e']
+
+
+@pytest.mark.asyncio
+async def test_zero_window_sends_every_delta():
+    sent = []
+
+    async def sink(payload):
+        sent.append(payload)
+
+    output = DeltaCoalescer(sink, window_seconds=0, max_bytes=1024)
+    for piece in 'abc':
+        await output(_delta(piece))
+
+    assert [item['content'] for item in sent] == ['a', 'b', 'c']
@@ -397,3 +397,44 @@ async def test_synthesis_control_error_is_never_downgraded_to_fallback():
             [StepResult(text="one"), StepResult(text="two")],
             synthesize,
         )
+
+
+@pytest.mark.asyncio
+async def test_ready_nodes_launch_by_critical_path_and_persist_one_write_per_wave():
+    dag = _dag_module()
+    # Node 3 heads the longest chain (3 -> 4 -> 5) and must start first.
+    nodes = [
+        dag.DagNode(node_id=0),
+        dag.DagNode(node_id=1),
+        dag.DagNode(node_id=2),
+        dag.DagNode(node_id=3),
+        dag.DagNode(node_id=4, dependencies=(3,)),
+        dag.DagNode(node_id=5, dependencies=(4,)),
+    ]
+    started = []
+    waves = []
+    states = []
+
+    async def execute(node):
+        started.append(node.node_id)
+        return node.node_id
+
+    async def persist_started(wave):
+        waves.append([node.node_id for node in wave])
+
+    async def persist(node, state, result, error):
+        states.append((node.node_id, state))
+
+    results = await dag.run_dag(
+        nodes,
+        execute,
+        max_parallel=2,
+        persist=persist,
+        persist_started=persist_started,
+    )
+
+    assert results == {node_id: node_id for node_id in range(6)}
+    assert waves[0] == [3, 0]
+    assert sorted(node_id for wave in waves for node_id in wave) == list(range(6))
+    assert all(state != dag.DagNodeState.RUNNING for _, state in states)
+    assert started.index(3) < started.index(1)
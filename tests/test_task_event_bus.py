@@ -0,0 +1,201 @@
+"""Push fan-out of task-run events to SSE watchers."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from cognitrix.tasks.event_bus import RunEventBus, UnixSocketEventTransport, set_run_event_bus
+from cognitrix.tasks.events import TaskRunEvent
+from cognitrix.tasks.run import TaskRunStatus
+
+
+class RequestStub:
+    headers = {}
+
+    async def is_disconnected(self):
+        return False
+
+
+def _event(sequence, run_id='run-1'):
+    return TaskRunEvent(run_id=run_id, sequence=sequence, kind='text_delta', data={'content': str(sequence)})
+
+
+@pytest.fixture
+def watched_run(monkeypatch):
+    """The SSE route over a local bus, counting every database read."""
+    import cognitrix.api.routes.tasks as routes
+
+    bus = RunEventBus()
+    stored = {'events': [], 'status': TaskRunStatus.RUNNING}
+    reads = {'events': 0, 'runs': 0}
+
+    async def events_after(_run_id, after):
+        reads['events'] += 1
+        return [event for event in stored['events'] if event.sequence > after]
+
+    async def run_get(_run_id):
+        reads['runs'] += 1
+        return SimpleNamespace(status=stored['status'], event_outbox=[])
+
+    monkeypatch.setattr(routes, 'run_event_bus', lambda: bus)
+    monkeypatch.setattr(routes, 'events_after', events_after)
+    monkeypatch.setattr(routes.TaskRun, 'get', staticmethod(run_get))
+    return routes, bus, stored, reads
+
+
+@pytest.mark.asyncio
+async def test_pushed_events_reach_watchers_without_database_reads(watched_run):
+    routes, bus, stored, reads = watched_run
+    stored['events'] = [_event(1)]
+    stream = routes._task_run_event_stream(RequestStub(), 'run-1', 0, resync_interval=60)
+
+    assert (await anext(stream))['id'] == '1'
+    pending = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    assert bus.subscriber_count('run-1') == 1
+
+    await bus.publish('run-1', [_event(2), _event(3)])
+    assert (await pending)['id'] == '2'
+    assert (await anext(stream))['id'] == '3'
+    assert reads == {'events': 1, 'runs': 1}
+
+    stored['status'] = TaskRunStatus.COMPLETED
+    await bus.publish('run-1', terminal=True)
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert bus.subscriber_count('run-1') == 0
+
+
+@pytest.mark.asyncio
+async def test_sequence_gap_and_oversized_messages_catch_up_from_the_cursor(watched_run):
+    routes, bus, stored, reads = watched_run
+    stream = routes._task_run_event_stream(RequestStub(), 'run-1', 0, resync_interval=60)
+    pending = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+
+    stored['events'] = [_event(1), _event(2)]
+    await bus.publish('run-1', [_event(2)])
+    assert (await pending)['id'] == '1'
+    assert (await anext(stream))['id'] == '2'
+
+    stored['events'].append(_event(3))
+    bus._dispatch({'run_id': 'run-1', 'events': None, 'terminal': False})
+    assert (await anext(stream))['id'] == '3'
+    assert reads['events'] == 3
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport_crosses_buses(tmp_path):
+    publisher = RunEventBus(UnixSocketEventTransport(tmp_path))
+    watcher = RunEventBus(UnixSocketEventTransport(tmp_path))
+    subscription = watcher.subscribe('run-1')
+    for _ in range(100):
+        if list(tmp_path.glob('*.sock')):
+            break
+        await asyncio.sleep(0.01)
+
+    await publisher.publish('run-1', [_event(1)])
+    message = await subscription.next(timeout=2)
+
+    assert [payload['sequence'] for payload in message['events']] == [1]
+    subscription.close()
+    await watcher.aclose()
+    await publisher.aclose()
+    assert list(tmp_path.glob('*.sock')) == []
+
+
+@pytest.mark.asyncio
+async def test_flush_outbox_publishes_delivered_events(tmp_path):
+    from odbms import DBMS
+
+    from cognitrix.config import _patch_odbms_sqlite
+    from cognitrix.tasks.repository import RunRepository
+    from cognitrix.tasks.run import TaskRun, TaskRunHead
+
+    await DBMS.initialize_async('sqlite', database=str(tmp_path / 'bus.db'))
+    _patch_odbms_sqlite()
+    for model in (TaskRun, TaskRunHead, TaskRunEvent):
+        create = getattr(model, '_create_table_async', None) or model.create_table
+        await create()
+
+    bus = RunEventBus()
+    set_run_event_bus(bus)
+    try:
+        repo = RunRepository()
+        created = await repo.create_queued(task_id='task-1')
+        subscription = bus.subscribe(created.id)
+        claim = await repo.claim(created.id, owner='worker-a', lease_seconds=60)
+        await repo.emit_event(created.id, claim=claim, kind='step_status', data={'status': 'running'})
+        await repo.force_cancel(created.id, reason='stop', grace_seconds=0)
+
+        messages = []
+        while (message := await subscription.next(timeout=0)) is not None:
+            messages.append(message)
+    finally:
+        set_run_event_bus(None)
+
+    kinds = [payload['kind'] for message in messages for payload in message['events']]
+    assert 'step_status' in kinds and kinds[-1] == 'run_status'
+    assert messages[-1]['terminal'] is True
+
+
+@pytest.mark.asyncio
+async def test_cancel_signal_wakes_the_watcher_without_polling(monkeypatch):
+    import cognitrix.tasks.orchestrator as orch
+
+    bus = RunEventBus(resync_seconds=60)
+    reads = []
+
+    async def cancel_requested(run):
+        reads.append(run.id)
+        return False
+
+    monkeypatch.setattr(orch, '_cancel_requested', cancel_requested)
+    monkeypatch.setattr(orch, 'CANCEL_POLL_MIN_SECONDS', 30)
+    cancel_event = asyncio.Event()
+    watcher = asyncio.create_task(orch._watch_run_cancellation(SimpleNamespace(id='run-1'), cancel_event, bus=bus))
+    await asyncio.sleep(0)
+
+    await bus.publish('run-1', [_event(1)])
+    await asyncio.sleep(0)
+    assert not cancel_event.is_set()
+    await bus.publish('run-1', cancel=True)
+    await asyncio.wait_for(watcher, 1)
+
+    assert cancel_event.is_set()
+    assert reads == ['run-1']
+    assert bus.subscriber_count('run-1') == 0
+
+
+@pytest.mark.asyncio
+async def test_cancellation_poll_backs_off_while_idle(monkeypatch):
+    import cognitrix.tasks.orchestrator as orch
+    from cognitrix.tasks.event_bus import RunEventSubscription
+
+    reads = 0
+    waits = []
+
+    async def cancel_requested(_run):
+        nonlocal reads
+        reads += 1
+        return reads == 5
+
+    async def idle(self, timeout):
+        # Nothing arrives: record the wait the watcher asked for, not the time taken.
+        waits.append(timeout)
+        await asyncio.sleep(0)
+        return None
+
+    monkeypatch.setattr(orch, '_cancel_requested', cancel_requested)
+    monkeypatch.setattr(orch, 'CANCEL_POLL_MIN_SECONDS', 10)
+    monkeypatch.setattr(orch, 'CANCEL_POLL_MAX_SECONDS', 100)
+    monkeypatch.setattr(RunEventSubscription, 'next', idle)
+    cancel_event = asyncio.Event()
+    bus = RunEventBus(resync_seconds=40)
+
+    await asyncio.wait_for(orch._watch_run_cancellation(SimpleNamespace(id='run-1'), cancel_event, bus=bus), 2)
+
+    assert cancel_event.is_set()
+    assert waits == pytest.approx([10, 20, 40, 40], abs=1)
@@ -778,11 +778,12 @@ async def test_run_list_filters_each_historical_run_by_its_immutable_acl(monkeyp
     async def get_task(_task_id):
         return task
 
-    async def authorized_page(task_id, ctx, *, limit, offset):
+    async def authorized_page(task_id, ctx, *, limit, offset, after):
         assert task_id == task.id
         assert limit == 50
         assert offset == 0
-        return [run for run in [allowed, denied] if routes.run_acl_allowed(run, ctx)]
+        assert after is None
+        return [run for run in [allowed, denied] if routes.run_acl_allowed(run, ctx)], None
 
     async def find_steps(run_ids):
         assert run_ids == [allowed.id]
@@ -856,12 +857,20 @@ async def test_run_list_is_bounded_and_batch_hydrates_page_steps(monkeypatch):
         async def find(self, table, conditions, **options):
             calls.append((table, conditions, options))
             if table == TaskRun.table_name():
-                assert conditions == {"task_id": task.id}
+                assert conditions.pop("task_id") == task.id
                 assert options["sort"] == [("created_at", -1), ("_id", -1)]
-                start = options["skip"]
                 size = options["limit"]
                 assert 1 <= size <= 100
-                return [run.json() for run in runs[start:start + size]]
+                rows = [run.json() for run in runs]
+                if conditions:
+                    after = conditions["$or"][1]
+                    start = next(
+                        index + 1
+                        for index, row in enumerate(rows)
+                        if row["id"] == after["_id"]["$lt"]
+                    )
+                    rows = rows[start:]
+                return rows[:size]
             assert table == TaskRunStep.table_name()
             assert conditions == {
                 "run_id": {"$in": ["allowed-1", "allowed-2"]},
@@ -898,7 +907,7 @@ async def test_run_list_is_bounded_and_batch_hydrates_page_steps(monkeypatch):
         ("allowed-2", ["allowed-2"]),
     ]
     run_calls = [call for call in calls if call[0] == TaskRun.table_name()]
-    assert [call[2]["skip"] for call in run_calls] == [0, 100]
+    assert ["$or" in call[1] for call in run_calls] == [False, True]
     assert len([call for call in calls if call[0] == TaskRunStep.table_name()]) == 1
 
 
@@ -913,11 +922,12 @@ async def test_run_list_stops_after_bounded_acl_scan(monkeypatch):
     denied.acl_team_id = "team-denied"
     calls = []
 
-    async def scan(_task_id, *, limit, offset):
-        calls.append((limit, offset))
-        if offset >= 300:
+    async def scan(_task_id, *, limit, after):
+        calls.append((limit, after))
+        start = int(after[1]) if after else 0
+        if start >= 300:
             return []
-        return [denied] * limit
+        return [(("2030-01-01 00:00:00", str(start + index + 1)), denied) for index in range(limit)]
 
     key = SimpleNamespace(
         team_allowed=lambda _team_id: False,
@@ -933,8 +943,8 @@ async def test_run_list_stops_after_bounded_acl_scan(monkeypatch):
         offset=0,
     )
 
-    assert page == []
-    assert calls == [(100, 0), (100, 100)]
+    assert page == ([], routes._encode_cursor(("2030-01-01 00:00:00", "200")))
+    assert calls == [(100, None), (100, ("2030-01-01 00:00:00", "100"))]
 
 
 async def test_run_list_rejects_offsets_above_bounded_history_window(monkeypatch):
@@ -164,13 +164,83 @@ async def test_durable_emitter_propagates_lease_loss(monkeypatch):
     async def lose_lease(self, *args, **kwargs):
         raise LeaseLost('worker-old was fenced')
 
-    monkeypatch.setattr(RunRepository, 'emit_event', lose_lease)
+    monkeypatch.setattr(RunRepository, 'emit_events', lose_lease)
     emitter = TaskRunEventEmitter('run-1', claim=claim)
 
     with pytest.raises(LeaseLost, match='fenced'):
         await emitter.emit('step_status', data={'status': 'running'})
 
 
+@pytest.mark.asyncio
+async def test_durable_text_is_written_in_batches_behind_barriers(monkeypatch):
+    import cognitrix.tasks.events as events
+    from cognitrix.tasks.events import TaskRunEvent, TaskRunEventEmitter
+    from cognitrix.tasks.repository import LeaseClaim, RunRepository
+
+    batches = []
+    release = asyncio.Event()
+
+    async def emit_events(self, run_id, *, claim, events):
+        await release.wait()
+        start = sum(len(batch) for batch in batches)
+        batches.append([event['kind'] for event in events])
+        return [
+            TaskRunEvent(run_id=run_id, sequence=start + offset, **event)
+            for offset, event in enumerate(events, start=1)
+        ]
+
+    monkeypatch.setattr(RunRepository, 'emit_events', emit_events)
+    monkeypatch.setattr(events, 'TEXT_FLUSH_CHARS', 1)
+    emitter = TaskRunEventEmitter('run-1', claim=LeaseClaim(run_id='run-1', owner='worker', generation=1))
+    common = {'session_id': 'session-1', 'step_index': 0, 'agent_name': 'Researcher', 'turn_id': 't', 'attempt': 1}
+
+    for index in range(4):
+        assert await asyncio.wait_for(emitter.text_delta(content=str(index), **common), 1) is None
+    status = asyncio.ensure_future(emitter.emit('step_status', step_index=0, data={'status': 'done'}))
+    await asyncio.sleep(0)
+    assert not status.done()
+
+    release.set()
+    stored = await status
+
+    assert stored.kind == 'step_status' and stored.sequence == 5
+    assert batches == [['text_delta'], ['text_delta'] * 3 + ['step_status']]
+    await emitter.aclose()
+
+
+@pytest.mark.asyncio
+async def test_lease_lost_with_a_full_queue_fails_blocked_writes_and_closes(monkeypatch):
+    import cognitrix.tasks.events as events
+    from cognitrix.tasks.events import TaskRunEventEmitter
+    from cognitrix.tasks.repository import LeaseClaim, LeaseLost, RunRepository
+
+    release = asyncio.Event()
+
+    async def emit_events(self, run_id, *, claim, events):
+        await release.wait()
+        raise LeaseLost('worker was fenced')
+
+    monkeypatch.setattr(RunRepository, 'emit_events', emit_events)
+    monkeypatch.setattr(events, 'TEXT_FLUSH_CHARS', 1)
+    monkeypatch.setattr(events, 'WRITE_QUEUE_SIZE', 2)
+    emitter = TaskRunEventEmitter('run-1', claim=LeaseClaim(run_id='run-1', owner='worker', generation=1))
+    common = {'session_id': 'session-1', 'step_index': 0, 'agent_name': 'Researcher', 'turn_id': 't', 'attempt': 1}
+
+    # One delta is in flight and two fill the queue; the fourth blocks on put.
+    for index in range(3):
+        await asyncio.wait_for(emitter.text_delta(content=str(index), **common), 1)
+    blocked = asyncio.ensure_future(emitter.text_delta(content='3', **common))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+
+    release.set()
+    with pytest.raises(LeaseLost):
+        await asyncio.wait_for(blocked, 1)
+    with pytest.raises(LeaseLost):
+        await asyncio.wait_for(emitter.aclose(), 1)
+    assert emitter._writes.empty()
+
+
 @pytest.mark.asyncio
 async def test_task_run_event_sqlite_round_trip(tmp_path):
     from odbms import DBMS
@@ -464,3 +464,91 @@ async def test_lease_controller_treats_same_claim_terminalization_as_graceful(
         await asyncio.wait_for(controller._stop.wait(), timeout=1)
 
     controller.checkpoint()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_many_renews_live_claims_in_one_update(
+    repository_db,
+    monkeypatch,
+):
+    from odbms import DBMS
+
+    repo = RunRepository()
+    claims = []
+    for index in range(3):
+        created = await repo.create_queued(task_id=f"task-batch-{index}")
+        claim = await repo.claim(created.id, owner="worker-a", lease_seconds=60)
+        assert claim is not None
+        claims.append(claim)
+    stale = LeaseClaim(
+        run_id=claims[1].run_id,
+        owner=claims[1].owner,
+        generation=claims[1].generation + 1,
+    )
+
+    updates = []
+    query = DBMS.Database.query
+
+    async def recording_query(sql, *args, **kwargs):
+        if sql.startswith(f"UPDATE {TaskRun.table_name()} "):
+            updates.append(sql)
+        return await query(sql, *args, **kwargs)
+
+    monkeypatch.setattr(DBMS.Database, "query", recording_query)
+
+    assert await repo.heartbeat_many(claims, lease_seconds=120) == [None] * 3
+    assert len(updates) == 1
+    for claim in claims:
+        renewed = await TaskRun.get(claim.run_id)
+        assert renewed.lease_expires_at > renewed.heartbeat_at
+
+    results = await repo.heartbeat_many(
+        [claims[0], stale, claims[2]],
+        lease_seconds=120,
+    )
+
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], LeaseLost)
+
+
+@pytest.mark.asyncio
+async def test_lease_heartbeat_service_batches_controllers_and_reports_each_failure():
+    from cognitrix.tasks.recovery import LeaseController
+
+    batches = []
+    renewed = asyncio.Event()
+    lost = LeaseClaim(run_id="run-2", owner="worker-a", generation=1)
+
+    class BatchRepository:
+        async def heartbeat(self, run_id, *, claim, lease_seconds):
+            return None
+
+        async def heartbeat_many(self, claims, *, lease_seconds):
+            batches.append([claim.run_id for claim in claims])
+            if len(batches) >= 2:
+                renewed.set()
+            return [
+                LeaseLost("worker lease was fenced") if claim == lost else None
+                for claim in claims
+            ]
+
+    healthy = LeaseController(
+        LeaseClaim(run_id="run-1", owner="worker-a", generation=1),
+        repository=BatchRepository(),
+        heartbeat_interval=0.01,
+    )
+    fenced = LeaseController(
+        lost,
+        repository=BatchRepository(),
+        heartbeat_interval=0.01,
+    )
+
+    async with healthy:
+        with pytest.raises(LeaseLost, match="worker lease was fenced"):
+            async with fenced:
+                await asyncio.wait_for(fenced.wait_failed(), timeout=1)
+        await asyncio.wait_for(renewed.wait(), timeout=1)
+        healthy.checkpoint()
+
+    assert batches[0] == ["run-1", "run-2"]
+    assert all(batch == ["run-1"] for batch in batches[1:])
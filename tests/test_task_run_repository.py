@@ -308,6 +308,84 @@ async def test_outbox_flush_recovers_idempotently_after_insert_before_ack(
     assert stored_run.event_outbox == []
 
 
+async def _strand_outbox(repo, run_id: str, count: int) -> None:
+    async def leave_for_recovery(*args, **kwargs):
+        return []
+
+    original = repo.flush_outbox
+    repo.flush_outbox = leave_for_recovery
+    try:
+        for index in range(count):
+            await repo.mutate(
+                run_id,
+                claim=None,
+                updates={},
+                expected_statuses={TaskRunStatus.QUEUED},
+                event={"kind": "run_status", "data": {"index": index}},
+            )
+    finally:
+        repo.flush_outbox = original
+
+
+@pytest.mark.asyncio
+async def test_outbox_flush_round_trips_do_not_grow_with_event_count(
+    repository_db,
+    monkeypatch,
+):
+    from odbms import DBMS
+
+    RunRepository, _, _, _ = _repository_api()
+    database = DBMS.Database
+    original_connection = database._get_connection
+    round_trips = []
+
+    def counted_connection():
+        round_trips.append(1)
+        return original_connection()
+
+    costs = {}
+    for count in (1, 40):
+        repo = RunRepository()
+        created = await repo.create_queued(task_id=f"task-{count}")
+        await _strand_outbox(repo, created.id, count)
+
+        monkeypatch.setattr(database, "_get_connection", counted_connection)
+        round_trips.clear()
+        delivered = await repo.flush_outbox(created.id)
+        costs[count] = len(round_trips)
+        monkeypatch.setattr(database, "_get_connection", original_connection)
+
+        assert [event.sequence for event in delivered] == list(range(1, count + 1))
+        assert [event.data["index"] for event in delivered] == list(range(count))
+        assert all(event.id for event in delivered)
+        stored_run = await TaskRun.get(created.id)
+        assert stored_run.event_outbox == []
+
+    assert costs[40] == costs[1]
+
+
+@pytest.mark.asyncio
+async def test_outbox_flush_drains_in_bounded_batches(repository_db, monkeypatch):
+    from cognitrix.tasks import repository as repository_module
+
+    RunRepository, _, _, _ = _repository_api()
+    repo = RunRepository()
+    created = await repo.create_queued(task_id="task-1")
+    await _strand_outbox(repo, created.id, 10)
+    # Another flusher already delivered part of the first batch.
+    stranded = await TaskRun.get(created.id)
+    await TaskRunEvent(**stranded.event_outbox[1]).save()
+
+    monkeypatch.setattr(repository_module, "OUTBOX_BATCH_SIZE", 4)
+    delivered = await repo.flush_outbox(created.id)
+
+    assert [event.sequence for event in delivered] == list(range(1, 11))
+    stored_events = await TaskRunEvent.find({"run_id": created.id})
+    assert sorted(event.sequence for event in stored_events) == list(range(1, 11))
+    stored_run = await TaskRun.get(created.id)
+    assert stored_run.event_outbox == []
+
+
 @pytest.mark.asyncio
 async def test_queued_cancel_prevents_late_worker_claim(repository_db):
     RunRepository, _, _, _ = _repository_api()
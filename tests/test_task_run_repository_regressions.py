@@ -200,14 +200,14 @@ async def test_repository_schema_setup_runs_once_per_database_instance(monkeypat
         *(RunRepository()._ensure_indexes() for _ in range(8))
     )
 
-    assert len(first_database.statements) == 4
+    assert len(first_database.statements) == 6
     assert sum("DROP TRIGGER" in sql for sql in first_database.statements) == 1
 
     second_database = RecordingDatabase()
     monkeypatch.setattr(DBMS, "Database", second_database)
     await RunRepository()._ensure_indexes()
 
-    assert len(second_database.statements) == 4
+    assert len(second_database.statements) == 6
 
 
 @pytest.fixture
@@ -5,6 +5,7 @@ from fastapi import HTTPException
 from sse_starlette.sse import EventSourceResponse
 
 from cognitrix.common.security import AuthContext
+from cognitrix.tasks.event_bus import RunEventBus
 
 
 class RequestStub:
@@ -77,15 +78,12 @@ async def test_stream_replays_ordered_events_then_stops_at_terminal(monkeypatch)
     async def run_get(_id):
         return SimpleNamespace(status=routes.TaskRunStatus.COMPLETED)
 
-    async def no_sleep(_seconds):
-        return None
-
     monkeypatch.setattr(routes, 'events_after', event_rows)
     monkeypatch.setattr(routes.TaskRun, 'get', staticmethod(run_get))
-    monkeypatch.setattr(routes.asyncio, 'sleep', no_sleep)
+    monkeypatch.setattr(routes, 'run_event_bus', RunEventBus)
 
     stream = routes._task_run_event_stream(
-        RequestStub(), 'run-1', 0, poll_interval=0
+        RequestStub(), 'run-1', 0, resync_interval=0
     )
     first = await anext(stream)
     second = await anext(stream)
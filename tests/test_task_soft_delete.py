@@ -395,3 +395,36 @@ def test_task_schema_migration_includes_tombstone_column():
 
     assert ("deleted_at", "TEXT") in _TASK_MIGRATION_COLUMNS
     assert ("deleted_at", "TEXT") in _TASKRUN_HEAD_MIGRATION_COLUMNS
+
+
+async def test_task_list_pages_live_tasks_with_latest_run_status(task_delete_db):
+    from fastapi import Response
+
+    import cognitrix.api.routes.tasks as routes
+
+    tasks = []
+    for index in range(3):
+        task = Task(title=f"live-{index}", description="keep it")
+        await task.save()
+        tasks.append(task)
+    hidden = Task(title="hidden", description="gone", deleted_at="2030-01-01 00:00:00")
+    await hidden.save()
+    run = await RunRepository().create_queued(
+        task_id=tasks[0].id,
+        requested_by="user-1",
+    )
+
+    first_response, second_response = Response(), Response()
+    first = await routes.list_tasks(limit=2, response=first_response)
+    cursor = first_response.headers["X-Next-Cursor"]
+    second = await routes.list_tasks(limit=2, cursor=cursor, response=second_response)
+
+    everything = await routes.list_tasks()
+    assert [item["id"] for item in first + second] == [item["id"] for item in everything]
+    assert "X-Next-Cursor" not in second_response.headers
+    assert {item["id"] for item in everything} == {task.id for task in tasks}
+    projected = {item["id"]: item for item in everything}
+    assert projected[tasks[0].id]["run_id"] == run.id
+    assert projected[tasks[0].id]["run_status"] == TaskRunStatus.QUEUED
+    assert projected[tasks[0].id]["status"] == TaskStatus.IN_PROGRESS
+    assert projected[tasks[1].id]["run_id"] is None
@@ -250,6 +250,199 @@ async def test_transition_step_updates_only_the_target_row(task_step_db):
     assert rows[1].attempts == 0
 
 
+@pytest.mark.asyncio
+async def test_transition_steps_starts_a_wave_with_one_fenced_write(task_step_db):
+    from odbms import DBMS
+
+    run, claim = await _running_run()
+    await _save_pending_steps(run, ("Collect", "Write", "Review"))
+    await DBMS.Database.query(
+        "CREATE TABLE task_step_update_audit (step_index INTEGER NOT NULL)"
+    )
+    await DBMS.Database.query(
+        f"CREATE TRIGGER audit_task_step_update AFTER UPDATE ON {TaskRunStep.table_name()} "
+        "BEGIN INSERT INTO task_step_update_audit (step_index) "
+        "VALUES (NEW.step_index); END"
+    )
+    repository = RunRepository()
+
+    started = await repository.transition_steps(
+        run.id,
+        [2, 0],
+        claim=claim,
+        updates={"status": TaskRunStepStatus.RUNNING},
+        expected_statuses={TaskRunStepStatus.PENDING},
+    )
+
+    audit = await DBMS.Database.query(
+        "SELECT step_index FROM task_step_update_audit ORDER BY step_index"
+    )
+    assert [row[0] for row in audit.fetchall()] == [0, 2]
+    assert [(row.step_index, row.status) for row in started] == [
+        (0, TaskRunStepStatus.RUNNING),
+        (2, TaskRunStepStatus.RUNNING),
+    ]
+    with pytest.raises(RunStateConflict, match=r"steps \[0\] are not pending"):
+        await repository.transition_steps(
+            run.id,
+            [0, 1],
+            claim=claim,
+            updates={"status": TaskRunStepStatus.RUNNING},
+            expected_statuses={TaskRunStepStatus.PENDING},
+        )
+    assert (await _steps(run.id))[1].status == TaskRunStepStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_compile_steps_inserts_a_whole_plan_in_one_statement(task_step_db):
+    from odbms import DBMS
+
+    run, claim = await _running_run()
+    plan = [
+        _plan_entry(index, f"Step {index}", dependencies=[index - 1] if index else [])
+        for index in range(40)
+    ]
+    original = DBMS.Database.query
+    inserts = []
+
+    async def counted(sql, *args, **kwargs):
+        if sql.lstrip().upper().startswith(f"INSERT INTO {TaskRunStep.table_name().upper()}"):
+            inserts.append(sql)
+        return await original(sql, *args, **kwargs)
+
+    DBMS.Database.query = counted
+    try:
+        rows = await RunRepository().compile_steps(run.id, plan, claim=claim)
+    finally:
+        DBMS.Database.query = original
+
+    assert len(inserts) == 1
+    assert [row.step_index for row in rows] == list(range(40))
+    assert rows[39].dependencies == [38]
+    assert await RunRepository().compile_steps(run.id, plan, claim=claim) == rows
+
+
+@pytest.mark.asyncio
+async def test_compile_steps_falls_back_row_by_row_only_on_unique_conflicts(task_step_db):
+    import sqlite3
+
+    run, claim = await _running_run()
+    plan = [_plan_entry(index, f"Step {index}") for index in range(3)]
+    repository = RunRepository()
+    insert = repository._fenced_step_insert
+    failure: Exception = RuntimeError("connection reset")
+    batches = []
+
+    async def failing_bulk_insert(candidate, *, claim):
+        if isinstance(candidate, list):
+            batches.append(len(candidate))
+            raise failure
+        return await insert(candidate, claim=claim)
+
+    repository._fenced_step_insert = failing_bulk_insert
+    with pytest.raises(RuntimeError, match="connection reset"):
+        await repository.compile_steps(run.id, plan, claim=claim)
+    assert await _steps(run.id) == []
+
+    failure = sqlite3.IntegrityError("UNIQUE constraint failed")
+    rows = await repository.compile_steps(run.id, plan, claim=claim)
+
+    assert batches == [3, 3]
+    assert [row.step_index for row in rows] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_transition_steps_cancels_pending_and_running_siblings_together(task_step_db):
+    run, claim = await _running_run()
+    await _save_pending_steps(run, ("Collect", "Write", "Review"))
+    repository = RunRepository()
+    await repository.transition_step(
+        run.id, 0, claim=claim, updates={"status": TaskRunStepStatus.RUNNING}
+    )
+
+    cancelled = await repository.transition_steps(
+        run.id,
+        [0, 1, 2],
+        claim=claim,
+        updates={"status": TaskRunStepStatus.CANCELLED},
+        expected_statuses={TaskRunStepStatus.PENDING, TaskRunStepStatus.RUNNING},
+    )
+
+    assert [row.status for row in cancelled] == [TaskRunStepStatus.CANCELLED] * 3
+    assert [row.status for row in await _steps(run.id)] == [TaskRunStepStatus.CANCELLED] * 3
+
+
+async def _finish_step_behind_the_read(run_id: str, step_index: int) -> None:
+    from odbms import DBMS
+
+    await DBMS.Database.query(
+        f"UPDATE {TaskRunStep.table_name()} SET status = :status "
+        "WHERE run_id = :run_id AND step_index = :step_index",
+        {"status": TaskRunStepStatus.DONE.value, "run_id": run_id, "step_index": step_index},
+    )
+
+
+@pytest.mark.asyncio
+async def test_transition_steps_writes_nothing_when_one_row_races(task_step_db):
+    run, claim = await _running_run()
+    await _save_pending_steps(run, ("Collect", "Write", "Review"))
+    repository = RunRepository()
+    step_rows = repository._step_rows
+
+    async def racing_read(run_id, step_indexes):
+        rows = await step_rows(run_id, step_indexes)
+        await _finish_step_behind_the_read(run_id, 1)
+        return rows
+
+    repository._step_rows = racing_read
+    with pytest.raises(RunStateConflict, match="changed during a batch transition"):
+        await repository.transition_steps(
+            run.id,
+            [0, 1, 2],
+            claim=claim,
+            updates={"status": TaskRunStepStatus.RUNNING},
+            expected_statuses={TaskRunStepStatus.PENDING},
+        )
+
+    assert [row.status for row in await _steps(run.id)] == [
+        TaskRunStepStatus.PENDING, TaskRunStepStatus.DONE, TaskRunStepStatus.PENDING,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_unfinished_steps_leaves_a_step_that_finished_meanwhile(task_step_db):
+    from cognitrix.tasks import orchestrator
+
+    run, claim = await _running_run()
+    await _save_pending_steps(run, ("Collect", "Write", "Review"))
+    repository = RunRepository()
+    transition_steps = repository.transition_steps
+    attempts = []
+
+    async def finishing_first(run_id, step_indexes, **kwargs):
+        attempts.append(list(step_indexes))
+        if len(attempts) == 1:
+            await _finish_step_behind_the_read(run_id, 1)
+        return await transition_steps(run_id, step_indexes, **kwargs)
+
+    class Emitter:
+        def __init__(self):
+            self.events = []
+
+        async def emit(self, kind, **kwargs):
+            self.events.append((kwargs["step_index"], kwargs["data"]["status"]))
+
+    repository.transition_steps = finishing_first
+    emitter = Emitter()
+    await orchestrator._cancel_unfinished_steps(repository, run, claim, emitter)
+
+    assert attempts == [[0, 1, 2], [0, 2]]
+    assert [row.status for row in await _steps(run.id)] == [
+        TaskRunStepStatus.CANCELLED, TaskRunStepStatus.DONE, TaskRunStepStatus.CANCELLED,
+    ]
+    assert sorted(emitter.events) == [(0, "cancelled"), (2, "cancelled")]
+
+
 @pytest.mark.parametrize(
     ("current", "target"),
     [
@@ -790,3 +983,88 @@ async def test_run_detail_rejects_run_from_another_task(task_step_db):
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "Task run not found"
+
+
+@pytest.mark.asyncio
+async def test_run_list_pages_by_cursor_and_skips_run_bodies(task_step_db, monkeypatch):
+    from fastapi import HTTPException, Response
+
+    from cognitrix.api.routes import tasks as task_routes
+    from cognitrix.common.security import AuthContext
+
+    task = Task(title="API task", description="Work")
+    await task.save()
+    legacy = TaskRun(
+        task_id=task.id,
+        status=TaskRunStatus.COMPLETED,
+        acl_version=1,
+        plan=[{**_plan_entry(0, "Legacy plan"), "status": "done"}],
+        result="PRIVATE RUN RESULT",
+    )
+    await legacy.save()
+    for _ in range(4):
+        run = TaskRun(
+            task_id=task.id,
+            status=TaskRunStatus.COMPLETED,
+            acl_version=1,
+            plan=[{**_plan_entry(0, "Stale"), "status": "pending"}],
+            result="PRIVATE RUN RESULT",
+            event_outbox=[{"kind": "private"}],
+        )
+        await run.save()
+        await TaskRunStep(
+            run_id=run.id,
+            task_id=task.id,
+            step_index=0,
+            title="Authoritative",
+            status=TaskRunStepStatus.DONE,
+        ).save()
+    listed = []
+    summarize = task_routes._run_summary
+
+    async def recording_summary(run, *, steps=None):
+        listed.append(run)
+        return await summarize(run, steps=steps)
+
+    monkeypatch.setattr(task_routes, "_run_summary", recording_summary)
+    ctx = AuthContext(user=SimpleNamespace(id="user-1"), api_key=None)
+
+    pages, cursor = [], None
+    while True:
+        response = Response()
+        pages.append(await task_routes.list_task_runs(
+            task.id, ctx, limit=2, cursor=cursor, response=response,
+        ))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    ids = [item["id"] for page in pages for item in page]
+    everything = await task_routes.list_task_runs(task.id, ctx)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert ids == [item["id"] for item in everything]
+    assert len(set(ids)) == 5
+    assert all(run.result is None and run.event_outbox == [] for run in listed)
+    plans = {item["id"]: item["plan"] for item in everything}
+    assert plans[legacy.id][0]["title"] == "Legacy plan"
+    assert all(
+        plan[0]["title"] == "Authoritative"
+        for run_id, plan in plans.items()
+        if run_id != legacy.id
+    )
+    assert "PRIVATE RUN RESULT" not in json.dumps(everything)
+    with pytest.raises(HTTPException):
+        await task_routes.list_task_runs(task.id, ctx, cursor="not-a-cursor")
+
+
+def test_run_list_mongo_cursor_compares_object_ids():
+    from bson import ObjectId
+
+    from cognitrix.api.routes import tasks as task_routes
+
+    oid = ObjectId()
+    conditions = task_routes._keyset_conditions(('2026-01-01T00:00:00', str(oid)))
+    assert conditions['$or'][1]['_id'] == {'$lt': oid}
+
+    conditions = task_routes._keyset_conditions(('2026-01-01T00:00:00', 'not-an-object-id'))
+    assert conditions['$or'][1]['_id'] == {'$lt': 'not-an-object-id'}
@@ -175,7 +175,7 @@ async def test_grep_applies_per_match_timeout_with_regex_engine(
     captured = {}
 
     class TimeoutPattern:
-        def search(self, value, *, timeout=None):
+        def search(self, value, *, timeout=None, **_options):
             captured['value'] = value
             captured['timeout'] = timeout
             if timeout is not None:
@@ -184,6 +184,7 @@ async def test_grep_applies_per_match_timeout_with_regex_engine(
 
     engine = SimpleNamespace(
         IGNORECASE=1,
+        MULTILINE=8,
         compile=lambda _pattern, _flags=0: TimeoutPattern(),
         escape=lambda value: value,
         error=ValueError,
@@ -197,6 +198,47 @@ async def test_grep_applies_per_match_timeout_with_regex_engine(
     assert captured['timeout'] == 0.01
 
 
+@pytest.mark.asyncio
+async def test_grep_returns_context_lines_around_each_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'tools_root', tmp_path.resolve())
+    (tmp_path / 'notes.txt').write_text('one\ntwo\nneedle\nfour\nfive\n')
+
+    result = await Grep.run(pattern='needle', path='.', context=1)
+
+    lines = result.content.splitlines()
+    match = next(index for index, line in enumerate(lines) if ':3: needle' in line)
+    assert lines[match - 1].endswith('-2- two')
+    assert lines[match + 1].endswith('-4- four')
+    assert 'five' not in result.content
+
+
+@pytest.mark.asyncio
+async def test_grep_maps_buffer_matches_to_lines_across_windows_and_files(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, 'tools_root', tmp_path.resolve())
+    monkeypatch.setattr(misc, 'SEARCH_WINDOW_CHARS', 64)
+    body = ''.join(
+        f'row {index} {"needle" if index % 25 == 0 else "hay"}\r\n'
+        for index in range(1, 101)
+    )
+    for name in ('a.txt', 'b.txt', 'c.txt'):
+        (tmp_path / name).write_text(body, newline='')
+
+    result = await Grep.run(pattern='needle$', path='.', max_results=10)
+
+    found = [
+        line.split(': ', 1)[0].rsplit('/', 1)[-1]
+        for line in result.content.splitlines()
+        if line.endswith('needle')
+    ]
+    assert found == [
+        f'{name}:{index}'
+        for name in ('a.txt', 'b.txt', 'c.txt')
+        for index in (25, 50, 75, 100)
+    ][:10]
+
+
 @pytest.mark.asyncio
 async def test_glob_rejects_an_oversized_pattern(tmp_path, monkeypatch):
     monkeypatch.setattr(settings, 'tools_root', tmp_path.resolve())